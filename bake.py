@@ -0,0 +1,70 @@
+"""
+Pré-processa as texturas dos modelos: gera, ao lado de cada imagem, um arquivo `.mips` com a cadeia de mipmaps
+(opcionalmente comprimida em BC1/BC3), que o jogo carrega direto, sem decodificar a imagem (veja
+src/components/bake.py). Imagens já processadas e sem mudanças são puladas.
+
+Com `--lods`, também gera os níveis de detalhe de cada OBJ (veja src/components/lod.py) e os guarda no cache em
+disco, para que a carga dos modelos registrados com `lods` não precise simplificá-los.
+
+Uso (a partir da raiz do repositório):
+
+    python bake.py [models] [--compress] [--force] [--lods [FRAÇÃO ...]]
+"""
+import argparse
+import os
+import time
+
+from src.components import cache
+from src.components.bake import bake_directory
+from src.components.lod import DEFAULT_LODS, read_lods
+from src.components.model import read_triangles
+
+
+def bake_lods(root: str, ratios=DEFAULT_LODS, force: bool = False):
+    """
+    Gera os níveis de detalhe de cada OBJ em `root` e nos subdiretórios, pulando os que já estão no cache.
+
+    :return: Lista de (caminho, descrição do resultado).
+    """
+    results = []
+    for directory, _, files in sorted(os.walk(root)):
+        for file in sorted(files):
+            if not file.endswith('.obj'):
+                continue
+            source = os.path.join(directory, file)
+            if force and os.path.exists(cache.cache_path(source, "lods")):
+                os.remove(cache.cache_path(source, "lods"))
+
+            start = time.perf_counter()
+            try:
+                triangles, _ = read_triangles(source)
+                _, errors = read_lods(source, triangles, ratios)
+            except (OSError, ValueError) as error:
+                results.append((source, f"ignorado ({error})"))
+                continue
+            total = sum(len(vertices) // 9 for vertices, _, _ in triangles.values())
+            levels = ", ".join(f"{error:.4f}" for error in errors) or "nenhum"
+            results.append((source, f"{total} triângulos, erros dos níveis: {levels}, "
+                                    f"em {(time.perf_counter() - start) * 1000:.0f}ms"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", nargs="?", default="models")
+    parser.add_argument("--compress", action="store_true", help="comprime em BC1/BC3 (S3TC)")
+    parser.add_argument("--force", action="store_true", help="refaz mesmo os arquivos atualizados")
+    parser.add_argument("--lods", type=float, nargs="*", default=None,
+                        help=f"gera os níveis de detalhe com estas frações de triângulos (padrão: {DEFAULT_LODS})")
+    args = parser.parse_args()
+
+    for source, result in bake_directory(args.root, args.compress, args.force):
+        print(f"{source}: {result}")
+
+    if args.lods is not None:
+        for source, result in bake_lods(args.root, tuple(args.lods) or DEFAULT_LODS, args.force):
+            print(f"{source}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Confere o gerenciador de modelos (src/engine/assets.py) e mede o custo de liberar e recarregar os modelos quando a
+memória de vídeo passa do limite.
+
+Os modelos são gerados em um diretório temporário: malhas de quadriláteros em dois materiais, com uma textura de
+ruído (JPEG) por material; dois modelos usam a mesma imagem. As verificações cobrem o registro de um diretório
+repetido (um só Model, também no pool de processos), a contagem de usuários (objetos e cenas, que saem ao serem
+coletados), a ordem de liberação (primeiro os sem usuários, depois os desenhados há mais tempo), o limite
+respeitado, a textura compartilhada mantida, a volta transparente ao desenhar (mesmos buffers e pixels) e as
+estatísticas por modelo. Usa uma HeadlessWindow (EGL), então não precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.assets [--models N] [--faces N] [--size PIXELS] [--frames N]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import gc
+import tempfile
+import time
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+
+from src.components import Model, Object, Scene
+from src.engine import Engine
+from src.view import HeadlessWindow, Shader
+
+from .common import buffer_bytes, check, create_models, release, texture_bytes
+
+
+def snapshot(model):
+    """Conteúdo dos buffers e das texturas do modelo na GPU."""
+    return (buffer_bytes(model.vbo), buffer_bytes(model.ebo) if model.ebo else None,
+            [texture_bytes(model.texture_ids[material]) for material in model.texture_ids])
+
+
+def setup_camera(shader: Shader, count: int):
+    """Vista de cima, ortográfica, com os `count` modelos lado a lado (veja place)."""
+    glUseProgram(int(shader.shader_program))
+    shader.shader_program.set_mat4("view", glm.lookAt(glm.vec3(0, 5, 0), glm.vec3(0, 0, 0), glm.vec3(0, 0, -1)))
+    shader.shader_program.set_mat4("projection", glm.ortho(-0.1, count * 1.1, -1.1, 0.1, -10, 10))
+    glEnable(GL_DEPTH_TEST)
+    # Sem luzes, os modelos saem pretos: o fundo cinza deixa as silhuetas na imagem
+    glClearColor(0.2, 0.2, 0.2, 1.0)
+
+
+def place(model, i: int) -> Object:
+    return Object(model).move((i * 1.1, 0, 0))
+
+
+def frame(engine: Engine, window: HeadlessWindow, objects) -> np.ndarray:
+    engine.objects = list(objects)
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    engine.render()
+    return window.read_pixels()
+
+
+def verify(models, shader: Shader, window: HeadlessWindow) -> bool:
+    print("verificações:")
+    results = []
+    program = shader.shader_program
+    dirs = list(models.values())
+
+    engine = Engine(program)
+    first = engine.register_model("a", dirs[0])
+    results.append(check("mesmo diretório, mesmo Model (e o nome novo aponta para ele)",
+                         engine.register_model("b", dirs[0]) is first and engine.models["b"] is first
+                         and first.loads == 1 and len(engine.assets.models) == 1))
+    results.append(check("outro formato (indexado) é outro Model",
+                         engine.register_model("c", dirs[0], indexed=True) is not first))
+    loaded = engine.register_models({"d": dirs[0], "e": dirs[1], "f": dirs[1]}, workers=2)
+    results.append(check("no pool de processos: repetidos no lote e já registrados não são lidos de novo",
+                         loaded["d"] is first and loaded["e"] is loaded["f"] and loaded["e"].loads == 1
+                         and len(engine.assets.models) == 3))
+
+    model = loaded["e"]
+    obj = Object(model)
+    scene = Scene("users", [obj])
+    counts = [model.refcount]
+    other = Object(model)
+    counts.append(model.refcount)
+    del other
+    gc.collect()
+    counts.append(model.refcount)
+    obj.set_model(first)
+    counts.append(model.refcount)
+    results.append(check(f"usuários contados: objeto e cena, e saem ao serem coletados ou trocarem de modelo "
+                         f"({counts})", counts == [2, 3, 2, 1] and first.refcount == 1))
+    del obj, scene
+    gc.collect()
+    results.append(check("nenhum usuário depois de apagar a cena e o objeto", model.refcount == 0))
+    release(engine)
+
+    engine = Engine(program)
+    registered = engine.register_models(models, workers=1)
+    meshes = list(registered.values())
+    setup_camera(shader, len(meshes))
+    objects = [place(mesh, i) for i, mesh in enumerate(meshes[:-1])]
+    scene_users = Scene("users", objects)  # Mantém os modelos desenhados com usuários
+    # O último modelo não tem usuários; o segundo é o desenhado há mais tempo; o primeiro, o mais recente
+    frame(engine, window, objects)
+    before = {mesh.root_dir: snapshot(mesh) for mesh in meshes}
+    expected = frame(engine, window, objects)
+    frame(engine, window, objects[:1] + objects[2:])
+    frame(engine, window, objects[:1])
+    unused, oldest = meshes[-1], meshes[1]
+
+    stone = meshes[0].texture_ids["stone"]
+    memory = engine.assets.memory()
+    textures = engine.textures.sizes
+    freed = (unused.gpu_memory() + sum(textures[texture_id] for texture_id in unused.texture_ids.values()))
+    engine.assets.budget = memory - freed - 1
+    evicted = engine.assets.trim(engine.render_queue.frame)
+    results.append(check("liberados primeiro o sem usuários, depois o desenhado há mais tempo",
+                         evicted == [unused, oldest]))
+    results.append(check(f"memória dentro do limite ({engine.assets.memory() / 2 ** 20:.2f}MB de "
+                         f"{engine.assets.budget / 2 ** 20:.2f}MB)",
+                         engine.assets.memory() <= engine.assets.budget
+                         and engine.assets.counters["evicted"] == 2
+                         and all(mesh.resident for mesh in meshes if mesh not in evicted)))
+    results.append(check("textura compartilhada com um modelo residente continua na GPU; as outras saem",
+                         oldest.texture_ids["stone"] == stone and stone in engine.textures.sizes
+                         and oldest.texture_ids["moss"] not in engine.textures.sizes
+                         and unused.texture_ids["moss"] not in engine.textures.sizes))
+    engine.assets.budget = None
+    pixels = frame(engine, window, objects)
+    results.append(check("volta transparente ao desenhar: mesmos pixels",
+                         oldest.resident and expected.any() and np.array_equal(pixels, expected)))
+    results.append(check("mesmos buffers e texturas depois de voltar",
+                         all(snapshot(mesh) == before[mesh.root_dir] for mesh in meshes if mesh.resident)
+                         and engine.assets.counters["restored"] == 1))
+    results.append(check("bytes dos buffers contados pelos arrays iguais aos tamanhos na GPU",
+                         all(mesh.buffer_memory == len(buffer_bytes(mesh.vbo))
+                             + (len(buffer_bytes(mesh.ebo)) if mesh.ebo else 0) for mesh in meshes if mesh.resident)))
+    engine.assets.budget = 0
+    results.append(check("os desenhados no quadro atual não são liberados, mesmo acima do limite",
+                         engine.assets.trim(engine.render_queue.frame) == []
+                         and all(mesh.resident for mesh in meshes[:-1])))
+    stats = {entry.path: entry for entry in engine.assets.stats()}
+    entry = stats[oldest.root_dir]
+    results.append(check("estatísticas por modelo",
+                         entry.loads == 2 and entry.evictions == 1 and entry.resident and entry.users == 2
+                         and entry.shared == 1 and entry.geometry == oldest.gpu_memory()
+                         and stats[unused.root_dir].resident is False and stats[unused.root_dir].geometry == 0
+                         and len(engine.assets.report()) == len(meshes)))
+    # Um modelo fora do AssetManager (ex.: um placeholder) que usa o cache da Engine também segura as texturas
+    outside = Model(program, meshes[0].root_dir, texture_manager=engine.textures)
+    engine.assets.evict(meshes[0])
+    results.append(check("textura de um modelo não registrado, com o mesmo cache, continua na GPU",
+                         outside.texture_ids == meshes[0].texture_ids
+                         and all(texture_id in engine.textures.sizes for texture_id in outside.texture_ids.values())))
+    outside.evict()
+    del scene_users
+    release(engine)
+    return all(results)
+
+
+def thrash(models, shader: Shader, window: HeadlessWindow, frames: int, budget: float | None):
+    """
+    Desenha um modelo diferente a cada quadro, em rodízio. Com um limite menor que todos os modelos, cada quadro
+    libera um modelo e traz outro de volta. Devolve os tempos dos quadros e a memória máxima.
+    """
+    engine = Engine(shader.shader_program)
+    meshes = list(engine.register_models(models, workers=1).values())
+    setup_camera(shader, len(meshes))
+    objects = [place(mesh, i) for i, mesh in enumerate(meshes)]
+    engine.assets.budget = budget
+    times, peak = [], 0
+    for i in range(frames):
+        start = time.perf_counter()
+        frame(engine, window, objects[i % len(objects):][:1])
+        glFinish()
+        times.append(time.perf_counter() - start)
+        peak = max(peak, engine.assets.counters["memory"])
+    release(engine)
+    return np.array(times) * 1000, peak
+
+
+def measure(models, shader: Shader, window: HeadlessWindow, frames: int):
+    engine = Engine(shader.shader_program)
+    meshes = list(engine.register_models(models, workers=1).values())
+    total = engine.assets.memory()
+    model = meshes[0]
+    start = time.perf_counter()
+    engine.assets.evict(model)
+    glFinish()
+    evict = time.perf_counter() - start
+    start = time.perf_counter()
+    model.restore()
+    glFinish()
+    restore = time.perf_counter() - start
+    release(engine)
+
+    print(f"\n{len(models)} modelos, {total / 2 ** 20:.1f}MB na GPU:")
+    print(f"  liberar um modelo: {evict * 1000:.2f}ms; trazer de volta: {restore * 1000:.2f}ms")
+    print(f"  {'um modelo por quadro':28s} {'p50':>8s} {'p99':>8s} {'máx':>8s} {'memória':>9s}")
+    for name, budget in (("sem limite", None), ("limite de metade", total / 2)):
+        times, peak = thrash(models, shader, window, frames, budget)
+        p50, p99 = np.percentile(times, [50, 99])
+        print(f"  {name:28s} {p50:6.2f}ms {p99:6.2f}ms {times.max():6.2f}ms {peak / 2 ** 20:7.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--faces", type=int, default=20000, help="quadriláteros por modelo")
+    parser.add_argument("--size", type=int, default=512, help="lado das texturas, em pixels")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    window = HeadlessWindow(256, 64)
+    window.create_window()
+    try:
+        shader = Shader("shaders/vertex.glsl", "shaders/fragment.glsl")
+        with tempfile.TemporaryDirectory() as directory:
+            models = create_models(directory, max(4, args.models), args.faces, args.size, "jpg", shared=True)
+            ok = verify(dict(list(models.items())[:4]), shader, window)
+            measure(models, shader, window, args.frames)
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
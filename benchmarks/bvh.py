@@ -0,0 +1,148 @@
+"""
+Confere e mede a BVH de src/engine/bvh.py contra testes lineares (todas as caixas de uma vez, com NumPy).
+
+Primeiro compara, para alguns tamanhos, os resultados das consultas (tronco de visão, esfera, ponto e raio) com os
+testes lineares, também depois de um refit incremental. Depois mede a construção, o refit e cada
+consulta para N caixas espalhadas em um mundo grande. Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.bvh [--objects N [N ...]] [--queries N]
+"""
+import argparse
+import time
+
+import glm
+import numpy as np
+
+from src.engine.bvh import BVH, box_distances, ray_boxes
+from src.view import Frustum
+
+from .common import check
+
+
+def make_boxes(count: int, seed: int = 0):
+    """Caixas pequenas espalhadas em um mundo de 1000 x 50 x 1000."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((-500, -25, -500), (500, 25, 500), (count, 3))
+    extents = rng.uniform(0.2, 3, (count, 3))
+    return centers - extents, centers + extents
+
+
+def camera_frustum() -> Frustum:
+    projection = glm.perspective(glm.radians(60), 16 / 9, 0.1, 200)
+    view = glm.lookAt(glm.vec3(0, 5, 0), glm.vec3(100, 0, -60), glm.vec3(0, 1, 0))
+    return Frustum(projection * view)
+
+
+def linear_frustum(lows, highs, planes):
+    distances = ((lows + highs) / 2) @ planes[:, :3].T + planes[:, 3]
+    reach = ((highs - lows) / 2) @ np.abs(planes[:, :3]).T
+    return np.flatnonzero((distances >= -reach).all(axis=1))
+
+
+def linear_sphere(lows, highs, center, radius):
+    return np.flatnonzero(box_distances(lows, highs, np.asarray(center, dtype=np.float64)) <= radius * radius)
+
+
+def linear_ray(lows, highs, origin, direction):
+    with np.errstate(divide="ignore"):
+        inverse = 1.0 / np.asarray(direction, dtype=np.float64)
+    near, far = ray_boxes(lows, highs, np.asarray(origin, dtype=np.float64), inverse)
+    hit = np.flatnonzero(far >= np.maximum(near, 0.0))
+    if not len(hit):
+        return None
+    near = np.maximum(near[hit], 0.0)
+    return int(hit[near.argmin()]), float(near.min())
+
+
+def verify() -> bool:
+    planes = camera_frustum().planes
+    results = []
+    print("verificações (BVH == linear):")
+    for count in (0, 1, 9, 1000, 20000):
+        lows, highs = make_boxes(count, count)
+        bvh = BVH(lows, highs)
+        center = (lows[count // 2] + highs[count // 2]) / 2 if count else np.zeros(3)
+        origin, direction = (-600, 0.5, 0.3), (1, 0.01, 0.002)
+        ray = bvh.ray_cast(origin, direction)
+        expected = linear_ray(lows, highs, origin, direction)
+        results += [
+            check(f"{count:6d} caixas: tronco de visão",
+                  np.array_equal(bvh.query_frustum(planes), linear_frustum(lows, highs, planes))),
+            check(f"{count:6d} caixas: esfera",
+                  np.array_equal(bvh.query_sphere(center, 40), linear_sphere(lows, highs, center, 40))),
+            check(f"{count:6d} caixas: ponto",
+                  np.array_equal(bvh.query_point(center), linear_sphere(lows, highs, center, 0))),
+            check(f"{count:6d} caixas: raio",
+                  ray == expected if ray is None or expected is None
+                  else ray[0] == expected[0] and np.isclose(ray[1], expected[1])),
+        ]
+
+        if count > 100:
+            rng = np.random.default_rng(1)
+            moved = rng.choice(count, count // 100, replace=False)
+            offset = rng.uniform(-50, 50, (len(moved), 3))
+            bvh.refit(moved, lows[moved] + offset, highs[moved] + offset)
+            lows, highs = lows.copy(), highs.copy()
+            lows[moved] += offset
+            highs[moved] += offset
+            results.append(check(f"{count:6d} caixas: refit incremental",
+                                 np.array_equal(bvh.query_sphere(center, 40), linear_sphere(lows, highs, center, 40))
+                                 and np.array_equal(bvh.query_frustum(planes), linear_frustum(lows, highs, planes))))
+    return all(results)
+
+
+def timed(function, repeat: int = 1) -> float:
+    """Tempo médio de `function`, em ms."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure(count: int, queries: int):
+    lows, highs = make_boxes(count)
+    planes = camera_frustum().planes
+    rng = np.random.default_rng(2)
+    centers = rng.uniform((-500, -25, -500), (500, 25, 500), (queries, 3))
+
+    build = timed(lambda: BVH(lows, highs))
+    bvh = BVH(lows, highs)
+    moved = rng.choice(count, max(count // 100, 1), replace=False)
+    refit_full = timed(bvh.refit, 5)
+    refit_some = timed(lambda: bvh.refit(moved, bvh.lows[moved] + 0.01, bvh.highs[moved] + 0.01), 5)
+
+    print(f"\n{count} caixas ({len(bvh.query_frustum(planes))} visíveis), média de {queries} consultas:")
+    print(f"  construção              {build:8.2f}ms")
+    print(f"  refit completo          {refit_full:8.2f}ms")
+    print(f"  refit de {len(moved):6d} caixas   {refit_some:8.2f}ms")
+    print(f"  {'':22s} {'BVH':>8s}   {'linear':>8s}")
+    rows = [
+        ("tronco de visão", lambda i: bvh.query_frustum(planes), lambda i: linear_frustum(lows, highs, planes)),
+        ("esfera (raio 10)", lambda i: bvh.query_sphere(centers[i], 10),
+         lambda i: linear_sphere(lows, highs, centers[i], 10)),
+        ("raio", lambda i: bvh.ray_cast(centers[i], (1, 0, 0.3)),
+         lambda i: linear_ray(lows, highs, centers[i], (1, 0, 0.3))),
+    ]
+    for name, tree, linear in rows:
+        tree_time = timed(lambda: [tree(i) for i in range(queries)]) / queries
+        linear_time = timed(lambda: [linear(i) for i in range(queries)]) / queries
+        print(f"  {name:22s} {tree_time:8.3f}ms {linear_time:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    ok = verify()
+    for count in args.objects:
+        measure(count, args.queries)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
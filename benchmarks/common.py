@@ -0,0 +1,82 @@
+"""
+Funções usadas por vários benchmarks: a verificação impressa como "ok"/"FALHOU", os modelos de teste gerados em
+um diretório temporário e a leitura do conteúdo de buffers e texturas da GPU.
+
+Os benchmarks que criam um contexto OpenGL escolhem a plataforma (PYOPENGL_PLATFORM) antes de importar este módulo.
+"""
+import os
+import shutil
+
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+
+
+def check(name: str, condition: bool):
+    print(f"  {'ok ' if condition else 'FALHOU'} {name}")
+    return condition
+
+
+def create_model(directory: str, side: int, seed: int, size: int = 16, extension: str = "png"):
+    """
+    Malha de side x side quadriláteros, metade com cada material ("stone" e "moss"), e uma textura de ruído de
+    size x size pixels por material.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory)
+    lines = []
+    for y in range(side + 1):
+        for x in range(side + 1):
+            lines.append(f"v {x / side:.6f} {rng.uniform(0, 0.1):.6f} {y / side:.6f}")
+            lines.append(f"vt {x / side:.6f} {y / side:.6f}")
+            lines.append(f"vn {rng.uniform(-0.1, 0.1):.6f} 1.0 {rng.uniform(-0.1, 0.1):.6f}")
+    for material, rows in (("stone", range(0, side // 2)), ("moss", range(side // 2, side))):
+        lines.append(f"usemtl {material}")
+        for y in rows:
+            for x in range(side):
+                corners = [y * (side + 1) + x + 1, y * (side + 1) + x + 2,
+                           (y + 1) * (side + 1) + x + 2, (y + 1) * (side + 1) + x + 1]
+                lines.append("f " + " ".join(f"{i}/{i}/{i}" for i in corners))
+        pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(directory, f"{material}.{extension}"))
+    with open(os.path.join(directory, "mesh.obj"), "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def create_models(directory: str, count: int, faces: int, size: int = 16, extension: str = "png",
+                  shared: bool = False):
+    """
+    `count` modelos de create_model com cerca de `faces` quadriláteros cada, em `directory`/mesh0, mesh1...
+
+    :param shared: O segundo modelo usa a mesma imagem do primeiro no material "stone".
+    :return: Dicionário nome -> diretório.
+    """
+    side = max(2, int(faces ** 0.5) // 2 * 2)
+    models = {f"mesh{i}": os.path.join(directory, f"mesh{i}") for i in range(count)}
+    for i, root_dir in enumerate(models.values()):
+        create_model(root_dir, side, i, size, extension)
+    if shared:
+        image = f"stone.{extension}"
+        shutil.copy(os.path.join(models["mesh0"], image), os.path.join(models["mesh1"], image))
+    return models
+
+
+def buffer_bytes(buffer: int) -> bytes:
+    glBindBuffer(GL_COPY_READ_BUFFER, buffer)
+    size = glGetBufferParameteriv(GL_COPY_READ_BUFFER, GL_BUFFER_SIZE)
+    data = glGetBufferSubData(GL_COPY_READ_BUFFER, 0, size)
+    glBindBuffer(GL_COPY_READ_BUFFER, 0)
+    return bytes(data)
+
+
+def texture_bytes(texture_id: int, level: int = 0) -> bytes:
+    """Pixels RGBA do nível `level` dos mipmaps da textura."""
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    return bytes(glGetTexImage(GL_TEXTURE_2D, level, GL_RGBA, GL_UNSIGNED_BYTE))
+
+
+def release(engine):
+    """Encerra as threads da Engine e apaga as suas texturas."""
+    engine.streamer.shutdown()
+    engine.textures.delete()
+    engine.textures.shutdown()
@@ -0,0 +1,115 @@
+"""
+Confere e mede o descarte de objetos fora do tronco de visão (src/view/frustum.py e src/components/bounds.py).
+
+Primeiro faz verificações com resultado conhecido: planos extraídos de uma câmera simples, esferas e caixas dentro,
+fora e cruzando os planos, e a igualdade entre o teste objeto a objeto e o vetorizado. Depois mede o tempo para
+testar N objetos espalhados em volta da câmera, um a um (Object.world_bounds) e de uma vez (transform_bounds).
+Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.culling [--objects N]
+"""
+import argparse
+import random
+import time
+
+import glm
+import numpy as np
+
+from src.components import Bounds, Object
+from src.components.bounds import transform_bounds
+from src.view import Frustum
+
+from .common import check
+
+
+def camera_frustum() -> Frustum:
+    """Câmera na origem olhando para -z, com 90° de abertura, proporção 1 e planos em 0.1 e 100."""
+    projection = glm.perspective(glm.radians(90), 1, 0.1, 100)
+    view = glm.lookAt(glm.vec3(0.0), glm.vec3(0, 0, -1), glm.vec3(0, 1, 0))
+    return Frustum(projection * view)
+
+
+def verify() -> bool:
+    frustum = camera_frustum()
+    s = np.sqrt(0.5)
+    expected = np.array([[s, 0, -s, 0], [-s, 0, -s, 0], [0, s, -s, 0], [0, -s, -s, 0], [0, 0, -1, -0.1],
+                         [0, 0, 1, 100]])
+
+    print("verificações:")
+    results = [
+        check("planos da câmera simples", np.allclose(frustum.planes, expected, atol=1e-5)),
+        check("esfera à frente é visível", frustum.sphere_visible((0, 0, -5), 0.5)),
+        check("esfera atrás é descartada", not frustum.sphere_visible((0, 0, 5), 0.5)),
+        check("esfera atrás cruzando o plano próximo é visível", frustum.sphere_visible((0, 0, 1), 1.5)),
+        check("esfera além do plano distante é descartada", not frustum.sphere_visible((0, 0, -102), 1)),
+        check("esfera fora à esquerda é descartada", not frustum.sphere_visible((-20, 0, -5), 1)),
+        check("caixa à frente é visível", frustum.box_visible((-1, -1, -3), (1, 1, -1))),
+        check("caixa atrás é descartada", not frustum.box_visible((-1, -1, 1), (1, 1, 3))),
+        check("caixa cruzando o plano direito é visível", frustum.box_visible((4, -1, -6), (8, 1, -4))),
+    ]
+
+    # Um cubo unitário girado e escalado: a caixa no mundo deve conter os oito cantos transformados
+    bounds = Bounds.from_positions(np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]))
+    obj = Object().move((1, 2, 3)).rotate((0.3, 0.7, 0.1)).rescale((2, 1, 0.5))
+    matrix = np.array(obj.model_matrix(), dtype=np.float64)
+    corners = (np.c_[bounds.low + (bounds.high - bounds.low) * np.array(
+        [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)]), np.ones(8)] @ matrix.T)[:, :3]
+    world = bounds.transform(matrix)
+    results.append(check("caixa no mundo contém os cantos transformados",
+                         bool((corners >= world.low - 1e-6).all() and (corners <= world.high + 1e-6).all())))
+    results.append(check("esfera no mundo contém os cantos transformados",
+                         bool((np.linalg.norm(corners - world.center, axis=1) <= world.radius + 1e-6).all())))
+
+    # Teste um a um e vetorizado devem concordar
+    rng = np.random.default_rng(0)
+    centers, radii = rng.uniform(-60, 60, (1000, 3)), rng.uniform(0.1, 5, 1000)
+    vectorized = frustum.spheres_visible(centers, radii)
+    scalar = np.array([frustum.sphere_visible(c, r) for c, r in zip(centers, radii)])
+    results.append(check("esferas: um a um == vetorizado", bool((vectorized == scalar).all())))
+    extents = rng.uniform(0.1, 5, (1000, 3))
+    vectorized = frustum.boxes_visible(centers, extents)
+    scalar = np.array([frustum.box_visible(c - e, c + e) for c, e in zip(centers, extents)])
+    results.append(check("caixas: um a um == vetorizado", bool((vectorized == scalar).all())))
+    return all(results)
+
+
+def measure(objects: int):
+    frustum = camera_frustum()
+    bounds = Bounds.from_positions(np.random.default_rng(1).uniform(-1, 1, (500, 3)))
+    objs = [Object().move((random.uniform(-50, 50), random.uniform(-5, 5), random.uniform(-50, 50)))
+            .rotate((0, random.uniform(0, 6.28), 0)) for _ in range(objects)]
+
+    start = time.perf_counter()
+    for obj in objs:
+        world = bounds.transform(np.array(obj.model_matrix()))
+        frustum.sphere_visible(world.center, world.radius) and frustum.box_visible(world.low, world.high)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrices = np.array([np.array(obj.model_matrix()) for obj in objs], dtype=np.float64)
+    n = len(objs)
+    centers, extents, radii = transform_bounds(np.tile(bounds.center, (n, 1)), np.tile(bounds.extent, (n, 1)),
+                                               np.full(n, bounds.radius), matrices)
+    visible = frustum.spheres_visible(centers, radii) & frustum.boxes_visible(centers, extents)
+    vectorized = time.perf_counter() - start
+
+    print(f"\n{objects} objetos, {int(visible.sum())} visíveis:")
+    print(f"  um a um      {single * 1000:8.2f}ms")
+    print(f"  vetorizado   {vectorized * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=10000)
+    args = parser.parse_args()
+
+    ok = verify()
+    measure(args.objects)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Confere o agendamento do loop de passo fixo (src/loop.py) com um relógio falso e mede a precisão da espera entre
+quadros com o relógio real.
+
+As verificações rodam sem esperar: o relógio falso só avança quando o loop dorme, quando o trabalho simulado de
+um quadro "gasta" tempo, ou um pouco a cada leitura (para que a espera girando termine). Elas cobrem a quantidade
+de ticks por quadro, o alpha da interpolação, o limite de tempo por quadro, a espera híbrida (dorme e depois gira)
+e o modo sem limite. Depois, com o relógio real, compara a duração dos quadros a 60 FPS esperando só com sleep e
+com a espera híbrida. Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.game_loop [--frames N] [--fps N]
+"""
+import argparse
+
+import numpy as np
+
+from src.components import Object
+from src.loop import GameLoop, Pacer, SystemClock
+
+from .common import check
+
+
+class FakeClock:
+    """Relógio controlado pelo teste: `sleep` avança o tempo na hora, e cada leitura avança `resolution`."""
+    def __init__(self, resolution: float = 1e-5):
+        self.time = 0.0
+        self.resolution = resolution
+        self.sleeps = []
+
+    def now(self) -> float:
+        self.time += self.resolution
+        return self.time
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.time += seconds
+
+    def advance(self, seconds: float):
+        self.time += seconds
+
+
+def run(frame_times, tick_rate=60, max_fps=None, resolution=0.0, **kwargs):
+    """
+    Roda um quadro para cada duração em `frame_times` (o tempo que o render "gasta") e devolve o loop, os
+    FrameStats e o relógio. Com max_fps, `resolution` precisa ser positiva para que a espera girando termine.
+    """
+    clock = FakeClock(resolution)
+    durations = iter(frame_times)
+    loop = GameLoop(lambda step: None, lambda alpha: clock.advance(next(durations)), tick_rate, max_fps, clock,
+                    **kwargs)
+    stats = []
+    loop.hooks.append(stats.append)
+    for _ in frame_times:
+        loop.frame()
+    return loop, stats, clock
+
+
+def verify() -> bool:
+    print("verificações (relógio falso):")
+    results = []
+
+    loop, stats, _ = run([1 / 60] * 61)
+    results.append(check("quadros de 1/60s a 60 ticks/s: um tick por quadro",
+                         [s.ticks for s in stats] == [0] + [1] * 60 and loop.ticks == 60))
+
+    loop, stats, _ = run([1 / 240] * 241)
+    alphas = [round(s.alpha, 6) for s in stats[1:5]]
+    results.append(check("quadros de 1/240s: um tick a cada quatro quadros, alpha 0.25, 0.5, 0.75, 0",
+                         loop.ticks == 60 and alphas == [0.25, 0.5, 0.75, 0.0]))
+
+    loop, stats, _ = run([1 / 25] * 26)
+    results.append(check("quadros de 1/25s: 2 ou 3 ticks por quadro, 60 no total",
+                         loop.ticks == 60 and {s.ticks for s in stats[1:]} == {2, 3}))
+
+    loop, stats, _ = run([1.0, 0.0])
+    results.append(check("pausa de 1s vira no máximo max_frame (0.25s = 15 ticks)", stats[1].ticks == 15))
+
+    loop, stats, clock = run([0.004] * 10, max_fps=100, resolution=1e-6, spin=0.002)
+    results.append(check("limite de 100 FPS: quadros de 10ms, dormindo 10 - 4 - 2 = 4ms",
+                         np.allclose([s.frame_time for s in stats[1:]], 0.01, atol=1e-5)
+                         and np.allclose(clock.sleeps, 0.004, atol=1e-5)))
+
+    loop, stats, clock = run([0.004] * 10, max_fps=None)
+    results.append(check("sem limite: nenhuma espera", not clock.sleeps and all(s.wait_time == 0 for s in stats)))
+
+    clock = FakeClock(resolution=1e-4)
+    waited = Pacer(clock, spin=0.002).wait_until(0.01)
+    results.append(check("espera híbrida: dorme até 2ms antes e gira até o prazo",
+                         len(clock.sleeps) == 1 and abs(clock.sleeps[0] - 0.0079) < 1e-9 and clock.time >= 0.01
+                         and waited > 0))
+
+    obj = Object().move((1, 0, 0))
+    obj.snapshot()
+    obj.move((1, 0, 0))
+    results.append(check("interpolação: alpha 0 = estado anterior, 0.5 = meio, 1 = atual",
+                         obj.render_matrix(0.0)[3].x == 1 and obj.render_matrix(0.5)[3].x == 1.5
+                         and obj.render_matrix(1.0) is obj.model_matrix()))
+    still = Object()
+    still.snapshot()
+    results.append(check("objeto parado usa a própria matriz em cache",
+                         still.render_matrix(0.3) is still.model_matrix()))
+    return all(results)
+
+
+def pacing(frames: int, fps: float, spin: float) -> np.ndarray:
+    """Durações reais de `frames` quadros vazios limitados a `fps`, em ms."""
+    loop = GameLoop(lambda step: None, lambda alpha: None, max_fps=fps, clock=SystemClock(), spin=spin)
+    times = []
+    loop.hooks.append(lambda stats: times.append(stats.frame_time))
+    for _ in range(frames + 1):
+        loop.frame()
+    return np.array(times[1:]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--fps", type=float, default=60)
+    args = parser.parse_args()
+
+    ok = verify()
+
+    target = 1000 / args.fps
+    print(f"\nduração de {args.frames} quadros a {args.fps:g} FPS (alvo {target:.3f}ms):")
+    print(f"  {'':16s} {'média':>8s} {'desvio':>8s} {'máximo':>8s}")
+    for name, spin in (("só sleep", 0.0), ("sleep + giro", 0.002)):
+        times = pacing(args.frames, args.fps, spin)
+        print(f"  {name:16s} {times.mean():7.3f}ms {times.std():7.3f}ms {times.max():7.3f}ms")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Confere a leitura dos arquivos Wavefront (read_wavefront, src/components/model.py) contra o leitor anterior, linha a
+linha, e a triangulação em leque (FaceGroup.triangulate e build_triangles) contra o laço anterior, face a face, e
+compara o tempo dos dois. Também confere a geometria indexada (index_triangles e Model.element_data) e os
+intervalos de draw de cada material (compute_draw_ranges).
+
+Os OBJ são gerados em um diretório temporário: polígonos de 3 a 6 cantos sobre vértices, coordenadas de textura e
+normais declarados aos poucos entre os blocos de faces, em vários materiais (com faces antes do primeiro `usemtl` e
+materiais que voltam mais adiante no arquivo). As verificações cobrem:
+
+- `v/vt/vn` com índices positivos, o único formato que o leitor anterior aceitava: a mesma saída que ele;
+- `v`, `v/vt`, `v//vn`, formatos misturados e índices negativos: a mesma saída que o leitor anterior com os
+  componentes ausentes como -1 e os índices negativos relativos ao que foi lido até a face, como na especificação;
+- o mesmo arquivo com índices negativos e positivos: a mesma saída;
+- a triangulação de cada material, com e sem normais e com faces de menos de três cantos: os mesmos floats que o
+  laço anterior;
+- os vértices únicos de index_triangles, lidos pelos índices, refazem os arrays expandidos, sem repetições e na
+  ordem da primeira ocorrência;
+- índices de 16 bits até 65536 vértices no VBO e de 32 bits a partir de 65537, com o deslocamento de cada material;
+- os intervalos de draw, em contagens sorteadas e nos de um modelo com níveis de detalhe (expandido e indexado),
+  cobrem cada vértice ou índice do buffer uma única vez, na ordem dos materiais.
+
+Não cria contexto OpenGL: os Model das últimas verificações são criados com as funções gl* trocadas por um GLRecorder.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.geometry [--faces N] [--repeat N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.components.model import FaceGroup, Model, build_triangles, compute_draw_ranges, index_triangles, \
+    load_geometry, read_wavefront
+from src.view.shader import Program
+
+from .common import check, create_model
+from .gl_calls import GLRecorder
+
+FORMATS = ("v", "v/vt", "v//vn", "v/vt/vn")
+
+
+def write_obj(path: str, faces: int, form: str, negative: bool = False, seed: int = 0):
+    """
+    Gera um OBJ com cerca de `faces` faces, em blocos: novos v, vt e vn, depois faces de um material sorteado.
+
+    :param form: Um de FORMATS, ou "misto" para sortear o formato de cada canto.
+    :param negative: Escreve os índices como negativos, relativos ao que foi declarado até a face.
+    """
+    rng = np.random.default_rng(seed)
+    lines = []
+    counts = [0, 0, 0]  # v, vt e vn declarados até aqui
+    written = 0
+    material = None
+    while written < faces:
+        for prefix, width, position in (("v", 3, 0), ("vt", 2, 1), ("vn", 3, 2)):
+            for _ in range(int(rng.integers(4, 40))):
+                values = rng.uniform(-10, 10, width)
+                lines.append(f"{prefix} " + " ".join(f"{value:.6f}" for value in values))
+                counts[position] += 1
+        if material is not None or rng.random() < 0.7:
+            material = f"material{int(rng.integers(0, 3))}"
+            lines.append(f"usemtl {material}")
+        for _ in range(int(rng.integers(1, 60))):
+            corners = []
+            for _ in range(int(rng.integers(3, 7))):
+                corner_form = FORMATS[int(rng.integers(0, 4))] if form == "misto" else form
+                indices = [int(rng.integers(1, count + 1)) for count in counts]
+                if negative:
+                    indices = [index - count - 1 for index, count in zip(indices, counts)]
+                v, vt, vn = (str(index) for index in indices)
+                corners.append({"v": v, "v/vt": f"{v}/{vt}", "v//vn": f"{v}//{vn}", "v/vt/vn": f"{v}/{vt}/{vn}"}
+                               [corner_form])
+            lines.append("f " + " ".join(corners))
+            written += 1
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def legacy_wavefront(file_path):
+    """O read_wavefront anterior, sem mudanças: listas de floats e faces como listas [v, vt, vn] base 1."""
+    vertices = []
+    texture_coords = []
+    normals = []
+    material = "default"
+    faces = {material: []}
+
+    with open(file_path, 'r') as file:
+        for line in file:
+            if line.startswith('v '):
+                vertices.append(list(map(float, line.strip().split()[1:4])))
+            elif line.startswith('vt '):
+                texture_coords.append(list(map(float, line.strip().split()[1:3])))
+            elif line.startswith('usemtl') or line.startswith('usemat'):
+                material = line.strip().split()[1]
+                if material not in faces:
+                    faces[material] = []
+            elif line.startswith('f '):
+                face = line.strip().split()[1:]
+                face = [list(map(int, f.split('/'))) for f in face]
+                faces[material].append(face)
+            elif line.startswith('vn '):
+                normals.append(list(map(float, line.strip().split()[1:4])))
+
+    if not faces["default"]:
+        faces.pop("default")
+
+    return vertices, texture_coords, faces, normals
+
+
+def reference_wavefront(file_path):
+    """
+    O leitor anterior, com os formatos que ele não aceitava resolvidos canto a canto: componente ausente vira 0
+    (base 1, então -1 na saída) e índice negativo conta a partir do que foi lido até a face.
+    """
+    vertices = []
+    texture_coords = []
+    normals = []
+    material = "default"
+    faces = {material: []}
+
+    with open(file_path, 'r') as file:
+        for line in file:
+            if line.startswith('v '):
+                vertices.append(list(map(float, line.strip().split()[1:4])))
+            elif line.startswith('vt '):
+                texture_coords.append(list(map(float, line.strip().split()[1:3])))
+            elif line.startswith('usemtl') or line.startswith('usemat'):
+                material = line.strip().split()[1]
+                if material not in faces:
+                    faces[material] = []
+            elif line.startswith('f '):
+                face = []
+                for corner in line.strip().split()[1:]:
+                    parts = (corner.split('/') + ["", ""])[:3]
+                    counts = (len(vertices), len(texture_coords), len(normals))
+                    face.append([0 if not part else int(part) if int(part) > 0 else count + int(part) + 1
+                                 for part, count in zip(parts, counts)])
+                faces[material].append(face)
+            elif line.startswith('vn '):
+                normals.append(list(map(float, line.strip().split()[1:4])))
+
+    if not faces["default"]:
+        faces.pop("default")
+
+    return vertices, texture_coords, faces, normals
+
+
+def legacy_triangles(vertices, texture_coords, normals, faces: FaceGroup):
+    """O laço anterior de Model.load sobre as faces de um material, com os índices base 0 de read_wavefront."""
+    triangle_vertice = []
+    triangle_normals = []
+    texture_vertice = []
+
+    for face in np.split(faces.indices, np.cumsum(faces.sizes)[:-1]):  # Para cada face
+        for i in range(1, len(face) - 1):  # Para cada vertice da face, cria um triângulo
+            for idx in [0, i, i + 1]:  # Cria um triângulo
+                triangle_vertice.extend(vertices[face[idx][0]])
+                texture_vertice.extend(texture_coords[face[idx][1]])
+                if len(normals):
+                    triangle_normals.extend(normals[face[idx][2]])
+
+    return (np.array(triangle_vertice, dtype=np.float32), np.array(texture_vertice, dtype=np.float32),
+            np.array(triangle_normals, dtype=np.float32))
+
+
+def same_triangles(triangles, expected) -> bool:
+    return all(np.array_equal(array, reference) and array.dtype == np.float32
+               for array, reference in zip(triangles, expected))
+
+
+def same_indexed(expanded, indexed) -> bool:
+    """Os vértices únicos, lidos pelos índices, refazem os arrays expandidos, sem repetições e na ordem original."""
+    *unique, indices = indexed
+    rebuilt = all(np.array_equal(array.reshape(len(array) // width, width)[indices].ravel() if len(array) else array,
+                                 reference)
+                  for array, reference, width in zip(unique, expanded, (3, 2, 3)))
+    corners = np.concatenate([array.reshape(len(unique[0]) // 3, -1) for array in unique if len(array)], axis=1)
+    _, first = np.unique(indices, return_index=True)
+    return (rebuilt and indices.dtype == np.uint32 and len(np.unique(corners, axis=0)) == len(corners)
+            and np.array_equal(indices[np.sort(first)], np.arange(len(corners))))
+
+
+def element_types(program: Program, directory: str, counts) -> tuple:
+    """
+    Model.element_data de um modelo com `counts` vértices por material, cada um com os índices 0..n-1.
+
+    :return: O tipo dos índices e se cada material aponta para o seu trecho do VBO.
+    """
+    model = Model(program, directory, streamed=True)
+    model.triangle_vertices = {f"material{i}": np.zeros(count * 3, np.float32) for i, count in enumerate(counts)}
+    model.textures = {material: np.zeros(len(vertices) // 3 * 2, np.float32)
+                      for material, vertices in model.triangle_vertices.items()}
+    model.triangle_normals = {material: np.zeros(0, np.float32) for material in model.triangle_vertices}
+    model.indices = {f"material{i}": np.arange(count, dtype=np.uint32) for i, count in enumerate(counts)}
+    elements = model.element_data()
+    return elements.dtype, np.array_equal(elements, np.arange(sum(counts)))
+
+
+def covers_once(ranges, total: int) -> bool:
+    """Os intervalos (first, count), na ordem do dicionário, são contíguos e cobrem 0..total-1 uma única vez."""
+    covered = np.concatenate([np.arange(first, first + count) for first, count in ranges.values()] + [np.arange(0)])
+    return np.array_equal(covered, np.arange(total))
+
+
+def model_ranges(program: Program, directory: str, indexed: bool) -> bool:
+    """
+    Intervalos de draw de todos os níveis de um modelo ("stone" e depois "moss", veja create_model), montados por
+    Model.buffer_data sem enviar nada à GPU.
+    """
+    model = Model(program, directory, streamed=True, indexed=indexed)
+    model.set_geometry(load_geometry(directory, use_cache=False, indexed=indexed, lods=(0.5, 0.25)))
+    _, elements, _ = model.buffer_data()
+    parts = model.geometry_parts()
+    counts = {part: len(indices) if indexed else len(vertices) // 3 for part, vertices, _, _, indices in parts}
+    ranges = {(level, material): draw for level, materials in enumerate(model.lod_ranges)
+              for material, draw in materials.items()}
+    total = len(elements) if indexed else sum(counts.values())
+    return (model.draw_ranges is model.lod_ranges[0]
+            and [list(materials) for materials in model.lod_ranges] == [["stone", "moss"]] * 3
+            and list(ranges) == list(counts)
+            and all(ranges[part][1] == count for part, count in counts.items())
+            and covers_once(ranges, total))
+
+
+def as_arrays(parsed):
+    """Saída de um leitor linha a linha no formato de read_wavefront: arrays float32 e índices base 0 por material."""
+    vertices, texture_coords, faces, normals = parsed
+    groups = {}
+    for material, material_faces in faces.items():
+        corners = [corner for face in material_faces for corner in face]
+        indices = np.array(corners, dtype=np.int64).reshape(-1, 3) - 1
+        groups[material] = (indices.astype(np.int32), np.array([len(face) for face in material_faces], np.int32))
+    return (np.array(vertices, np.float32).reshape(-1, 3), np.array(texture_coords, np.float32).reshape(-1, 2),
+            groups, np.array(normals, np.float32).reshape(-1, 3))
+
+
+def same_output(parsed, expected) -> bool:
+    vertices, texture_coords, faces, normals = parsed
+    expected_vertices, expected_textures, expected_faces, expected_normals = expected
+    return (np.array_equal(vertices, expected_vertices) and np.array_equal(texture_coords, expected_textures)
+            and np.array_equal(normals, expected_normals) and list(faces) == list(expected_faces)
+            and all(np.array_equal(faces[material].indices, indices) and np.array_equal(faces[material].sizes, sizes)
+                    for material, (indices, sizes) in expected_faces.items()))
+
+
+def verify(directory: str, faces: int) -> bool:
+    print("verificações:")
+    results = []
+
+    path = os.path.join(directory, "legacy.obj")
+    write_obj(path, faces, "v/vt/vn")
+    results.append(check("v/vt/vn: mesma saída que o leitor anterior",
+                         same_output(read_wavefront(path), as_arrays(legacy_wavefront(path)))))
+
+    for seed, form in enumerate(FORMATS + ("misto",), 1):
+        for negative in (False, True):
+            path = os.path.join(directory, f"{form.replace('/', '_')}{'_neg' if negative else ''}.obj")
+            write_obj(path, faces, form, negative, seed)
+            name = f"{form}{', índices negativos' if negative else ''}"
+            results.append(check(f"{name}: mesma saída que o leitor anterior, canto a canto",
+                                 same_output(read_wavefront(path), as_arrays(reference_wavefront(path)))))
+        positive = read_wavefront(os.path.join(directory, f"{form.replace('/', '_')}.obj"))
+        negative = read_wavefront(os.path.join(directory, f"{form.replace('/', '_')}_neg.obj"))
+        results.append(check(f"{form}: índices negativos e positivos dão a mesma saída",
+                             same_output(negative, (positive[0], positive[1],
+                                                    {material: (group.indices, group.sizes)
+                                                     for material, group in positive[2].items()}, positive[3]))))
+
+    vertices, texture_coords, faces, normals = read_wavefront(os.path.join(directory, "legacy.obj"))
+    no_normals = np.zeros((0, 3), dtype=np.float32)
+    results.append(check(f"triangulação de {len(faces)} materiais: mesmos floats que o laço anterior",
+                         all(same_triangles(build_triangles(vertices, texture_coords, normals, group),
+                                            legacy_triangles(vertices, texture_coords, normals, group))
+                             for group in faces.values())))
+    results.append(check("sem normais: mesmas posições e coordenadas de textura, normais vazias",
+                         all(same_triangles(build_triangles(vertices, texture_coords, no_normals, group),
+                                            legacy_triangles(vertices, texture_coords, no_normals, group))
+                             for group in faces.values())))
+    # Faces de 1 e 2 cantos não geram triângulos, nem no laço anterior; as vizinhas continuam no lugar
+    sizes = np.array([3, 2, 5, 1, 4, 0, 6], dtype=np.int32)
+    rng = np.random.default_rng(0)
+    corners = np.stack([rng.integers(0, len(array), sizes.sum()) for array in (vertices, texture_coords, normals)],
+                       axis=1).astype(np.int32)
+    group = FaceGroup(corners, sizes)
+    results.append(check("faces com menos de três cantos: mesmos floats que o laço anterior",
+                         same_triangles(build_triangles(vertices, texture_coords, normals, group),
+                                        legacy_triangles(vertices, texture_coords, normals, group))
+                         and len(group.triangulate()) == 3 * (1 + 3 + 2 + 4)))
+
+    for form in FORMATS + ("misto",):
+        path = os.path.join(directory, f"{form.replace('/', '_')}.obj")
+        vertices, texture_coords, faces, normals = read_wavefront(path)
+        expanded = [build_triangles(vertices, texture_coords, normals, group) for group in faces.values()]
+        indexed = [index_triangles(*arrays) for arrays in expanded]
+        unique = sum(len(group[0]) // 3 for group in indexed)
+        shared = 1 - unique / sum(len(group[3]) for group in indexed)
+        results.append(check(f"{form}: vértices únicos lidos pelos índices refazem os arrays expandidos "
+                             f"({shared:.0%} dos cantos repetidos)",
+                             all(same_indexed(*pair) for pair in zip(expanded, indexed))))
+
+    with GLRecorder():
+        program = Program(1)
+    types = {counts: element_types(program, directory, counts)
+             for counts in ((65536,), (65537,), (40000, 25536), (40000, 25537))}
+    results.append(check("16 bits até 65536 vértices, 32 bits a partir de 65537, com os deslocamentos corretos",
+                         types == {(65536,): (np.uint16, True), (65537,): (np.uint32, True),
+                                   (40000, 25536): (np.uint16, True), (40000, 25537): (np.uint32, True)}))
+
+    rng = np.random.default_rng(0)
+    counts = {f"material{i}": int(count) for i, count in enumerate(rng.integers(0, 1000, 12))}
+    counts["vazio"] = 0
+    ranges = compute_draw_ranges(counts)
+    results.append(check("compute_draw_ranges: cada vértice uma vez, na ordem dos materiais",
+                         list(ranges) == list(counts) and covers_once(ranges, sum(counts.values()))
+                         and all(ranges[material][1] == count for material, count in counts.items())))
+    model = os.path.join(directory, "model")
+    create_model(model, 16, 0)
+    results.append(check("intervalos de um modelo com níveis de detalhe: cada vértice do VBO uma vez, na ordem",
+                         model_ranges(program, model, indexed=False)))
+    results.append(check("no modo indexado: cada índice do EBO uma vez, na ordem",
+                         model_ranges(program, model, indexed=True)))
+    return all(results)
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(directory: str, faces: int, repeat: int):
+    path = os.path.join(directory, "measure.obj")
+    write_obj(path, faces, "v/vt/vn")
+    legacy = best_time(lambda: legacy_wavefront(path), repeat)
+    bulk = best_time(lambda: read_wavefront(path), repeat)
+    print(f"\n{faces} faces ({os.path.getsize(path) / 1e6:.1f}MB), melhor de {repeat}:")
+    print(f"  leitor anterior   {legacy * 1000:8.1f}ms")
+    print(f"  read_wavefront    {bulk * 1000:8.1f}ms  ({legacy / bulk:.1f}x)")
+
+    vertices, texture_coords, faces, normals = read_wavefront(path)
+    legacy = best_time(lambda: [legacy_triangles(vertices, texture_coords, normals, group)
+                                for group in faces.values()], repeat)
+    bulk = best_time(lambda: [build_triangles(vertices, texture_coords, normals, group)
+                              for group in faces.values()], repeat)
+    print(f"  laço anterior     {legacy * 1000:8.1f}ms")
+    print(f"  build_triangles   {bulk * 1000:8.1f}ms  ({legacy / bulk:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=20000, help="faces de cada OBJ gerado")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ok = verify(directory, args.faces // 10)
+        measure(directory, args.faces, args.repeat)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
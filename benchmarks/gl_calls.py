@@ -0,0 +1,131 @@
+"""
+Conta as chamadas ao OpenGL feitas por quadro, sem GPU nem janela.
+
+As funções gl* importadas pelos módulos do jogo são trocadas por um GLRecorder, que apenas registra cada chamada
+(e devolve ids falsos para glGen*/glGetUniformLocation). Com isso é possível ver quantos envios de uniforms,
+binds e draws cada quadro faz, e comparar mudanças no caminho de renderização.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.gl_calls [--frames N]
+    python -m benchmarks.gl_calls --model models/caixa --objects 100 --lights 2
+"""
+import argparse
+import random
+import sys
+from collections import Counter
+
+import glm
+from OpenGL.GL import GL_ACTIVE_UNIFORMS
+
+
+class GLRecorder:
+    """
+    Context manager que substitui as funções gl* dos módulos `src.*` e `main` por funções que registram as chamadas.
+    """
+    def __init__(self):
+        self.calls = Counter()
+        self.stream = []
+        self.next_id = 0
+        self.locations = {}
+        self.originals = []
+
+    def result(self, name, args):
+        if name.startswith(("glGen", "glCreate")):
+            self.next_id += 1
+            return self.next_id
+        if name == "glGetUniformLocation":
+            return self.locations.setdefault(args[1], len(self.locations))
+        if name in ("glGetProgramiv", "glGetShaderiv"):
+            return 0 if args[1] == GL_ACTIVE_UNIFORMS else 1
+        if name == "glGetUniformBlockIndex":
+            return 0
+        return None
+
+    def fake(self, name):
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+            self.stream.append(name)
+            return self.result(name, args)
+        return call
+
+    def __enter__(self):
+        for module_name, module in list(sys.modules.items()):
+            if not (module_name.startswith("src.") or module_name == "main"):
+                continue
+            for attribute, value in list(vars(module).items()):
+                if attribute.startswith("gl") and attribute[2:3].isupper() and callable(value):
+                    self.originals.append((module, attribute, value))
+                    setattr(module, attribute, self.fake(attribute))
+        return self
+
+    def __exit__(self, *args):
+        for module, attribute, value in self.originals:
+            setattr(module, attribute, value)
+        self.originals.clear()
+
+    def reset(self):
+        calls = Counter(self.calls)
+        self.calls.clear()
+        self.stream.clear()
+        return calls
+
+
+def build_scene(engine, args):
+    from src.components import Object, LightSource, Scene
+
+    if not args.model:
+        from main import MainScene
+        return MainScene(engine).register().load()
+
+    model = engine.register_model("model", args.model)
+    objects = [Object(model).move((random.uniform(-10, 10), 0, random.uniform(-10, 10))) for _ in range(args.objects)]
+    lights = [LightSource(None, (1, 1, 1)).move((random.uniform(-5, 5), 3, random.uniform(-5, 5)))
+              for _ in range(args.lights)]
+    scene = Scene("benchmark", objects, lights)
+    engine.register_scene(scene)
+    return scene
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--model", help="Diretório de um modelo; se omitido, usa a MainScene de main.py")
+    parser.add_argument("--objects", type=int, default=100)
+    parser.add_argument("--lights", type=int, default=2)
+    args = parser.parse_args()
+
+    # Importa os módulos antes de trocar as funções gl*
+    import main as _  # noqa: F401
+    from src.engine import Engine
+    from src.view.shader import Program, light_buffer
+
+    with GLRecorder() as recorder:
+        program = Program(1)
+        engine = Engine(program)
+        build_scene(engine, args)
+        recorder.reset()
+        program.reset_stats()
+        light_buffer.reset_stats()
+
+        totals = Counter()
+        for frame in range(args.frames):
+            program.set_mat4("view", glm.mat4(1.0))
+            program.set_mat4("projection", glm.mat4(1.0))
+            engine.render()
+            calls = recorder.reset()
+            totals += calls
+            uniforms = program.reset_stats()
+            lights = light_buffer.reset_stats()
+            queue = engine.render_queue.stats
+            print(f"quadro {frame:3d}: {sum(calls.values()):6d} chamadas GL | uniforms: {uniforms['uploads']} enviados, "
+                  f"{uniforms['skipped']} evitados | luzes: {lights['uploads']} envios, {lights['skipped']} evitados"
+                  f" | fila: {queue['items']} itens em {queue['draws']} draws, {queue['changes']} trocas, {queue['avoided']} evitadas")
+
+    print("\nmédia por quadro:")
+    for name, count in totals.most_common():
+        print(f"  {name:28s} {count / args.frames:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compara a geometria expandida com a indexada (vértices deduplicados + buffer de índices) para cada OBJ:
+memória economizada e taxa de acerto simulada do cache pós-transformação.
+Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.indexed [arquivo.obj ...] [--cache-size N]
+
+Sem argumentos, mede todos os OBJ dentro de `models/`.
+"""
+import argparse
+import glob
+
+from src.components.model import read_wavefront, build_triangles, index_triangles, memory_report, \
+    vertex_cache_hit_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=sorted(glob.glob("models/*/*.obj")))
+    parser.add_argument("--cache-size", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'arquivo':40s} {'expandido':>10s} {'indexado':>10s} {'economia':>9s} {'acertos':>8s}")
+    for file_path in args.files:
+        vertices, texture_coords, faces, normals = read_wavefront(file_path)
+        groups = {material: index_triangles(*build_triangles(vertices, texture_coords, normals, group))
+                  for material, group in faces.items()}
+
+        report = memory_report(*({material: group[i] for material, group in groups.items()} for i in range(4)))
+        indexed_bytes = report["vertex_bytes"] + report["index_bytes"]
+        saved = report["saved_bytes"] / report["baseline_bytes"] if report["baseline_bytes"] else 0.0
+
+        corners = sum(len(group[3]) for group in groups.values())
+        hits = sum(vertex_cache_hit_rate(group[3], args.cache_size) * len(group[3]) for group in groups.values())
+        hit_rate = hits / corners if corners else 0.0
+
+        print(f"{file_path:40s} {report['baseline_bytes'] / 1e6:8.2f}MB {indexed_bytes / 1e6:8.2f}MB "
+              f"{saved:8.1%} {hit_rate:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Mede o tempo de CPU por quadro para desenhar N cópias de um modelo, com e sem instanciamento:
+
+- `por objeto`: Scene.draw, um draw (e um envio de matriz) por objeto e material;
+- `instanciado`: Engine.render, pela fila de renderização, um draw instanciado por material.
+
+As funções gl* são trocadas pelo GLRecorder de benchmarks.gl_calls, então o tempo medido é apenas o do Python
+(montagem das matrizes, ordenação, chamadas), sem GPU nem janela.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.instancing [--model models/tree] [--counts 10 100 1000 10000] [--frames N]
+"""
+import argparse
+import random
+import time
+
+import glm
+
+from .gl_calls import GLRecorder
+
+
+def measure(render, frames: int) -> float:
+    """Tempo médio por quadro, em ms."""
+    render()  # primeiro quadro cria os buffers
+    start = time.perf_counter()
+    for _ in range(frames):
+        render()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="models/tree")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    # Importa os módulos antes de trocar as funções gl*
+    from src.components import Object, Scene
+    from src.engine import Engine
+    from src.view.shader import Program
+
+    print(f"{'instâncias':>10s} {'por objeto':>12s} {'instanciado':>12s} {'draws':>6s} {'ganho':>7s}")
+    with GLRecorder() as recorder:
+        program = Program(1)
+        engine = Engine(program)
+        model = engine.register_model("model", args.model)
+
+        for count in args.counts:
+            objects = [Object(model).move((random.uniform(-50, 50), 0, random.uniform(-50, 50)))
+                       .rotate((0, random.uniform(0, 6.28), 0)) for _ in range(count)]
+            scene = Scene("benchmark", objects)
+            engine.scenes = {scene.name: scene}
+
+            program.set_mat4("view", glm.mat4(1.0))
+            single = measure(scene.draw, args.frames)
+            instanced = measure(engine.render, args.frames)
+            recorder.reset()
+
+            print(f"{count:10d} {single:10.2f}ms {instanced:10.2f}ms {engine.render_queue.stats['draws']:6d} "
+                  f"{single / instanced:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Confere os níveis de detalhe (src/components/lod.py) e mede como a tolerância da escolha dos níveis troca
+triângulos desenhados por fidelidade da imagem.
+
+O modelo é gerado em um diretório temporário: uma esfera densa com relevo de ruído, em dois materiais (metade de
+cima e metade de baixo), com uma textura de ruído (JPEG) por material. As verificações cobrem a fração de
+triângulos de cada nível, os erros crescentes, o cache em disco reaproveitado, os mesmos níveis com e sem índices,
+no pool de processos e no streaming, a escolha pelo tamanho na tela (perto, o modelo completo; longe, um nível
+simplificado), a histerese, Object.draw com a câmera e a contagem de triângulos da RenderQueue.
+
+A medição desenha uma "floresta" de cópias do modelo a distâncias de 3 a 45 unidades (o raio da esfera do céu em
+main.py), iluminada por uma luz na câmera, com várias tolerâncias: triângulos por quadro, tempo do quadro e
+fração de pixels diferentes da imagem com todos os modelos completos. Usa uma HeadlessWindow (EGL), então não
+precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.lod [--faces N] [--objects N] [--size PIXELS] [--frames N] [--tolerances 0.5,1,2,4,8]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import math
+import tempfile
+import time
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+
+from src.components import Object, Scene, LightSource, LodView
+from src.components import cache
+from src.components.lod import DEFAULT_LODS, select_levels
+from src.engine import Engine
+from src.view import HeadlessWindow, Shader, Frustum
+
+from .common import check, release
+
+WIDTH, HEIGHT, FOV = 320, 240, 45.0
+
+
+def create_model(directory: str, faces: int, size: int, seed: int = 0):
+    """
+    Esfera de raio ~1 com `faces` triângulos (aproximadamente) e relevo de ruído; os anéis de cima usam o material
+    "bark" e os de baixo, "leaf". A costura das coordenadas de textura repete a primeira coluna de vértices.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory)
+    rings = max(4, int(math.sqrt(faces / 4)))
+    columns = 2 * rings
+    lines = []
+    # Polos (vértices 1 e 2) e anéis 1 a rings - 1, cada um com columns + 1 vértices
+    for y, v in ((1.0, 0.0), (-1.0, 1.0)):
+        lines += [f"v 0 {y:.6f} 0", f"vt 0.5 {v:.6f}", f"vn 0 {y:.6f} 0"]
+    for ring in range(1, rings):
+        theta = math.pi * ring / rings
+        for column in range(columns + 1):
+            phi = 2 * math.pi * (column % columns) / columns
+            normal = np.array([math.sin(theta) * math.cos(phi), math.cos(theta), math.sin(theta) * math.sin(phi)])
+            radius = 1 + rng.uniform(-0.02, 0.02)
+            x, y, z = normal * radius
+            lines += [f"v {x:.6f} {y:.6f} {z:.6f}", f"vt {column / columns:.6f} {ring / rings:.6f}",
+                      f"vn {normal[0]:.6f} {normal[1]:.6f} {normal[2]:.6f}"]
+
+    def vertex(ring: int, column: int) -> int:
+        if ring == 0:
+            return 1
+        if ring == rings:
+            return 2
+        return 3 + (ring - 1) * (columns + 1) + column
+
+    for material, band in (("bark", range(0, rings // 2)), ("leaf", range(rings // 2, rings))):
+        lines.append(f"usemtl {material}")
+        for ring in band:
+            for column in range(columns):
+                a, b = vertex(ring, column), vertex(ring, column + 1)
+                c, d = vertex(ring + 1, column + 1), vertex(ring + 1, column)
+                if ring == 0:
+                    corners = [a, d, c]
+                elif ring == rings - 1:
+                    corners = [a, c, b]
+                else:
+                    corners = [a, d, c, b]
+                lines.append("f " + " ".join(f"{i}/{i}/{i}" for i in corners))
+        pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(directory, f"{material}.jpg"))
+    with open(os.path.join(directory, "sphere.obj"), "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def level_triangles(model) -> list:
+    """Triângulos de cada nível do modelo (0 é o completo)."""
+    return [sum(count for _, count in ranges.values()) // 3 for ranges in model.lod_ranges]
+
+
+def setup_camera(shader: Shader, eye=(0.0, 0.0, 0.0), target=(0.0, 0.0, -1.0)) -> Frustum:
+    """Câmera perspectiva em `eye` olhando para `target`, como em Game.render. Devolve o tronco de visão."""
+    glUseProgram(int(shader.shader_program))
+    projection = glm.perspective(glm.radians(FOV), WIDTH / HEIGHT, 0.1, 100.0)
+    view = glm.lookAt(glm.vec3(*eye), glm.vec3(*target), glm.vec3(0, 1, 0))
+    shader.shader_program.set_vec3("cameraPos", glm.vec3(*eye))
+    shader.shader_program.set_mat4("view", view)
+    shader.shader_program.set_mat4("projection", projection)
+    glEnable(GL_DEPTH_TEST)
+    glClearColor(0.2, 0.3, 0.3, 1.0)
+    return Frustum(projection * view)
+
+
+def forest(model, count: int, seed: int = 1) -> Scene:
+    """
+    `count` cópias do modelo à frente da câmera (que olha para -z), a distâncias de 3 a 45, espalhadas dentro do
+    campo de visão, e uma luz forte na câmera.
+    """
+    rng = np.random.default_rng(seed)
+    objects = []
+    for distance in np.geomspace(3, 45, count):
+        spread = 0.8 * distance * math.tan(math.radians(FOV) / 2)
+        obj = Object(model).move((rng.uniform(-spread, spread) * WIDTH / HEIGHT, rng.uniform(-spread, spread) / 2,
+                                  -distance))
+        obj.rotation = glm.vec3(0, rng.uniform(0, 360), 0)
+        objects.append(obj)
+    return Scene("forest", objects, [LightSource(None, (600, 600, 600))])
+
+
+def frame(engine: Engine, window: HeadlessWindow, frustum: Frustum, view: LodView | None) -> np.ndarray:
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    engine.render(frustum, 1.0, view)
+    return window.read_pixels()
+
+
+def verify(root_dir: str, shader: Shader, window: HeadlessWindow) -> bool:
+    print("verificações:")
+    results = []
+    program = shader.shader_program
+
+    engine = Engine(program)
+    start = time.perf_counter()
+    model = engine.register_model("sphere", root_dir, lods=DEFAULT_LODS)
+    built = time.perf_counter() - start
+    triangles = level_triangles(model)
+    ratios = [count / triangles[0] for count in triangles[1:]]
+    results.append(check(f"um nível por fração, perto da fração pedida ({triangles}, "
+                         f"{', '.join(f'{ratio:.3f}' for ratio in ratios)})",
+                         len(ratios) == len(DEFAULT_LODS)
+                         and all(abs(ratio - target) < 0.25 * target for ratio, target in zip(ratios, DEFAULT_LODS))))
+    results.append(check(f"erros crescentes ({', '.join(f'{error:.4f}' for error in model.lod_errors)})",
+                         model.lod_errors[0] == 0 and all(np.diff(model.lod_errors) > 0)))
+    bounds = model.bounds
+    results.append(check("os níveis ficam dentro da caixa do modelo completo",
+                         all(np.all(np.abs(arrays[0].reshape(-1, 3) - bounds.center) <= bounds.extent + 1e-5)
+                             for level in model.lods for arrays in level.values())))
+
+    wavefront_file = os.path.join(root_dir, "sphere.obj")
+    other = Engine(program)
+    start = time.perf_counter()
+    cached = other.register_model("sphere", root_dir, lods=DEFAULT_LODS)
+    reused = time.perf_counter() - start
+    results.append(check(f"cache em disco reaproveitado ({built * 1000:.0f}ms gerando, {reused * 1000:.0f}ms do "
+                         f"cache)", os.path.exists(cache.cache_path(wavefront_file, "lods"))
+                         and cached.lod_ranges == model.lod_ranges and cached.lod_errors == model.lod_errors
+                         and reused < built / 2))
+    indexed = other.register_model("indexed", root_dir, indexed=True, lods=DEFAULT_LODS)
+    results.append(check("mesmos níveis com índices", level_triangles(indexed) == triangles
+                         and indexed.ebo is not None))
+    pooled = other.register_models({"pooled": root_dir}, workers=2, lods=(0.1, 0.5, 0.25))["pooled"]
+    results.append(check("no pool de processos: mesmos níveis (e o mesmo asset, com as frações em outra ordem)",
+                         pooled is cached))
+    release(other)
+
+    other = Engine(program)
+    pooled = other.register_models({"pooled": root_dir, "copy": root_dir}, workers=2, lods=DEFAULT_LODS)["pooled"]
+    streamed_engine = Engine(program)
+    streamed = streamed_engine.register_model("streamed", root_dir, asynchronous=True, lods=DEFAULT_LODS)
+    deadline = time.perf_counter() + 60
+    while not streamed.resident and time.perf_counter() < deadline:
+        streamed_engine.render()
+    results.append(check("mesmos níveis no pool de processos e no streaming",
+                         pooled.lod_ranges == model.lod_ranges and pooled.lod_errors == model.lod_errors
+                         and streamed.resident and streamed.lod_ranges == model.lod_ranges
+                         and streamed.lod_errors == model.lod_errors))
+    release(other)
+    release(streamed_engine)
+
+    frustum = setup_camera(shader)
+    view = LodView.perspective((0, 0, 0), FOV, HEIGHT)
+    near, far = Object(model).move((0, 0, -3)), Object(model).move((0, 0, -45))
+    engine.register_scene(Scene("pair", [near, far]))
+    frame(engine, window, frustum, view)
+    stats = engine.render_queue.stats
+    limits = view.limits(np.array(model.lod_errors[1:]))
+    expected = [int((2 * model.bounds.radius * view.scale / distance < limits).sum()) for distance in (3, 45)]
+    results.append(check(f"perto, o modelo completo; longe, o nível do tamanho na tela ({near.lod}, {far.lod})",
+                         [near.lod, far.lod] == expected and far.lod > 0))
+    results.append(check(f"triângulos desenhados contados ({stats['triangles']})",
+                         stats["triangles"] == triangles[0] + triangles[far.lod] and stats["simplified"] == 2))
+    # Um material que some no nível simplificado não é desenhado nem contado
+    ranges = model.lod_ranges[far.lod]
+    gone = list(ranges)[-1]
+    model.lod_ranges[far.lod] = {material: draw for material, draw in ranges.items() if material != gone}
+    frame(engine, window, frustum, view)
+    model.lod_ranges[far.lod] = ranges
+    results.append(check("material ausente no nível: fora dos itens desenhados e dos simplificados",
+                         engine.render_queue.stats["items"] == stats["items"] - 1
+                         and engine.render_queue.stats["simplified"] == 1))
+    frame(engine, window, frustum, None)
+    results.append(check("sem câmera, todos completos",
+                         engine.render_queue.stats["triangles"] == 2 * triangles[0]
+                         and engine.render_queue.stats["simplified"] == 0))
+
+    queued = far.lod
+    far.lod = -1
+    chosen = far.lod_level(view)
+    far.lod = -1
+    far.draw(view=view)
+    results.append(check("Object.draw com a câmera escolhe o mesmo nível que a RenderQueue",
+                         chosen == queued and far.lod == queued))
+
+    # Histerese: distâncias em que o objeto tem 10% a mais e a menos que o limite do nível 1 na tela
+    limit, radius = limits[0], model.bounds.radius
+    near.lod = -1
+    levels = []
+    for factor in (1.3, 0.9, 1.1, 0.9, 1.1, 0.7, 0.9, 1.1, 0.9, 1.3):
+        distance = 2 * radius * view.scale / (limit * factor)
+        levels.append(near.lod_level(LodView.perspective((0, 0, distance - 3), FOV, HEIGHT)))
+    results.append(check(f"histerese: perto do limite, o nível não troca a cada quadro ({levels})",
+                         levels == [0, 0, 0, 0, 0, 1, 1, 1, 1, 0]))
+    sizes = np.array([limit * 1.05])
+    results.append(check("sem nível anterior, o limite exato",
+                         select_levels(sizes, limits[None], np.array([-1]), view.hysteresis)[0] == 0
+                         and select_levels(sizes * 0.9, limits[None], np.array([-1]), view.hysteresis)[0] == 1))
+    release(engine)
+    return all(results)
+
+
+def measure(root_dir: str, shader: Shader, window: HeadlessWindow, objects: int, frames: int, tolerances):
+    engine = Engine(shader.shader_program)
+    model = engine.register_model("sphere", root_dir, lods=DEFAULT_LODS)
+    scene = forest(model, objects)
+    engine.register_scene(scene)
+    frustum = setup_camera(shader)
+    scale = LodView.perspective((0, 0, 0), FOV, HEIGHT).scale
+    diameter = 2 * model.bounds.radius
+
+    triangles = level_triangles(model)
+    print(f"\nmodelo: {triangles[0]} triângulos, diâmetro {diameter:.2f}")
+    print(f"  {'nível':6s} {'triângulos':>10s} {'erro':>8s} {'limite (px, tolerância 1)':>26s} {'distância':>10s}")
+    for level, (count, error) in enumerate(zip(triangles, model.lod_errors)):
+        limit = 1 / error if error else math.inf
+        distance = diameter * scale / limit if error else 0.0
+        print(f"  {level:<6d} {count:10d} {error:8.4f} {limit:26.1f} {distance:10.1f}")
+
+    print(f"\n{objects} objetos a 3-45 unidades, {WIDTH}x{HEIGHT}:")
+    print(f"  {'tolerância':10s} {'triângulos':>10s} {'simplif.':>9s} {'p50':>8s} {'pixels dif.':>12s} "
+          f"{'dif. máx':>9s}")
+    reference = None
+    for tolerance in [None] + list(tolerances):
+        view = None if tolerance is None else LodView.perspective((0, 0, 0), FOV, HEIGHT, tolerance=tolerance)
+        for obj in scene.objects:
+            obj.lod = -1
+        pixels = frame(engine, window, frustum, view)
+        stats = dict(engine.render_queue.stats)
+        times = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            frame(engine, window, frustum, view)
+            glFinish()
+            times.append(time.perf_counter() - start)
+        if reference is None:
+            reference = pixels
+        difference = np.abs(pixels.astype(np.int16) - reference.astype(np.int16)).max(axis=-1)
+        changed = (difference > 16).mean() * 100
+        name = "completo" if tolerance is None else f"{tolerance:g} px"
+        print(f"  {name:10s} {stats['triangles']:10d} {stats['simplified'] // 2:9d} "
+              f"{np.median(times) * 1000:6.2f}ms {changed:11.2f}% {difference.max():9d}")
+    release(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=60000, help="triângulos do modelo")
+    parser.add_argument("--objects", type=int, default=60)
+    parser.add_argument("--size", type=int, default=256, help="lado das texturas, em pixels")
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--tolerances", default="0.5,1,2,4,8", help="tolerâncias em pixels, separadas por vírgula")
+    args = parser.parse_args()
+
+    window = HeadlessWindow(WIDTH, HEIGHT)
+    window.create_window()
+    try:
+        shader = Shader("shaders/vertex.glsl", "shaders/fragment.glsl")
+        with tempfile.TemporaryDirectory() as directory:
+            root_dir = os.path.join(directory, "sphere")
+            create_model(root_dir, args.faces, args.size)
+            ok = verify(root_dir, shader, window)
+            measure(root_dir, shader, window, args.objects, args.frames,
+                    [float(value) for value in args.tolerances.split(",")])
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Confere as texturas com mipmaps e os arquivos `.mips` pré-processados (src/components/bake.py), e compara o
+carregamento de várias imagens decodificando com o PIL e gerando os mipmaps na GPU com o carregamento dos
+arquivos `.mips`, sem compressão e em BC1/BC3: tempo de carga e memória de vídeo. Depois mede o custo de amostrar
+uma textura vista de longe (um quad com a textura repetida muitas vezes) sem mipmaps, com mipmaps e comprimida.
+
+As imagens são geradas em um diretório temporário (gradientes com ruído, como uma foto; uma delas com
+transparência). As verificações cobrem a cadeia de níveis, os níveis do `.mips` comparados com os gerados pela
+GPU, a carga sem PIL, a invalidação quando a imagem muda e a qualidade da compressão (comparada com a imagem
+original depois de descomprimida pelo OpenGL). Usa uma HeadlessWindow (EGL), então não precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.mipmaps [--images N] [--size PIXELS] [--draws N]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+from PIL import Image
+
+from src.components import TextureManager, textures
+from src.components.bake import bake, bake_directory, read_baked, level_bytes, GL_COMPRESSED_RGB_S3TC_DXT1_EXT, \
+    GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+from src.view import HeadlessWindow
+
+from .common import check
+
+VERTEX = """
+#version 330 core
+layout (location = 0) in vec2 position;
+out vec2 uv;
+void main() {
+    uv = (position * 0.5 + 0.5) * 64.0;
+    gl_Position = vec4(position, 0.0, 1.0);
+}
+"""
+
+FRAGMENT = """
+#version 330 core
+in vec2 uv;
+out vec4 color;
+uniform sampler2D image;
+void main() {
+    color = texture(image, uv);
+}
+"""
+
+
+def create_images(directory: str, count: int, size: int):
+    """Gradientes com ruído; a primeira imagem é um PNG com transparência, as outras JPEG."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size] / size
+    paths = []
+    for i in range(count):
+        channels = [np.sin((x * (i + 1) + y * c) * np.pi) * 100 + 128 for c in range(3)]
+        pixels = np.stack(channels, axis=2) + rng.normal(0, 6, (size, size, 3))
+        pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+        if i == 0:
+            alpha = np.clip(x * 255, 0, 255).astype(np.uint8)[..., None]
+            path = os.path.join(directory, "image0.png")
+            Image.fromarray(np.concatenate([pixels, alpha], axis=2), "RGBA").save(path)
+        else:
+            path = os.path.join(directory, f"image{i}.jpg")
+            Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def level_pixels(texture_id: int, level: int) -> np.ndarray:
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    width = glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_WIDTH)
+    height = glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_HEIGHT)
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+    data = glGetTexImage(GL_TEXTURE_2D, level, GL_RGBA, GL_UNSIGNED_BYTE)
+    return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4).astype(np.int16)
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    error = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return 10 * np.log10(255 ** 2 / max(error, 1e-12))
+
+
+def clear_baked(paths):
+    for path in paths:
+        if os.path.exists(f"{path}.mips"):
+            os.remove(f"{path}.mips")
+
+
+def verify(directory: str, paths, size: int) -> bool:
+    print("verificações:")
+    results = []
+    levels = size.bit_length()
+    path = paths[1]
+
+    manager = TextureManager(workers=0)
+    generated = manager.get(path)
+    glBindTexture(GL_TEXTURE_2D, generated)
+    results.append(check(f"sem .mips: filtro trilinear e {levels} níveis gerados na GPU",
+                         glGetTexParameteriv(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER) == GL_LINEAR_MIPMAP_LINEAR
+                         and glGetTexLevelParameteriv(GL_TEXTURE_2D, levels - 1, GL_TEXTURE_WIDTH) == 1
+                         and manager.memory() == sum(level_bytes(size >> i, size >> i) for i in range(levels))))
+
+    bake(path)
+    baked = read_baked(path)
+    source = np.asarray(Image.open(path).convert("RGBA"))[::-1]
+    results.append(check("bake: cadeia completa e nível 0 igual à imagem",
+                         len(baked.levels) == levels and np.array_equal(baked.levels[0][2].reshape(source.shape),
+                                                                        source)))
+
+    loader = TextureManager(workers=0)
+    image, textures.Image = textures.Image, None
+    try:
+        loaded = loader.get(path)
+    finally:
+        textures.Image = image
+    results.append(check("com .mips, a textura carrega sem o PIL", loader.stats[loader.key(path)].baked))
+    difference = max(np.abs(level_pixels(loaded, level) - level_pixels(generated, level)).max()
+                     for level in range(1, levels))
+    results.append(check(f"níveis do .mips iguais aos gerados pela GPU (diferença máxima {difference})",
+                         difference <= 2))
+    manager.delete()
+    loader.delete()
+
+    with open(path, "ab") as file:
+        file.write(b"\0")
+    stale = read_baked(path) is None
+    rebaked = dict(bake_directory(directory))[path] != "atualizado"
+    results.append(check("imagem alterada: .mips ignorado e refeito pelo bake_directory", stale and rebaked))
+
+    bake(paths[1], compress_levels=True)
+    bake(paths[0], compress_levels=True)
+    manager = TextureManager(workers=0)
+    opaque, transparent = manager.get(paths[1]), manager.get(paths[0])
+    original = np.asarray(Image.open(paths[1]).convert("RGBA"))[::-1]
+    with_alpha = np.asarray(Image.open(paths[0]).convert("RGBA"))[::-1]
+    glBindTexture(GL_TEXTURE_2D, opaque)
+    bc1 = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_INTERNAL_FORMAT)
+    bc1_size = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_COMPRESSED_IMAGE_SIZE)
+    glBindTexture(GL_TEXTURE_2D, transparent)
+    bc3 = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_INTERNAL_FORMAT)
+    chain = sum(level_bytes(size >> i, size >> i) for i in range(levels))
+    results.append(check("compressão: BC1 para a imagem opaca (8x menor) e BC3 para a com transparência",
+                         bc1 == GL_COMPRESSED_RGB_S3TC_DXT1_EXT and bc3 == GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+                         and bc1_size == size * size // 2
+                         and chain / manager.stats[manager.key(paths[1])].memory > 7.9))
+    quality = psnr(level_pixels(opaque, 0)[..., :3], original[..., :3])
+    alpha_quality = psnr(level_pixels(transparent, 0)[..., 3], with_alpha[..., 3])
+    results.append(check(f"qualidade: BC1 {quality:.1f}dB, alfa do BC3 {alpha_quality:.1f}dB (mínimo 30dB)",
+                         quality > 30 and alpha_quality > 30))
+    manager.delete()
+    clear_baked(paths)
+    return all(results)
+
+
+def load(paths, mode: str):
+    """Carrega as imagens em um TextureManager novo; devolve o gerenciador e o tempo de carga."""
+    clear_baked(paths)
+    if mode != "PIL":
+        for path in paths:
+            bake(path, compress_levels=mode == "BC")
+    manager = TextureManager(workers=0, baked=mode != "PIL")
+    start = time.perf_counter()
+    for path in paths:
+        manager.get(path)
+    glFinish()
+    return manager, time.perf_counter() - start
+
+
+def sampling(texture_id: int, min_filter: int, draws: int) -> float:
+    """Tempo médio, em ms, de desenhar um quad de 512x512 pixels com a textura repetida 64x64 vezes."""
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, min_filter)
+    glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+    glFinish()
+    start = time.perf_counter()
+    for _ in range(draws):
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        glFinish()
+    return (time.perf_counter() - start) / draws * 1000
+
+
+def measure(paths, draws: int):
+    print(f"\ncarga de {len(paths)} imagens:")
+    print(f"  {'':28s} {'carga':>9s} {'memória':>10s}")
+    loaded = {}
+    for mode, name in (("PIL", "PIL + glGenerateMipmap"), ("RGBA8", ".mips sem compressão"), ("BC", ".mips BC1/BC3")):
+        manager, elapsed = load(paths, mode)
+        print(f"  {name:28s} {elapsed * 1000:8.1f}ms {manager.memory() / 2 ** 20:8.2f}MB")
+        loaded[mode] = manager
+
+    program = compileProgram(compileShader(VERTEX, GL_VERTEX_SHADER), compileShader(FRAGMENT, GL_FRAGMENT_SHADER))
+    glUseProgram(program)
+    vao = glGenVertexArrays(1)
+    vbo = glGenBuffers(1)
+    glBindVertexArray(vao)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    quad = np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype=np.float32)
+    glBufferData(GL_ARRAY_BUFFER, quad.nbytes, quad, GL_STATIC_DRAW)
+    glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, None)
+    glEnableVertexAttribArray(0)
+
+    path = paths[-1]
+    print(f"\namostragem de longe ({draws} quadros de 512x512, textura repetida 64x64 vezes):")
+    for name, mode, min_filter in (("sem mipmaps", "PIL", GL_LINEAR),
+                                   ("mipmaps, um nível", "PIL", GL_LINEAR_MIPMAP_NEAREST),
+                                   ("mipmaps, trilinear", "PIL", GL_LINEAR_MIPMAP_LINEAR),
+                                   ("mipmaps, trilinear, BC1", "BC", GL_LINEAR_MIPMAP_LINEAR)):
+        manager = loaded[mode]
+        print(f"  {name:28s} {sampling(manager.get(path), min_filter, draws):8.2f}ms")
+
+    for manager in loaded.values():
+        manager.delete()
+    clear_baked(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--draws", type=int, default=20)
+    args = parser.parse_args()
+
+    window = HeadlessWindow(512, 512)
+    window.create_window()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = create_images(directory, args.images, args.size)
+            ok = verify(directory, paths, args.size)
+            measure(paths, args.draws)
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Mede o tempo de carregamento dos modelos no lado da CPU: leitura do OBJ e triangulação.
+Não cria contexto OpenGL, então texturas e buffers não entram na medida.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.model_load [arquivo.obj ...] [--repeat N]
+
+Sem argumentos, mede todos os OBJ dentro de `models/`.
+"""
+import argparse
+import glob
+import time
+
+from src.components.model import read_wavefront, build_triangles
+
+
+def benchmark(file_path: str, repeat: int = 5):
+    best_parse, best_build, triangles = float("inf"), float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vertices, texture_coords, faces, normals = read_wavefront(file_path)
+        parsed = time.perf_counter()
+        triangles = 0
+        for group in faces.values():
+            triangles += len(build_triangles(vertices, texture_coords, normals, group)[0]) // 9
+        built = time.perf_counter()
+
+        best_parse = min(best_parse, parsed - start)
+        best_build = min(best_build, built - parsed)
+    return triangles, best_parse, best_build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=sorted(glob.glob("models/*/*.obj")))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'arquivo':40s} {'triângulos':>10s} {'leitura':>10s} {'triangulação':>13s}")
+    for file_path in args.files:
+        triangles, parse, build = benchmark(file_path, args.repeat)
+        print(f"{file_path:40s} {triangles:10d} {parse * 1e3:8.1f}ms {build * 1e3:11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
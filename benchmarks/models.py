@@ -0,0 +1,177 @@
+"""
+Confere o carregamento de modelos em um pool de processos (Engine.register_models, src/engine/loader.py) e compara
+o tempo de registrar vários modelos com 1 (um a um, na thread principal), 2, 4 e 8 processos, com o cache de
+triângulos frio (OBJ lido e triangulado) e quente (cache em disco já salvo).
+
+Os modelos são gerados em um diretório temporário: malhas de quadriláteros com coordenadas de textura e normais,
+em dois materiais, cada um com uma textura pequena (o tempo medido é o dos OBJ, não o das imagens). As
+verificações cobrem a geometria igual à lida um a um (com e sem índices), os arrays como visões da memória
+compartilhada, sem cópia, a ordem dos modelos, a limpeza dos blocos em /dev/shm, inclusive quando um dos modelos
+falha, e o cache regravado quando só o mtime do OBJ muda. Usa uma HeadlessWindow (EGL), então não precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.models [--models N] [--faces N] [--workers 1,2,4,8]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import gc
+import tempfile
+import time
+
+import numpy as np
+from OpenGL.GL import glFinish
+
+from src.components import cache
+from src.engine import Engine
+from src.view import HeadlessWindow, Shader
+
+from .common import check, create_models, release
+
+
+def clear_cache(models):
+    for root_dir in models.values():
+        path = cache.cache_path(os.path.join(root_dir, "mesh.obj"), "triangles")
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def segments():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def arrays(model):
+    result = []
+    for material in model.texture_ids:
+        result += [model.triangle_vertices[material], model.textures[material], model.triangle_normals[material]]
+        if model.indexed:
+            result.append(model.indices[material])
+    return result
+
+
+def in_segment(model) -> bool:
+    """Se todos os arrays do modelo estão dentro do bloco de memória compartilhada (visões, não cópias)."""
+    start = np.frombuffer(model.shared_memory.buf, np.uint8).ctypes.data
+    end = start + model.shared_memory.size
+    return all(not array.flags.owndata and start <= array.ctypes.data and array.ctypes.data + array.nbytes <= end
+               for array in arrays(model))
+
+
+def same_geometry(a, b) -> bool:
+    return list(a.texture_ids) == list(b.texture_ids) and all(
+        x.dtype == y.dtype and np.array_equal(x, y) for x, y in zip(arrays(a), arrays(b)))
+
+
+def verify(directory: str, models, shader_program) -> bool:
+    print("verificações:")
+    results = []
+    before = segments()
+
+    for indexed in (False, True):
+        sequential = Engine(shader_program)
+        expected = sequential.register_models(models, workers=1, use_cache=False, indexed=indexed)
+        parallel = Engine(shader_program)
+        loaded = parallel.register_models(models, workers=2, use_cache=False, indexed=indexed)
+        suffix = ", indexado" if indexed else ""
+        results.append(check(f"mesma geometria que a leitura um a um{suffix}",
+                             all(same_geometry(expected[name], loaded[name]) for name in models)))
+        results.append(check(f"arrays são visões da memória compartilhada, sem cópia{suffix}",
+                             all(in_segment(model) for model in loaded.values())
+                             and all(model.shared_memory is None for model in expected.values())))
+        results.append(check("modelos na ordem pedida, registrados na Engine",
+                             list(loaded) == list(models) and list(parallel.models) == list(models)
+                             and all(parallel.models[name] is loaded[name] for name in models)))
+        results.append(check("bounds e texturas iguais",
+                             all(np.array_equal(expected[name].bounds.low, loaded[name].bounds.low)
+                                 and np.array_equal(expected[name].bounds.high, loaded[name].bounds.high)
+                                 and len(loaded[name].texture_ids) == 2 for name in models)))
+        results.append(check("nenhum bloco em /dev/shm depois de carregar (unlink na hora)", segments() == before))
+        release(sequential)
+        release(parallel)
+        del expected, loaded, sequential, parallel
+
+    gc.collect()
+    results.append(check("nada sobra em /dev/shm depois de apagar os modelos", segments() == before))
+
+    broken = dict(models)
+    broken["empty"] = os.path.join(directory, "empty")
+    os.makedirs(broken["empty"])
+    engine = Engine(shader_program)
+    try:
+        engine.register_models(broken, workers=2, use_cache=False)
+        failed = False
+    except FileNotFoundError:
+        failed = True
+    results.append(check("modelo sem OBJ: o erro chega ao chamador e os blocos dos outros são liberados",
+                         failed and segments() == before))
+    release(engine)
+
+    # Mesmo conteúdo com outro mtime (ex.: git checkout): o hash é conferido uma vez e a chave, regravada
+    source = os.path.join(models["mesh0"], "mesh.obj")
+    engine = Engine(shader_program)
+    engine.register_model("mesh0", models["mesh0"])
+    release(engine)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    hashes = []
+    file_hash = cache.file_hash
+    cache.file_hash = lambda path: hashes.append(path) or file_hash(path)
+    try:
+        loads = [cache.load(source, "triangles") is not None for _ in range(2)]
+    finally:
+        cache.file_hash = file_hash
+    with np.load(cache.cache_path(source, "triangles")) as data:
+        mtime = int(data["__mtime__"])
+    results.append(check("OBJ com mtime novo e mesmo conteúdo: cache usado, hash lido uma vez e chave regravada",
+                         loads == [True, True] and len(hashes) == 1 and mtime == os.stat(source).st_mtime_ns))
+    return all(results)
+
+
+def register(models, shader_program, workers: int) -> float:
+    engine = Engine(shader_program)
+    start = time.perf_counter()
+    engine.register_models(models, workers=workers)
+    glFinish()
+    elapsed = time.perf_counter() - start
+    release(engine)
+    return elapsed
+
+
+def measure(models, shader_program, workers):
+    print(f"\n{len(models)} modelos ({os.cpu_count()} CPUs):")
+    print(f"  {'processos':>9s} {'cache frio':>11s} {'cache quente':>13s}")
+    for count in workers:
+        clear_cache(models)
+        cold = register(models, shader_program, count)
+        warm = register(models, shader_program, count)
+        print(f"  {count:9d} {cold * 1000:9.1f}ms {warm * 1000:11.1f}ms")
+    clear_cache(models)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=8)
+    parser.add_argument("--faces", type=int, default=20000, help="quadriláteros por modelo")
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    window = HeadlessWindow(64, 64)
+    window.create_window()
+    try:
+        shader_program = Shader("shaders/vertex.glsl", "shaders/fragment.glsl").shader_program
+        with tempfile.TemporaryDirectory() as directory:
+            models = create_models(directory, args.models, args.faces)
+            ok = verify(directory, dict(list(models.items())[:3]), shader_program)
+            measure(models, shader_program, [int(count) for count in args.workers.split(",")])
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
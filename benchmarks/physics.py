@@ -0,0 +1,161 @@
+"""
+Confere e mede a física de src/engine/physics.py com centenas de objetos interativos em movimento.
+
+Primeiro faz verificações com resultado conhecido: esferas e caixas que se sobrepõem são separadas, um objeto sem
+forma de colisão é levado de volta para dentro das regiões como antes (também em um tick curto demais para um
+passo), uma caixa em queda para sobre o plano do
+chão, o tick executa a quantidade certa de passos fixos, e a fase ampla (sweep and prune) encontra os mesmos pares
+que a comparação de todos com todos. Depois mede, para N objetos se movendo dentro de uma esfera, o tempo da fase
+ampla contra todos os pares e o tempo por quadro da simulação completa. Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.physics [--objects N [N ...]] [--frames N]
+"""
+import argparse
+import itertools
+import time
+
+import glm
+import numpy as np
+
+from src.components import InteractiveObject, SphereCollider, BoxCollider, SphereBound, NormalBound
+from src.engine import Physics
+from src.engine.physics import sweep_and_prune
+
+from .common import check
+
+
+def body(position, collider=None, velocity=(0, 0, 0)) -> InteractiveObject:
+    obj = InteractiveObject()
+    obj.position = glm.vec3(*position)
+    obj.collider = collider
+    if collider is not None:
+        collider.velocity = glm.vec3(*velocity)
+    return obj
+
+
+def world() -> Physics:
+    """As mesmas regiões de main.py: a esfera do céu e o plano do chão."""
+    physics = Physics()
+    physics.register_object(SphereBound((0, 0, 0), radius=45))
+    physics.register_object(NormalBound((0, -1, 0), (0, -0.7, 0)))
+    return physics
+
+
+def all_pairs(lows: np.ndarray, highs: np.ndarray):
+    """Todos com todos, de uma vez: n² comparações."""
+    overlap = ((lows[:, None] <= highs[None]) & (lows[None] <= highs[:, None])).all(axis=2)
+    return np.nonzero(np.triu(overlap, 1))
+
+
+def close(a: glm.vec3, b: tuple) -> bool:
+    return bool(np.allclose(np.array(a), b, atol=1e-5))
+
+
+def verify() -> bool:
+    print("verificações:")
+    results = []
+
+    a, b = body((0, 0, 0), SphereCollider(1)), body((1.5, 0, 0), SphereCollider(1))
+    Physics().simulate([a, b])
+    results.append(check("esferas sobrepostas são separadas", close(a.position, (-0.25, 0, 0))
+                         and close(b.position, (1.75, 0, 0))))
+
+    sphere, box = body((0.9, 0, 0), SphereCollider(0.5)), body((0, 0, 0), BoxCollider((0.5, 0.5, 0.5)))
+    Physics().simulate([box, sphere])
+    results.append(check("esfera e caixa sobrepostas são separadas", close(sphere.position, (0.95, 0, 0))
+                         and close(box.position, (-0.05, 0, 0))))
+
+    a, b = body((0, 0, 0), BoxCollider((1, 1, 1))), body((1.5, 0.2, 0), BoxCollider((1, 1, 1), mass=np.inf))
+    Physics().simulate([a, b])
+    results.append(check("caixa é empurrada para fora de uma caixa imóvel", close(a.position, (-0.5, 0, 0))
+                         and close(b.position, (1.5, 0.2, 0))))
+
+    player = body((60, 0, 0))
+    world().tick([player], 1 / 60)
+    results.append(check("objeto sem forma de colisão volta para dentro da esfera", close(player.position, (45, 0, 0))))
+
+    physics = world()
+    physics.tick([player], 1 / 60)
+    player.position = glm.vec3(0, -5, 0)
+    steps = physics.tick([player], 1 / 1000)
+    results.append(check("tick sem passos ainda leva o objeto de volta para dentro das regiões",
+                         steps == 0 and close(player.position, (0, -0.7, 0))))
+
+    falling = body((0, 3, 0), BoxCollider((0.5, 0.5, 0.5)), velocity=(0, -5, 0))
+    physics = world()
+    for _ in range(120):
+        physics.tick([falling], 1 / 60)
+    results.append(check("caixa em queda para sobre o chão", close(falling.position, (0, -0.2, 0))
+                         and close(falling.collider.velocity, (0, 0, 0))))
+
+    physics = Physics(step=1 / 120, max_steps=8)
+    steps = [physics.tick([], delta) for delta in (1 / 60, 1 / 240, 1 / 240, 1.0)]
+    results.append(check("passos fixos por tick (1/60, 1/240, 1/240, 1s)", steps == [2, 0, 1, 8]))
+
+    rng = np.random.default_rng(0)
+    for count in (0, 1, 2, 50, 400):
+        lows = rng.uniform(-20, 20, (count, 3))
+        highs = lows + rng.uniform(0, 3, (count, 3))
+        first, second = sweep_and_prune(lows, highs)
+        expected = {(i, j) for i, j in itertools.combinations(range(count), 2)
+                    if (lows[i] <= highs[j]).all() and (lows[j] <= highs[i]).all()}
+        results.append(check(f"sweep and prune == todos os pares ({count} caixas)",
+                             len(first) == len(expected) and set(zip(first.tolist(), second.tolist())) == expected))
+    return all(results)
+
+
+def moving_objects(count: int, seed: int = 1):
+    """Metade esferas, metade caixas, espalhadas na esfera do céu e andando em direções aleatórias."""
+    rng = np.random.default_rng(seed)
+    objects = []
+    for i in range(count):
+        position = rng.uniform(-25, 25, 3)
+        position[1] = rng.uniform(0, 20)
+        collider = SphereCollider(rng.uniform(0.3, 1)) if i % 2 else BoxCollider(rng.uniform(0.3, 1, 3))
+        objects.append(body(position, collider, velocity=rng.uniform(-5, 5, 3)))
+    return objects
+
+
+def timed(function, repeat: int) -> float:
+    """Tempo médio de `function`, em ms."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure(count: int, frames: int):
+    objects = moving_objects(count)
+    physics = world()
+    positions = np.array([obj.position for obj in objects], dtype=np.float64)
+    extents = np.array([obj.collider.extent for obj in objects], dtype=np.float64)
+    lows, highs = positions - extents, positions + extents
+
+    prune = timed(lambda: sweep_and_prune(lows, highs), 20)
+    brute = timed(lambda: all_pairs(lows, highs), 20)
+    frame = timed(lambda: physics.tick(objects, 1 / 60), frames)
+
+    print(f"\n{count} objetos em movimento ({len(sweep_and_prune(lows, highs)[0])} pares sobrepostos):")
+    print(f"  fase ampla, sweep and prune  {prune:8.3f}ms")
+    print(f"  fase ampla, todos os pares   {brute:8.3f}ms")
+    print(f"  tick de 1/60s ({physics.stats['steps']} passos)     {frame:8.3f}ms "
+          f"({physics.stats['pairs']} pares, {physics.stats['contacts']} contatos no último)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    ok = verify()
+    for count in args.objects:
+        measure(count, args.frames)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Confere o profiler de quadros (src/profiler.py) e mede o seu custo por trecho medido, desligado e ligado.
+
+As verificações cobrem o aninhamento dos trechos, o resumo da janela deslizante, o limite de quadros guardados,
+os arquivos exportados (trace do Chrome e CSV) e os trechos de um quadro da Engine (tick e render, com as funções
+gl* trocadas por um GLRecorder). Depois mede o custo de envolver uma função vazia com `profiler.scope` comparado
+à chamada sem profiler. Não cria contexto OpenGL (sem contexto, os trechos de GPU são medidos só na CPU).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.profiler [--calls N]
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+from src.components import Object, Scene
+from src.engine import Engine
+from src.profiler import Profiler, NULL_SCOPE, profiler as frame_profiler
+from src.view.shader import Program
+
+from .common import check, create_models, release
+from .gl_calls import GLRecorder
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def engine_scopes(directory: str) -> set:
+    """Nomes dos trechos registrados pelo profiler da Engine em um tick e um render de uma cena com um modelo."""
+    models = create_models(directory, 1, 16)
+    with GLRecorder():
+        engine = Engine(Program(1))
+        try:
+            model = engine.register_model("mesh0", models["mesh0"])
+            engine.register_scene(Scene("cena", [Object(model).move((i, 0, 0)) for i in range(3)]))
+            frame_profiler.enable()
+            engine.tick(set(), 1 / 60)
+            engine.render()
+            frame_profiler.end_frame()
+        finally:
+            frame_profiler.disable()
+            release(engine)
+    return {name for name, _, _, _ in frame_profiler.frames[-1].events}
+
+
+def verify() -> bool:
+    print("verificações:")
+    results = []
+
+    profiler = Profiler(window=3)
+    results.append(check("desligado, scope devolve o contexto vazio compartilhado",
+                         profiler.scope("a") is NULL_SCOPE and profiler.gpu_scope("a") is NULL_SCOPE))
+
+    profiler.enable()
+    for frame in range(5):
+        with profiler.scope("Engine.tick"):
+            with profiler.scope("Physics.tick"):
+                busy(0.001)
+        for name in ("a", "b"):
+            with profiler.scope("Scene.collect", name):
+                busy(0.0005)
+        profiler.end_frame({"draws": frame})
+
+    last = profiler.frames[-1]
+    depths = {name: depth for name, _, _, depth in last.events}
+    results.append(check("janela guarda só os últimos 3 quadros", [f.index for f in profiler.frames] == [2, 3, 4]))
+    results.append(check("profundidade dos trechos aninhados",
+                         depths == {"Engine.tick": 0, "Physics.tick": 1, "Scene.collect:a": 0, "Scene.collect:b": 0}))
+
+    summary = profiler.summary()
+    results.append(check("resumo: tempo do trecho externo inclui o interno",
+                         summary["Engine.tick"]["mean"] >= summary["Physics.tick"]["mean"] >= 1.0))
+    results.append(check("resumo: uma chamada por quadro de cada cena", summary["Scene.collect:a"]["calls"] == 1))
+    results.append(check("contadores: média da janela", profiler.counters() == {"draws": 3.0}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        trace_path, csv_path = os.path.join(directory, "trace.json"), os.path.join(directory, "trace.csv")
+        profiler.export_chrome_trace(trace_path)
+        profiler.export_csv(csv_path)
+        with open(trace_path) as file:
+            events = json.load(file)["traceEvents"]
+        with open(csv_path) as file:
+            rows = list(csv.DictReader(file))
+
+    complete = [event for event in events if event["ph"] == "X"]
+    results.append(check("trace do Chrome: 4 trechos por quadro, com início e duração em µs",
+                         len(complete) == 12 and all(event["dur"] > 0 for event in complete)))
+    physics = next(event for event in complete if event["name"] == "Physics.tick")
+    engine = next(event for event in complete if event["name"] == "Engine.tick")
+    results.append(check("trace do Chrome: o trecho interno fica dentro do externo",
+                         engine["ts"] <= physics["ts"] and physics["ts"] + physics["dur"] <= engine["ts"] + engine["dur"]))
+    results.append(check("trace do Chrome: contadores por quadro",
+                         [event["args"]["draws"] for event in events if event["ph"] == "C"] == [2, 3, 4]))
+    results.append(check("CSV: uma linha por trecho", len(rows) == 12 and rows[0]["kind"] == "cpu"))
+
+    profiler.disable()
+    with profiler.scope("ignorado"):
+        pass
+    profiler.end_frame()
+    results.append(check("desligado, nada é registrado", len(profiler.frames) == 3 and not profiler.events))
+
+    with tempfile.TemporaryDirectory() as directory:
+        names = engine_scopes(directory)
+        expected = {"Engine.tick", "Physics.tick", "Scene.collect:cena", "RenderQueue.submit",
+                    f"Model.draw:{os.path.join(directory, 'mesh0')}"}
+    results.append(check("quadro da Engine: Physics.tick sem objetos interativos e Model.draw por lote, com o modelo",
+                         expected <= names))
+    return all(results)
+
+
+def measure(calls: int):
+    profiler = Profiler()
+
+    def empty():
+        pass
+
+    def bare():
+        for _ in range(calls):
+            empty()
+
+    def scoped():
+        for _ in range(calls):
+            with profiler.scope("empty"):
+                empty()
+
+    def timed(function) -> float:
+        start = time.perf_counter()
+        function()
+        return (time.perf_counter() - start) / calls * 1e9
+
+    base = timed(bare)
+    disabled = timed(scoped)
+    profiler.enable()
+    enabled = timed(scoped)
+    profiler.end_frame()
+
+    print(f"\ncusto por chamada de uma função vazia ({calls} chamadas):")
+    print(f"  sem profiler        {base:8.1f}ns")
+    print(f"  profiler desligado  {disabled:8.1f}ns (+{disabled - base:.1f}ns)")
+    print(f"  profiler ligado     {enabled:8.1f}ns (+{enabled - base:.1f}ns)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    ok = verify()
+    measure(args.calls)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Mede a vazão (MB/s) do leitor de arquivos Wavefront.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.read_wavefront [arquivo.obj ...] [--repeat N]
+
+Sem argumentos, mede todos os OBJ dentro de `models/`.
+"""
+import argparse
+import glob
+import os
+import time
+
+from src.components.model import read_wavefront
+
+
+def benchmark(file_path: str, repeat: int = 5):
+    size = os.path.getsize(file_path) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_wavefront(file_path)
+        best = min(best, time.perf_counter() - start)
+    return size, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=sorted(glob.glob("models/*/*.obj")))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    total_size, total_time = 0.0, 0.0
+    for file_path in args.files:
+        size, elapsed = benchmark(file_path, args.repeat)
+        total_size += size
+        total_time += elapsed
+        print(f"{file_path:40s} {size:8.2f} MB {elapsed * 1e3:9.1f} ms {size / elapsed:8.1f} MB/s")
+
+    if total_time:
+        print(f"{'total':40s} {total_size:8.2f} MB {total_time * 1e3:9.1f} ms {total_size / total_time:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
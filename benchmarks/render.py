@@ -0,0 +1,225 @@
+"""
+Benchmark de renderização sem display nem GPU: carrega a MainScene em uma HeadlessWindow (EGL; no Linux sem GPU,
+o Mesa llvmpipe), percorre um caminho de câmera fixo por N quadros e mostra o tempo de carga, a memória e os
+percentis do tempo por quadro (tick + render + glFinish).
+
+O caminho começa dentro da casa e sai para a floresta, passando pelas duas cenas. A posição dos objetos gerados
+aleatoriamente usa uma semente fixa, então os quadros são os mesmos entre execuções: com --dump, alguns quadros são
+salvos como PNG; com --compare, os mesmos quadros são comparados com imagens salvas antes (ex.: antes de uma
+mudança na renderização), e o script falha se a fração de pixels diferentes passar de --threshold.
+
+Com --asynchronous, os modelos carregam em segundo plano (veja src/engine/streaming.py): os quadros desenhados
+enquanto eles chegam são contados à parte, e as medidas e comparações começam com todos os modelos residentes.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.render [--frames N] [--size 800x600] [--dump DIR] [--compare DIR] [--threshold F]
+                                [--asynchronous] [--budget MB]
+
+Com uma janela GLFW invisível (precisa de display, ex.: Xvfb):
+
+    PYOPENGL_PLATFORM=glx python -m benchmarks.render --backend glfw
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL, então isto vem antes de importar o jogo
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import math
+import random
+import resource
+import time
+
+import glm
+import numpy as np
+from OpenGL.GL import glFinish, glGetString, GL_RENDERER
+from PIL import Image
+
+from main import MainScene
+from src.components import Player
+from src.game import Game
+from src.view import HeadlessWindow
+
+from .common import check
+
+
+def memory() -> tuple:
+    """Memória residente atual e o pico do processo, em MB."""
+    with open("/proc/self/statm") as file:
+        resident = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return resident / 2 ** 20, peak / 2 ** 20
+
+
+def camera_path(t: float):
+    """
+    Posição e direção da câmera em t ∈ [0, 1): uma volta em torno da origem cujo raio vai de 2 (dentro da casa)
+    a 12 (na floresta) e volta, sempre olhando para o centro.
+    """
+    angle = 2 * math.pi * t
+    radius = 2 + 10 * (1 - math.cos(angle)) / 2
+    position = glm.vec3(radius * math.cos(angle), 0.5, radius * math.sin(angle))
+    front = glm.normalize(glm.vec3(0, 0.5, 0) - position)
+    return position, front
+
+
+def create(size, backend: str, asynchronous: bool = False):
+    random.seed(0)
+    width, height = size
+    game = Game(window=HeadlessWindow(width, height, backend=backend))
+    game.create()
+
+    player = Player()
+    game.add_player(player)
+
+    start = time.perf_counter()
+    scene = MainScene(game.engine).register(asynchronous)
+    scene.load()
+    load_time = time.perf_counter() - start
+    return game, player, scene, load_time
+
+
+def frame(game: Game, player: Player, t: float) -> float:
+    """Posiciona a câmera em `t`, executa um tick e desenha o quadro. Devolve a duração em segundos."""
+    player.position, game.camera.front = camera_path(t)
+    start = time.perf_counter()
+    game.tick(1 / 60)
+    game.present(1.0)
+    glFinish()
+    return time.perf_counter() - start
+
+
+def stream(game: Game, player: Player) -> bool:
+    """Desenha quadros parados em t = 0 até todos os modelos ficarem residentes, medindo cada um."""
+    streamer = game.engine.streamer
+    times, copied = [], []
+    start = time.perf_counter()
+    while streamer.busy:
+        times.append(frame(game, player, 0.0))
+        copied.append(streamer.stats["bytes"])
+    elapsed = time.perf_counter() - start
+
+    times = np.array(times) * 1000
+    print(f"carga em segundo plano: {len(times)} quadros em {elapsed * 1000:.1f}ms, "
+          f"quadro p50 {np.median(times):.2f}ms, máx {times.max():.2f}ms, "
+          f"até {max(copied) / 2 ** 20:.2f}MB enviados por quadro\n")
+    return check(f"no máximo {streamer.budget / 2 ** 20:.1f}MB enviados por quadro", max(copied) <= streamer.budget)
+
+
+def dumped_frames(frames: int, count: int):
+    return sorted({int(i * frames / count) for i in range(count)})
+
+
+def compare(pixels: np.ndarray, path: str, tolerance: int) -> float:
+    """
+    Fração dos pixels cuja diferença em algum canal passa de `tolerance`. Sem a imagem de referência (ex.: salva com
+    outro --frames) ou com outro tamanho, todos os pixels contam como diferentes.
+    """
+    if not os.path.exists(path):
+        return 1.0
+    reference = np.asarray(Image.open(path).convert("RGB"))
+    if reference.shape != pixels.shape:
+        return 1.0
+    difference = np.abs(reference.astype(np.int16) - pixels.astype(np.int16)).max(axis=2)
+    return float(np.mean(difference > tolerance))
+
+
+def verify(game: Game, player: Player, scene: MainScene) -> bool:
+    print("verificações:")
+    results = []
+    window = game.window
+    frames = window.frames
+
+    frame(game, player, 0.0)
+    inside = window.read_pixels()
+    results.append(check(f"framebuffer {window.width}x{window.height} lido do FBO",
+                         inside.shape == (window.height, window.width, 3)))
+    results.append(check("quadro desenhado (não é só a cor de fundo)",
+                         np.any(inside != inside[0, 0]) and scene.current_scene == "inside"))
+
+    frame(game, player, 0.0)
+    results.append(check("mesmo quadro, mesmos pixels", np.array_equal(inside, window.read_pixels())))
+
+    frame(game, player, 0.5)
+    outside = window.read_pixels()
+    results.append(check("na metade do caminho a câmera está na floresta",
+                         scene.current_scene == "outside" and not np.array_equal(inside, outside)))
+    results.append(check("trocas de buffer contadas pela janela", window.frames - frames == 3))
+    return all(results)
+
+
+def measure(game: Game, player: Player, frames: int, dump: str, reference: str, threshold: float,
+            tolerance: int) -> bool:
+    saved = set(dumped_frames(frames, 8)) if dump or reference else set()
+    if dump:
+        os.makedirs(dump, exist_ok=True)
+
+    times, differences = [], {}
+    for index in range(frames):
+        times.append(frame(game, player, index / frames))
+        if index not in saved:
+            continue
+        name = f"frame_{index:04d}.png"
+        if dump:
+            game.window.save(os.path.join(dump, name))
+        if reference:
+            differences[name] = compare(game.window.read_pixels(), os.path.join(reference, name), tolerance)
+
+    times = np.array(times) * 1000
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    print(f"\n{frames} quadros ({1000 / times.mean():.1f} FPS em média):")
+    print(f"  p50 {p50:7.2f}ms  p90 {p90:7.2f}ms  p99 {p99:7.2f}ms  máx {times.max():7.2f}ms")
+    if dump:
+        print(f"  {len(saved)} quadros salvos em {dump}")
+
+    if not reference:
+        return True
+    print(f"\ncomparação com {reference} (tolerância {tolerance} por canal):")
+    ok = True
+    for name, fraction in differences.items():
+        ok &= check(f"{name}: {fraction:.4%} dos pixels diferentes (limite {threshold:.4%})", fraction <= threshold)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--size", default="800x600")
+    parser.add_argument("--backend", choices=("egl", "glfw"), default="egl")
+    parser.add_argument("--dump", help="diretório onde salvar alguns quadros como PNG")
+    parser.add_argument("--compare", help="diretório com quadros salvos antes com --dump")
+    parser.add_argument("--threshold", type=float, default=0.001, help="fração máxima de pixels diferentes")
+    parser.add_argument("--tolerance", type=int, default=2, help="diferença ignorada por canal (0-255)")
+    parser.add_argument("--asynchronous", action="store_true", help="carrega os modelos em segundo plano")
+    parser.add_argument("--budget", type=float, default=4, help="MB enviados por quadro, com --asynchronous")
+    args = parser.parse_args()
+    size = tuple(int(value) for value in args.size.split("x"))
+
+    before = memory()
+    game, player, scene, load_time = create(size, args.backend, args.asynchronous)
+    try:
+        print(f"renderer: {glGetString(GL_RENDERER).decode()}")
+        ok = True
+        if args.asynchronous:
+            print(f"registro da MainScene: {load_time * 1000:.1f}ms")
+            game.engine.streamer.budget = args.budget * 2 ** 20
+            ok &= stream(game, player)
+        loaded = memory()
+        print(f"carga da MainScene: {load_time * 1000:.1f}ms, "
+              f"memória {before[0]:.0f}MB -> {loaded[0]:.0f}MB (+{loaded[0] - before[0]:.0f}MB), "
+              f"texturas na GPU {game.engine.textures.memory() / 2 ** 20:.1f}MB\n")
+
+        ok &= verify(game, player, scene)
+        ok &= measure(game, player, args.frames, args.dump, args.compare, args.threshold, args.tolerance)
+        resident, peak = memory()
+        print(f"\nmemória ao fim: {resident:.0f}MB (pico {peak:.0f}MB)")
+    finally:
+        game.stop()
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compara as transformações de cena compostas no draw (Scene com matriz local) com o comportamento antigo, em que
+Scene.move, Scene.rescale e Scene.rotate reescreviam a posição, a rotação e a escala de cada objeto.
+
+Primeiro confere, para casos simples, que as matrizes globais dos objetos são as mesmas nos dois modos
+(o modo antigo não compõe rotações em eixos diferentes nem escalas não uniformes após rotações, então os casos
+usam rotações em y e escalas uniformes). Depois mede o custo por quadro de animar uma cena com N objetos.
+Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.scene_graph [--objects N] [--frames N]
+"""
+import argparse
+import random
+import time
+
+import glm
+import numpy as np
+
+from src.components import Object, Scene
+
+
+def eager_move(objects, pivot: glm.vec3, position: tuple):
+    pivot += glm.vec3(*position)
+    for obj in objects:
+        obj.move(position)
+
+
+def eager_rescale(objects, pivot: glm.vec3, factor: tuple):
+    for obj in objects:
+        obj.position = (obj.position - pivot) * glm.vec3(*factor) + pivot
+        obj.scale *= glm.vec3(*factor)
+
+
+def eager_rotate(objects, pivot: glm.vec3, rotation: tuple):
+    rotation = glm.vec3(*rotation)
+    matrix = glm.rotate(glm.mat4(1.0), rotation.x, glm.vec3(1.0, 0.0, 0.0))
+    matrix = glm.rotate(matrix, rotation.y, glm.vec3(0.0, 1.0, 0.0))
+    matrix = glm.rotate(matrix, rotation.z, glm.vec3(0.0, 0.0, 1.0))
+    for obj in objects:
+        obj.position = glm.vec3(matrix * glm.vec4(obj.position - pivot, 1.0)) + pivot
+        obj.rotation += rotation
+
+
+CASES = {
+    "move": [("move", (1, 2, 3))],
+    "move + rescale": [("move", (1, 0, -2)), ("rescale", (2, 2, 2))],
+    "move + rotate": [("move", (0, 1, 0)), ("rotate", (0, 0.7, 0))],
+    "sequência": [("move", (1, 0, 0)), ("rotate", (0, 0.5, 0)), ("rescale", (0.5, 0.5, 0.5)), ("move", (0, -1, 2)),
+                  ("rotate", (0, -1.2, 0))],
+}
+
+
+def make_objects(count: int, seed: int):
+    random.seed(seed)
+    return [Object().move((random.uniform(-5, 5), random.uniform(-5, 5), random.uniform(-5, 5)))
+            .rotate((0, random.uniform(0, 6.28), 0)).rescale((random.uniform(0.5, 2),) * 3) for _ in range(count)]
+
+
+def compare():
+    eager = {"move": eager_move, "rescale": eager_rescale, "rotate": eager_rotate}
+    print("diferença máxima entre as matrizes globais (antigo x composto):")
+    for name, operations in CASES.items():
+        old = make_objects(20, 0)
+        new = make_objects(20, 0)
+        pivot = glm.vec3(0.0)
+        scene = Scene("teste", new)
+        for operation, argument in operations:
+            eager[operation](old, pivot, argument)
+            getattr(scene, operation)(argument)
+
+        world = scene.world_matrix()
+        error = max(np.abs(np.array(a.model_matrix()) - np.array(world * b.model_matrix())).max()
+                    for a, b in zip(old, new))
+        print(f"  {name:16s} {error:.2e}")
+
+
+def measure(frame, frames: int) -> float:
+    """Tempo médio por quadro, em ms."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    compare()
+
+    old = make_objects(args.objects, 1)
+    pivot = glm.vec3(0.0)
+    scene = Scene("animada", make_objects(args.objects, 1))
+
+    def eager_frame():
+        eager_move(old, pivot, (0.01, 0, 0))
+        for obj in old:
+            obj.model_matrix()
+
+    def lazy_frame():
+        scene.move((0.01, 0, 0))
+        scene.world_matrix()
+        for obj in scene.objects:
+            obj.model_matrix()
+
+    print(f"\nanimando uma cena com {args.objects} objetos, média de {args.frames} quadros:")
+    print(f"  {'antigo':16s} {measure(eager_frame, args.frames):8.2f}ms/quadro")
+    print(f"  {'composto':16s} {measure(lazy_frame, args.frames):8.2f}ms/quadro")
+
+
+if __name__ == "__main__":
+    main()
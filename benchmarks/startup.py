@@ -0,0 +1,56 @@
+"""
+Mede o tempo de `MainScene.register` com o cache de malhas frio (sem arquivos .npz dos triângulos e dos níveis de
+detalhe) e quente. Cada medição usa uma Engine nova: na mesma Engine, o AssetManager devolveria os modelos já
+carregados e a medição quente não leria o cache. Precisa de um display, pois cria a janela e o contexto OpenGL do
+jogo.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.startup
+"""
+import glob
+import os
+import time
+
+from main import MainScene
+from src.components import cache
+from src.engine import Engine
+from src.game import Game
+
+
+def clear_cache():
+    for file_path in glob.glob("models/*/*.obj"):
+        for name in ("triangles", "lods"):
+            path = cache.cache_path(file_path, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def timed_register(game: Game) -> float:
+    """Registra a cena em uma Engine nova, descartando a anterior e as suas texturas."""
+    game.engine.streamer.shutdown()
+    game.engine.textures.delete()
+    game.engine.textures.shutdown()
+    game.engine = Engine(game.shader_program)
+    start = time.perf_counter()
+    MainScene(game.engine).register()
+    return time.perf_counter() - start
+
+
+def main():
+    game = Game()
+    game.create()
+
+    try:
+        clear_cache()
+        cold = timed_register(game)
+        warm = timed_register(game)
+    finally:
+        game.stop()
+
+    print(f"frio:   {cold * 1e3:8.1f} ms")
+    print(f"quente: {warm * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
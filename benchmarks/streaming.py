@@ -0,0 +1,202 @@
+"""
+Confere o carregamento de modelos em segundo plano (src/engine/streaming.py) e compara o tempo dos quadros
+enquanto os modelos carregam: com o carregamento de antes (todos os modelos registrados de uma vez, um único
+"quadro" que dura a carga inteira) e com o AssetStreamer, para alguns limites de bytes enviados por quadro.
+
+Os modelos são gerados em um diretório temporário: malhas de quadriláteros em dois materiais, com uma textura de
+ruído (JPEG) por material; dois modelos usam a mesma imagem. As verificações cobrem o registro sem bloqueio, o
+limite de bytes por quadro, o placeholder, os buffers e texturas iguais aos do carregamento normal (com e sem
+índices), a textura compartilhada enviada uma vez e a BVH atualizada quando os modelos ficam residentes. Usa uma
+HeadlessWindow (EGL), então não precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.streaming [--models N] [--faces N] [--size PIXELS] [--budgets 1,4,16] [--rate HZ]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import tempfile
+import time
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+
+from src.components import Object, Scene
+from src.engine import Engine, RenderQueue
+from src.engine.bvh import object_bounds
+from src.view import HeadlessWindow, Shader
+
+from .common import buffer_bytes, check, create_models, release, texture_bytes
+
+BOX = """v -1 -1 -1
+v 1 -1 -1
+v 1 1 -1
+vt 0 0
+vt 1 0
+vt 1 1
+vn 0 0 1
+usemtl box
+f 1/1/1 2/2/1 3/3/1
+"""
+
+
+def create_box(directory: str) -> str:
+    """Triângulo com uma textura magenta, usado como placeholder."""
+    box = os.path.join(directory, "box")
+    os.makedirs(box)
+    with open(os.path.join(box, "box.obj"), "w") as file:
+        file.write(BOX)
+    Image.new("RGB", (4, 4), (255, 0, 255)).save(os.path.join(box, "box.png"))
+    return box
+
+
+def same_model(a, b) -> bool:
+    """Mesmos buffers, texturas (com o nível 1 dos mipmaps), intervalos de draw e volumes."""
+    return (buffer_bytes(a.vbo) == buffer_bytes(b.vbo)
+            and (a.ebo is None) == (b.ebo is None) and (a.ebo is None or buffer_bytes(a.ebo) == buffer_bytes(b.ebo))
+            and list(a.texture_ids) == list(b.texture_ids)
+            and all(texture_bytes(a.texture_ids[m], 1) == texture_bytes(b.texture_ids[m], 1) for m in a.texture_ids)
+            and a.draw_ranges == b.draw_ranges and a.index_type == b.index_type
+            and np.array_equal(a.bounds.low, b.bounds.low) and np.array_equal(a.bounds.high, b.bounds.high))
+
+
+def verify(models, box: str, shader_program) -> bool:
+    print("verificações:")
+    results = []
+
+    for indexed in (False, True):
+        expected = Engine(shader_program)
+        engine = Engine(shader_program)
+        placeholder = engine.register_model("box", box)
+        for name, root_dir in models.items():
+            expected.register_model(name, root_dir, indexed=indexed)
+
+        start = time.perf_counter()
+        streamed = engine.register_models(models, asynchronous=True, indexed=indexed, placeholder=placeholder)
+        elapsed = time.perf_counter() - start
+        first = streamed["mesh0"]
+        suffix = ", indexado" if indexed else ""
+        results.append(check(f"registro sem bloquear ({elapsed * 1000:.1f}ms){suffix}",
+                             not any(model.resident for model in streamed.values()) and first.bounds is None))
+
+        queue = RenderQueue()
+        queue.add(first, glm.mat4(1.0))
+        first.placeholder = None
+        queue.add(first, glm.mat4(1.0))
+        first.placeholder = placeholder
+        results.append(check("antes de residente: desenha o placeholder, ou nada sem ele",
+                             len(queue.items) == len(placeholder.draw_items())
+                             and all(item.model is placeholder for item in queue.items)))
+
+        scene = Scene("streamed", [Object(model) for model in streamed.values()])
+        engine.register_scene(scene)
+        engine.index_scene(scene)
+
+        # Com a leitura já terminada, cada quadro envia alguma coisa
+        engine.streamer.wait()
+        budget = 2 ** 20
+        copied, frames = [], 0
+        while engine.streamer.busy:
+            engine.stream(budget)
+            copied.append(engine.streamer.stats["bytes"])
+            frames += 1
+        results.append(check(f"no máximo {budget / 2 ** 20:.0f}MB enviados por quadro ({frames} quadros){suffix}",
+                             max(copied) <= budget and all(model.resident for model in streamed.values())))
+        results.append(check(f"buffers e texturas iguais aos do carregamento normal{suffix}",
+                             all(same_model(expected.models[name], streamed[name]) for name in models)))
+        results.append(check("mesma imagem em dois modelos: uma textura, enviada uma vez",
+                             streamed["mesh0"].texture_ids["stone"] == streamed["mesh1"].texture_ids["stone"]
+                             and len(engine.textures.sizes) == len(expected.textures.sizes) + 1))
+        lows, highs = object_bounds(scene.objects)
+        results.append(check("BVH da cena atualizada com os volumes dos modelos carregados",
+                             np.allclose(scene.bvh.lows, lows) and np.allclose(scene.bvh.highs, highs)
+                             and np.allclose(scene.bvh.node_low[0], lows.min(axis=0))))
+        release(expected)
+        release(engine)
+
+    engine = Engine(shader_program)
+    missing = engine.register_model("missing", os.path.dirname(box), asynchronous=True)
+    loaded = engine.register_model("loaded", box, asynchronous=True)
+    engine.finish_streaming()
+    results.append(check("diretório sem OBJ: o erro fica no modelo e os outros continuam carregando",
+                         isinstance(missing.load_error, FileNotFoundError) and not missing.resident
+                         and loaded.resident and loaded.load_error is None and engine.streamer.stats["failed"] == 1))
+    release(engine)
+    return all(results)
+
+
+def synchronous(models, shader_program):
+    engine = Engine(shader_program)
+    start = time.perf_counter()
+    engine.register_models(models, workers=1)
+    glFinish()
+    elapsed = time.perf_counter() - start
+    release(engine)
+    return elapsed
+
+
+def streamed(models, shader_program, budget: float, rate: float):
+    """
+    Tempos de cada quadro (stream + glFinish) até todos os modelos ficarem residentes, e o tempo total. Os quadros
+    começam a cada 1 / `rate` segundos, como no jogo com vsync; no resto do tempo, a thread de carga trabalha.
+    """
+    engine = Engine(shader_program)
+    engine.streamer.budget = budget
+    start = time.perf_counter()
+    engine.register_models(models, asynchronous=True)
+    times = []
+    while engine.streamer.busy:
+        frame = time.perf_counter()
+        engine.stream()
+        glFinish()
+        times.append(time.perf_counter() - frame)
+        time.sleep(max(0.0, 1 / rate - (time.perf_counter() - frame)))
+    elapsed = time.perf_counter() - start
+    release(engine)
+    return np.array(times) * 1000, elapsed
+
+
+def measure(models, shader_program, budgets, rate: float):
+    print(f"\n{len(models)} modelos ({os.cpu_count()} CPUs, quadros a {rate:g}Hz):")
+    print(f"  {'':22s} {'total':>9s} {'quadros':>8s} {'p50':>8s} {'p99':>8s} {'máx':>8s}")
+    elapsed = synchronous(models, shader_program)
+    print(f"  {'tudo de uma vez':22s} {elapsed * 1000:7.1f}ms {1:8d} {'':8s} {'':8s} {elapsed * 1000:6.1f}ms")
+    for budget in budgets:
+        times, elapsed = streamed(models, shader_program, budget * 2 ** 20, rate)
+        p50, p99 = np.percentile(times, [50, 99])
+        print(f"  {f'streaming, {budget:g}MB/quadro':22s} {elapsed * 1000:7.1f}ms {len(times):8d} {p50:6.2f}ms "
+              f"{p99:6.2f}ms {times.max():6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=6)
+    parser.add_argument("--faces", type=int, default=20000, help="quadriláteros por modelo")
+    parser.add_argument("--size", type=int, default=1024, help="lado das texturas, em pixels")
+    parser.add_argument("--budgets", default="1,4,16", help="MB enviados por quadro")
+    parser.add_argument("--rate", type=float, default=60, help="quadros por segundo durante a carga")
+    args = parser.parse_args()
+
+    window = HeadlessWindow(64, 64)
+    window.create_window()
+    try:
+        shader_program = Shader("shaders/vertex.glsl", "shaders/fragment.glsl").shader_program
+        with tempfile.TemporaryDirectory() as directory:
+            models = create_models(directory, args.models, args.faces, args.size, "jpg", shared=True)
+            box = create_box(directory)
+            ok = verify(dict(list(models.items())[:3]), box, shader_program)
+            measure(models, shader_program, [float(budget) for budget in args.budgets.split(",")], args.rate)
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
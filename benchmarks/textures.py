@@ -0,0 +1,218 @@
+"""
+Confere o cache de texturas (src/components/textures.py) e compara o carregamento de várias imagens uma a uma na
+thread principal (load_texture, como antes) com o TextureManager, sem e com o pool de threads de decodificação.
+
+As imagens são geradas em um diretório temporário (ruído, para que a decodificação custe como a de uma foto), com
+uma cópia de mesmo conteúdo e outro nome. As verificações cobrem o reaproveitamento por caminho e por conteúdo,
+o mesmo modelo registrado duas vezes na Engine, os pixels enviados (iguais aos de load_texture), a memória de
+vídeo, as imagens com transparência (também nos `.mips`, com e sem compressão) e a ordem dos draws: as partes
+transparentes depois das opacas, de trás para a frente. Usa uma HeadlessWindow (EGL), então não precisa de display.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.textures [--images N] [--size PIXELS] [--workers N]
+"""
+import os
+
+# O PyOpenGL escolhe a plataforma no primeiro import do OpenGL
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from OpenGL.GL import glBindTexture, glGetTexImage, glFinish, GL_TEXTURE_2D, GL_RGBA, GL_UNSIGNED_BYTE
+from PIL import Image
+
+from src.components import Object, TextureManager
+from src.components.bake import bake
+from src.components.model import load_texture
+from src.components.textures import decode_texture, translucent_textures
+from src.engine import Engine
+from src.view import HeadlessWindow, Shader
+
+from .common import check
+
+BOX = """v -1 -1 -1
+v 1 -1 -1
+v 1 1 -1
+vt 0 0
+vt 1 0
+vt 1 1
+vn 0 0 1
+usemtl box
+f 1/1/1 2/2/1 3/3/1
+"""
+
+
+def create_images(directory: str, count: int, size: int):
+    """Imagens de ruído alternando JPEG e PNG, e uma cópia da primeira com outro nome."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        path = os.path.join(directory, f"image{i}.{'jpg' if i % 2 == 0 else 'png'}")
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    copy = os.path.join(directory, "copy.jpg")
+    shutil.copy(paths[0], copy)
+    return paths, copy
+
+
+def texture_pixels(texture_id: int) -> np.ndarray:
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    return np.frombuffer(glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE), dtype=np.uint8)
+
+
+def create_box(directory: str, image: str) -> str:
+    """O triângulo de BOX com a textura `image`."""
+    os.makedirs(directory)
+    with open(os.path.join(directory, "box.obj"), "w") as file:
+        file.write(BOX)
+    shutil.copy(image, os.path.join(directory, "box" + os.path.splitext(image)[1]))
+    return directory
+
+
+def draw_order(engine: Engine, objects, eye) -> list:
+    """Modelos na ordem em que os draws foram feitos em um quadro com a câmera em `eye`."""
+    order = []
+    for model in {obj.model for obj in objects}:
+        def draw_range(*args, model=model, original=model.draw_range):
+            order.append(model)
+            return original(*args)
+        model.draw_range = draw_range
+    engine.objects = list(objects)
+    engine.render(eye=np.array(eye, dtype=np.float64))
+    for model in {obj.model for obj in objects}:
+        del model.draw_range
+    return order
+
+
+def verify(directory: str, paths, copy: str) -> bool:
+    print("verificações:")
+    results = []
+
+    manager = TextureManager(workers=2)
+    manager.prefetch(paths + [copy])
+    first = manager.get(paths[0])
+    results.append(check("mesmo arquivo, mesma textura",
+                         manager.get(paths[0]) == first
+                         and manager.get(os.path.join(directory, ".", os.path.basename(paths[0]))) == first))
+    results.append(check("mesmo conteúdo com outro nome, mesma textura e sem novo envio",
+                         manager.get(copy) == first and manager.stats[manager.key(copy)].shared))
+    ids = [manager.get(path) for path in paths]
+    results.append(check("imagens diferentes, texturas diferentes", len(set(ids)) == len(paths)))
+    results.append(check("memória de vídeo: uma cópia por conteúdo, com mipmaps",
+                         manager.memory() == len(paths) * decode_texture(paths[0]).memory()))
+    results.append(check("mesmos pixels que load_texture",
+                         all(np.array_equal(texture_pixels(manager.get(path)), texture_pixels(load_texture(path)))
+                             for path in paths[:2])))
+    stats = manager.stats[manager.key(paths[1])]
+    results.append(check("tempos de decodificação e envio registrados", stats.decode_time > 0 and stats.upload_time > 0))
+    manager.delete()
+    manager.shutdown()
+
+    manager = TextureManager(workers=2)
+    manager.prefetch(paths[:1])
+    manager.discard(paths[0])
+    results.append(check("imagem descartada sai da fila", not manager.pending and not manager.stats))
+    manager.shutdown()
+
+    model_dir = create_box(os.path.join(directory, "box"), paths[0])
+    engine = Engine(Shader("shaders/vertex.glsl", "shaders/fragment.glsl").shader_program)
+    a = engine.register_model("a", model_dir, use_cache=False)
+    b = engine.register_model("b", model_dir, use_cache=False)
+    results.append(check("modelo registrado duas vezes: a mesma textura, enviada uma vez, e compartilhada com a "
+                         "imagem de mesmo conteúdo",
+                         a.texture_ids == b.texture_ids and engine.textures.get(paths[0]) == a.texture_ids["box"]
+                         and len(engine.textures.sizes) == 1))
+
+    pixels = np.random.default_rng(1).integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    opaque = os.path.join(directory, "opaque.png")
+    Image.fromarray(pixels).save(opaque)
+    pixels[0, 0, 3] = 128
+    alpha = os.path.join(directory, "alpha.png")
+    Image.fromarray(pixels).save(alpha)
+    flags = [decode_texture(path).translucent for path in (opaque, alpha, paths[0])]
+    for compress_levels in (False, True):
+        for path in (opaque, alpha):
+            bake(path, compress_levels)
+        textures = [decode_texture(path) for path in (opaque, alpha)]
+        flags += [texture.translucent for texture in textures if texture.baked]
+    results.append(check("transparência detectada só na imagem com alfa, também nos .mips com e sem compressão",
+                         flags == [False, True, False, False, True, False, True]))
+
+    near = engine.register_model("near", create_box(os.path.join(directory, "near"), alpha), use_cache=False)
+    far = engine.register_model("far", create_box(os.path.join(directory, "far"), alpha), use_cache=False)
+    results.append(check("texturas com transparência marcadas ao serem enviadas",
+                         near.texture_ids["box"] in translucent_textures
+                         and a.texture_ids["box"] not in translucent_textures))
+    objects = [Object(near).move((0, 0, -1)), Object(a), Object(far).move((0, 0, -10))]
+    results.append(check("transparentes depois dos opacos, da mais distante da câmera para a mais próxima",
+                         draw_order(engine, objects, (0, 0, 5)) == [a, far, near]
+                         and draw_order(engine, objects, (0, 0, -20)) == [a, near, far]))
+    engine.objects = []
+    engine.textures.delete()
+    engine.textures.shutdown()
+    return all(results)
+
+
+def measure(paths, workers: int):
+    def legacy():
+        return [load_texture(path) for path in paths], None
+
+    def managed(count):
+        def run():
+            manager = TextureManager(workers=count)
+            manager.prefetch(paths)
+            return [manager.get(path) for path in paths], manager
+        return run
+
+    print(f"\n{len(paths)} imagens ({os.cpu_count()} CPUs):")
+    print(f"  {'':24s} {'total':>9s} {'decodif.':>9s} {'envio':>9s}")
+    for name, function in (("load_texture", legacy), ("manager, sem threads", managed(0)),
+                           (f"manager, {workers} threads", managed(workers))):
+        start = time.perf_counter()
+        _, manager = function()
+        glFinish()
+        total = time.perf_counter() - start
+        if manager is None:
+            print(f"  {name:24s} {total * 1000:8.1f}ms")
+            continue
+        decode = sum(stats.decode_time for stats in manager.stats.values())
+        upload = sum(stats.upload_time for stats in manager.stats.values())
+        print(f"  {name:24s} {total * 1000:8.1f}ms {decode * 1000:8.1f}ms {upload * 1000:8.1f}ms")
+        report = manager.report()
+        manager.delete()
+        manager.shutdown()
+
+    print("\npor textura (último carregamento):")
+    for line in report[:4]:
+        print(f"  {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    window = HeadlessWindow(64, 64)
+    window.create_window()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths, copy = create_images(directory, args.images, args.size)
+            ok = verify(directory, paths, copy)
+            measure(paths, args.workers)
+    finally:
+        window.close_window()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Mede o custo por quadro das matrizes de N objetos:
+
+- `sem cache`: a matriz de cada objeto é montada do zero a cada quadro (translate, três rotate e scale),
+  como Object.draw fazia antes;
+- `estáticos`: Object.model_matrix com os objetos parados, devolvendo a matriz em cache;
+- `em movimento`: Object.model_matrix com todos os objetos se movendo a cada quadro (pior caso do cache);
+- `store, em movimento`: os mesmos objetos em um TransformStore, movidos um a um por Object.move (que escreve
+  direto nos arrays do store) e com as matrizes calculadas de uma vez por TransformStore.update.
+
+Antes, confere que os índices dos objetos coletados voltam ao store e são reaproveitados. Não cria contexto OpenGL.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.transforms [--objects N] [--frames N]
+"""
+import argparse
+import gc
+import random
+import time
+
+from src.components import TransformStore
+from src.components.object import Object, transform_matrix
+
+from .common import check
+
+
+def measure(frame, frames: int) -> float:
+    """Tempo médio por quadro, em ms."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def verify() -> bool:
+    print("verificações:")
+    store = TransformStore(capacity=4)
+    objects = [Object(None, store).move((i, 0, 0)) for i in range(8)]
+    released = {obj.index for obj in objects[::2]}
+    del objects[::2]
+    gc.collect()
+    results = [check("índices dos objetos coletados voltam ao store", len(store) == 4)]
+    created = [Object(None, store) for _ in range(4)]
+    store.update()
+    results.append(check("e são reaproveitados, com a transformação identidade, sem aumentar o store",
+                         {obj.index for obj in created} == released and store.count == 8
+                         and len(store.positions) == 8 and all(obj.position == (0, 0, 0) for obj in created)
+                         and [obj.model_matrix()[3].x for obj in objects] == [1, 3, 5, 7]))
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+    ok = verify()
+
+    objects = [Object().move((random.uniform(-50, 50), 0, random.uniform(-50, 50)))
+               .rotate((0, random.uniform(0, 6.28), 0)) for _ in range(args.objects)]
+
+    store = TransformStore()
+    stored = [Object(None, store) for _ in objects]
+    for obj, source in zip(stored, objects):
+        obj.position, obj.rotation = source.position, source.rotation
+
+    def uncached():
+        for obj in objects:
+            transform_matrix(obj.position, obj.rotation, obj.scale)
+
+    def static():
+        for obj in objects:
+            obj.model_matrix()
+
+    def moving():
+        for obj in objects:
+            obj.move((0.01, 0, 0))
+            obj.model_matrix()
+
+    def stored_moving():
+        for obj in stored:
+            obj.move((0.01, 0, 0))
+        store.update()
+
+    static()  # preenche o cache
+    results = {"sem cache": measure(uncached, args.frames), "estáticos": measure(static, args.frames),
+               "em movimento": measure(moving, args.frames),
+               "store, em movimento": measure(stored_moving, args.frames)}
+
+    print(f"\n{args.objects} objetos, média de {args.frames} quadros")
+    for name, elapsed in results.items():
+        print(f"  {name:20s} {elapsed:8.2f}ms/quadro {elapsed * 1000 / args.objects:8.2f}µs/objeto")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
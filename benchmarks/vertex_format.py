@@ -0,0 +1,133 @@
+"""
+Compara o tamanho do VBO de cada OBJ nos formatos de vértice disponíveis e mede o erro introduzido
+pela quantização das posições, das coordenadas de textura e das normais. Não cria contexto OpenGL.
+
+O buffer de cada formato é montado por pack_vertices e lido de volta como o vertex shader o vê; o erro de cada
+atributo precisa ficar dentro do limite documentado em src/components/vertex_format.py: nenhum nos atributos em
+float32, meio passo de quantização (mais o arredondamento do float32) nas posições em 16 bits, precisão relativa de
+2^-11 nas coordenadas em half-float e 1 / (2 * 511) por componente nas normais empacotadas, já normalizadas.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.vertex_format [arquivo.obj ...]
+
+Sem argumentos, mede todos os OBJ dentro de `models/`.
+"""
+import argparse
+import glob
+
+import numpy as np
+from OpenGL.GL import GL_FLOAT, GL_HALF_FLOAT, GL_INT_2_10_10_10_REV, GL_SHORT
+
+from src.components.model import read_wavefront, build_triangles
+from src.components.vertex_format import NORMAL_STEPS, VertexFormat, dequantize_positions, pack_vertices, \
+    unpack_normals
+
+from .common import check
+
+FORMATS = {
+    "planar": VertexFormat(),
+    "intercalado": VertexFormat(interleaved=True),
+    "empacotado": VertexFormat.packed(),
+    "quantizado": VertexFormat.packed(quantized_positions=True),
+}
+
+# Arredondamento do float32 ao reconstruir posições e normalizar normais, em múltiplos da magnitude dos valores
+ROUNDING = 4 * np.finfo(np.float32).eps
+
+
+def unpack(buffer: np.ndarray, attributes, offset: np.ndarray, scale: np.ndarray):
+    """
+    Lê de volta os atributos de um buffer de pack_vertices, como o vertex shader os recebe.
+
+    :return: Dicionário location -> array (n, componentes) float32 (posição, textura e, se houver, normal).
+    """
+    types = {GL_FLOAT: np.float32, GL_HALF_FLOAT: np.float16, GL_SHORT: np.int16, GL_INT_2_10_10_10_REV: np.uint32}
+    values = {}
+    for location, size, gl_type, _, start in attributes:
+        dtype = np.dtype(types[gl_type])
+        width = 1 if gl_type == GL_INT_2_10_10_10_REV else size
+        column = np.ascontiguousarray(buffer[:, start:start + width * dtype.itemsize]).view(dtype)
+        if gl_type == GL_SHORT:
+            values[location] = dequantize_positions(column, offset, scale)
+        elif gl_type == GL_INT_2_10_10_10_REV:
+            values[location] = unpack_normals(column.ravel())
+        else:
+            values[location] = column.astype(np.float32)
+    return values
+
+
+def format_errors(vertex_format: VertexFormat, positions: np.ndarray, uvs: np.ndarray, normals: np.ndarray):
+    """
+    Erro de cada atributo de `vertex_format` e se ficou dentro do limite documentado.
+
+    :return: Uma tupla com os erros máximos (posição, textura, normal) e se todos estão dentro dos limites.
+    """
+    buffer, attributes, offset, scale = pack_vertices(positions.ravel(), uvs.ravel(), normals.ravel(),
+                                                      vertex_format)
+    values = unpack(buffer, attributes, offset, scale)
+    magnitude = np.abs(positions).max(axis=0, initial=0.0)
+
+    position_error = np.abs(values[0] - positions)
+    if vertex_format.quantized_positions:
+        position_bound = scale / 2 + ROUNDING * magnitude
+    else:
+        position_bound = np.zeros(3, dtype=np.float32)
+
+    uv_error = np.abs(values[1] - uvs)
+    uv_bound = 2.0 ** -11 * np.abs(uvs) + 2.0 ** -25 if vertex_format.half_uvs else np.zeros_like(uvs)
+
+    normal_error = np.zeros((0, 3), dtype=np.float32)
+    within = bool((position_error <= position_bound).all() and (uv_error <= uv_bound).all())
+    if len(normals):
+        if vertex_format.packed_normals:
+            length = np.linalg.norm(normals, axis=1, keepdims=True)
+            unit = np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+            normal_error = np.abs(values[2] - unit)
+            within = within and bool((normal_error <= 1 / (2 * NORMAL_STEPS) + ROUNDING).all())
+        else:
+            normal_error = np.abs(values[2] - normals)
+            within = within and not normal_error.any()
+
+    return (position_error.max(initial=0.0), uv_error.max(initial=0.0), normal_error.max(initial=0.0)), within
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=sorted(glob.glob("models/*/*.obj")))
+    args = parser.parse_args()
+
+    print(f"{'arquivo':40s} " + " ".join(f"{name:>12s}" for name in FORMATS) +
+          f" {'erro pos.':>10s} {'erro uv':>9s} {'erro n.':>8s}")
+    results = {}
+    for file_path in args.files:
+        vertices, texture_coords, faces, normals = read_wavefront(file_path)
+        triangles = [build_triangles(vertices, texture_coords, normals, group) for group in faces.values()]
+        positions = np.concatenate([t[0] for t in triangles]).reshape(-1, 3)
+        uvs = np.concatenate([t[1] for t in triangles]).reshape(-1, 2)
+        triangle_normals = np.concatenate([t[2] for t in triangles]).reshape(-1, 3)
+        has_normals = len(triangle_normals) > 0
+
+        sizes = [len(positions) * vertex_format.stride(has_normals) / 1e6 for vertex_format in FORMATS.values()]
+        errors = {}
+        for name, vertex_format in FORMATS.items():
+            errors[name], results[(file_path, name)] = format_errors(vertex_format, positions, uvs,
+                                                                     triangle_normals)
+        position_error, _, _ = errors["quantizado"]
+        _, uv_error, normal_error = errors["empacotado"]
+
+        print(f"{file_path:40s} " + " ".join(f"{size:10.2f}MB" for size in sizes) +
+              f" {position_error:10.2e} {uv_error:9.2e} {normal_error:8.2e}")
+
+    print("\nverificações:")
+    ok = all([check(f"{name}: erro dentro do limite documentado em "
+                    f"{sum(within for (_, format_name), within in results.items() if format_name == name)} "
+                    f"de {len(args.files)} arquivos",
+                    all(within for (_, format_name), within in results.items() if format_name == name))
+              for name in FORMATS])
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
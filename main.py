@@ -4,6 +4,7 @@ from typing import Dict, Set
 
 from src.game import Game
 from src.components import Object, LightSource, Scene, Model, Player, SphereBound, NormalBound
+from src.components.lod import DEFAULT_LODS
 
 import glfw
 import glm
@@ -135,8 +136,8 @@ class Day(LightSource):
             self.update_luminance(delta, max_luminance=5.0)
 
 
-def generate(model, n, a, b, y=0.5, radius=1, distance=1):
-    objs = [Object(model).move((random.uniform(a, b), y, random.uniform(a, b))) for _ in range(n)]
+def generate(model, n, a, b, y=0.5, radius=1, distance=1, store=None):
+    objs = [Object(model, store).move((random.uniform(a, b), y, random.uniform(a, b))) for _ in range(n)]
     # se os objetos estiverem muito próximos, distanciar
     for i in range(n):
         for j in range(i + 1, n):
@@ -151,6 +152,16 @@ def generate(model, n, a, b, y=0.5, radius=1, distance=1):
     return objs
 
 
+# Modelos registrados pela MainScene: nome -> diretório
+MODEL_DIRS = {"sky": "models/sky", "terrain": "models/terrain", "ground": "models/ground", "house": "models/house",
+              "cube": "models/caixa", "cat": "models/cat", "fabienne": "models/fabienne", "stool": "models/stool",
+              "lantern": "models/lantern", "denis": "models/denis", "tree": "models/tree", "grass": "models/grass",
+              "horse": "models/horse"}
+
+# Malhas grandes, desenhadas também longe da câmera: ganham níveis de detalhe simplificados (veja lod.py)
+LOD_MODELS = ("house", "tree", "horse")
+
+
 class MainScene(Scene):
     def __init__(self, engine):
         super().__init__("main", [])
@@ -159,35 +170,42 @@ class MainScene(Scene):
         self.ambient_lights = {}
         self.current_scene = None
 
-    def register(self):
-        sky = self.engine.register_model("sky", "models/sky")
-        terrain = self.engine.register_model("terrain", "models/terrain") # vn
+    def register(self, asynchronous: bool = False):
+        # Os OBJ são lidos em paralelo em um pool de processos, e as texturas decodificadas em threads. Com
+        # asynchronous, os modelos carregam em segundo plano e aparecem à medida que ficam prontos
+        models = self.engine.register_models({name: path for name, path in MODEL_DIRS.items()
+                                              if name not in LOD_MODELS}, asynchronous=asynchronous)
+        models.update(self.engine.register_models({name: MODEL_DIRS[name] for name in LOD_MODELS},
+                                                  asynchronous=asynchronous, lods=DEFAULT_LODS))
+
+        sky = models["sky"]
+        terrain = models["terrain"] # vn
 
-        ground = self.engine.register_model("ground", "models/ground")
+        ground = models["ground"]
         ground.shininess = 16
 
-        house = self.engine.register_model("house", "models/house")
+        house = models["house"]
         house.shininess = 1
         house.diffuse_coefficient = 0.9
         house.specular_coefficient = 0.1
 
-        cube = self.engine.register_model("cube", "models/caixa")
-        cat = self.engine.register_model("cat", "models/cat")
+        cube = models["cube"]
+        cat = models["cat"]
         cat.shininess = 128
         cat.specular_coefficient = 0.7
         cat.diffuse_coefficient = 0.8
 
-        fabienne = self.engine.register_model("fabienne", "models/fabienne")
-        stool = self.engine.register_model("stool", "models/stool")
+        fabienne = models["fabienne"]
+        stool = models["stool"]
         stool.shininess = 128
         stool.specular_coefficient = 0.5
 
-        lantern = self.engine.register_model("lantern", "models/lantern")
+        lantern = models["lantern"]
 
-        denis = self.engine.register_model("denis", "models/denis")
-        tree = self.engine.register_model("tree", "models/tree")
-        grass = self.engine.register_model("grass", "models/grass")
-        horse = self.engine.register_model("horse", "models/horse") # vn
+        denis = models["denis"]
+        tree = models["tree"]
+        grass = models["grass"]
+        horse = models["horse"] # vn
 
         self.models = {
             "sky": sky,
@@ -217,7 +235,10 @@ class MainScene(Scene):
         inside = self.inside
         inside.move((0, -1, 0))
         self.add_scene(inside)
-        self.add_scene(self.outside)
+        outside = self.outside
+        # A floresta é a cena com mais objetos: a BVH evita testar cada árvore fora do campo de visão
+        self.engine.index_scene(outside)
+        self.add_scene(outside)
 
         return self
 
@@ -304,7 +325,7 @@ class MainScene(Scene):
 
         # trees
         a, b = -10, 10
-        trees = generate(self.models["tree"], 10, a, b, -1.25, 10)
+        trees = generate(self.models["tree"], 10, a, b, -1.25, 10, store=self.engine.transforms)
 
         # grass
         grass = Object(self.models["grass"])
@@ -330,13 +351,23 @@ class MainScene(Scene):
             self.current_scene = "outside"
         self.ambient_lights['outside'].tick(key_actions, delta)
 
-    def draw(self, lights: list = None, ambient_light=None):
+    def draw(self, lights: list = None, ambient_light=None, parent: glm.mat4 = None):
+        ambient_light = self.ambient_lights[self.current_scene]
+        world = self.world_matrix(parent)
+        if self.current_scene == "inside":
+            self.sub_scenes["inside"].draw([], ambient_light, world)
+        else:
+            self.sub_scenes["environment"].draw([], ambient_light, world)
+            self.sub_scenes["outside"].draw([], ambient_light, world)
+
+    def collect(self, queue, lights: list = None, ambient_light=None, parent: glm.mat4 = None):
         ambient_light = self.ambient_lights[self.current_scene]
+        world = self.world_matrix(parent)
         if self.current_scene == "inside":
-            self.sub_scenes["inside"].draw([], ambient_light)
+            self.sub_scenes["inside"].collect(queue, [], ambient_light, world)
         else:
-            self.sub_scenes["environment"].draw([], ambient_light)
-            self.sub_scenes["outside"].draw([], ambient_light)
+            self.sub_scenes["environment"].collect(queue, [], ambient_light, world)
+            self.sub_scenes["outside"].collect(queue, [], ambient_light, world)
 
 
 def main():
@@ -347,7 +378,8 @@ def main():
     player.move((0, 0.5, 0))
     game.add_player(player)
 
-    main_scene = MainScene(game.engine).register()
+    # A janela abre e responde enquanto os modelos carregam
+    main_scene = MainScene(game.engine).register(asynchronous=True)
     main_scene.load()
 
     try:
@@ -1,18 +1,29 @@
-attribute vec3 position;
-attribute vec2 texture_coord;
-attribute vec3 normal;
+#version 330 core
 
-uniform mat4 model;
+layout(location = 0) in vec3 position;
+layout(location = 1) in vec2 texture_coord;
+layout(location = 2) in vec3 normal;
+// Matriz do objeto, por instância (ocupa os locais 3 a 6, uma coluna por local)
+layout(location = 3) in mat4 model;
+
+// Transformação da cena que contém o objeto, já composta com as cenas pai (veja Scene)
+uniform mat4 scene;
 uniform mat4 view;
 uniform mat4 projection;
 
-varying vec3 out_normal;
-varying vec2 out_texture;
-varying vec3 out_position;
+// Dequantização das posições (identidade para modelos com posições em float)
+uniform vec3 positionOffset;
+uniform vec3 positionScale;
+
+out vec3 out_normal;
+out vec2 out_texture;
+out vec3 out_position;
 
 void main(){
-    gl_Position = projection * view * model * vec4(position,1.0);
+    vec3 local_position = positionOffset + positionScale * position;
+    vec4 world_position = scene * model * vec4(local_position,1.0);
+    gl_Position = projection * view * world_position;
     out_texture = vec2(texture_coord);
     out_normal = normal;
-    out_position = vec3(model * vec4(position,1.0));
-}
\ No newline at end of file
+    out_position = vec3(world_position);
+}
@@ -2,3 +2,8 @@ from .model import Model
 from .player import Player
 from .object import *
 from .scene import Scene
+from .vertex_format import VertexFormat
+from .transforms import TransformStore
+from .bounds import Bounds
+from .textures import TextureManager
+from .lod import LodView
@@ -0,0 +1,282 @@
+"""
+Texturas pré-processadas ("bake"): a cadeia de mipmaps de cada imagem é calculada offline e, opcionalmente,
+comprimida em S3TC/BC (BC1 para imagens opacas, BC3 com alfa), e gravada ao lado da imagem como `<imagem>.mips`.
+
+O arquivo é um cabeçalho seguido dos níveis, na ordem e no formato em que vão para a GPU, então em tempo de
+execução é só mapeado na memória (np.memmap) e enviado, sem PIL, sem decodificar e sem gerar mipmaps. Como o cache
+dos OBJ (veja cache.py), guarda o tamanho, o mtime e o hash da imagem original e é ignorado se ela mudou.
+
+Os arquivos são gerados pelo comando `python bake.py` (veja bake.py na raiz do repositório).
+"""
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from OpenGL.GL.EXT.texture_compression_s3tc import GL_COMPRESSED_RGB_S3TC_DXT1_EXT, GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+
+from .cache import file_hash, source_key
+
+MAGIC = b"MIPS"
+# Incrementar quando o formato do arquivo mudar, para invalidar os arquivos antigos
+BAKE_VERSION = 1
+# Cabeçalho: magic, versão, formato (0 = RGBA8; senão o formato comprimido do OpenGL), largura, altura, níveis,
+# tamanho e mtime da imagem original e o seu hash SHA-1 (hex)
+HEADER = struct.Struct("<4sHIIII QQ40s")
+# Um por nível: largura, altura, início e tamanho dos dados no arquivo
+LEVEL = struct.Struct("<IIQQ")
+ALIGNMENT = 16
+
+BLOCK_SIZES = {GL_COMPRESSED_RGB_S3TC_DXT1_EXT: 8, GL_COMPRESSED_RGBA_S3TC_DXT5_EXT: 16}
+
+
+@dataclass
+class BakedImage:
+    """
+    Conteúdo de um arquivo `.mips`.
+
+    Atributos:
+        compressed (int): Formato comprimido do OpenGL dos níveis, ou 0 para RGBA 8 bits sem compressão.
+
+        digest (str): Hash SHA-1 da imagem original, o mesmo usado pelo TextureManager para reaproveitar texturas.
+
+        levels (List[Tuple[int, int, np.ndarray]]): Largura, altura e dados de cada nível, do maior ao 1x1. Os
+        dados são fatias do arquivo mapeado na memória, com a última linha da imagem primeiro.
+    """
+    width: int
+    height: int
+    compressed: int
+    digest: str
+    levels: List[Tuple[int, int, np.ndarray]]
+
+
+def baked_path(source: str) -> str:
+    return f"{source}.mips"
+
+
+def mip_chain(image) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Cadeia completa de mipmaps de uma imagem do PIL, cada nível com a média de 2x2 pixels do anterior.
+
+    :return: Largura, altura e pixels RGBA (altura, largura, 4) de cada nível, com a última linha primeiro.
+    """
+    from PIL import Image
+
+    level = image.convert("RGBA")
+    levels = []
+    while True:
+        pixels = np.asarray(level)[::-1]
+        levels.append((level.width, level.height, np.ascontiguousarray(pixels)))
+        if level.width == level.height == 1:
+            return levels
+        level = level.resize((max(1, level.width // 2), max(1, level.height // 2)), Image.BOX)
+
+
+def _blocks(pixels: np.ndarray) -> np.ndarray:
+    """Divide a imagem em blocos 4x4 (repetindo a borda quando não é múltipla de 4): array (n, 16, 4)."""
+    height, width = pixels.shape[:2]
+    padded = np.pad(pixels, ((0, -height % 4), (0, -width % 4), (0, 0)), mode="edge")
+    rows, columns = padded.shape[0] // 4, padded.shape[1] // 4
+    return padded.reshape(rows, 4, columns, 4, 4).transpose(0, 2, 1, 3, 4).reshape(-1, 16, 4)
+
+
+def _pack565(colors: np.ndarray) -> np.ndarray:
+    colors = np.clip(colors, 0, 255)
+    r = np.rint(colors[..., 0] * 31 / 255).astype(np.uint16)
+    g = np.rint(colors[..., 1] * 63 / 255).astype(np.uint16)
+    b = np.rint(colors[..., 2] * 31 / 255).astype(np.uint16)
+    return (r << 11) | (g << 5) | b
+
+
+def _unpack565(packed: np.ndarray) -> np.ndarray:
+    r, g, b = (packed >> 11) & 31, (packed >> 5) & 63, packed & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1).astype(np.float32)
+
+
+def _color_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    Parte de cor dos blocos BC1/BC3, 8 bytes por bloco: as duas cores extremas em RGB565 e um índice de 2 bits por
+    pixel na paleta de 4 cores entre elas. Os extremos ficam no eixo principal das cores do bloco (PCA).
+    """
+    colors = blocks[..., :3].astype(np.float32)
+    mean = colors.mean(axis=1, keepdims=True)
+    centered = colors - mean
+    covariance = np.einsum("nki,nkj->nij", centered, centered)
+
+    axis = np.ones((len(blocks), 3), dtype=np.float32)
+    for _ in range(8):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        axis /= np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-12)
+    projection = np.einsum("nki,ni->nk", centered, axis)
+    high = mean[:, 0] + axis * projection.max(axis=1, keepdims=True)
+    low = mean[:, 0] + axis * projection.min(axis=1, keepdims=True)
+
+    c0, c1 = _pack565(high), _pack565(low)
+    # O modo de 4 cores do BC1 exige c0 > c1
+    swap = c0 < c1
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+
+    p0, p1 = _unpack565(c0), _unpack565(c1)
+    palette = np.stack([p0, p1, (2 * p0 + p1) / 3, (p0 + 2 * p1) / 3], axis=1)
+    distances = ((colors[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=3)
+    indices = distances.argmin(axis=2).astype(np.uint32)
+    indices[c0 == c1] = 0
+
+    packed = np.zeros(len(blocks), dtype=[("c0", "<u2"), ("c1", "<u2"), ("indices", "<u4")])
+    packed["c0"], packed["c1"] = c0, c1
+    packed["indices"] = (indices << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+    return packed.view(np.uint8).reshape(-1, 8)
+
+
+def _alpha_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    Parte de alfa dos blocos BC3, 8 bytes por bloco: os alfas máximo e mínimo do bloco e um índice de 3 bits por
+    pixel na paleta de 8 valores entre eles.
+    """
+    alpha = blocks[..., 3].astype(np.float32)
+    a0, a1 = alpha.max(axis=1), alpha.min(axis=1)
+    weights = np.array([0, 7, 1, 2, 3, 4, 5, 6], dtype=np.float32) / 7
+    palette = a0[:, None] * (1 - weights) + a1[:, None] * weights
+    indices = np.abs(alpha[:, :, None] - palette[:, None, :]).argmin(axis=2).astype(np.uint64)
+    indices[a0 == a1] = 0
+
+    bits = (indices << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+    packed = np.zeros((len(blocks), 8), dtype=np.uint8)
+    packed[:, 0], packed[:, 1] = a0, a1
+    packed[:, 2:] = bits.astype("<u8").view(np.uint8).reshape(-1, 8)[:, :6]
+    return packed
+
+
+def compress(pixels: np.ndarray, compressed: int) -> np.ndarray:
+    """
+    Comprime um nível RGBA (altura, largura, 4) em BC1 (GL_COMPRESSED_RGB_S3TC_DXT1_EXT, sem alfa) ou BC3
+    (GL_COMPRESSED_RGBA_S3TC_DXT5_EXT).
+
+    :return: Os blocos, da primeira linha de blocos para a última, como bytes.
+    """
+    blocks = _blocks(pixels)
+    if compressed == GL_COMPRESSED_RGB_S3TC_DXT1_EXT:
+        return _color_blocks(blocks).ravel()
+    return np.concatenate([_alpha_blocks(blocks), _color_blocks(blocks)], axis=1).ravel()
+
+
+def bake(source: str, compress_levels: bool = False) -> str:
+    """
+    Gera o arquivo `.mips` de uma imagem, de forma atômica (como cache.save).
+
+    :param source: Caminho da imagem.
+    :param compress_levels: Comprime os níveis em BC1 (imagem opaca) ou BC3 (com transparência).
+    :return: Caminho do arquivo gerado.
+    """
+    from PIL import Image
+
+    size, mtime, digest = source_key(source)
+    with Image.open(source) as image:
+        levels = mip_chain(image)
+
+    compressed = 0
+    if compress_levels:
+        opaque = bool(np.all(levels[0][2][..., 3] == 255))
+        compressed = GL_COMPRESSED_RGB_S3TC_DXT1_EXT if opaque else GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+        levels = [(width, height, compress(pixels, compressed)) for width, height, pixels in levels]
+
+    width, height = levels[0][0], levels[0][1]
+    offset = HEADER.size + LEVEL.size * len(levels)
+    table, chunks = [], []
+    for level_width, level_height, data in levels:
+        offset += -offset % ALIGNMENT
+        table.append(LEVEL.pack(level_width, level_height, offset, data.nbytes))
+        chunks.append((offset, data))
+        offset += data.nbytes
+
+    path = baked_path(source)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(HEADER.pack(MAGIC, BAKE_VERSION, compressed, width, height, len(levels), size, mtime,
+                                   digest.encode()))
+            file.write(b"".join(table))
+            for start, data in chunks:
+                file.write(b"\0" * (start - file.tell()))
+                file.write(data.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_baked(source: str) -> Optional[BakedImage]:
+    """
+    Mapeia na memória o arquivo `.mips` de uma imagem.
+
+    :return: Os níveis, ou None se o arquivo não existe, é de outra versão, está corrompido ou a imagem mudou.
+    """
+    path = baked_path(source)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, compressed, width, height, count, size, mtime, digest = \
+            HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != BAKE_VERSION:
+            return None
+        levels = []
+        for i in range(count):
+            level_width, level_height, start, length = LEVEL.unpack_from(data, HEADER.size + LEVEL.size * i)
+            if start + length > len(data):
+                return None
+            levels.append((level_width, level_height, data[start:start + length]))
+    except (OSError, ValueError, struct.error):
+        return None
+
+    digest = digest.decode()
+    stat = os.stat(source)
+    if size != stat.st_size or (mtime != stat.st_mtime_ns and digest != file_hash(source)):
+        return None
+    return BakedImage(width, height, compressed, digest, levels)
+
+
+def level_bytes(width: int, height: int, compressed: int = 0) -> int:
+    """Bytes de um nível na GPU: 4 por pixel sem compressão, ou 8/16 por bloco 4x4 em BC1/BC3."""
+    if not compressed:
+        return width * height * 4
+    return ((width + 3) // 4) * ((height + 3) // 4) * BLOCK_SIZES[compressed]
+
+
+def bake_directory(root: str, compress_levels: bool = False, force: bool = False):
+    """
+    Gera o `.mips` de cada imagem (JPG, PNG) em `root` e nos subdiretórios, pulando as que já estão atualizadas.
+
+    :return: Lista de (caminho, descrição do resultado).
+    """
+    results = []
+    for directory, _, files in sorted(os.walk(root)):
+        for file in sorted(files):
+            if not file.lower().endswith(('.jpg', '.png', '.jpeg')):
+                continue
+            source = os.path.join(directory, file)
+            baked = None if force else read_baked(source)
+            if baked is not None and compress_levels == bool(baked.compressed):
+                results.append((source, "atualizado"))
+                continue
+
+            start = time.perf_counter()
+            try:
+                bake(source, compress_levels)
+            except OSError as error:
+                # Ex.: imagem que é só um ponteiro do Git LFS, sem o conteúdo baixado
+                results.append((source, f"ignorado ({error})"))
+                continue
+            baked = read_baked(source)
+            total = sum(level_bytes(width, height, baked.compressed) for width, height, _ in baked.levels)
+            kind = {0: "RGBA8", GL_COMPRESSED_RGB_S3TC_DXT1_EXT: "BC1"}.get(baked.compressed, "BC3")
+            results.append((source, f"{baked.width}x{baked.height}, {len(baked.levels)} níveis, {kind}, "
+                                    f"{total / 2 ** 20:.2f}MB em {(time.perf_counter() - start) * 1000:.0f}ms"))
+    return results
+
@@ -0,0 +1,67 @@
+"""
+Volumes envolventes dos modelos (caixa alinhada aos eixos e esfera) e a sua transformação para o espaço do mundo,
+usados no descarte dos objetos fora do campo de visão (veja src/view/frustum.py).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Bounds:
+    """
+    Caixa alinhada aos eixos (low, high) e esfera (center, radius) que envolvem um conjunto de pontos.
+    O centro da esfera é o centro da caixa, e o raio é a maior distância de um ponto até ele.
+    """
+    low: np.ndarray
+    high: np.ndarray
+    center: np.ndarray
+    radius: float
+
+    @classmethod
+    def from_positions(cls, positions: np.ndarray) -> "Bounds":
+        """
+        :param positions: Array (n, 3) ou achatado com as posições dos vértices.
+        :return: Bounds dos pontos (um ponto na origem, se não houver nenhum).
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if not len(positions):
+            return cls(np.zeros(3), np.zeros(3), np.zeros(3), 0.0)
+
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        center = (low + high) / 2
+        radius = float(np.sqrt(((positions - center) ** 2).sum(axis=1).max()))
+        return cls(low, high, center, radius)
+
+    @property
+    def extent(self) -> np.ndarray:
+        """Metade do tamanho da caixa em cada eixo."""
+        return (self.high - self.low) / 2
+
+    def transform(self, matrix: np.ndarray) -> "Bounds":
+        """
+        Volumes envolventes no espaço transformado por `matrix` (4x4, convenção matemática: linha, coluna).
+        A caixa continua alinhada aos eixos, e por isso cresce com rotações.
+        """
+        centers, extents, radii = transform_bounds(self.center[None], self.extent[None], np.array([self.radius]),
+                                                   np.asarray(matrix, dtype=np.float64)[None])
+        return Bounds(centers[0] - extents[0], centers[0] + extents[0], centers[0], float(radii[0]))
+
+
+def transform_bounds(centers: np.ndarray, extents: np.ndarray, radii: np.ndarray, matrices: np.ndarray):
+    """
+    Transforma, de uma vez, as caixas (centro, metade do tamanho) e esferas de vários objetos.
+
+    :param centers: Array (n, 3) com os centros no espaço do modelo.
+    :param extents: Array (n, 3) com a metade do tamanho de cada caixa.
+    :param radii: Array (n,) com os raios das esferas.
+    :param matrices: Array (n, 4, 4) com as matrizes de cada objeto (convenção matemática: linha, coluna).
+    :return: Uma tupla com os centros (n, 3), as metades dos tamanhos das caixas (n, 3) e os raios (n,) no mundo.
+    """
+    linear = matrices[:, :3, :3]
+    world_centers = np.einsum("nij,nj->ni", linear, centers) + matrices[:, :3, 3]
+    # Cada eixo da nova caixa é a soma das projeções dos eixos da caixa original (Arvo, 1990)
+    world_extents = np.einsum("nij,nj->ni", np.abs(linear), extents)
+    # A esfera cresce com a maior escala entre os eixos
+    world_radii = radii * np.sqrt((linear ** 2).sum(axis=1).max(axis=1))
+    return world_centers, world_extents, world_radii
@@ -0,0 +1,103 @@
+"""
+Cache em disco para arrays derivados de um arquivo fonte (ex.: os triângulos processados de um OBJ).
+
+O cache fica ao lado do arquivo fonte, como `<fonte>.<nome>.npz`, e guarda o tamanho, o mtime e o hash
+SHA-1 do conteúdo da fonte. Se o tamanho e o mtime batem, o cache é usado direto; se só o mtime mudou
+(ex.: após um `git checkout`), o hash decide e, se bater, o cache é regravado com o mtime novo, para que as
+próximas cargas não precisem ler a fonte de novo. A escrita é feita em um arquivo temporário seguido de
+`os.replace`, que é atômico, então dois processos iniciando juntos nunca leem um cache pela metade.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Incrementar quando o formato dos arrays salvos mudar, para invalidar caches antigos
+CACHE_VERSION = 1
+
+
+def cache_path(source: str, name: str) -> str:
+    return f"{source}.{name}.npz"
+
+
+def file_hash(source: str) -> str:
+    digest = hashlib.sha1()
+    with open(source, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(source: str) -> Tuple[int, int, str]:
+    """
+    Chave do arquivo fonte: (tamanho, mtime em ns, hash do conteúdo).
+    """
+    stat = os.stat(source)
+    return stat.st_size, stat.st_mtime_ns, file_hash(source)
+
+
+def load(source: str, name: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Carrega os arrays salvos para `source`, se o cache existir e ainda corresponder ao arquivo fonte.
+
+    :param source: Caminho do arquivo fonte.
+    :param name: Nome do conjunto de arrays (permite mais de um cache por fonte).
+    :return: Dicionário com os arrays salvos, ou None se o cache não existe, é antigo ou está corrompido.
+    """
+    path = cache_path(source, name)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return None
+
+    try:
+        version = int(arrays.pop("__version__"))
+        size = int(arrays.pop("__size__"))
+        mtime = int(arrays.pop("__mtime__"))
+        digest = str(arrays.pop("__hash__"))
+    except KeyError:
+        return None
+
+    stat = os.stat(source)
+    if version != CACHE_VERSION or size != stat.st_size:
+        return None
+    if mtime != stat.st_mtime_ns:
+        if digest != file_hash(source):
+            return None
+        save(source, name, arrays, (stat.st_size, stat.st_mtime_ns, digest))
+
+    return arrays
+
+
+def save(source: str, name: str, arrays: Dict[str, np.ndarray], key: Tuple[int, int, str] = None):
+    """
+    Salva os arrays derivados de `source` de forma atômica.
+
+    :param source: Caminho do arquivo fonte.
+    :param name: Nome do conjunto de arrays.
+    :param arrays: Arrays a salvar. Nomes começando com `__` são reservados.
+    :param key: Chave da fonte calculada antes de processá-la. Se omitida, é calculada agora.
+    :return: None
+    """
+    size, mtime, digest = key if key else source_key(source)
+    path = cache_path(source, name)
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    except OSError:
+        return  # diretório somente leitura: segue sem cache
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, __version__=CACHE_VERSION, __size__=size, __mtime__=mtime, __hash__=digest, **arrays)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
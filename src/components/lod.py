@@ -0,0 +1,308 @@
+"""
+Níveis de detalhe (LOD) dos modelos: versões simplificadas da malha, geradas na carga (ou no `bake.py`) e
+guardadas no cache em disco, e a escolha do nível de cada objeto pelo tamanho que ele ocupa na tela.
+
+A simplificação é por agrupamento de vértices (vertex clustering): o espaço do modelo é dividido em uma grade de
+células cúbicas, todos os vértices de uma célula viram um só e os triângulos com dois cantos na mesma célula somem.
+O vértice de cada célula é o ponto que minimiza a soma das distâncias (ao quadrado) aos planos dos triângulos que a
+tocam, as quádricas de Garland e Heckbert, como em Lindstrom (2000), então quinas e bordas ficam no lugar em vez
+de serem arredondadas pela média. O tamanho da célula de cada nível é buscado para chegar à fração de triângulos
+pedida. Tudo em NumPy, sem laço por vértice ou triângulo.
+
+Cada canto dos triângulos que sobram mantém as suas coordenadas de textura e normal originais; só a posição muda.
+Assim as costuras de textura não se misturam, e cada nível é um conjunto de triângulos como os de build_triangles.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from . import cache
+
+# Frações de triângulos dos níveis, quando não especificadas (veja Model e bake.py)
+DEFAULT_LODS = (0.5, 0.25, 0.1)
+
+# Níveis com menos triângulos que isto não são gerados: não economizam nada e deformam demais o modelo
+MIN_TRIANGLES = 64
+
+# Triângulos por material: (posições, coordenadas de textura, normais), achatados, como em build_triangles
+Triangles = Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+def weld_vertices(positions: np.ndarray):
+    """
+    Junta os cantos com a mesma posição.
+
+    :param positions: Array (n, 3) float32 com as posições dos cantos.
+    :return: Posições únicas (u, 3) float64 e o vértice único de cada canto (n,).
+    """
+    positions = np.ascontiguousarray(positions, dtype=np.float32)
+    keys = positions.view(np.dtype((np.void, positions.itemsize * 3))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return positions[first].astype(np.float64), inverse.ravel()
+
+
+def cluster(vertices: np.ndarray, low: np.ndarray, cell: float):
+    """
+    Célula da grade de cada vértice.
+
+    :return: Rótulo da célula de cada vértice (0 a c - 1), o índice (i, j, k) de cada célula (c, 3) e c.
+    """
+    cells = np.floor((vertices - low) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, first, labels = np.unique(keys, return_index=True, return_inverse=True)
+    return labels.ravel(), cells[first], len(first)
+
+
+def surviving_triangles(corners: np.ndarray) -> np.ndarray:
+    """
+    Triângulos que continuam triângulos depois do agrupamento: com os três cantos em células diferentes, e sem
+    repetir um triângulo anterior com as mesmas três células.
+
+    :param corners: Array (m, 3) com a célula de cada canto.
+    :return: Índices dos triângulos mantidos, em ordem crescente.
+    """
+    valid = np.flatnonzero((corners[:, 0] != corners[:, 1]) & (corners[:, 1] != corners[:, 2])
+                           & (corners[:, 0] != corners[:, 2]))
+    if not len(valid):
+        return valid
+    ordered = np.sort(corners[valid], axis=1)
+    if ordered.max() < 2 ** 21:
+        # As três células em um único inteiro de 63 bits: np.unique em 1D é bem mais rápido que com axis=0
+        ordered = (ordered[:, 0] << 42) | (ordered[:, 1] << 21) | ordered[:, 2]
+        _, first = np.unique(ordered, return_index=True)
+    else:
+        _, first = np.unique(ordered, axis=0, return_index=True)
+    return np.sort(valid[first])
+
+
+def quadric_positions(vertices: np.ndarray, triangles: np.ndarray, labels: np.ndarray, count: int,
+                      low: np.ndarray, high: np.ndarray, cells: np.ndarray, cell: float) -> np.ndarray:
+    """
+    Posição de cada célula: o ponto que minimiza a quádrica dos planos dos triângulos que a tocam, puxado para a
+    média dos vértices nas direções em que a quádrica não decide (ex.: ao longo de uma superfície plana) e
+    limitado à célula e à caixa do modelo.
+
+    :param vertices: Array (u, 3) com os vértices únicos.
+    :param triangles: Array (m, 3) com os vértices de cada triângulo.
+    :param labels: Célula de cada vértice.
+    :return: Array (count, 3) float64.
+    """
+    sizes = np.bincount(labels, minlength=count).astype(np.float64)
+    mean = np.stack([np.bincount(labels, vertices[:, axis], count) for axis in range(3)], axis=1) / sizes[:, None]
+
+    a, b, c = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+    normals = np.cross(b - a, c - a)
+    lengths = np.sqrt((normals ** 2).sum(axis=1))
+    keep = lengths > 0
+    planes = np.zeros((len(triangles), 4))
+    planes[keep, :3] = normals[keep] / lengths[keep, None]
+    planes[:, 3] = -(planes[:, :3] * a).sum(axis=1)
+    # Quádrica de cada triângulo, pesada pela área: só os 10 termos distintos da matriz simétrica 4x4
+    rows, columns = np.triu_indices(4)
+    terms = planes[:, rows] * planes[:, columns] * (lengths / 2)[:, None]
+
+    quadric = np.zeros((count, 10))
+    corner_labels = labels[triangles]
+    for corner in range(3):
+        for term in range(10):
+            quadric[:, term] += np.bincount(corner_labels[:, corner], terms[:, term], count)
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, rows, columns] = quadric
+    matrices[:, columns, rows] = quadric
+
+    a_matrix, b_vector = matrices[:, :3, :3], -matrices[:, :3, 3]
+    # Regularização pequena: sem ela, superfícies planas (quádrica de posto 1) não teriam solução única
+    trace = np.trace(a_matrix, axis1=1, axis2=2)
+    regularized = a_matrix + (1e-3 * trace / 3 + 1e-12)[:, None, None] * np.eye(3)
+    residual = b_vector - np.einsum("nij,nj->ni", a_matrix, mean)
+    positions = mean + np.linalg.solve(regularized, residual[:, :, None])[:, :, 0]
+
+    cell_low = low + cells * cell
+    positions = np.clip(positions, cell_low, cell_low + cell)
+    return np.clip(positions, low, high)
+
+
+def simplify(triangles: Triangles, ratio: float) -> Tuple[Triangles, float, int]:
+    """
+    Simplifica os triângulos de todos os materiais juntos (a mesma grade, para as bordas entre materiais
+    continuarem fechadas), com células do tamanho que deixa o total de triângulos mais perto de `ratio` do
+    original.
+
+    :return: Os triângulos simplificados de cada material (os mesmos materiais, mesmo que algum fique vazio), o
+    erro do nível (diagonal da célula dividida pelo diâmetro do modelo) e o total de triângulos.
+    """
+    materials = list(triangles)
+    positions = np.concatenate([triangles[material][0] for material in materials]).reshape(-1, 3)
+    counts = [len(triangles[material][0]) // 9 for material in materials]
+    vertices, corner_vertices = weld_vertices(positions)
+    corner_vertices = corner_vertices.reshape(-1, 3)
+    total = len(corner_vertices)
+
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    center = (low + high) / 2
+    diameter = 2 * float(np.sqrt(((vertices - center) ** 2).sum(axis=1).max()))
+    longest = float((high - low).max()) or 1.0
+    target = ratio * total
+
+    def attempt(resolution: int):
+        cell = longest / resolution
+        labels, cells, count = cluster(vertices, low, cell)
+        kept = surviving_triangles(labels[corner_vertices])
+        return cell, labels, cells, count, kept
+
+    # Mais células, mais triângulos: a resolução dobra até passar do alvo, e depois a busca é binária
+    resolution = 1
+    results = {}
+    while resolution < 65536:
+        results[resolution] = attempt(resolution)
+        if len(results[resolution][4]) >= target:
+            break
+        resolution *= 2
+    lower, upper = max(1, resolution // 2), resolution
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        results[middle] = attempt(middle)
+        if len(results[middle][4]) >= target:
+            upper = middle
+        else:
+            lower = middle
+    best = min(results.values(), key=lambda result: abs(len(result[4]) - target))
+    cell, labels, cells, count, kept = best
+
+    cluster_positions = quadric_positions(vertices, corner_vertices, labels, count, low, high, cells, cell)
+    simplified = {}
+    start = 0
+    for material, material_count in zip(materials, counts):
+        chosen = kept[(kept >= start) & (kept < start + material_count)]
+        local = chosen - start
+        corners = (local[:, None] * 3 + np.arange(3)).ravel()
+        _, textures, normals = triangles[material]
+        new_positions = cluster_positions[labels[corner_vertices[chosen]]].astype(np.float32).ravel()
+        new_textures = textures.reshape(-1, 2)[corners].ravel() if len(textures) else textures
+        new_normals = normals.reshape(-1, 3)[corners].ravel() if len(normals) else normals
+        simplified[material] = (new_positions, new_textures, new_normals)
+        start += material_count
+
+    error = cell * math.sqrt(3) / diameter if diameter else 0.0
+    return simplified, error, len(kept)
+
+
+def build_lods(triangles: Triangles, ratios=DEFAULT_LODS) -> Tuple[List[Triangles], List[float]]:
+    """
+    Gera os níveis simplificados, do mais detalhado para o menos. Níveis que ficariam abaixo de MIN_TRIANGLES, ou
+    que quase não reduzem o nível anterior, são pulados.
+
+    :param ratios: Fração dos triângulos originais de cada nível, em ordem decrescente.
+    :return: Os níveis e o erro de cada um (veja simplify).
+    """
+    total = sum(len(vertices) // 9 for vertices, _, _ in triangles.values())
+    levels, errors = [], []
+    previous = total
+    for ratio in sorted(ratios, reverse=True):
+        if ratio * total < MIN_TRIANGLES:
+            break
+        level, error, count = simplify(triangles, ratio)
+        if count < MIN_TRIANGLES or count > 0.9 * previous or (errors and error <= errors[-1]):
+            continue
+        levels.append(level)
+        errors.append(error)
+        previous = count
+    return levels, errors
+
+
+def read_lods(wavefront_file: str, triangles: Triangles, ratios=DEFAULT_LODS,
+              use_cache: bool = True) -> Tuple[List[Triangles], List[float]]:
+    """
+    Níveis de `triangles` (os triângulos do OBJ, como devolvidos por read_triangles), do cache em disco se ele
+    ainda vale para o arquivo e as mesmas frações; senão, gerados e salvos.
+    """
+    ratios = np.asarray(sorted(ratios, reverse=True), dtype=np.float64)
+    if use_cache:
+        arrays = cache.load(wavefront_file, "lods")
+        if arrays is not None and np.array_equal(arrays["ratios"], ratios):
+            materials = [str(material) for material in arrays["materials"]]
+            levels = [{material: (arrays[f"vertices{level}_{i}"], arrays[f"textures{level}_{i}"],
+                                  arrays[f"normals{level}_{i}"]) for i, material in enumerate(materials)}
+                      for level in range(len(arrays["errors"]))]
+            return levels, arrays["errors"].tolist()
+        key = cache.source_key(wavefront_file)
+
+    levels, errors = build_lods(triangles, ratios.tolist())
+
+    if use_cache:
+        arrays = {"ratios": ratios, "errors": np.array(errors, dtype=np.float64),
+                  "materials": np.array(list(triangles), dtype=np.str_)}
+        for level, simplified in enumerate(levels):
+            for i, (vertices, textures, normals) in enumerate(simplified.values()):
+                arrays[f"vertices{level}_{i}"] = vertices
+                arrays[f"textures{level}_{i}"] = textures
+                arrays[f"normals{level}_{i}"] = normals
+        cache.save(wavefront_file, "lods", arrays, key)
+
+    return levels, errors
+
+
+@dataclass
+class LodView:
+    """
+    O que a escolha dos níveis precisa saber da câmera em um quadro.
+
+    Atributos:
+        eye (np.ndarray): Posição da câmera no mundo.
+
+        scale (float): Pixels por unidade do mundo a uma unidade de distância da câmera (altura da tela dividida
+        por 2 * tan(fov / 2), em uma projeção perspectiva).
+
+        tolerance (float): Erro aceito, em pixels: um nível é usado quando o seu erro (veja simplify), projetado
+        na tela, fica abaixo disto. Maior, menos triângulos e menos fidelidade.
+
+        hysteresis (float): Margem relativa em volta de cada limite. Um objeto só passa para um nível menos
+        detalhado abaixo de `limite * (1 - hysteresis)` e só volta acima de `limite * (1 + hysteresis)`, para não
+        trocar de nível a cada quadro quando o seu tamanho fica perto do limite.
+    """
+    eye: np.ndarray
+    scale: float
+    tolerance: float = 1.0
+    hysteresis: float = 0.2
+
+    @classmethod
+    def perspective(cls, eye, fov: float, height: int, **kwargs) -> "LodView":
+        """:param fov: Campo de visão vertical, em graus, como em glm.perspective."""
+        return cls(np.array(eye, dtype=np.float64), height / (2 * math.tan(math.radians(fov) / 2)), **kwargs)
+
+    def limits(self, errors: np.ndarray) -> np.ndarray:
+        """Tamanho na tela (diâmetro, em pixels) abaixo do qual cada nível é usado. Erro infinito, nunca."""
+        with np.errstate(divide="ignore"):
+            return np.where(np.isfinite(errors), self.tolerance / errors, 0.0)
+
+
+def screen_sizes(centers: np.ndarray, radii: np.ndarray, eye: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Diâmetro aproximado, em pixels, das esferas envolventes projetadas na tela. Esferas que contêm a câmera
+    ocupam a tela toda (infinito).
+    """
+    distances = np.sqrt(((centers - eye) ** 2).sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sizes = 2 * radii * scale / distances
+    return np.where(distances > radii, sizes, np.inf)
+
+
+def select_levels(sizes: np.ndarray, limits: np.ndarray, previous: np.ndarray, hysteresis: float) -> np.ndarray:
+    """
+    Nível de cada objeto, com histerese (veja LodView.hysteresis).
+
+    :param sizes: Array (n,) com os tamanhos na tela.
+    :param limits: Array (n, k) com os limites dos níveis 1 a k de cada objeto, decrescentes (0 para níveis que o
+    modelo não tem).
+    :param previous: Array (n,) com o nível do quadro anterior, ou -1 se não há.
+    :return: Array (n,) int com os níveis, de 0 (o modelo completo) a k.
+    """
+    # Dentro da margem, o nível anterior fica se estiver entre min_level e max_level
+    min_level = (sizes[:, None] < limits * (1 - hysteresis)).sum(axis=1)
+    max_level = (sizes[:, None] < limits * (1 + hysteresis)).sum(axis=1)
+    plain = (sizes[:, None] < limits).sum(axis=1)
+    previous = np.where(previous < 0, plain, previous)
+    return np.clip(previous, min_level, max_level)
@@ -1,73 +1,471 @@
 import os
-from typing import List
+import re
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Dict, List, Tuple
 
 from OpenGL.GL import *
 import glm
 import numpy as np
-from OpenGL.GL.shaders import ShaderProgram
-from PIL import Image
+
+from src.view.shader import Program
+
+from . import cache
+from .bounds import Bounds
+from .lod import read_lods
+from .textures import TextureManager, decode_texture, upload_texture
+from .vertex_format import VertexFormat, pack_vertices
 
 
 def load_texture(file_path) -> int:
     """
-    Função para carregar uma textura de um arquivo de imagem.
+    Função para carregar uma textura de um arquivo de imagem, sem passar pelo cache de texturas.
 
     :param file_path: Caminho do arquivo de imagem.
     :return: ID da textura carregada na GPU. Corresponde à posição na memória e permite organizar várias texturas.
     Sem ter que contar os vértices manualmente.
     """
-    image = Image.open(file_path)
-    img_data = image.convert("RGBA").tobytes("raw", "RGBA", 0, -1)
-    texture_id = glGenTextures(1)
+    return upload_texture(decode_texture(file_path))
+
+
+# Cantos de face sem barras ("v") ou com apenas uma ("v/vt")
+_BARE_CORNER = re.compile(r"(^|\s)(-?\d+)(?=\s|$)")
+_PARTIAL_CORNER = re.compile(r"(^|\s)(-?\d+/-?\d*)(?=\s|$)")
+
+
+@dataclass
+class FaceGroup:
+    """
+    Faces de um material, armazenadas em arrays contíguos.
+
+    - indices: Array (n_cantos, 3) int32 com os índices (v, vt, vn) de cada canto, base 0. -1 indica ausente.
+    - sizes: Array (n_faces,) int32 com o número de cantos de cada face.
+    """
+    indices: np.ndarray
+    sizes: np.ndarray
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def triangulate(self) -> np.ndarray:
+        """
+        Divide cada face em um leque de triângulos [0, i, i + 1], mantendo a ordem das faces.
+        Faces de qualquer aridade são tratadas de uma vez, sem laço em Python.
+
+        :return: Array (3 * n_triângulos, 3) com os índices (v, vt, vn) de cada canto dos triângulos.
+        """
+        triangles = np.maximum(self.sizes - 2, 0)
+        starts = np.cumsum(self.sizes) - self.sizes
+
+        # Para cada triângulo, a face de origem e a posição i do leque dentro dela
+        face = np.repeat(np.arange(len(self.sizes)), triangles)
+        fan = np.arange(len(face)) - np.repeat(np.cumsum(triangles) - triangles, triangles) + 1
+
+        first = starts[face]
+        corners = np.stack([first, first + fan, first + fan + 1], axis=1).ravel()
+        return self.indices[corners]
+
+
+def _gather(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    Copia `values[index]` para um array pré-alocado e achatado. Índices -1 (ausentes) viram zeros.
+    """
+    out = np.zeros((len(index), values.shape[1]), dtype=np.float32)
+    valid = index >= 0
+    if valid.all():
+        np.take(values, index, axis=0, out=out)
+    else:
+        out[valid] = values[index[valid]]
+    return out.ravel()
+
+
+def build_triangles(vertices: np.ndarray, texture_coords: np.ndarray, normals: np.ndarray, faces: FaceGroup):
+    """
+    Triangula as faces de um material e busca as posições, coordenadas de textura e normais de cada canto.
+
+    :return: Uma tupla com os arrays achatados float32 de posições, coordenadas de textura e normais.
+    Se o arquivo não tem normais, o array de normais é vazio.
+    """
+    corners = faces.triangulate()
+    triangle_vertices = _gather(vertices, corners[:, 0])
+    triangle_textures = _gather(texture_coords, corners[:, 1])
+    triangle_normals = _gather(normals, corners[:, 2]) if len(normals) else np.zeros(0, dtype=np.float32)
+    return triangle_vertices, triangle_textures, triangle_normals
+
+
+def _parse_floats(bodies: List[str], width: int) -> np.ndarray:
+    """
+    Converte de uma vez as linhas de um tipo (v, vt ou vn) em um array (n, width) float32.
+
+    :param bodies: Conteúdo das linhas, sem o prefixo.
+    :param width: Número de componentes mantidos por linha.
+    :return: Array contíguo com os valores.
+    """
+    if not bodies:
+        return np.zeros((0, width), dtype=np.float32)
+
+    values = np.fromstring(" ".join(bodies), dtype=np.float64, sep=" ")
+    if values.size == len(bodies) * width:
+        return values.reshape(-1, width).astype(np.float32)
+
+    # Número variável de componentes por linha (ex.: "v x y z w" ou cores por vértice)
+    return np.array([body.split()[:width] for body in bodies], dtype=np.float64).astype(np.float32)
+
+
+def _parse_faces(bodies: List[str], runs: List[tuple]) -> FaceGroup:
+    """
+    Converte as linhas `f` de um material em um FaceGroup.
+    Aceita os formatos `v`, `v/vt`, `v//vn` e `v/vt/vn`, além de índices negativos.
+
+    :param bodies: Conteúdo das linhas `f`, sem o prefixo.
+    :param runs: Sequências de faces consecutivas, como (início, nº de v, nº de vt, nº de vn) lidos até ali.
+    :return: FaceGroup com índices base 0 (-1 indica componente ausente).
+    """
+    if not bodies:
+        return FaceGroup(np.zeros((0, 3), dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+    corners = [body.split() for body in bodies]
+    sizes = np.fromiter(map(len, corners), dtype=np.int32, count=len(corners))
+    joined = " ".join(chain.from_iterable(corners))
+    n = int(sizes.sum())
 
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image.width, image.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, img_data)
+    if joined.count("/") != 2 * n:
+        # Formatos mistos ou sem todos os componentes: completa cada canto para "v/vt/vn"
+        joined = _BARE_CORNER.sub(r"\1\2/0/0", joined)
+        joined = _PARTIAL_CORNER.sub(r"\1\2/0", joined)
+    joined = joined.replace("//", "/0/").replace("/", " ")
 
-    return texture_id
+    raw = np.fromstring(joined, dtype=np.int64, sep=" ")
+    if raw.size != 3 * n:
+        raise ValueError("Malformed face definition in OBJ file")
+    raw = raw.reshape(n, 3)
+
+    # Índices positivos são base 1, negativos são relativos ao que foi lido até a face
+    starts = [run[0] for run in runs] + [len(bodies)]
+    counts = np.repeat(np.array([run[1:] for run in runs], dtype=np.int64), np.diff(starts), axis=0)
+    counts = np.repeat(counts, sizes, axis=0)
+    indices = np.where(raw > 0, raw - 1, np.where(raw < 0, counts + raw, -1))
+
+    return FaceGroup(indices.astype(np.int32), sizes)
+
+
+def index_triangles(vertices: np.ndarray, textures: np.ndarray, normals: np.ndarray):
+    """
+    Deduplica os cantos (posição, textura, normal) repetidos dos triângulos de um material.
+    Os vértices únicos ficam na ordem da primeira ocorrência, preservando a localidade do buffer.
+
+    :param vertices: Posições achatadas dos cantos, como retornadas por build_triangles.
+    :param textures: Coordenadas de textura achatadas dos cantos.
+    :param normals: Normais achatadas dos cantos (pode ser vazio).
+    :return: Uma tupla com as posições, texturas e normais únicas (achatadas) e os índices uint32 de cada canto.
+    """
+    n = len(vertices) // 3
+    columns = [vertices.reshape(n, 3), textures.reshape(n, 2)]
+    if len(normals):
+        columns.append(normals.reshape(n, 3))
+    corners = np.ascontiguousarray(np.concatenate(columns, axis=1))
+
+    # Cada canto vira uma chave binária única, comparada de uma vez pelo np.unique
+    keys = corners.view(np.dtype((np.void, corners.itemsize * corners.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    indices = rank[inverse.ravel()].astype(np.uint32)
+
+    unique = corners[first[order]]
+    unique_normals = unique[:, 5:].ravel() if len(normals) else normals
+    return unique[:, :3].ravel(), unique[:, 3:5].ravel(), unique_normals, indices
+
+
+def index_dtype(vertex_count: int):
+    """Menor tipo de índice (16 ou 32 bits) capaz de endereçar `vertex_count` vértices."""
+    return np.uint16 if vertex_count <= 65536 else np.uint32
+
+
+def vertex_cache_hit_rate(indices: np.ndarray, cache_size: int = 32) -> float:
+    """
+    Simula o cache pós-transformação da GPU (FIFO) sobre a sequência de índices.
+
+    :param indices: Índices dos cantos, três por triângulo.
+    :param cache_size: Número de vértices transformados mantidos no cache.
+    :return: Fração dos cantos cujo vértice já estava no cache.
+    """
+    fifo = deque()
+    resident = set()
+    hits = 0
+    for index in indices.tolist():
+        if index in resident:
+            hits += 1
+            continue
+        fifo.append(index)
+        resident.add(index)
+        if len(fifo) > cache_size:
+            resident.discard(fifo.popleft())
+    return hits / len(indices) if len(indices) else 0.0
+
+
+def memory_report(vertices: Dict[str, np.ndarray], textures: Dict[str, np.ndarray],
+                  normals: Dict[str, np.ndarray], indices: Dict[str, np.ndarray] = None,
+                  vertex_stride: int = None) -> Dict[str, int]:
+    """
+    Calcula quantos bytes a geometria ocupa e quanto economiza frente ao formato original: triângulos expandidos,
+    com todos os atributos em float32.
+
+    :param vertex_stride: Bytes por vértice no VBO. Se omitido, considera os atributos em float32.
+    :return: Dicionário com `vertex_bytes`, `index_bytes`, `baseline_bytes` e `saved_bytes`.
+    """
+    float_bytes = sum(array.nbytes for group in (vertices, textures, normals) for array in group.values())
+    vertex_count = sum(len(array) // 3 for array in vertices.values())
+    if not vertex_count:
+        return {"vertex_bytes": 0, "index_bytes": 0, "baseline_bytes": 0, "saved_bytes": 0}
+
+    float_stride = float_bytes // vertex_count
+    vertex_bytes = vertex_count * (vertex_stride if vertex_stride else float_stride)
+
+    corner_count = sum(len(array) for array in indices.values()) if indices else vertex_count
+    index_bytes = corner_count * np.dtype(index_dtype(vertex_count)).itemsize if indices else 0
+    baseline_bytes = corner_count * float_stride
+    return {"vertex_bytes": vertex_bytes, "index_bytes": index_bytes, "baseline_bytes": baseline_bytes,
+            "saved_bytes": baseline_bytes - vertex_bytes - index_bytes}
+
+
+def compute_draw_ranges(counts: Dict[str, int]) -> Dict[str, Tuple[int, int]]:
+    """
+    Calcula o intervalo de cada material dentro do buffer onde todos os materiais foram concatenados.
+
+    :param counts: Número de vértices (ou índices, no modo indexado) de cada material, na ordem do buffer.
+    :return: Dicionário material -> (first, count), prontos para glDrawArrays/glDrawElements.
+    """
+    ranges = {}
+    first = 0
+    for material, count in counts.items():
+        ranges[material] = (first, count)
+        first += count
+    return ranges
+
+
+def instance_matrices(matrices: List[glm.mat4]) -> np.ndarray:
+    """
+    Junta as matrizes de vários objetos no formato do buffer de instâncias: (n, 4, 4) float32, coluna a coluna,
+    como o OpenGL espera (cada coluna é um dos quatro atributos vec4 de `model` no vertex shader).
+    """
+    if not matrices:
+        return np.zeros((0, 4, 4), dtype=np.float32)
+    # bytes() de uma matriz do glm sai linha a linha, então é preciso transpor cada matriz
+    rows = np.frombuffer(b"".join(map(bytes, matrices)), dtype=np.float32).reshape(-1, 4, 4)
+    return np.ascontiguousarray(rows.transpose(0, 2, 1))
 
 
 def read_wavefront(file_path):
     """
-    Função para ler um arquivo .obj e retornar os vértices, coordenadas de textura e faces.
+    Função para ler um arquivo .obj e retornar os vértices, coordenadas de textura, faces e normais.
+    O arquivo é lido em uma única passada e os valores são convertidos em bloco para arrays NumPy.
 
     :param file_path: Caminho do arquivo .obj.
-    :return: Uma tupla com os vértices, coordenadas de textura e faces.
+    :return: Uma tupla com os vértices (n, 3), coordenadas de textura (n, 2), faces por material e normais (n, 3).
     """
     vertices = []
     texture_coords = []
     normals = []
     material = "default"
     faces = {material: []}
+    runs = {material: []}
+    in_run = False
 
     with open(file_path, 'r') as file:
-        for line in file:
-            if line.startswith('v '):
-                vertices.append(list(map(float, line.strip().split()[1:4])))
-            elif line.startswith('vt '):
-                texture_coords.append(list(map(float, line.strip().split()[1:3])))
-            elif line.startswith('usemtl') or line.startswith('usemat'):
-                material = line.strip().split()[1]
-                if material not in faces:
-                    faces[material] = []
-            elif line.startswith('f '):
-                face = line.strip().split()[1:]
-                face = [list(map(int, f.split('/'))) for f in face]
-                faces[material].append(face)
-            elif line.startswith('vn '):
-                normals.append(list(map(float, line.strip().split()[1:4])))
+        lines = file.read().splitlines()
+
+    for line in lines:
+        if line.startswith('f '):
+            if not in_run:
+                runs[material].append((len(faces[material]), len(vertices), len(texture_coords), len(normals)))
+                in_run = True
+            faces[material].append(line[2:])
+        elif line.startswith('v '):
+            vertices.append(line[2:])
+            in_run = False
+        elif line.startswith('vt '):
+            texture_coords.append(line[3:])
+            in_run = False
+        elif line.startswith('vn '):
+            normals.append(line[3:])
+            in_run = False
+        elif line.startswith('usemtl') or line.startswith('usemat'):
+            material = line.strip().split()[1]
+            if material not in faces:
+                faces[material] = []
+                runs[material] = []
+            in_run = False
 
     if not faces["default"]:
         faces.pop("default")
 
-    return vertices, texture_coords, faces, normals
+    faces = {material: _parse_faces(bodies, runs[material]) for material, bodies in faces.items()}
+
+    return _parse_floats(vertices, 3), _parse_floats(texture_coords, 2), faces, _parse_floats(normals, 3)
+
+
+def create_buffer(blocks: List[np.ndarray], usage=GL_STATIC_DRAW) -> int:
+    """
+    Cria um buffer com os blocos em sequência. Usa o alvo GL_COPY_WRITE_BUFFER, que não depende do VAO ligado.
+
+    :return: ID do buffer.
+    """
+    buffer = glGenBuffers(1)
+    glBindBuffer(GL_COPY_WRITE_BUFFER, buffer)
+    glBufferData(GL_COPY_WRITE_BUFFER, sum(block.nbytes for block in blocks), None, usage)
+    offset = 0
+    for block in blocks:
+        glBufferSubData(GL_COPY_WRITE_BUFFER, offset, block.nbytes, block)
+        offset += block.nbytes
+    glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
+    return buffer
+
+
+def find_wavefront(root_dir: str) -> str:
+    """Caminho do primeiro arquivo OBJ em `root_dir`."""
+    for file in os.listdir(root_dir):
+        if file.endswith('.obj'):
+            return os.path.join(root_dir, file)
+
+    raise FileNotFoundError("No obj file found in directory")
+
+
+def find_textures(root_dir: str) -> Dict[str, str]:
+    # Para cada arquivo JPG, PNG e JPEG em root_dir, retorna o caminho do arquivo
+    textures = {}
+    for file in os.listdir(root_dir):
+        if file.endswith(('.jpg', '.png', '.jpeg')):
+            textures[os.path.basename(file).split('.')[0]] = os.path.join(root_dir, file)
+
+    return textures
+
+
+def read_triangles(wavefront_file: str, use_cache: bool = True):
+    """
+    Lê o OBJ e triangula as faces de cada material, usando o cache em disco quando ele ainda é válido.
+
+    :param wavefront_file: Caminho do arquivo Wavefront (OBJ).
+    :param use_cache: Usa e atualiza o cache em disco (veja cache.py).
+    :return: Dicionário material -> (posições, coordenadas de textura, normais), como em build_triangles, e a
+    saída de read_wavefront (None quando o cache foi usado).
+    """
+    if use_cache:
+        arrays = cache.load(wavefront_file, "triangles")
+        if arrays is not None:
+            return {str(material): (arrays[f"vertices{i}"], arrays[f"textures{i}"], arrays[f"normals{i}"])
+                    for i, material in enumerate(arrays["materials"])}, None
+        key = cache.source_key(wavefront_file)
+
+    vertices, texture_coords, faces, normals = read_wavefront(wavefront_file)
+    triangles = {material: build_triangles(vertices, texture_coords, normals, group)
+                 for material, group in faces.items()}
+
+    if use_cache:
+        arrays = {"materials": np.array(list(triangles), dtype=np.str_)}
+        for i, (triangle_vertices, textures, triangle_normals) in enumerate(triangles.values()):
+            arrays[f"vertices{i}"] = triangle_vertices
+            arrays[f"textures{i}"] = textures
+            arrays[f"normals{i}"] = triangle_normals
+        cache.save(wavefront_file, "triangles", arrays, key)
+
+    return triangles, (vertices, texture_coords, faces, normals)
+
+
+def select_materials(wavefront_file: str, triangles, available_textures: Dict[str, str], indexed: bool = False):
+    """
+    Associa os triângulos de cada material à sua textura e descarta os materiais sem textura. Um OBJ sem materiais
+    usa a textura com o nome do arquivo.
+
+    :return: Dicionário material -> (posições, coordenadas de textura, normais, índices). No modo indexado, os
+    arrays guardam apenas os vértices únicos; senão, os índices são None.
+    """
+    if "default" in triangles:
+        if len(available_textures) == 0:
+            raise FileNotFoundError("No texture file found and no material specified in OBJ")
+
+        obj_name = os.path.basename(wavefront_file).split('.')[0]
+
+        if available_textures.get(obj_name, None) is not None:
+            triangles = dict(triangles)
+            triangles[obj_name] = triangles.pop("default")
+        else:
+            raise FileNotFoundError("Unnamed material with no texture with the obj file name found")
+
+    materials = {}
+    for material, (vertices, textures, normals) in triangles.items():
+        if material not in available_textures:
+            continue
+        if indexed:
+            materials[material] = index_triangles(vertices, textures, normals)
+        else:
+            materials[material] = (vertices, textures, normals, None)
+    return materials
+
+
+@dataclass
+class ModelGeometry:
+    """
+    A parte do carregamento de um modelo que não usa o OpenGL, e por isso pode rodar em outro processo
+    (veja Engine.register_models).
+
+    Atributos:
+        materials (Dict[str, Tuple[np.ndarray, ...]]): Como devolvido por select_materials.
+
+        shared_memory (SharedMemory | None): Memória compartilhada onde estão os arrays, quando vieram de outro
+        processo. Precisa viver tanto quanto eles, então o Model guarda uma referência.
+
+        lods (List[Dict[str, Tuple[np.ndarray, ...]]]): Níveis de detalhe simplificados, do mais detalhado para o
+        menos, cada um com os mesmos materiais e arrays de `materials` (veja lod.py).
+
+        lod_errors (List[float]): Erro de cada nível de `lods`, relativo ao diâmetro do modelo.
+    """
+    wavefront_file: str
+    available_textures: Dict[str, str]
+    materials: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]]
+    shared_memory: object = None
+    lods: List[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]]] = field(default_factory=list)
+    lod_errors: List[float] = field(default_factory=list)
+
+
+def select_lods(wavefront_file: str, triangles, available_textures: Dict[str, str], lods=(), use_cache: bool = True,
+                indexed: bool = False):
+    """
+    Níveis de detalhe dos triângulos do OBJ (do cache em disco, ou gerados; veja read_lods), com os materiais
+    escolhidos como em select_materials.
+
+    :param lods: Fração dos triângulos de cada nível. Vazio, nenhum nível.
+    :return: Os níveis e o erro de cada um.
+    """
+    if not lods:
+        return [], []
+    levels, errors = read_lods(wavefront_file, triangles, lods, use_cache)
+    return [select_materials(wavefront_file, level, available_textures, indexed) for level in levels], errors
+
+
+def load_geometry(root_dir: str, use_cache: bool = True, indexed: bool = False, lods=()) -> ModelGeometry:
+    """
+    Lê, triangula e (no modo indexado) indexa o modelo em `root_dir`, com os níveis de detalhe pedidos em `lods`,
+    sem criar nada na GPU.
+    """
+    wavefront_file = find_wavefront(root_dir)
+    available_textures = find_textures(root_dir)
+    triangles, _ = read_triangles(wavefront_file, use_cache)
+    levels, errors = select_lods(wavefront_file, triangles, available_textures, lods, use_cache, indexed)
+    return ModelGeometry(wavefront_file, available_textures,
+                         select_materials(wavefront_file, triangles, available_textures, indexed),
+                         lods=levels, lod_errors=errors)
 
 
 class Model:
-    def __init__(self, shader_program: ShaderProgram, root_dir: str):
+    def __init__(self, shader_program: Program, root_dir: str, use_cache: bool = True, indexed: bool = False,
+                 vertex_format: VertexFormat = None, texture_manager: TextureManager = None,
+                 geometry: ModelGeometry = None, streamed: bool = False, placeholder: "Model" = None,
+                 lods: Tuple[float, ...] = ()):
         self.textures = None
         self.vertices = None
         self.triangle_vertices = None
@@ -75,10 +473,47 @@ class Model:
         self.texture_coords = None
         self.faces = None
         self.normals = None
+        self.indices = None  # Índices de cada material, quando indexed=True
 
         self.vao = None  # Vertex Array Object
         self.vbo = None  # Vertex Buffer Object
+        self.ebo = None  # Element Buffer Object
+        self.instance_vbo = None  # Matrizes `model` de cada instância desenhada
+        self.instances = None  # Últimas matrizes enviadas para instance_vbo
+        self.index_type = None
+        self.index_size = None
+        self.vertex_format = vertex_format if vertex_format else VertexFormat()
+        # Transformação aplicada no shader às posições quantizadas (identidade nos demais formatos)
+        self.position_offset = glm.vec3(0.0, 0.0, 0.0)
+        self.position_scale = glm.vec3(1.0, 1.0, 1.0)
+        self.draw_ranges = None  # (first, count) de cada material no VBO (ou no EBO, no modo indexado)
+        # Níveis de detalhe (veja lod.py): frações de triângulos pedidas, arrays de cada nível simplificado (como
+        # os do modelo completo, por material), erro de cada nível (0 no nível 0, o modelo completo) e os
+        # intervalos de draw de cada nível, depois dos do modelo completo no mesmo VBO
+        self.lod_ratios = tuple(lods)
+        self.lods: List[Dict[str, tuple]] = []
+        self.lod_errors: List[float] = [0.0]
+        self.lod_ranges: List[Dict[str, Tuple[int, int]]] = []
         self.texture_ids = None
+        # Cache compartilhado de texturas (ex.: o da Engine); sem ele, cada material carrega a sua textura
+        self.texture_manager = texture_manager
+        if texture_manager:
+            texture_manager.models.add(self)
+        self.bounds: Bounds | None = None  # Volumes envolventes no espaço do modelo, para o descarte por visibilidade
+        # Se os buffers já estão na GPU. Um modelo carregado em segundo plano (veja AssetStreamer) não é desenhado
+        # até ficar residente; se tiver um placeholder (outro modelo, já residente), ele é desenhado no lugar
+        self.resident = False
+        self.placeholder: Model | None = placeholder
+        self.load_error: Exception | None = None  # Erro da carga em segundo plano, se houve (o modelo não carrega)
+
+        # Quem usa o modelo (objetos e cenas), para a contagem de referências do AssetManager
+        self.users = weakref.WeakSet()
+        self.last_drawn = -1  # Último quadro da RenderQueue em que o modelo foi desenhado
+        # Buffers e texturas liberados pelo AssetManager; voltam no próximo uso (veja restore)
+        self.evicted = False
+        self.loads = 0  # Vezes que a geometria foi enviada para a GPU
+        self.evictions = 0
+        self.buffer_memory = 0  # Bytes do VBO e do EBO na GPU
 
         self.ambient_coefficient = 0.1
         self.diffuse_coefficient = 0.7
@@ -86,32 +521,36 @@ class Model:
         self.shininess = 1
 
         self.shader_program = shader_program
-        if not isinstance(shader_program, ShaderProgram):
+        if not isinstance(shader_program, Program):
             raise ValueError("Invalid argument passed as shader program")
 
         self.root_dir = root_dir
-        wavefront_file = None
-
-        for file in os.listdir(root_dir):
-            if file.endswith('.obj'):
-                wavefront_file = os.path.join(root_dir, file)
-                break
-
-        if not wavefront_file:
-            raise FileNotFoundError("No obj file found in directory")
-
+        self.use_cache = use_cache
+        self.indexed = indexed
+        # Mantém viva a memória compartilhada dos arrays carregados em outro processo
+        self.shared_memory = None
+
+        if geometry is not None:
+            # Geometria já lida e triangulada (ex.: em um pool de processos): só falta a parte da GPU
+            self.available_textures = geometry.available_textures
+            self.apply_geometry(geometry)
+            return
+
+        if streamed:
+            # Nada é lido agora: o AssetStreamer carrega a geometria e as texturas aos poucos
+            self.available_textures = self.get_textures(root_dir)
+            return
+
+        wavefront_file = find_wavefront(root_dir)
         self.available_textures = self.get_textures(root_dir)
+        if self.texture_manager:
+            # As imagens decodificam em segundo plano enquanto o OBJ é lido
+            self.texture_manager.prefetch(self.available_textures.values())
         self.load(wavefront_file)
 
     @staticmethod
     def get_textures(root_dir):
-        # Para cada arquivo JPG, PNG e JPEG em root_dir, retorna o caminho do arquivo
-        textures = {}
-        for file in os.listdir(root_dir):
-            if file.endswith(('.jpg', '.png', '.jpeg')):
-                textures[os.path.basename(file).split('.')[0]] = os.path.join(root_dir, file)
-
-        return textures
+        return find_textures(root_dir)
 
     def setup_buffers(self):
         """
@@ -120,38 +559,248 @@ class Model:
 
         Precisa ter setado self.triangle_vertices, self.textures e self.triangle_normals
 
+        :return: None
+        """
+        blocks, elements, attributes = self.buffer_data()
+        vbo = create_buffer(blocks)
+        ebo = create_buffer([elements]) if elements is not None else None
+        buffer_bytes = sum(block.nbytes for block in blocks) + (elements.nbytes if elements is not None else 0)
+        self.setup_vertex_array(vbo, ebo, attributes, buffer_bytes)
+
+    def buffer_data(self):
+        """
+        Dados dos buffers do modelo, prontos para a GPU, sem chamar o OpenGL (pode rodar fora da thread do contexto).
+        Também calcula os intervalos de draw de cada material e, com posições quantizadas, a dequantização.
+
+        :return: Blocos do VBO, em sequência; índices do EBO (None fora do modo indexado); e os atributos, como
+        (location, size, type, normalized, stride, início).
+        """
+        parts = self.geometry_parts()
+        total_vertices = np.concatenate([vertices for _, vertices, _, _, _ in parts])
+        total_texture_coords = np.concatenate([textures for _, _, textures, _, _ in parts])
+        total_normals = np.concatenate([normals for _, _, _, normals, _ in parts])
+
+        if self.vertex_format.interleaved:
+            blocks, attributes = self.interleaved_data(total_vertices, total_texture_coords, total_normals)
+        else:
+            blocks, attributes = self.planar_data(total_vertices, total_texture_coords, total_normals)
+
+        elements = None
+        if self.indices:
+            elements = self.element_data()
+            counts = {part: len(indices) for part, _, _, _, indices in parts}
+        else:
+            counts = {part: len(vertices) // 3 for part, vertices, _, _, _ in parts}
+        ranges = compute_draw_ranges(counts)
+        self.lod_ranges = [{material: ranges[(level, material)] for material in materials}
+                           for level, materials in enumerate([self.triangle_vertices] + self.lods)]
+        self.draw_ranges = self.lod_ranges[0]
+        return blocks, elements, attributes
+
+    def geometry_parts(self):
+        """
+        Arrays de cada material, do modelo completo e depois de cada nível de detalhe, na ordem em que vão para o
+        VBO: ((nível, material), posições, coordenadas de textura, normais, índices ou None).
+        """
+        parts = [((0, material), self.triangle_vertices[material], self.textures[material],
+                  self.triangle_normals[material], self.indices[material] if self.indices else None)
+                 for material in self.triangle_vertices]
+        for level, materials in enumerate(self.lods, 1):
+            parts += [((level, material), *arrays) for material, arrays in materials.items()]
+        return parts
+
+    def setup_vertex_array(self, vbo: int, ebo: int | None, attributes, buffer_bytes: int):
+        """
+        Cria o VAO sobre buffers já preenchidos (veja buffer_data). Depois disso o modelo pode ser desenhado.
+
+        :param buffer_bytes: Bytes enviados para o VBO e o EBO, somados pelos arrays (sem consultar o OpenGL).
         :return: None
         """
         self.vao = glGenVertexArrays(1)
-        self.vbo = glGenBuffers(1)
+        self.vbo = vbo
+        self.buffer_memory = buffer_bytes
 
         glBindVertexArray(self.vao)
         glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
 
-        total_vertices = np.concatenate(list(self.triangle_vertices.values()))
-        total_texture_coords = np.concatenate(list(self.textures.values()))
-        total_normals = np.concatenate(list(self.triangle_normals.values()))
+        for location, size, gl_type, normalized, stride, start in attributes:
+            glVertexAttribPointer(location, size, gl_type, normalized, stride, ctypes.c_void_p(start))
+            glEnableVertexAttribArray(location)
+
+        self.setup_instance_buffer()
+
+        if ebo is not None:
+            # O buffer de índices fica associado ao VAO ligado
+            self.ebo = ebo
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindVertexArray(0)
+        self.resident = True
+        self.loads += 1
+
+    def acquire(self, user):
+        """Registra `user` (um objeto ou uma cena) como usuário do modelo. Usuários coletados saem sozinhos."""
+        self.users.add(user)
+
+    def release(self, user):
+        self.users.discard(user)
+
+    @property
+    def refcount(self) -> int:
+        return len(self.users)
+
+    def gpu_memory(self) -> int:
+        """Bytes dos buffers do modelo na GPU: vértices, índices e matrizes das instâncias. Sem as texturas."""
+        if not self.resident:
+            return 0
+        # O buffer das instâncias começa com uma matriz (veja setup_instance_buffer)
+        return self.buffer_memory + (self.instances.nbytes if self.instances is not None else 64)
+
+    def evict(self):
+        """
+        Apaga o VAO e os buffers da GPU, mantendo os arrays na memória para `restore`. As texturas, que podem ser
+        compartilhadas com outros modelos, ficam a cargo de quem chama (veja AssetManager).
 
+        :return: None
+        """
+        if not self.resident:
+            return
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(3 if self.ebo else 2, [self.vbo, self.instance_vbo] + ([self.ebo] if self.ebo else []))
+        self.vao = self.vbo = self.ebo = self.instance_vbo = None
+        self.instances = None
+        self.buffer_memory = 0
+        self.resident = False
+        self.evicted = True
+        self.evictions += 1
+
+    def restore(self):
+        """
+        Envia de novo para a GPU um modelo liberado por `evict`, a partir dos arrays guardados. As texturas voltam
+        pelo cache de texturas (do arquivo `.mips`, se houver, ou decodificando a imagem).
+
+        :return: None
+        """
+        if self.texture_manager:
+            self.texture_ids = {material: self.texture_manager.get(self.available_textures[material])
+                                for material in self.texture_ids}
+        self.evicted = False
+        self.setup_buffers()
+
+    @staticmethod
+    def planar_data(total_vertices, total_texture_coords, total_normals):
+        """
+        Três blocos float32 consecutivos no VBO: posições, coordenadas de textura e normais.
+
+        :return: Blocos e atributos, como em buffer_data.
+        """
         vertices_size = total_vertices.nbytes
         textures_size = total_texture_coords.nbytes
-        normals_size = total_normals.nbytes
 
-        glBufferData(GL_ARRAY_BUFFER, vertices_size + textures_size + normals_size, None, GL_STATIC_DRAW)
-        glBufferSubData(GL_ARRAY_BUFFER, 0, vertices_size, total_vertices)
-        glBufferSubData(GL_ARRAY_BUFFER, vertices_size, textures_size, total_texture_coords)
-        glBufferSubData(GL_ARRAY_BUFFER, vertices_size + textures_size, normals_size, total_normals)
+        attributes = [(0, 3, GL_FLOAT, GL_FALSE, 0, 0),
+                      (1, 2, GL_FLOAT, GL_FALSE, 0, vertices_size),
+                      (2, 3, GL_FLOAT, GL_FALSE, 0, vertices_size + textures_size)]
+        return [total_vertices, total_texture_coords, total_normals], attributes
+
+    def interleaved_data(self, total_vertices, total_texture_coords, total_normals):
+        """
+        Os atributos de cada vértice intercalados, no formato de self.vertex_format.
+        Com posições quantizadas, guarda a transformação de dequantização enviada ao shader em draw.
+
+        :return: Blocos e atributos, como em buffer_data.
+        """
+        data, attributes, offset, scale = pack_vertices(total_vertices, total_texture_coords, total_normals,
+                                                        self.vertex_format)
+        self.position_offset = glm.vec3(*offset)
+        self.position_scale = glm.vec3(*scale)
+        stride = data.shape[1]
 
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
-        glEnableVertexAttribArray(0)
+        return [data], [(location, size, gl_type, normalized, stride, start)
+                        for location, size, gl_type, normalized, start in attributes]
 
-        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(vertices_size))
-        glEnableVertexAttribArray(1)
+    def setup_instance_buffer(self):
+        """
+        Cria o buffer com a matriz `model` de cada instância, lido pelo vertex shader nos locais 3 a 6 (uma coluna
+        por local) e avançado uma vez por instância. Todo draw do modelo é instanciado, mesmo com uma só instância.
+        Precisa ser chamado com o VAO ligado.
+
+        :return: None
+        """
+        self.instance_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, 64, None, GL_STREAM_DRAW)
 
-        glVertexAttribPointer(2, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(vertices_size + textures_size))
-        glEnableVertexAttribArray(2)
+        for column in range(4):
+            glVertexAttribPointer(3 + column, 4, GL_FLOAT, GL_FALSE, 64, ctypes.c_void_p(16 * column))
+            glVertexAttribDivisor(3 + column, 1)
+            glEnableVertexAttribArray(3 + column)
 
+    def upload_instances(self, matrices: np.ndarray):
+        """
+        Envia as matrizes das instâncias, (n, 4, 4) float32 como devolvido por instance_matrices.
+        Não faz nada se forem iguais às últimas enviadas (ex.: segundo material dos mesmos objetos).
+
+        :return: None
+        """
+        if self.instances is not None and np.array_equal(matrices, self.instances):
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, matrices.nbytes, matrices, GL_STREAM_DRAW)
         glBindBuffer(GL_ARRAY_BUFFER, 0)
-        glBindVertexArray(0)
+        self.instances = matrices
+
+    def element_data(self) -> np.ndarray:
+        """
+        Índices de todos os materiais (e dos níveis de detalhe), deslocados para o início de cada material no VBO.
+        Usa índices de 16 bits quando o modelo tem até 65536 vértices e de 32 bits caso contrário.
+        """
+        parts = self.geometry_parts()
+        vertex_count = sum(len(vertices) // 3 for _, vertices, _, _, _ in parts)
+        dtype = index_dtype(vertex_count)
+        self.index_type = GL_UNSIGNED_SHORT if dtype == np.uint16 else GL_UNSIGNED_INT
+        self.index_size = np.dtype(dtype).itemsize
+
+        elements = []
+        base_vertex = 0
+        for _, vertices, _, _, indices in parts:
+            elements.append((indices + base_vertex).astype(dtype))
+            base_vertex += len(vertices) // 3
+
+        return np.concatenate(elements)
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Bytes ocupados pela geometria do modelo e quanto o modo indexado e o formato dos vértices economizam.
+        Veja memory_report no nível do módulo.
+        """
+        has_normals = any(len(normals) for normals in self.triangle_normals.values())
+        stride = self.vertex_format.stride(has_normals) if self.vertex_format.interleaved else None
+        return memory_report(self.triangle_vertices, self.textures, self.triangle_normals, self.indices, stride)
+
+    def vertex_cache_hit_rate(self, cache_size: int = 32) -> float:
+        """
+        Taxa de acerto simulada do cache pós-transformação, somando todos os materiais.
+        Sem índices, nenhum vértice é reaproveitado e a taxa é zero.
+        """
+        if not self.indices:
+            return 0.0
+        total = sum(len(indices) for indices in self.indices.values())
+        hits = sum(vertex_cache_hit_rate(indices, cache_size) * len(indices) for indices in self.indices.values())
+        return hits / total if total else 0.0
+
+    def read_triangles(self, wavefront_file):
+        """
+        Lê o OBJ e triangula as faces de cada material, usando o cache em disco quando ele ainda é válido.
+        Quando o cache é usado, self.vertices, self.texture_coords, self.faces e self.normals ficam como None.
+
+        :param wavefront_file: Caminho do arquivo Wavefront (OBJ).
+        :return: Dicionário material -> (posições, coordenadas de textura, normais), como em build_triangles.
+        """
+        triangles, parsed = read_triangles(wavefront_file, self.use_cache)
+        if parsed is not None:
+            self.vertices, self.texture_coords, self.faces, self.normals = parsed
+        return triangles
 
     def load(self, wavefront_file):
         """
@@ -161,99 +810,134 @@ class Model:
         :param wavefront_file: Caminho do arquivo Wavefront (OBJ).
         :return: None
         """
-        self.vertices, self.texture_coords, self.faces, self.normals = read_wavefront(wavefront_file)
-
-        if "default" in self.faces:
-            if len(self.available_textures) == 0:
-                raise FileNotFoundError("No texture file found and no material specified in OBJ")
-
-            obj_name = os.path.basename(wavefront_file).split('.')[0]
+        triangles = self.read_triangles(wavefront_file)
+        materials = select_materials(wavefront_file, triangles, self.available_textures, self.indexed)
+        levels, errors = select_lods(wavefront_file, triangles, self.available_textures, self.lod_ratios,
+                                     self.use_cache, self.indexed)
+        self.apply_geometry(ModelGeometry(wavefront_file, self.available_textures, materials, lods=levels,
+                                          lod_errors=errors))
+
+    def apply_geometry(self, geometry: ModelGeometry):
+        """
+        Carrega as texturas dos materiais e envia a geometria para a GPU. Precisa rodar na thread com o contexto.
 
-            if self.available_textures.get(obj_name, None) is not None:
-                self.faces[obj_name] = self.faces.pop("default")
+        :return: None
+        """
+        self.set_geometry(geometry)
+        self.texture_ids = {}
+        for material in self.triangle_vertices:
+            if self.texture_manager:
+                self.texture_ids[material] = self.texture_manager.get(self.available_textures[material])
             else:
-                raise FileNotFoundError("Unnamed material with no texture with the obj file name found")
+                self.texture_ids[material] = load_texture(self.available_textures[material])
+        self.discard_textures()
+        self.setup_buffers()
 
-        self.texture_ids = {}
+    def set_geometry(self, geometry: ModelGeometry):
+        """
+        Guarda os arrays de cada material e calcula os volumes envolventes. Não usa o OpenGL.
+
+        :return: None
+        """
+        self.shared_memory = geometry.shared_memory
         self.textures = {}
         self.triangle_vertices = {}
         self.triangle_normals = {}
+        self.indices = {} if self.indexed else None
 
-        for material in self.faces:
-            if material not in self.available_textures:
-                continue
-
-            texture_id = load_texture(self.available_textures[material])
-            self.texture_ids[material] = texture_id
-
-            triangle_vertice = []
-            triangle_normals = []
-            texture_vertice = []
-
-            for face in self.faces[material]:  # Para cada face
-                for i in range(1, len(face) - 1):  # Para cada vertice da face, cria um triângulo, ex: quadrado vira dois triângulos
-                    for idx in [0, i, i + 1]:  # Cria um triângulo
-                        vertex = self.vertices[face[idx][0] - 1]
-                        texture_coord = self.texture_coords[face[idx][1] - 1]
-                        triangle_vertice.extend(vertex)
-                        texture_vertice.extend(texture_coord)
-                        # copia a normal para cada face nova criada
-                        if self.normals: # fazer alguma coisa com a normal aqui
-                            normals = self.normals[face[idx][2] - 1]
-                            triangle_normals.extend(normals)
-
-            # just copy normals to equate number of new faces
-            self.triangle_vertices[material] = np.array(triangle_vertice, dtype=np.float32)
-            self.textures[material] = np.array(texture_vertice, dtype=np.float32)
-            self.triangle_normals[material] = np.array(triangle_normals, dtype=np.float32)
+        for material, (vertices, textures, normals, indices) in geometry.materials.items():
+            if self.indexed:
+                self.indices[material] = indices
 
-        self.setup_buffers()
+            self.triangle_vertices[material] = vertices
+            self.textures[material] = textures
+            self.triangle_normals[material] = normals
+        self.lods = [dict(level) for level in geometry.lods]
+        self.lod_errors = [0.0] + list(geometry.lod_errors)
+
+        self.bounds = Bounds.from_positions(np.concatenate([np.zeros(0, dtype=np.float32)]
+                                                           + list(self.triangle_vertices.values())))
+
+    def discard_textures(self):
+        """Descarta do cache de texturas as imagens do diretório que nenhum material usa."""
+        if self.texture_manager:
+            for material, path in self.available_textures.items():
+                if material not in self.triangle_vertices:
+                    self.texture_manager.discard(path)
 
-    def draw(self, matrix, light_sources: List = None, ambient_light=None):
+    def bind(self):
+        """
+        Liga o VAO do modelo e envia a transformação das posições quantizadas, criando os buffers na primeira vez.
+
+        :return: None
+        """
         if not self.vao:
             self.setup_buffers()
 
-        # Send the model matrix to the shader
-        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "model"), 1, GL_FALSE, glm.value_ptr(matrix))
+        glBindVertexArray(self.vao)
+        self.shader_program.set_vec3("positionOffset", self.position_offset)
+        self.shader_program.set_vec3("positionScale", self.position_scale)
 
-        # set k_a, k_d, k_s
-        glUniform1f(glGetUniformLocation(self.shader_program, "ambientCoefficient"), self.ambient_coefficient)
-        glUniform1f(glGetUniformLocation(self.shader_program, "diffuseCoefficient"), self.diffuse_coefficient)
-        glUniform1f(glGetUniformLocation(self.shader_program, "specularCoefficient"), self.specular_coefficient)
+    def draw_range(self, first: int, count: int, instances: int = 1):
+        """
+        Desenha `count` vértices (ou índices, no modo indexado) a partir de `first`, para as `instances` primeiras
+        matrizes enviadas com upload_instances. O VAO precisa estar ligado.
+        """
+        if self.indices:
+            glDrawElementsInstanced(GL_TRIANGLES, count, self.index_type, ctypes.c_void_p(first * self.index_size),
+                                    instances)
+        else:
+            glDrawArraysInstanced(GL_TRIANGLES, first, count, instances)
+
+    def material(self) -> Tuple[float, float, float, float]:
+        return self.ambient_coefficient, self.diffuse_coefficient, self.specular_coefficient, self.shininess
 
-        glUniform1f(glGetUniformLocation(self.shader_program, "shininess"), self.shininess)
-        num_lights = len(light_sources) if light_sources else 0
-        color = glm.vec3(0.0, 0.0, 0.0)
+    def draw_parts(self, level: int = 0) -> List[Tuple[str, int, int, int]]:
+        """
+        Partes desenháveis do nível de detalhe `level` (0, o modelo completo; acima do último nível, o último), uma
+        por material: (material, id da textura, first, count).
+        """
+        if not self.vao:
+            self.setup_buffers()
 
-        if ambient_light:
-            color = ambient_light.luminance
+        ranges = self.lod_ranges[min(level, len(self.lod_ranges) - 1)]
+        return [(material, self.texture_ids[material], first, count)
+                for material, (first, count) in ranges.items() if count]
 
-        if light_sources:
-            light_sources = light_sources[0:10]
+    def draw_items(self, level: int = 0) -> List[Tuple[int, int, int]]:
+        """
+        Partes desenháveis do modelo, uma por material: (id da textura, first, count).
+        Usado pela fila de renderização, que agrupa as partes de vários objetos pela textura.
+        """
+        return [(texture_id, first, count) for _, texture_id, first, count in self.draw_parts(level)]
 
-            # Send light positions and colors to the shader
-            light_positions = [light.position for light in light_sources]
-            light_colors = [light.luminance for light in light_sources]
+    def draw(self, matrix, scene: glm.mat4 = None, level: int = 0):
+        """
+        Desenha o modelo com a matriz `matrix`, dentro de uma cena com a matriz global `scene` (identidade se None).
+        As luzes não são enviadas aqui, e sim uma vez por cena, pelo LightBuffer (veja Scene.draw).
 
-            for i, (position, color) in enumerate(zip(light_positions, light_colors)):
-                glUniform3fv(glGetUniformLocation(self.shader_program, f"lightPos[{i}]"), 1, glm.value_ptr(position))
-                glUniform3fv(glGetUniformLocation(self.shader_program, f"lightColor[{i}]"), 1, glm.value_ptr(color))
+        :param level: Nível de detalhe (veja Object.lod_level).
+        """
+        if self.evicted:
+            self.restore()
+        if not self.resident:
+            if self.placeholder is not None:
+                self.placeholder.draw(matrix, scene)
+            return
 
-        glUniform3fv(glGetUniformLocation(self.shader_program, "ambientLight"), 1, glm.value_ptr(color))
-        glUniform1i(glGetUniformLocation(self.shader_program, "numLights"), num_lights)
+        self.bind()
+        self.shader_program.set_mat4("scene", scene if scene is not None else glm.mat4(1.0))
 
-        for material in self.triangle_vertices:
-            glBindTexture(GL_TEXTURE_2D, self.texture_ids[material])
+        # A matriz do objeto vai para o buffer de instâncias, como uma única instância
+        self.upload_instances(instance_matrices([matrix]))
+
+        # set k_a, k_d, k_s
+        self.shader_program.set_material(*self.material())
 
-            # bind normal to
-            glBindVertexArray(self.vao)
-            # Divide by 3 because there are 3 coordinates per triangle
-            glDrawArrays(GL_TRIANGLES, 0, len(self.triangle_vertices[material]) // 3)
-            glBindVertexArray(0)
+        for texture_id, first, count in self.draw_items(level):
+            # Cada material desenha apenas o seu intervalo do buffer
+            glBindTexture(GL_TEXTURE_2D, texture_id)
+            self.draw_range(first, count)
+        glBindVertexArray(0)
 
         glBindTexture(GL_TEXTURE_2D, 0)
-
-        # remove light sources
-        glUniform1i(glGetUniformLocation(self.shader_program, "numLights"), 0)
-        glUniform3fv(glGetUniformLocation(self.shader_program, "ambientLight"), 1,
-                     glm.value_ptr(glm.vec3(0.0, 0.0, 0.0)))
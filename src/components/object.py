@@ -1,34 +1,198 @@
 from abc import ABC
-from typing import Union
 
 import glm
+import numpy as np
 
+from .bounds import Bounds
+from .lod import LodView, screen_sizes, select_levels
 from .model import Model
+from .transforms import TransformStore
+
+
+def transform_matrix(position: glm.vec3, rotation: glm.vec3, scale: glm.vec3) -> glm.mat4:
+    """Matriz de translação * rotação em x, y e z (ângulos de Euler, em radianos) * escala."""
+    matrix = glm.mat4(1.0)
+    matrix = glm.translate(matrix, position)
+    matrix = glm.rotate(matrix, rotation.x, glm.vec3(1.0, 0.0, 0.0))
+    matrix = glm.rotate(matrix, rotation.y, glm.vec3(0.0, 1.0, 0.0))
+    matrix = glm.rotate(matrix, rotation.z, glm.vec3(0.0, 0.0, 1.0))
+    matrix = glm.scale(matrix, scale)
+    return matrix
+
+
+def euler_rotation(rotation: glm.vec3) -> glm.quat:
+    """Rotação em x, y e z (na mesma ordem de transform_matrix) como quatérnio."""
+    return glm.angleAxis(rotation.x, glm.vec3(1.0, 0.0, 0.0)) * glm.angleAxis(rotation.y, glm.vec3(0.0, 1.0, 0.0)) \
+        * glm.angleAxis(rotation.z, glm.vec3(0.0, 0.0, 1.0))
 
 
 class Object:
-    def __init__(self, model: Model = None):
+    """
+    Objeto da cena: um modelo com posição, rotação e escala.
+
+    A matriz do objeto é guardada e só é recalculada depois que posição, rotação ou escala mudam, seja por `move`,
+    `rotate` e `rescale` ou por atribuição (`obj.position = ...`, `obj.position += ...`). Alterar um componente
+    diretamente (`obj.position.x = 1`) não é detectado: nesse caso, reatribua o vetor ou chame `invalidate`.
+
+    Com `store`, o objeto é apenas um índice em um TransformStore: posição, rotação e escala ficam nos arrays do
+    store (os getters devolvem cópias) e as matrizes de todos os objetos do store são calculadas juntas. O índice
+    volta ao store quando o objeto é coletado.
+
+    Se o modelo tem níveis de detalhe, `lod` guarda o nível em que o objeto foi desenhado por último, para a
+    histerese da escolha do próximo (veja lod.py).
+    """
+    __slots__ = ("model", "matrix", "previous", "store", "index", "_position", "_rotation", "_scale", "speed",
+                 "tick_methods", "lod", "__weakref__")
+
+    def __init__(self, model: Model = None, store: TransformStore = None):
         self.model = model
-        self.position: glm.vec3 = glm.vec3(0.0, 0.0, 0.0)
-        self.rotation: glm.vec3 = glm.vec3(0.0, 0.0, 0.0)
-        self.scale: glm.vec3 = glm.vec3(1.0, 1.0, 1.0)
+        if model is not None:
+            model.acquire(self)
+        self.matrix: glm.mat4 | None = None  # Matriz em cache, None quando precisa ser recalculada
+        self.previous: glm.mat4 | None = None  # Matriz antes do último tick, para interpolar (veja snapshot)
+        self.store = store
+        self.index = store.allocate() if store is not None else -1
+        self.lod = -1
+        if store is None:
+            self.position: glm.vec3 = glm.vec3(0.0, 0.0, 0.0)
+            self.rotation: glm.vec3 = glm.vec3(0.0, 0.0, 0.0)
+            self.scale: glm.vec3 = glm.vec3(1.0, 1.0, 1.0)
         self.speed = 2
 
         self.tick_methods = []
 
+    def __del__(self):
+        # Devolve o índice ao store quando o objeto é coletado, para ser reaproveitado pelo próximo objeto criado
+        if getattr(self, "store", None) is not None:
+            self.store.release(self.index)
+
+    @property
+    def position(self) -> glm.vec3:
+        if self.store is not None:
+            return glm.vec3(*self.store.positions[self.index])
+        return self._position
+
+    @position.setter
+    def position(self, value: glm.vec3):
+        if self.store is not None:
+            self.store.positions[self.index] = value
+            self.store.dirty[self.index] = True
+            return
+        self._position = value
+        self.matrix = None
+
+    @property
+    def rotation(self) -> glm.vec3:
+        if self.store is not None:
+            return glm.vec3(*self.store.rotations[self.index])
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value: glm.vec3):
+        if self.store is not None:
+            self.store.rotations[self.index] = value
+            self.store.dirty[self.index] = True
+            return
+        self._rotation = value
+        self.matrix = None
+
+    @property
+    def scale(self) -> glm.vec3:
+        if self.store is not None:
+            return glm.vec3(*self.store.scales[self.index])
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: glm.vec3):
+        if self.store is not None:
+            self.store.scales[self.index] = value
+            self.store.dirty[self.index] = True
+            return
+        self._scale = value
+        self.matrix = None
+
+    def invalidate(self):
+        """Força o recálculo da matriz no próximo draw."""
+        if self.store is not None:
+            self.store.dirty[self.index] = True
+        self.matrix = None
+
     def set_model(self, model):
+        if self.model is not None:
+            self.model.release(self)
         self.model = model
-
-    def draw(self, lights: list = None, ambient_light=None):
+        if model is not None:
+            model.acquire(self)
+
+    def model_matrix(self) -> glm.mat4:
+        if self.store is not None:
+            return self.store.matrix(self.index)
+        if self.matrix is None:
+            self.matrix = transform_matrix(self._position, self._rotation, self._scale)
+        return self.matrix
+
+    def snapshot(self):
+        """
+        Guarda a matriz atual como o estado anterior ao próximo tick.
+        Objetos em um TransformStore não são interpolados.
+        """
+        if self.store is None:
+            self.previous = self.model_matrix()
+
+    def render_matrix(self, alpha: float = 1.0) -> glm.mat4:
+        """
+        Matriz entre o estado anterior ao último tick e o atual, para desenhar entre dois passos da simulação.
+        A interpolação é linear nos elementos da matriz, o que basta para o movimento pequeno de um passo.
+
+        :param alpha: Fração do caminho entre os dois estados (1 = estado atual).
+        """
+        matrix = self.model_matrix()
+        if self.previous is None or self.previous is matrix or alpha >= 1.0:
+            return matrix
+        return self.previous * (1.0 - alpha) + matrix * alpha
+
+    def world_bounds(self, scene: glm.mat4 = None) -> Bounds | None:
+        """Volumes envolventes do modelo no espaço do mundo, dentro de uma cena com a matriz global `scene`."""
+        if not self.model or self.model.bounds is None:
+            return None
+        matrix = self.model_matrix() if scene is None else scene * self.model_matrix()
+        return self.model.bounds.transform(np.array(matrix))
+
+    def lod_level(self, view: LodView, scene: glm.mat4 = None) -> int:
+        """
+        Nível de detalhe do modelo para o objeto visto de `view`, pelo tamanho na tela e com a histerese do nível
+        anterior. A RenderQueue faz a mesma escolha para todos os objetos do quadro de uma vez.
+        """
+        if len(self.model.lod_errors) < 2 or self.model.bounds is None:
+            return 0
+        bounds = self.world_bounds(scene)
+        sizes = screen_sizes(bounds.center[None], np.array([bounds.radius]), view.eye, view.scale)
+        limits = view.limits(np.array([self.model.lod_errors[1:]]))
+        self.lod = int(select_levels(sizes, limits, np.array([self.lod]), view.hysteresis)[0])
+        return self.lod
+
+    def draw(self, scene: glm.mat4 = None, view: LodView = None):
+        """
+        Desenha o objeto imediatamente, dentro de uma cena com a matriz global `scene` (identidade se None).
+        Com `view`, no nível de detalhe escolhido por `lod_level`; sem, com o modelo completo.
+        """
+        if not self.model:
+            return
+        level = self.lod_level(view, scene) if view is not None else 0
+        self.model.draw(self.model_matrix(), scene, level)
+
+    def collect(self, queue, lights: int = 0, transform: int = 0):
+        """
+        Adiciona as partes do modelo à fila de renderização `queue`, com o conjunto de luzes `lights` e a
+        transformação de cena `transform` (veja RenderQueue.add_lights e RenderQueue.add_transform).
+        """
         if not self.model:
             return
-        matrix = glm.mat4(1.0)
-        matrix = glm.translate(matrix, self.position)
-        matrix = glm.rotate(matrix, self.rotation.x, glm.vec3(1.0, 0.0, 0.0))
-        matrix = glm.rotate(matrix, self.rotation.y, glm.vec3(0.0, 1.0, 0.0))
-        matrix = glm.rotate(matrix, self.rotation.z, glm.vec3(0.0, 0.0, 1.0))
-        matrix = glm.scale(matrix, self.scale)
-        self.model.draw(matrix, lights, ambient_light)
+        if self.store is not None:
+            # A fila copia a matriz direto do store, já no formato do buffer de instâncias
+            queue.add(self.model, None, lights, self.store, self.index, transform, self)
+        else:
+            queue.add(self.model, self.render_matrix(queue.alpha), lights, transform=transform, owner=self)
 
     def rescale(self, factor: tuple, speed=1):
         self.scale *= glm.vec3(*factor) * speed
@@ -49,6 +213,12 @@ class Object:
 
 
 class BoundObject(ABC):
+    """
+    Região que limita onde os objetos interativos podem estar (veja Physics).
+
+    `contains` e `clip` tratam um ponto; `resolve` trata as formas de colisão de vários objetos de uma vez, e por
+    padrão chama `clip` para cada posição fora da região.
+    """
     def __init__(self, *args, **kwargs):
         pass
 
@@ -58,6 +228,22 @@ class BoundObject(ABC):
     def clip(self, point):
         pass
 
+    def resolve(self, positions: np.ndarray, extents: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """
+        Traz para dentro da região as formas que saíram dela.
+
+        :param positions: Array (n, 3) com os centros das formas.
+        :param extents: Array (n, 3) com a metade do tamanho da caixa de cada forma (zero para pontos).
+        :param radii: Array (n,) com o raio de cada forma (zero para pontos).
+        :return: Array (n, 3) com as posições corrigidas.
+        """
+        positions = positions.copy()
+        for i, position in enumerate(positions):
+            point = glm.vec3(*position)
+            if not self.contains(point):
+                positions[i] = self.clip(point)
+        return positions
+
 
 class CuboidBound(BoundObject):
     def __init__(self, min_point, max_point):
@@ -68,6 +254,15 @@ class CuboidBound(BoundObject):
     def contains(self, point):
         return all(self.min_point[i] <= point[i] <= self.max_point[i] for i in range(3))
 
+    def clip(self, point):
+        return glm.clamp(glm.vec3(*point), glm.vec3(*self.min_point), glm.vec3(*self.max_point))
+
+    def resolve(self, positions, extents, radii):
+        low, high = np.array(self.min_point, dtype=np.float64), np.array(self.max_point, dtype=np.float64)
+        middle = (low + high) / 2
+        # Formas maiores que a caixa ficam no centro dela
+        return np.clip(positions, np.minimum(low + extents, middle), np.maximum(high - extents, middle))
+
 
 class SphereBound(BoundObject):
     def __init__(self, center, radius):
@@ -81,6 +276,18 @@ class SphereBound(BoundObject):
     def clip(self, point):
         return self.center + glm.normalize(point - self.center) * self.radius
 
+    def resolve(self, positions, extents, radii):
+        center = np.array(self.center, dtype=np.float64)
+        offsets = positions - center
+        distances = np.sqrt((offsets ** 2).sum(axis=1))
+        # Caixas usam o raio da esfera que as envolve
+        reach = np.where(radii > 0, radii, np.sqrt((extents ** 2).sum(axis=1)))
+        limits = np.maximum(self.radius - reach, 0.0)
+        outside = distances > limits
+        positions = positions.copy()
+        positions[outside] = center + offsets[outside] / distances[outside, None] * limits[outside, None]
+        return positions
+
 
 class NormalBound(BoundObject):  # 2D plane with no bounds
     def __init__(self, normal, point):
@@ -94,17 +301,70 @@ class NormalBound(BoundObject):  # 2D plane with no bounds
     def clip(self, point):
         return point - glm.dot(self.normal, point - self.point) * self.normal
 
+    def resolve(self, positions, extents, radii):
+        normal = np.array(glm.normalize(self.normal), dtype=np.float64)
+        # O lado permitido é o oposto à normal; a forma avança `reach` além do seu centro na direção dela
+        reach = np.where(radii > 0, radii, extents @ np.abs(normal))
+        depths = np.maximum((positions - np.array(self.point, dtype=np.float64)) @ normal + reach, 0.0)
+        return positions - depths[:, None] * normal
+
+
+class Collider:
+    """
+    Forma de colisão de um InteractiveObject, centrada na posição do objeto e alinhada aos eixos do mundo.
+
+    Atributos:
+        mass (float): Massa usada para dividir a correção dos contatos; `math.inf` deixa o objeto imóvel.
+
+        velocity (glm.vec3): Velocidade integrada pela Physics a cada passo, em unidades por segundo.
+    """
+    def __init__(self, mass: float = 1.0):
+        self.mass = mass
+        self.velocity = glm.vec3(0.0)
+
+    @property
+    def extent(self) -> glm.vec3:
+        """Metade do tamanho da caixa que envolve a forma."""
+        return glm.vec3(0.0)
+
+    @property
+    def radius(self) -> float:
+        """Raio da forma, ou zero se ela não for uma esfera."""
+        return 0.0
+
+
+class SphereCollider(Collider):
+    def __init__(self, radius: float, mass: float = 1.0):
+        super().__init__(mass)
+        self.sphere_radius = radius
+
+    @property
+    def extent(self):
+        return glm.vec3(self.sphere_radius)
+
+    @property
+    def radius(self):
+        return self.sphere_radius
+
+
+class BoxCollider(Collider):
+    def __init__(self, extent: tuple, mass: float = 1.0):
+        super().__init__(mass)
+        self.box_extent = glm.vec3(*extent)
+
+    @property
+    def extent(self):
+        return self.box_extent
+
 
 class InteractiveObject(Object):
+    collider: Collider | None = None  # Sem forma de colisão, o objeto é um ponto para as regiões da Physics
+
     def tick(self, key_actions, delta=0):
         for method in self.tick_methods:
             method(key_actions, delta)
         return self
 
-    def interact(self, obj: Union["InteractiveObject", BoundObject], delta):
-        if isinstance(obj, BoundObject):
-            self.position = obj.clip(self.position)
-
 
 class LightSource(InteractiveObject):
     def __init__(self, model: Model = None, luminance=None):
@@ -114,9 +374,6 @@ class LightSource(InteractiveObject):
         else:
             self.luminance = glm.vec3(1.0, 1.0, 1.0) if luminance is None else glm.vec3(*luminance)
 
-    def draw(self, lights: list = None, ambient_light=None):
-        super().draw(None)
-
     def update_luminance(self, eps: float, min_luminance=1.0, max_luminance=5.0):
         self.luminance = glm.clamp(self.luminance + eps, min_luminance, max_luminance)
         return self
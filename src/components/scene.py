@@ -2,18 +2,35 @@ from typing import List, Dict
 
 import glm
 
-from .object import Object, LightSource
+from src.profiler import profiler
+from src.view.shader import light_buffer
+
+from .object import Object, LightSource, euler_rotation
+
+IDENTITY = glm.mat4(1.0)
 
 
 class Scene:
+    """
+    Conjunto de objetos, luzes e sub-cenas com uma transformação local própria (posição, rotação e escala).
+
+    A transformação da cena não altera os objetos: ela é composta com a da cena pai no draw e enviada ao shader
+    como o uniform `scene`, que multiplica a matriz de cada objeto. Mover, girar ou escalar uma cena inteira custa
+    O(1), e as matrizes local e global ficam em cache até a cena (ou a cena pai) mudar. As fontes de luz não são
+    afetadas pela transformação da cena.
+    """
     def __init__(self, name: str, objects: List[Object] = None, lights: List[LightSource] = None):
         self.name = name
         self.objects: List[Object] = []
         self.lights: List[LightSource] = []
         self.sub_scenes: Dict[str, "Scene"] = {}
+        self.bvh = None  # ObjectBVH sobre os objetos da cena, opcional (veja Engine.index_scene)
 
+        self.matrix: glm.mat4 | None = None  # Matriz local em cache, None quando precisa ser recalculada
+        self.world: glm.mat4 | None = None  # Matriz global em cache, calculada com a matriz da cena pai
+        self.parent_world: glm.mat4 | None = None
         self.position = glm.vec3(0.0, 0.0, 0.0)
-        self.rotation = glm.vec3(0.0, 0.0, 0.0)
+        self.rotation = glm.quat(1.0, 0.0, 0.0, 0.0)
         self.scale = glm.vec3(1.0, 1.0, 1.0)
 
         if objects:
@@ -23,66 +40,130 @@ class Scene:
 
         self.tick_methods = []
 
+    @property
+    def position(self) -> glm.vec3:
+        return self._position
+
+    @position.setter
+    def position(self, value: glm.vec3):
+        self._position = value
+        self.matrix = None
+
+    @property
+    def rotation(self) -> glm.quat:
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value: glm.quat):
+        self._rotation = value
+        self.matrix = None
+
+    @property
+    def scale(self) -> glm.vec3:
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: glm.vec3):
+        self._scale = value
+        self.matrix = None
+
+    def local_matrix(self) -> glm.mat4:
+        """Translação * rotação * escala da cena em relação à cena pai."""
+        if self.matrix is None:
+            self.matrix = glm.translate(IDENTITY, self._position) * glm.mat4_cast(self._rotation) \
+                          * glm.scale(IDENTITY, self._scale)
+        return self.matrix
+
+    def world_matrix(self, parent: glm.mat4 = None) -> glm.mat4:
+        """Matriz da cena composta com a matriz global `parent` da cena pai (identidade para cenas raiz)."""
+        parent = IDENTITY if parent is None else parent
+        if self.matrix is None or self.world is None or self.parent_world != parent:
+            self.world = parent * self.local_matrix()
+            self.parent_world = parent
+        return self.world
+
     def add_object(self, obj: List | Object):
-        if isinstance(obj, list):
-            self.objects.extend(obj)
-        else:
-            self.objects.append(obj)
+        objects = obj if isinstance(obj, list) else [obj]
+        self.objects.extend(objects)
+        self.acquire_models(objects)
+        if self.bvh is not None:
+            self.bvh.rebuild(self.objects)
 
     def add_lights(self, lights: List | LightSource):
-        if isinstance(lights, list):
-            self.lights.extend(lights)
-        else:
-            self.lights.append(lights)
+        lights = lights if isinstance(lights, list) else [lights]
+        self.lights.extend(lights)
+        self.acquire_models(lights)
+
+    def acquire_models(self, objects: List[Object]):
+        """A cena conta como um usuário dos modelos dos seus objetos e luzes (veja Model.acquire)."""
+        for obj in objects:
+            if obj.model is not None:
+                obj.model.acquire(self)
 
     def add_scene(self, scene: "Scene"):
         self.sub_scenes[scene.name] = scene
 
-    def draw(self, lights: list = None, ambient_light=None):
+    def draw(self, lights: list = None, ambient_light=None, parent: glm.mat4 = None):
         lights = lights + self.lights if lights else self.lights
-        for light in self.lights:
-            light.draw()
+        world = self.world_matrix(parent)
+
+        # As fontes de luz são desenhadas sem iluminação
+        if self.lights:
+            light_buffer.update()
+            for light in self.lights:
+                light.draw()
+
+        # As luzes são as mesmas para todos os objetos da cena, então são enviadas uma única vez
+        light_buffer.update(lights, ambient_light)
         for obj in self.objects:
-            obj.draw(lights, ambient_light)
+            obj.draw(world)
         for scene in self.sub_scenes.values():
-            scene.draw(lights, ambient_light)
+            scene.draw(lights, ambient_light, world)
+
+    def collect(self, queue, lights: list = None, ambient_light=None, parent: glm.mat4 = None):
+        """
+        Adiciona os objetos da cena e das sub-cenas à fila de renderização `queue`, na mesma ordem e com as
+        mesmas luzes que `draw` usaria. A fila decide a ordem real dos draws (veja RenderQueue).
+        """
+        with profiler.scope("Scene.collect", self.name):
+            lights = lights + self.lights if lights else self.lights
+            world = self.world_matrix(parent)
+
+            # As fontes de luz são desenhadas sem iluminação (conjunto 0) e sem a transformação da cena
+            for light in self.lights:
+                light.collect(queue)
+
+            light_set = queue.add_lights(lights, ambient_light)
+            transform = queue.add_transform(world)
+            objects = self.objects
+            if self.bvh is not None and queue.frustum is not None:
+                # Com a BVH, só os objetos que podem estar visíveis chegam à fila
+                objects = self.bvh.visible(queue.frustum, world)
+            for obj in objects:
+                obj.collect(queue, light_set, transform)
+            for scene in self.sub_scenes.values():
+                scene.collect(queue, lights, ambient_light, world)
 
     def move(self, position: tuple):
         self.position += glm.vec3(*position)
 
-        for obj in self.objects:
-            obj.move(position)
-        for scene in self.sub_scenes.values():
-            scene.move(position)
-
     def rescale(self, factor: tuple):
+        """Escala a cena em relação à sua posição, nos eixos da própria cena."""
         self.scale *= glm.vec3(*factor)
 
-        for obj in self.objects:
-            obj.position -= self.position
-            obj.position *= glm.vec3(*factor)
-            obj.position += self.position
-
-            obj.scale *= glm.vec3(*factor)
-
-        for scene in self.sub_scenes.values():
-            scene.rescale(factor)
-
     def rotate(self, rotation: tuple):
-        self.rotation = glm.vec3(*rotation)
-        rotation_matrix = glm.rotate(glm.mat4(1.0), self.rotation.x, glm.vec3(1.0, 0.0, 0.0))
-        rotation_matrix = glm.rotate(rotation_matrix, self.rotation.y, glm.vec3(0.0, 1.0, 0.0))
-        rotation_matrix = glm.rotate(rotation_matrix, self.rotation.z, glm.vec3(0.0, 0.0, 1.0))
+        """Gira a cena em torno da sua posição, compondo com a rotação atual (ângulos de Euler, como Object.rotate)."""
+        self.rotation = euler_rotation(glm.vec3(*rotation)) * self.rotation
 
+    def snapshot(self):
+        """Guarda as matrizes dos objetos e luzes que se movem nos ticks, para a interpolação (veja Object.snapshot)."""
         for obj in self.objects:
-            obj.position -= self.position
-            obj.position = glm.vec3(rotation_matrix * glm.vec4(obj.position, 1.0))
-            obj.position += self.position
-
-            obj.rotation += self.rotation
-
+            if obj.tick_methods:
+                obj.snapshot()
+        for light in self.lights:
+            light.snapshot()
         for scene in self.sub_scenes.values():
-            scene.rotate(rotation)
+            scene.snapshot()
 
     def tick(self, *args, **kwargs):
         for method in self.tick_methods:
@@ -93,4 +174,6 @@ class Scene:
             scene.tick(*args, **kwargs)
         for light in self.lights:
             light.tick(*args, **kwargs)
+        if self.bvh is not None:
+            self.bvh.refit_dynamic()
         return self
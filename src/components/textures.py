@@ -0,0 +1,319 @@
+"""
+Texturas compartilhadas: as imagens são decodificadas em um pool de threads (o PIL libera o GIL enquanto
+decodifica JPEG e PNG) e a thread do OpenGL só envia os pixels já prontos para a GPU.
+
+Cada imagem fica uma única vez na memória de vídeo: o TextureManager reaproveita a textura quando o mesmo arquivo é
+pedido de novo (ex.: o mesmo modelo registrado duas vezes) e quando arquivos diferentes têm o mesmo conteúdo (hash
+SHA-1 dos bytes do arquivo, ex.: uma textura copiada para o diretório de outro modelo).
+
+As texturas têm mipmaps. Se a imagem tiver um arquivo `.mips` atualizado (veja bake.py), os níveis prontos, talvez
+comprimidos, são lidos direto do arquivo mapeado na memória; senão, a imagem é decodificada com o PIL e os
+mipmaps são gerados na GPU (glGenerateMipmap).
+
+As texturas com algum pixel de alfa menor que 255 ficam em `translucent_textures`, para que a fila de renderização
+as desenhe depois das opacas, de trás para a frente (veja src/engine/render_queue.py).
+"""
+import hashlib
+import io
+import os
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.EXT.texture_compression_s3tc import GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+# A versão sem o wrapper do PyOpenGL recebe o tamanho dos dados, necessário quando eles vêm de um PBO
+from OpenGL.raw.GL.VERSION.GL_1_3 import glCompressedTexImage2D as compressed_tex_image_2d
+from PIL import Image
+
+from .bake import level_bytes, read_baked
+
+# IDs das texturas na GPU cuja imagem tem transparência. Toda textura passa por upload_texture, que atualiza o
+# conjunto, então um ID reaproveitado pelo OpenGL depois de apagado não herda a marca da textura anterior
+translucent_textures: Set[int] = set()
+
+
+@dataclass
+class DecodedTexture:
+    """
+    Imagem decodificada, pronta para o envio.
+
+    Atributos:
+        levels (List[Tuple[int, int, bytes | np.ndarray]]): Largura, altura e dados de cada nível de mipmap, com
+        a última linha da imagem primeiro (origem do OpenGL embaixo). Só o nível 0 quando a imagem foi decodificada
+        agora (os outros são gerados na GPU); a cadeia inteira quando veio de um arquivo `.mips`.
+
+        compressed (int): Formato comprimido do OpenGL dos níveis, ou 0 para RGBA 8 bits por canal.
+
+        digest (str): Hash SHA-1 dos bytes do arquivo.
+
+        decode_time (float): Tempo de leitura, hash e decodificação (ou de leitura do `.mips`), em segundos.
+
+        baked (bool): Se os níveis vieram de um arquivo `.mips`.
+
+        translucent (bool): Se algum pixel tem alfa menor que 255 (desenhada com blending, veja RenderQueue).
+    """
+    path: str
+    width: int
+    height: int
+    levels: List[Tuple[int, int, bytes]]
+    digest: str
+    decode_time: float
+    compressed: int = 0
+    baked: bool = False
+    translucent: bool = False
+
+    def memory(self) -> int:
+        """Bytes ocupados na GPU pela cadeia completa de mipmaps."""
+        total, width, height = 0, self.width, self.height
+        while True:
+            total += level_bytes(width, height, self.compressed)
+            if width == height == 1:
+                return total
+            width, height = max(1, width // 2), max(1, height // 2)
+
+
+@dataclass
+class TextureStats:
+    """
+    Custo de carregar uma textura pelo TextureManager.
+
+    Atributos:
+        decode_time (float): Tempo de decodificação (em uma thread do pool, se houver), em segundos.
+
+        upload_time (float): Tempo de envio para a GPU na thread do OpenGL, em segundos. Zero se `shared`.
+
+        shared (bool): Se o conteúdo já estava na GPU (mesmo hash) e a textura foi reaproveitada.
+
+        baked (bool): Se os níveis vieram de um arquivo `.mips`.
+
+        memory (int): Bytes na GPU, com mipmaps. Zero se `shared`.
+    """
+    path: str
+    texture_id: int
+    width: int
+    height: int
+    decode_time: float
+    upload_time: float
+    shared: bool
+    baked: bool = False
+    memory: int = 0
+
+
+def decode_texture(file_path: str, baked: bool = True) -> DecodedTexture:
+    """
+    Lê e decodifica uma imagem para RGBA. Não usa o OpenGL, então pode rodar em qualquer thread.
+
+    :param file_path: Caminho da imagem.
+    :param baked: Usa o arquivo `.mips` da imagem, se estiver atualizado.
+    """
+    start = time.perf_counter()
+    if baked:
+        image = read_baked(file_path)
+        if image is not None:
+            # O bake comprime em BC3 (DXT5) só as imagens com transparência; sem compressão, o alfa é conferido
+            if image.compressed:
+                translucent = image.compressed == GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+            else:
+                translucent = bool(np.frombuffer(image.levels[0][2], np.uint8)[3::4].min(initial=255) < 255)
+            return DecodedTexture(file_path, image.width, image.height, image.levels, image.digest,
+                                  time.perf_counter() - start, image.compressed, baked=True, translucent=translucent)
+
+    with open(file_path, "rb") as file:
+        data = file.read()
+    image = Image.open(io.BytesIO(data))
+    rgba = image.convert("RGBA")
+    pixels = rgba.tobytes("raw", "RGBA", 0, -1)
+    return DecodedTexture(file_path, image.width, image.height, [(image.width, image.height, pixels)],
+                          hashlib.sha1(data).hexdigest(), time.perf_counter() - start,
+                          translucent=rgba.getextrema()[3][0] < 255)
+
+
+def upload_texture(texture: DecodedTexture, offsets: List[int] = None) -> int:
+    """
+    Cria a textura na GPU com os níveis decodificados e completa a cadeia de mipmaps, se ela não veio pronta.
+    Precisa ser chamada na thread com o contexto OpenGL.
+
+    :param offsets: Se dado, os níveis são lidos do PBO ligado em GL_PIXEL_UNPACK_BUFFER, a partir destes
+    deslocamentos (um por nível), em vez de `texture.levels`.
+    :return: ID da textura.
+    """
+    texture_id = glGenTextures(1)
+    if texture.translucent:
+        translucent_textures.add(texture_id)
+    else:
+        translucent_textures.discard(texture_id)
+
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    # Objetos distantes leem um nível menor (trilinear), em vez de amostrar a imagem inteira
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+    for level, (width, height, data) in enumerate(texture.levels):
+        if offsets is not None:
+            data = ctypes.c_void_p(offsets[level])
+        if texture.compressed and offsets is not None:
+            compressed_tex_image_2d(GL_TEXTURE_2D, level, texture.compressed, width, height, 0,
+                                    level_bytes(width, height, texture.compressed), data)
+        elif texture.compressed:
+            glCompressedTexImage2D(GL_TEXTURE_2D, level, texture.compressed, width, height, 0, data)
+        else:
+            glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+
+    if not texture.baked:
+        glGenerateMipmap(GL_TEXTURE_2D)
+
+    return texture_id
+
+
+class TextureManager:
+    """
+    Cache de texturas da GPU, por caminho e por conteúdo, com decodificação em paralelo.
+
+    Uso: `prefetch` com as imagens que serão usadas (começa a decodificar em segundo plano) e depois `get` para
+    cada uma, na thread do OpenGL. `get` sem `prefetch` antes decodifica na hora.
+
+    Atributos:
+        workers (int): Threads de decodificação; por padrão, uma por núcleo além do da thread do OpenGL (até 8).
+        Com 0 (ex.: máquina com um núcleo), tudo é decodificado na thread que chama `get`.
+
+        baked (bool): Se usa os arquivos `.mips` das imagens, quando existem e estão atualizados.
+
+        stats (Dict[str, TextureStats]): Custo de cada arquivo carregado, pelo caminho normalizado.
+
+        models (WeakSet[Model]): Modelos que usam o cache, registrados ou não na Engine (ex.: placeholders). Veja
+        `users`.
+    """
+    def __init__(self, workers: int = None, baked: bool = True):
+        self.baked = baked
+        self.workers = min(8, (os.cpu_count() or 1) - 1) if workers is None else workers
+        self.executor: ThreadPoolExecutor | None = None
+        self.models = weakref.WeakSet()
+
+        self.pending: Dict[str, Future] = {}
+        self.by_path: Dict[str, int] = {}
+        self.by_digest: Dict[str, int] = {}
+        self.sizes: Dict[int, int] = {}
+        self.stats: Dict[str, TextureStats] = {}
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        return os.path.realpath(file_path)
+
+    def prefetch(self, paths: Iterable[str]):
+        """Começa a decodificar as imagens que ainda não estão na GPU nem sendo decodificadas."""
+        if not self.workers:
+            return
+        for path in paths:
+            key = self.key(path)
+            if key in self.by_path or key in self.pending:
+                continue
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="texture")
+            self.pending[key] = self.executor.submit(decode_texture, path, self.baked)
+
+    def get(self, file_path: str) -> int:
+        """
+        Devolve a textura do arquivo, enviando-a para a GPU se ainda não estiver lá.
+
+        :param file_path: Caminho da imagem.
+        :return: ID da textura, compartilhado com os outros pedidos do mesmo arquivo ou do mesmo conteúdo.
+        """
+        key = self.key(file_path)
+        texture_id = self.by_path.get(key)
+        if texture_id is not None:
+            return texture_id
+
+        return self.add(file_path, self.decode(file_path))
+
+    def decode(self, file_path: str) -> DecodedTexture:
+        """Imagem decodificada: o resultado do `prefetch`, se houver (esperando por ele), ou decodificada agora."""
+        future = self.pending.pop(self.key(file_path), None)
+        return future.result() if future else decode_texture(file_path, self.baked)
+
+    def add(self, file_path: str, texture: DecodedTexture, texture_id: int = None, upload_time: float = 0.0) -> int:
+        """
+        Registra uma imagem já decodificada. Se o conteúdo ainda não está na GPU, a textura é enviada agora, a não
+        ser que `texture_id` seja dado (textura já enviada por fora, ex.: aos poucos pelo AssetStreamer).
+
+        :return: ID da textura, compartilhado com os outros pedidos do mesmo arquivo ou do mesmo conteúdo.
+        """
+        start = time.perf_counter()
+        shared_id = self.by_digest.get(texture.digest)
+        shared = shared_id is not None
+        if shared:
+            if texture_id is not None and texture_id != shared_id:
+                glDeleteTextures(1, [texture_id])
+            texture_id = shared_id
+        else:
+            if texture_id is None:
+                texture_id = upload_texture(texture)
+                upload_time = time.perf_counter() - start
+            self.by_digest[texture.digest] = texture_id
+            self.sizes[texture_id] = texture.memory()
+
+        key = self.key(file_path)
+        self.by_path[key] = texture_id
+        self.stats[key] = TextureStats(file_path, texture_id, texture.width, texture.height, texture.decode_time,
+                                       0.0 if shared else upload_time, shared, texture.baked,
+                                       0 if shared else texture.memory())
+        return texture_id
+
+    def discard(self, file_path: str):
+        """Descarta uma imagem pedida em `prefetch` que acabou não sendo usada (ex.: sem material no OBJ)."""
+        future = self.pending.pop(self.key(file_path), None)
+        if future:
+            future.cancel()
+
+    def remove(self, texture_id: int):
+        """Apaga uma textura da GPU e a esquece: um novo `get` de um dos seus arquivos a carrega de novo."""
+        glDeleteTextures(1, [texture_id])
+        self.sizes.pop(texture_id, None)
+        self.by_digest = {digest: id_ for digest, id_ in self.by_digest.items() if id_ != texture_id}
+        for key in [key for key, id_ in self.by_path.items() if id_ == texture_id]:
+            del self.by_path[key]
+            self.stats.pop(key, None)
+
+    def users(self) -> Dict[int, int]:
+        """Quantos modelos residentes, entre todos os que usam o cache, têm cada textura."""
+        users = {}
+        for model in list(self.models):
+            if model.resident:
+                for texture_id in set(model.texture_ids.values()):
+                    users[texture_id] = users.get(texture_id, 0) + 1
+        return users
+
+    def memory(self) -> int:
+        """Bytes ocupados na GPU pelas texturas distintas, com mipmaps."""
+        return sum(self.sizes.values())
+
+    def report(self) -> List[str]:
+        """Uma linha por arquivo carregado: tamanho, tempo de decodificação e de envio, memória na GPU."""
+        lines = []
+        for stats in self.stats.values():
+            upload = "compartilhada" if stats.shared else \
+                f"envio {stats.upload_time * 1000:7.2f}ms, {stats.memory / 2 ** 20:.2f}MB"
+            source = ".mips" if stats.baked else "decodificação"
+            lines.append(f"{stats.path}: {stats.width}x{stats.height}, {source} {stats.decode_time * 1000:7.2f}ms,"
+                         f" {upload}")
+        return lines
+
+    def delete(self):
+        """Apaga as texturas da GPU e esvazia o cache."""
+        for future in self.pending.values():
+            future.cancel()
+        if self.sizes:
+            glDeleteTextures(len(self.sizes), list(self.sizes))
+        self.pending, self.by_path, self.by_digest, self.sizes, self.stats = {}, {}, {}, {}, {}
+
+    def shutdown(self):
+        """Encerra o pool de threads (as texturas continuam na GPU)."""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
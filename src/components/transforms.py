@@ -0,0 +1,115 @@
+"""
+Armazenamento opcional das transformações de muitos objetos em arrays contíguos (estrutura de arrays).
+
+Posições, rotações (ângulos de Euler, em radianos) e escalas de todos os objetos de um TransformStore ficam em
+arrays NumPy, e as matrizes de todos os objetos alterados são calculadas de uma vez, sem laço em Python.
+As matrizes já ficam no formato do buffer de instâncias (coluna a coluna, float32), então a fila de renderização
+pode copiá-las direto para a GPU.
+"""
+from typing import List
+
+import glm
+import numpy as np
+
+
+def compute_matrices(positions: np.ndarray, rotations: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Versão vetorizada de object.transform_matrix: translação * rotação em x, y e z * escala.
+
+    :param positions: Array (n, 3).
+    :param rotations: Array (n, 3) com os ângulos em x, y e z.
+    :param scales: Array (n, 3).
+    :return: Array (n, 4, 4) float32 coluna a coluna, ou seja, `matrices[i, coluna, linha]`.
+    """
+    n = len(positions)
+    cos, sin = np.cos(rotations.astype(np.float64)), np.sin(rotations.astype(np.float64))
+    cx, cy, cz = cos.T
+    sx, sy, sz = sin.T
+
+    # Rx * Ry * Rz, expandida
+    rotation = np.empty((n, 3, 3))
+    rotation[:, 0, 0] = cy * cz
+    rotation[:, 0, 1] = -cy * sz
+    rotation[:, 0, 2] = sy
+    rotation[:, 1, 0] = sx * sy * cz + cx * sz
+    rotation[:, 1, 1] = -sx * sy * sz + cx * cz
+    rotation[:, 1, 2] = -sx * cy
+    rotation[:, 2, 0] = -cx * sy * cz + sx * sz
+    rotation[:, 2, 1] = cx * sy * sz + sx * cz
+    rotation[:, 2, 2] = cx * cy
+
+    matrices = np.zeros((n, 4, 4), dtype=np.float32)
+    # Coluna j da parte 3x3 é a coluna j da rotação multiplicada pela escala j
+    matrices[:, :3, :3] = np.transpose(rotation * scales[:, None, :], (0, 2, 1))
+    matrices[:, 3, :3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+class TransformStore:
+    """
+    Transformações de vários objetos em arrays contíguos. Cada objeto guarda apenas o seu índice (veja Object).
+
+    Atributos:
+        positions, rotations, scales (np.ndarray): Arrays (capacidade, 3) float32.
+
+        matrices (np.ndarray): Array (capacidade, 4, 4) float32 com as matrizes, coluna a coluna.
+        Só é válido para índices que não estão em `dirty`; use `update` antes de ler.
+
+        dirty (np.ndarray): Array (capacidade,) bool, marcando os objetos cuja matriz precisa ser recalculada.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.count = 0
+        self.free: List[int] = []
+        self.positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.rotations = np.zeros((capacity, 3), dtype=np.float32)
+        self.scales = np.ones((capacity, 3), dtype=np.float32)
+        self.matrices = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self.dirty = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count - len(self.free)
+
+    def grow(self):
+        capacity = 2 * len(self.positions)
+        for name in ("positions", "rotations", "scales", "matrices", "dirty"):
+            old = getattr(self, name)
+            new = np.ones((capacity,) + old.shape[1:], dtype=old.dtype) if name == "scales" \
+                else np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def allocate(self) -> int:
+        """Reserva um índice com a transformação identidade."""
+        if self.free:
+            index = self.free.pop()
+        else:
+            if self.count == len(self.positions):
+                self.grow()
+            index = self.count
+            self.count += 1
+
+        self.positions[index] = 0.0
+        self.rotations[index] = 0.0
+        self.scales[index] = 1.0
+        self.dirty[index] = True
+        return index
+
+    def release(self, index: int):
+        """Libera o índice de um objeto que não será mais usado, para ser reaproveitado (veja Object.__del__)."""
+        self.dirty[index] = False
+        self.free.append(index)
+
+    def update(self):
+        """Recalcula, de uma vez, as matrizes de todos os objetos alterados desde a última chamada."""
+        indices = np.flatnonzero(self.dirty[:self.count])
+        if not len(indices):
+            return
+        self.matrices[indices] = compute_matrices(self.positions[indices], self.rotations[indices],
+                                                  self.scales[indices])
+        self.dirty[indices] = False
+
+    def matrix(self, index: int) -> glm.mat4:
+        if self.dirty[index]:
+            self.update()
+        return glm.mat4(*self.matrices[index].ravel().tolist())
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+from OpenGL.GL import GL_FLOAT, GL_HALF_FLOAT, GL_INT_2_10_10_10_REV, GL_SHORT, GL_FALSE, GL_TRUE
+
+# Maior valor de um inteiro de 16 bits com sinal, usado na quantização das posições
+POSITION_STEPS = 32767
+# Maior valor de um componente de 10 bits com sinal, usado no empacotamento das normais
+NORMAL_STEPS = 511
+
+
+@dataclass
+class VertexFormat:
+    """
+    Formato dos vértices de um Model no VBO.
+
+    Atributos:
+        interleaved (bool): Intercala posição, textura e normal de cada vértice, em vez de três blocos separados.
+
+        half_uvs (bool): Coordenadas de textura em half-float (4 bytes em vez de 8).
+        Precisão relativa de 2^-11, suficiente para texturas repetidas algumas dezenas de vezes.
+
+        packed_normals (bool): Normais normalizadas em GL_INT_2_10_10_10_REV (4 bytes em vez de 12).
+
+        quantized_positions (bool): Posições em inteiros de 16 bits (8 bytes com preenchimento, em vez de 12).
+        O shader recupera a posição com `positionOffset + positionScale * position`.
+
+    As opções de empacotamento só existem no formato intercalado e o ativam automaticamente.
+    """
+    interleaved: bool = False
+    half_uvs: bool = False
+    packed_normals: bool = False
+    quantized_positions: bool = False
+
+    def __post_init__(self):
+        if self.half_uvs or self.packed_normals or self.quantized_positions:
+            self.interleaved = True
+
+    @classmethod
+    def packed(cls, quantized_positions: bool = False) -> "VertexFormat":
+        return cls(True, True, True, quantized_positions)
+
+    def stride(self, has_normals: bool = True) -> int:
+        """Bytes ocupados por vértice."""
+        position = 8 if self.quantized_positions else 12
+        texture = 4 if self.half_uvs else 8
+        normal = (4 if self.packed_normals else 12) if has_normals else 0
+        return position + texture + normal
+
+
+def quantize_positions(positions: np.ndarray):
+    """
+    Quantiza posições (n, 3) para inteiros de 16 bits em torno do centro da caixa envolvente do modelo.
+    A posição original é `offset + scale * q`, com erro máximo de `scale / 2` por eixo (meio passo de quantização),
+    mais o arredondamento do float32 ao reconstruir a posição.
+
+    :param positions: Array (n, 3) float32.
+    :return: Uma tupla com q (n, 3) int16, offset (3,) float32 e scale (3,) float32.
+    """
+    if not len(positions):
+        return np.zeros((0, 3), dtype=np.int16), np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32)
+
+    low = positions.min(axis=0).astype(np.float64)
+    high = positions.max(axis=0).astype(np.float64)
+    offset = (low + high) / 2
+    scale = (high - low) / 2 / POSITION_STEPS
+    scale[scale == 0] = 1.0
+
+    q = np.clip(np.round((positions - offset) / scale), -POSITION_STEPS, POSITION_STEPS).astype(np.int16)
+    return q, offset.astype(np.float32), scale.astype(np.float32)
+
+
+def dequantize_positions(q: np.ndarray, offset: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Inverso de quantize_positions, igual ao que o vertex shader calcula."""
+    return offset + scale * q.astype(np.float32)
+
+
+def pack_normals(normals: np.ndarray) -> np.ndarray:
+    """
+    Normaliza e empacota normais (n, 3) no formato GL_INT_2_10_10_10_REV: x, y e z em 10 bits com sinal, w = 0.
+    O erro máximo por componente, já normalizado, é de meio passo: 1 / (2 * 511).
+
+    :param normals: Array (n, 3) float32.
+    :return: Array (n,) uint32.
+    """
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    unit = np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+    c = np.round(np.clip(unit, -1.0, 1.0) * NORMAL_STEPS).astype(np.int32) & 0x3FF
+    return (c[:, 0] | (c[:, 1] << 10) | (c[:, 2] << 20)).astype(np.uint32)
+
+
+def unpack_normals(packed: np.ndarray) -> np.ndarray:
+    """Inverso de pack_normals, com a regra de conversão de inteiros normalizados do OpenGL 4.2+."""
+    components = np.stack([(packed >> shift) & 0x3FF for shift in (0, 10, 20)], axis=1).astype(np.int32)
+    components[components >= 512] -= 1024
+    return np.maximum(components / NORMAL_STEPS, -1.0).astype(np.float32)
+
+
+def pack_vertices(vertices: np.ndarray, textures: np.ndarray, normals: np.ndarray, vertex_format: VertexFormat):
+    """
+    Monta o buffer intercalado de um modelo no formato pedido.
+
+    :param vertices: Posições achatadas de todos os vértices do modelo.
+    :param textures: Coordenadas de textura achatadas.
+    :param normals: Normais achatadas (pode ser vazio, e então o atributo de normal é omitido).
+    :param vertex_format: Formato dos vértices.
+    :return: Uma tupla com o buffer (n, stride) uint8, a lista de atributos (local, componentes, tipo, normalizado,
+    deslocamento em bytes) para glVertexAttribPointer, e o offset e scale de dequantização das posições.
+    """
+    n = len(vertices) // 3
+    positions = vertices.reshape(n, 3)
+    offset, scale = np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32)
+
+    columns: List[np.ndarray] = []
+    attributes: List[Tuple[int, int, int, int, int]] = []
+
+    if vertex_format.quantized_positions:
+        q, offset, scale = quantize_positions(positions)
+        # Preenche até 8 bytes para manter os atributos seguintes alinhados em 4 bytes
+        columns.append(np.concatenate([q, np.zeros((n, 1), dtype=np.int16)], axis=1))
+        attributes.append((0, 3, GL_SHORT, GL_FALSE))
+    else:
+        columns.append(positions.astype(np.float32))
+        attributes.append((0, 3, GL_FLOAT, GL_FALSE))
+
+    if vertex_format.half_uvs:
+        columns.append(textures.reshape(n, 2).astype(np.float16))
+        attributes.append((1, 2, GL_HALF_FLOAT, GL_FALSE))
+    else:
+        columns.append(textures.reshape(n, 2).astype(np.float32))
+        attributes.append((1, 2, GL_FLOAT, GL_FALSE))
+
+    if len(normals):
+        if vertex_format.packed_normals:
+            columns.append(pack_normals(normals.reshape(n, 3)).reshape(n, 1))
+            attributes.append((2, 4, GL_INT_2_10_10_10_REV, GL_TRUE))
+        else:
+            columns.append(normals.reshape(n, 3).astype(np.float32))
+            attributes.append((2, 3, GL_FLOAT, GL_FALSE))
+
+    parts = [np.ascontiguousarray(column).view(np.uint8).reshape(n, column.shape[1] * column.itemsize)
+             for column in columns]
+    offsets = np.cumsum([0] + [part.shape[1] for part in parts[:-1]])
+    attributes = [attribute + (int(start),) for attribute, start in zip(attributes, offsets)]
+
+    return np.concatenate(parts, axis=1), attributes, offset, scale
@@ -1,2 +1,7 @@
 from .engine import Engine
+from .render_queue import RenderQueue
+from .streaming import AssetStreamer
+from .assets import AssetManager
+from .bvh import BVH, ObjectBVH
+from .physics import Physics
 from .multiplayer import Multiplayer, Server
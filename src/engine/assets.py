@@ -0,0 +1,159 @@
+"""
+Gerenciador dos modelos carregados: um Model por diretório (e formato), contagem de quem usa cada um e um limite
+de memória de vídeo.
+
+Quando a memória dos modelos residentes (buffers e texturas) passa de `budget`, o AssetManager libera os buffers
+e texturas dos modelos sem usuários e depois dos desenhados há mais tempo (LRU), mas nunca os do quadro atual.
+Os arrays dos modelos liberados ficam na memória: no próximo uso (RenderQueue.add ou Model.draw), o modelo volta
+para a GPU sozinho (Model.restore), com as texturas pelo cache de texturas.
+"""
+import os
+from dataclasses import dataclass, astuple
+from typing import Dict, Iterable, List
+
+from src.components import Model, TextureManager, VertexFormat
+
+
+@dataclass
+class AssetStats:
+    """
+    Uso de memória e estado de um modelo.
+
+    Atributos:
+        geometry (int): Bytes dos buffers na GPU (0 se não residente).
+
+        textures (int): Bytes das texturas do modelo na GPU, mesmo as compartilhadas com outros modelos.
+
+        shared (int): Quantas das texturas do modelo outros modelos residentes também usam.
+
+        users (int): Objetos e cenas que usam o modelo.
+
+        last_drawn (int): Último quadro em que o modelo foi desenhado (-1 se nunca).
+
+        loads, evictions (int): Vezes que a geometria foi enviada para a GPU e liberada.
+    """
+    name: str
+    path: str
+    resident: bool
+    geometry: int
+    textures: int
+    shared: int
+    users: int
+    last_drawn: int
+    loads: int
+    evictions: int
+
+
+class AssetManager:
+    """
+    Registro dos modelos por diretório, com o limite de memória de vídeo. Usado pela Engine: `find`/`add` em
+    `register_model` e `trim` ao fim de cada quadro.
+
+    Atributos:
+        budget (int | None): Bytes de memória de vídeo para os modelos (buffers e texturas). None, sem limite.
+
+        models (Dict[tuple, Model]): Modelos pela chave de `key`.
+
+        counters (Dict[str, int]): Do último `trim`: `memory` (bytes usados depois dele), `evicted` (modelos
+        liberados) e `restored` (modelos que voltaram para a GPU desde o `trim` anterior).
+    """
+    def __init__(self, textures: TextureManager, budget: int = None):
+        self.textures = textures
+        self.budget = budget
+        self.models: Dict[tuple, Model] = {}
+        self.names: Dict[int, str] = {}
+        self.loads = 0
+        self.counters = {"memory": 0, "evicted": 0, "restored": 0}
+
+    @staticmethod
+    def key(root_dir: str, indexed: bool = False, vertex_format: VertexFormat = None, lods=(), **_) -> tuple:
+        """
+        Modelos do mesmo diretório, com os mesmos índices, formato de vértices e níveis de detalhe, são o mesmo
+        asset.
+        """
+        return (os.path.realpath(root_dir), bool(indexed), astuple(vertex_format or VertexFormat()),
+                tuple(sorted(lods, reverse=True)))
+
+    def find(self, root_dir: str, **kwargs) -> Model | None:
+        """O modelo já carregado de `root_dir` com as opções de Model em `kwargs`, se houver."""
+        return self.models.get(self.key(root_dir, **kwargs))
+
+    def add(self, name: str, model: Model, **kwargs):
+        self.models[self.key(model.root_dir, **kwargs)] = model
+        self.names[id(model)] = name
+
+    def texture_users(self) -> Dict[int, int]:
+        """
+        Quantos modelos residentes usam cada textura, contando também os que usam o cache de texturas sem estar
+        registrados aqui (ex.: placeholders e modelos criados direto com o TextureManager).
+        """
+        return self.textures.users()
+
+    def memory(self) -> int:
+        """Bytes na GPU: buffers dos modelos residentes e todas as texturas do cache."""
+        return sum(model.gpu_memory() for model in self.models.values()) + self.textures.memory()
+
+    def evict(self, model: Model, protected: Iterable[int] = ()):
+        """
+        Libera os buffers do modelo e as suas texturas que nenhum outro modelo residente usa (veja texture_users).
+
+        :param protected: Texturas que não podem ser apagadas (ex.: as de modelos ainda sendo enviados).
+        """
+        model.evict()
+        if model.texture_manager is not self.textures:
+            # Texturas próprias do modelo (sem o cache da Engine) não são contadas nem apagadas aqui
+            return
+        users = self.texture_users()
+        protected = set(protected)
+        for texture_id in set(model.texture_ids.values()):
+            if texture_id not in users and texture_id not in protected:
+                self.textures.remove(texture_id)
+
+    def trim(self, frame: int, protected: Iterable[int] = ()) -> List[Model]:
+        """
+        Libera modelos até a memória caber em `budget`: primeiro os sem usuários, depois os desenhados há mais
+        tempo. Os desenhados em `frame` (o quadro atual) ficam.
+
+        :return: Modelos liberados.
+        """
+        loads = sum(model.loads for model in self.models.values())
+        restored, self.loads = loads - self.loads, loads
+
+        evicted = []
+        memory = self.memory()
+        if self.budget is not None and memory > self.budget:
+            candidates = sorted((model for model in self.models.values()
+                                 if model.resident and model.last_drawn < frame),
+                                key=lambda model: (model.refcount > 0, model.last_drawn))
+            for model in candidates:
+                if memory <= self.budget:
+                    break
+                self.evict(model, protected)
+                evicted.append(model)
+                memory = self.memory()
+
+        self.counters = {"memory": memory, "evicted": len(evicted), "restored": restored}
+        return evicted
+
+    def stats(self) -> List[AssetStats]:
+        users = self.texture_users()
+        result = []
+        for model in self.models.values():
+            texture_ids = set(model.texture_ids.values()) if model.texture_ids else set()
+            textures = sum(self.textures.sizes.get(texture_id, 0) for texture_id in texture_ids)
+            shared = sum(1 for texture_id in texture_ids if users.get(texture_id, 0) > int(model.resident))
+            result.append(AssetStats(self.names.get(id(model), ""), model.root_dir, model.resident,
+                                     model.gpu_memory(), textures, shared, model.refcount, model.last_drawn,
+                                     model.loads, model.evictions))
+        return result
+
+    def report(self) -> List[str]:
+        """Uma linha por modelo, do que mais usa memória de vídeo para o que menos usa."""
+        lines = []
+        for stats in sorted(self.stats(), key=lambda stats: stats.geometry + stats.textures, reverse=True):
+            state = "residente" if stats.resident else "liberado"
+            lines.append(f"{stats.name} ({stats.path}): {state}, buffers {stats.geometry / 2 ** 20:.2f}MB, "
+                         f"texturas {stats.textures / 2 ** 20:.2f}MB ({stats.shared} compartilhadas), "
+                         f"{stats.users} usuários, desenhado no quadro {stats.last_drawn}, "
+                         f"{stats.loads} cargas, {stats.evictions} liberações")
+        return lines
@@ -0,0 +1,358 @@
+"""
+Hierarquia de volumes envolventes (BVH) sobre caixas alinhadas aos eixos, para consultas espaciais em mundos grandes:
+objetos dentro do tronco de visão, perto de um ponto ou atingidos por um raio.
+
+A árvore é guardada em arrays NumPy e percorrida nível a nível, testando todos os nós de um nível de uma vez.
+Os itens de cada nó ocupam um intervalo contíguo de `order`, então um nó completamente dentro da consulta devolve
+todos os seus itens sem descer até as folhas.
+"""
+from typing import List, Optional, Tuple
+
+import glm
+import numpy as np
+
+from src.components import Object, InteractiveObject
+from src.components.bounds import Bounds, transform_bounds
+
+
+def ranges_to_indices(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatena os intervalos [start, end) em um único array de índices, sem laço em Python."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+def box_distances(lows: np.ndarray, highs: np.ndarray, point: np.ndarray) -> np.ndarray:
+    """Quadrado da distância de `point` até cada caixa (zero para as caixas que o contêm)."""
+    gap = np.maximum(np.maximum(lows - point, point - highs), 0.0)
+    return (gap ** 2).sum(axis=1)
+
+
+def ray_boxes(lows: np.ndarray, highs: np.ndarray, origin: np.ndarray, inverse: np.ndarray):
+    """
+    Teste de placas (slabs) de um raio contra várias caixas.
+
+    :return: Uma tupla com a distância de entrada (n,) e de saída (n,) do raio em cada caixa.
+    O raio atinge a caixa quando `saída >= max(entrada, 0)`.
+    """
+    with np.errstate(invalid="ignore"):
+        t1 = (lows - origin) * inverse
+        t2 = (highs - origin) * inverse
+        # Componentes nulas da direção dão 0 * inf = nan: o raio é paralelo à placa, e só a limita se estiver fora
+        near = np.where(np.isnan(t1), -np.inf, np.minimum(t1, t2))
+        far = np.where(np.isnan(t2), np.inf, np.maximum(t1, t2))
+    return near.max(axis=1), far.min(axis=1)
+
+
+class BVH:
+    """
+    BVH sobre as caixas (lows, highs) de n itens, construída dividindo cada nó na mediana do maior eixo dos centros.
+
+    Atributos:
+        lows, highs (np.ndarray): Caixas dos itens, (n, 3).
+
+        order (np.ndarray): Permutação dos itens; o nó i contém os itens `order[start[i]:end[i]]`.
+
+        node_low, node_high (np.ndarray): Caixas dos nós, (m, 3). O nó 0 é a raiz.
+
+        left, right (np.ndarray): Filhos de cada nó (-1 nas folhas). parent (np.ndarray): Pai de cada nó (-1 na raiz).
+
+        leaf_of (np.ndarray): Folha de cada item, usada no refit incremental.
+    """
+    def __init__(self, lows: np.ndarray, highs: np.ndarray, leaf_size: int = 8):
+        self.leaf_size = leaf_size
+        self.build(lows, highs)
+
+    def __len__(self):
+        return len(self.lows)
+
+    def build(self, lows: np.ndarray, highs: np.ndarray):
+        self.lows = np.asarray(lows, dtype=np.float64).reshape(-1, 3).copy()
+        self.highs = np.asarray(highs, dtype=np.float64).reshape(-1, 3).copy()
+        n = len(self.lows)
+        self.order = np.arange(n)
+        centers = (self.lows + self.highs) / 2
+
+        starts, ends, lefts, rights, parents, depths = [0], [n], [-1], [-1], [-1], [0]
+        stack = [0] if n > self.leaf_size else []
+        while stack:
+            node = stack.pop()
+            start, end = starts[node], ends[node]
+            items = self.order[start:end]
+            axis = int(np.ptp(centers[items], axis=0).argmax())
+            middle = (end - start) // 2
+            # Mediana no maior eixo: metade dos itens de cada lado
+            self.order[start:end] = items[np.argpartition(centers[items, axis], middle)]
+
+            for child_start, child_end in ((start, start + middle), (start + middle, end)):
+                child = len(starts)
+                starts.append(child_start)
+                ends.append(child_end)
+                lefts.append(-1)
+                rights.append(-1)
+                parents.append(node)
+                depths.append(depths[node] + 1)
+                if child_end - child_start > self.leaf_size:
+                    stack.append(child)
+            lefts[node], rights[node] = len(starts) - 2, len(starts) - 1
+
+        self.start, self.end = np.array(starts), np.array(ends)
+        self.left, self.right, self.parent = np.array(lefts), np.array(rights), np.array(parents)
+        self.depth = np.array(depths)
+        self.is_leaf = self.left < 0
+
+        self.leaf_of = np.empty(n, dtype=np.int64)
+        leaves = np.flatnonzero(self.is_leaf)
+        for leaf in leaves:
+            self.leaf_of[self.order[self.start[leaf]:self.end[leaf]]] = leaf
+
+        self.node_low = np.zeros((len(starts), 3))
+        self.node_high = np.zeros((len(starts), 3))
+        self.refit()
+
+    def refit(self, indices: np.ndarray = None, lows: np.ndarray = None, highs: np.ndarray = None):
+        """
+        Atualiza as caixas dos nós sem mudar a topologia da árvore.
+
+        :param indices: Itens que mudaram. Se None, todas as caixas são recalculadas (em uma passada vetorizada).
+        :param lows: Novas caixas dos itens em `indices` (n, 3). Se None, usa as caixas atuais de self.lows.
+        :param highs: Idem, para self.highs.
+        """
+        if indices is not None and lows is not None:
+            self.lows[indices] = lows
+            self.highs[indices] = highs
+        if not len(self.lows):
+            return
+
+        if indices is None:
+            leaves = np.flatnonzero(self.is_leaf)
+        else:
+            leaves = np.unique(self.leaf_of[np.asarray(indices, dtype=np.int64)])
+        # Em ordem de início; no refit completo, as folhas cobrem `order` inteiro na ordem original
+        leaves = leaves[np.argsort(self.start[leaves])]
+
+        # Folhas: menor e maior valor entre os seus itens, em um único reduceat sobre os intervalos concatenados
+        items = self.order if indices is None else self.order[ranges_to_indices(self.start[leaves], self.end[leaves])]
+        lengths = self.end[leaves] - self.start[leaves]
+        offsets = np.cumsum(lengths) - lengths
+        self.node_low[leaves] = np.minimum.reduceat(self.lows[items], offsets)
+        self.node_high[leaves] = np.maximum.reduceat(self.highs[items], offsets)
+
+        # Nós internos: do nível mais profundo para a raiz, todos os nós de um nível de uma vez
+        if indices is None:
+            internal = np.flatnonzero(~self.is_leaf)
+            for depth in range(int(self.depth.max()), -1, -1):
+                self.update_nodes(internal[self.depth[internal] == depth])
+        else:
+            nodes = np.unique(self.parent[leaves])
+            nodes = nodes[nodes >= 0]
+            while len(nodes):
+                # Processa primeiro os mais profundos, para que os filhos já estejam atualizados
+                deepest = self.depth[nodes].max()
+                level = nodes[self.depth[nodes] == deepest]
+                self.update_nodes(level)
+                parents = self.parent[level]
+                nodes = np.unique(np.concatenate([nodes[self.depth[nodes] != deepest], parents[parents >= 0]]))
+
+    def update_nodes(self, nodes: np.ndarray):
+        self.node_low[nodes] = np.minimum(self.node_low[self.left[nodes]], self.node_low[self.right[nodes]])
+        self.node_high[nodes] = np.maximum(self.node_high[self.left[nodes]], self.node_high[self.right[nodes]])
+
+    def traverse(self, classify, test_items) -> np.ndarray:
+        """
+        Percorre a árvore nível a nível.
+
+        :param classify: Função (lows, highs) -> (fora, dentro) com arrays bool por nó.
+        :param test_items: Função (índices dos itens) -> array bool, para os itens de folhas parcialmente dentro.
+        :return: Índices dos itens aceitos, em ordem crescente.
+        """
+        if not len(self.lows):
+            return np.zeros(0, dtype=np.int64)
+
+        accepted = []
+        frontier = np.array([0])
+        while len(frontier):
+            outside, inside = classify(self.node_low[frontier], self.node_high[frontier])
+            whole = frontier[inside & ~outside]
+            partial = frontier[~inside & ~outside]
+            accepted.append(self.order[ranges_to_indices(self.start[whole], self.end[whole])])
+
+            leaves = partial[self.is_leaf[partial]]
+            if len(leaves):
+                items = self.order[ranges_to_indices(self.start[leaves], self.end[leaves])]
+                accepted.append(items[test_items(items)])
+
+            internal = partial[~self.is_leaf[partial]]
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+
+        return np.sort(np.concatenate(accepted))
+
+    def query_frustum(self, planes: np.ndarray) -> np.ndarray:
+        """
+        Itens cujas caixas estão dentro ou cruzando o tronco de visão (teste conservador, como Frustum.boxes_visible).
+
+        :param planes: Array (6, 4) com os planos do tronco (Frustum.planes), normais para dentro.
+        Os planos não precisam estar normalizados, então podem ser os planos do mundo multiplicados por uma matriz.
+        :return: Índices dos itens, em ordem crescente.
+        """
+        normals, offsets = planes[:, :3], planes[:, 3]
+        absolute = np.abs(normals).T
+
+        def distances(lows, highs):
+            return ((lows + highs) / 2) @ normals.T + offsets, ((highs - lows) / 2) @ absolute
+
+        def classify(lows, highs):
+            distance, reach = distances(lows, highs)
+            return (distance < -reach).any(axis=1), (distance >= reach).all(axis=1)
+
+        def test_items(items):
+            distance, reach = distances(self.lows[items], self.highs[items])
+            return (distance >= -reach).all(axis=1)
+
+        return self.traverse(classify, test_items)
+
+    def query_sphere(self, center, radius: float) -> np.ndarray:
+        """Itens cujas caixas tocam a esfera. Com raio 0, os itens cujas caixas contêm o ponto `center`."""
+        center = np.asarray(center, dtype=np.float64)
+        squared = radius * radius
+
+        def classify(lows, highs):
+            outside = box_distances(lows, highs, center) > squared
+            # Dentro: o canto mais distante da caixa também está na esfera
+            farthest = np.maximum(np.abs(lows - center), np.abs(highs - center))
+            return outside, (farthest ** 2).sum(axis=1) <= squared
+
+        def test_items(items):
+            return box_distances(self.lows[items], self.highs[items], center) <= squared
+
+        return self.traverse(classify, test_items)
+
+    def query_point(self, point) -> np.ndarray:
+        return self.query_sphere(point, 0.0)
+
+    def ray_cast(self, origin, direction, max_distance: float = np.inf) -> Optional[Tuple[int, float]]:
+        """
+        Item cuja caixa o raio atinge primeiro.
+
+        :param origin: Origem do raio.
+        :param direction: Direção do raio. As distâncias são medidas em múltiplos dela.
+        :param max_distance: Distância máxima ao longo do raio.
+        :return: Uma tupla (índice do item, distância de entrada) ou None se nenhuma caixa for atingida.
+        Um raio que começa dentro de uma caixa a atinge na distância 0.
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / np.asarray(direction, dtype=np.float64)
+
+        def hits(lows, highs):
+            near, far = ray_boxes(lows, highs, origin, inverse)
+            return (far >= np.maximum(near, 0.0)) & (near <= max_distance), near
+
+        def classify(lows, highs):
+            hit, _ = hits(lows, highs)
+            return ~hit, np.zeros(len(lows), dtype=bool)
+
+        items = self.traverse(classify, lambda items: hits(self.lows[items], self.highs[items])[0])
+        if not len(items):
+            return None
+        _, near = hits(self.lows[items], self.highs[items])
+        near = np.maximum(near, 0.0)
+        best = int(near.argmin())
+        return int(items[best]), float(near[best])
+
+
+def object_bounds(objects: List[Object]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Caixas dos objetos no espaço da cena que os contém (só com as suas próprias matrizes), calculadas de uma vez.
+    Objetos sem modelo ocupam apenas o ponto da sua posição.
+    """
+    if not objects:
+        return np.zeros((0, 3)), np.zeros((0, 3))
+
+    empty = Bounds.from_positions(np.zeros((1, 3)))
+    bounds = [obj.model.bounds if obj.model is not None and obj.model.bounds is not None else empty
+              for obj in objects]
+    matrices = np.array([np.array(obj.model_matrix()) for obj in objects], dtype=np.float64)
+    centers, extents, _ = transform_bounds(np.array([b.center for b in bounds]), np.array([b.extent for b in bounds]),
+                                           np.array([b.radius for b in bounds]), matrices)
+    return centers - extents, centers + extents
+
+
+class ObjectBVH(BVH):
+    """
+    BVH sobre os objetos de uma cena, no espaço da cena: mover a cena inteira não exige refazer a árvore.
+
+    Objetos estáticos entram apenas na construção. Os dinâmicos (por padrão, os InteractiveObject e os objetos com
+    métodos de tick, como F e Saucer em main.py) são verificados por `refit_dynamic`, que refaz apenas o caminho
+    das folhas dos que se moveram até a raiz.
+
+    Atributos:
+        objects (List[Object]): Objetos indexados; os índices devolvidos pelas consultas são posições nesta lista.
+
+        dynamic (np.ndarray): Índices dos objetos que podem se mover.
+    """
+    def __init__(self, objects: List[Object], dynamic: List[Object] = None, leaf_size: int = 8):
+        self.objects: List[Object] = []
+        self.dynamic = np.zeros(0, dtype=np.int64)
+        self.matrices: List[glm.mat4] = []
+        self.dynamic_objects = dynamic
+        super().__init__(np.zeros((0, 3)), np.zeros((0, 3)), leaf_size)
+        self.rebuild(objects)
+
+    def rebuild(self, objects: List[Object]):
+        """Reconstrói a árvore, por exemplo depois que objetos foram adicionados à cena."""
+        self.objects = list(objects)
+        if self.dynamic_objects is None:
+            dynamic = [i for i, obj in enumerate(self.objects) if isinstance(obj, InteractiveObject) or obj.tick_methods]
+        else:
+            ids = set(map(id, self.dynamic_objects))
+            dynamic = [i for i, obj in enumerate(self.objects) if id(obj) in ids]
+        self.dynamic = np.array(dynamic, dtype=np.int64)
+        self.matrices = [self.objects[i].model_matrix() for i in dynamic]
+        self.build(*object_bounds(self.objects))
+
+    def refit_dynamic(self) -> int:
+        """
+        Atualiza as caixas dos objetos dinâmicos que se moveram desde a última chamada.
+
+        :return: Quantidade de objetos atualizados.
+        """
+        moved = []
+        for slot, index in enumerate(self.dynamic):
+            matrix = self.objects[index].model_matrix()
+            if matrix is not self.matrices[slot] and matrix != self.matrices[slot]:
+                self.matrices[slot] = matrix
+                moved.append(index)
+
+        if moved:
+            lows, highs = object_bounds([self.objects[i] for i in moved])
+            self.refit(np.array(moved), lows, highs)
+        return len(moved)
+
+    def refit_models(self, models) -> int:
+        """
+        Atualiza as caixas dos objetos de `models` cujos volumes mudaram (ex.: modelos que acabaram de ser
+        carregados pelo AssetStreamer, indexados antes como um ponto).
+
+        :return: Quantidade de objetos atualizados.
+        """
+        ids = set(map(id, models))
+        changed = [i for i, obj in enumerate(self.objects) if obj.model is not None and id(obj.model) in ids]
+        if changed:
+            lows, highs = object_bounds([self.objects[i] for i in changed])
+            self.refit(np.array(changed), lows, highs)
+        return len(changed)
+
+    def visible(self, frustum, world: glm.mat4 = None) -> List[Object]:
+        """
+        Objetos que podem estar dentro do tronco de visão, na ordem em que estão na cena.
+
+        :param frustum: Frustum da câmera, no espaço do mundo.
+        :param world: Matriz global da cena. Os planos são levados para o espaço da cena, em vez de cada caixa para
+        o espaço do mundo.
+        """
+        planes = frustum.planes if world is None else frustum.planes @ np.array(world, dtype=np.float64)
+        return [self.objects[i] for i in self.query_frustum(planes)]
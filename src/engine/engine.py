@@ -1,28 +1,17 @@
+import os
+from concurrent.futures import as_completed
 from typing import List, Dict, Set
 
-from OpenGL.GL.shaders import ShaderProgram
+from src.components import Object, Model, Scene, InteractiveObject, TransformStore, TextureManager, LodView
+from src.profiler import profiler
+from src.view import Program, Frustum
 
-from src.components import Object, Model, Scene, BoundObject, InteractiveObject
-
-
-class Physics:
-    """
-    Classe responsável por gerenciar a física do jogo.
-    No momento a física é apenas para bounding, ou seja, para limitar espaços onde objetos podem ser movidos.
-    """
-    def __init__(self):
-        self.objects: List[BoundObject] = []
-
-    def register_object(self, obj: BoundObject):
-        self.objects.append(obj)
-
-    def tick(self, interactive_objects: List[InteractiveObject], delta):
-        for obj in self.objects:
-            if not isinstance(obj, BoundObject):
-                continue
-            for interactive_object in interactive_objects:
-                if not obj.contains(interactive_object.position):
-                    interactive_object.interact(obj, delta)
+from .assets import AssetManager
+from .bvh import ObjectBVH
+from .loader import ModelLoader, attach_geometry, release
+from .physics import Physics
+from .render_queue import RenderQueue
+from .streaming import AssetStreamer
 
 
 class Engine:
@@ -30,7 +19,7 @@ class Engine:
     Classe responsável por gerenciar os objetos e cenas do jogo.
     Tem duas funções principais: `tick` e `render`.
     """
-    def __init__(self, shader_program: ShaderProgram):
+    def __init__(self, shader_program: Program):
         self.objects: List[Object] = []
         self.interactive_objects: List[InteractiveObject] = []
         self.shader_program = shader_program
@@ -39,13 +28,127 @@ class Engine:
         self.scenes: Dict[str, Scene] = {}
 
         self.physics = Physics()
+        self.render_queue = RenderQueue()
+        # Transformações dos objetos numerosos (ex.: árvores), calculadas em lote
+        self.transforms = TransformStore()
+        # Texturas de todos os modelos, decodificadas em paralelo e enviadas uma vez por imagem
+        self.textures = TextureManager()
+        # Modelos registrados com asynchronous=True, carregados em segundo plano e enviados aos poucos
+        self.streamer = AssetStreamer()
+        # Um modelo por diretório, com o limite de memória de vídeo (assets.budget, sem limite por padrão)
+        self.assets = AssetManager(self.textures)
         self.day = None
 
-    def register_model(self, name: str, wavefront_path: str):
-        model = Model(self.shader_program, wavefront_path)
+    def register_model(self, name: str, wavefront_path: str, asynchronous: bool = False, **kwargs):
+        """
+        Carrega um modelo do diretório `wavefront_path`. Argumentos extras (ex.: `indexed`, `placeholder`, `lods`)
+        vão para Model.
+
+        :param asynchronous: Devolve o modelo na hora, ainda não residente, e o carrega em segundo plano (veja
+        AssetStreamer); ele passa a ser desenhado no quadro em que fica pronto.
+        :return: O modelo; se o diretório já foi registrado (com os mesmos `indexed`, `vertex_format` e `lods`), o
+        mesmo Model de antes, agora também com o nome `name`.
+        """
+        model = self.assets.find(wavefront_path, **kwargs)
+        if model is None:
+            kwargs.setdefault("texture_manager", self.textures)
+            model = Model(self.shader_program, wavefront_path, streamed=asynchronous, **kwargs)
+            if asynchronous:
+                self.streamer.load(model)
+            self.assets.add(name, model, **kwargs)
         self.models[name] = model
         return model
 
+    def register_models(self, models: Dict[str, str], workers: int = None, asynchronous: bool = False,
+                        **kwargs) -> Dict[str, Model]:
+        """
+        Carrega vários modelos de uma vez. Os OBJ são lidos e triangulados em um pool de processos (veja loader.py)
+        enquanto as texturas decodificam em threads; cada modelo vai para a GPU, nesta thread, assim que fica pronto.
+
+        :param models: Nome -> diretório do modelo, como em `register_model`.
+        :param workers: Processos de leitura; por padrão, um por núcleo além do desta thread (até 8). Com 0 ou 1,
+        os modelos são lidos aqui mesmo, um a um.
+        :param asynchronous: Como em `register_model`: os modelos voltam na hora e são carregados em segundo plano,
+        pelo AssetStreamer (e não pelo pool de processos).
+        :param kwargs: Argumentos extras para Model, iguais para todos os modelos.
+        :return: Nome -> Model, na ordem de `models`.
+        """
+        if asynchronous:
+            return {name: self.register_model(name, root_dir, asynchronous=True, **kwargs)
+                    for name, root_dir in models.items()}
+
+        self.prefetch_textures(models.values())
+        if workers is None:
+            workers = min(8, (os.cpu_count() or 1) - 1)
+        if workers <= 1 or len(models) <= 1:
+            return {name: self.register_model(name, root_dir, **kwargs) for name, root_dir in models.items()}
+
+        # Diretórios já registrados, ou repetidos no lote, não são lidos de novo
+        loaded, first = {}, {}
+        for name, root_dir in models.items():
+            model = self.assets.find(root_dir, **kwargs)
+            if model is not None:
+                loaded[name] = model
+            else:
+                first.setdefault(self.assets.key(root_dir, **kwargs), name)
+        unique = {name: models[name] for name in first.values()}
+
+        kwargs.setdefault("texture_manager", self.textures)
+        loader = ModelLoader(max(1, min(workers, len(unique))))
+        pending = {loader.submit(root_dir, kwargs.get("use_cache", True), kwargs.get("indexed", False),
+                                 kwargs.get("lods", ())): name
+                   for name, root_dir in unique.items()}
+        try:
+            for future in as_completed(list(pending)):
+                name = pending.pop(future)
+                geometry = attach_geometry(future.result())
+                loaded[name] = Model(self.shader_program, models[name], geometry=geometry, **kwargs)
+                self.assets.add(name, loaded[name], **kwargs)
+        finally:
+            # Se algum modelo falhou, os blocos de memória dos que já estavam prontos são liberados
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    release(future.result())
+            loader.shutdown()
+
+        for name, root_dir in models.items():
+            if name not in loaded:
+                loaded[name] = loaded[first[self.assets.key(root_dir, **kwargs)]]
+            self.models[name] = loaded[name]
+        return {name: loaded[name] for name in models}
+
+    def prefetch_textures(self, root_dirs):
+        """
+        Começa a decodificar as texturas dos modelos em `root_dirs` antes de registrá-los, para que a decodificação
+        de todas as imagens rode em paralelo com a leitura dos OBJ.
+        """
+        for root_dir in root_dirs:
+            self.textures.prefetch(Model.get_textures(root_dir).values())
+
+    def stream(self, budget: float = None) -> List[Model]:
+        """
+        Avança o carregamento em segundo plano (veja AssetStreamer.update) e atualiza as BVHs das cenas com os
+        volumes dos modelos que ficaram residentes. Chamado a cada quadro por `render`.
+
+        :return: Modelos que ficaram residentes.
+        """
+        resident = self.streamer.update(budget)
+        if resident:
+            self.refit_scenes(self.scenes.values(), resident)
+        return resident
+
+    def finish_streaming(self) -> List[Model]:
+        """Termina de carregar, sem limite de bytes, todos os modelos pedidos em segundo plano."""
+        self.streamer.wait()
+        return self.stream(float("inf"))
+
+    @staticmethod
+    def refit_scenes(scenes, models: List[Model]):
+        for scene in scenes:
+            if scene.bvh is not None:
+                scene.bvh.refit_models(models)
+            Engine.refit_scenes(scene.sub_scenes.values(), models)
+
     def register_object(self, obj: List | Object):
         if isinstance(obj, InteractiveObject):
             self.interactive_objects.append(obj)
@@ -59,19 +162,66 @@ class Engine:
     def register_scene(self, scene: Scene):
         self.scenes[scene.name] = scene
 
-    def tick(self, key_actions: Set[int], delta: float, player=None):
-        """Chama o método tick de todos os objetos e cenas registrados."""
+    @staticmethod
+    def index_scene(scene: Scene, dynamic: List[Object] = None, leaf_size: int = 8) -> ObjectBVH:
+        """
+        Cria uma BVH sobre os objetos de `scene`, usada no descarte por visibilidade e em consultas espaciais.
+        Vale a pena em cenas com muitos objetos, como florestas.
+
+        :param scene: Cena (não inclui as sub-cenas, que podem ter a sua própria BVH).
+        :param dynamic: Objetos que se movem; se None, os InteractiveObject e os objetos com métodos de tick.
+        :param leaf_size: Máximo de objetos por folha.
+        :return: A BVH, também guardada em `scene.bvh`.
+        """
+        scene.bvh = ObjectBVH(scene.objects, dynamic, leaf_size)
+        return scene.bvh
+
+    def snapshot(self):
+        """Guarda o estado dos objetos que se movem antes de um tick, para a interpolação em `render`."""
         for obj in self.objects + self.interactive_objects:
-            obj.tick(key_actions, delta)
-
+            obj.snapshot()
         for scene in self.scenes.values():
-            scene.tick(key_actions, delta, player)
-
-        self.physics.tick(self.interactive_objects, delta)
+            scene.snapshot()
 
-    def render(self):
-        """Chama o método draw de todos os objetos e cenas registrados."""
-        for obj in self.objects:
-            obj.draw()
-        for scene in self.scenes.values():
-            scene.draw()
+    def tick(self, key_actions: Set[int], delta: float, player=None):
+        """Chama o método tick de todos os objetos e cenas registrados."""
+        with profiler.scope("Engine.tick"):
+            self.snapshot()
+            for obj in self.objects + self.interactive_objects:
+                obj.tick(key_actions, delta)
+
+            for scene in self.scenes.values():
+                scene.tick(key_actions, delta, player)
+
+            self.physics.tick(self.interactive_objects, delta)
+
+    def render(self, frustum: Frustum = None, alpha: float = 1.0, lod_view: LodView = None, eye=None):
+        """
+        Coleta os objetos e cenas registrados na fila de renderização e os desenha ordenados pelo estado do OpenGL.
+        Objetos fora de cenas são desenhados sem iluminação.
+
+        :param frustum: Tronco de visão da câmera. Objetos completamente fora dele não são desenhados.
+        :param alpha: Fração do passo de simulação decorrida desde o último tick. Os objetos que se movem são
+        desenhados entre o estado anterior e o atual.
+        :param lod_view: Câmera, para desenhar os modelos com níveis de detalhe (registrados com `lods`) no nível
+        do seu tamanho na tela. Se None, os modelos são desenhados completos.
+        :param eye: Posição da câmera, para desenhar as partes transparentes de trás para a frente. Se None, a de
+        `lod_view`, se houver.
+        """
+        with profiler.scope("Engine.stream"):
+            self.stream()
+
+        self.render_queue.clear()
+        self.render_queue.frustum = frustum
+        self.render_queue.lod_view = lod_view
+        self.render_queue.eye = eye if eye is not None else lod_view.eye if lod_view is not None else None
+        self.render_queue.alpha = alpha
+        with profiler.gpu_scope("Engine.render"):
+            for obj in self.objects:
+                obj.collect(self.render_queue)
+            for scene in self.scenes.values():
+                scene.collect(self.render_queue)
+            with profiler.scope("RenderQueue.submit"):
+                self.render_queue.submit()
+        with profiler.scope("AssetManager.trim"):
+            self.assets.trim(self.render_queue.frame, self.streamer.texture_ids())
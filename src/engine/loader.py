@@ -0,0 +1,171 @@
+"""
+Carregamento de modelos em um pool de processos.
+
+Ler e triangular um OBJ é trabalho de CPU em Python (e NumPy), que não roda em paralelo em threads por causa do
+GIL. Cada processo do pool lê um modelo inteiro (load_geometry) e copia os arrays resultantes para um único bloco
+de memória compartilhada; o processo principal só recebe o nome do bloco e a posição de cada array, e monta os
+arrays como visões desse bloco, sem cópia nem pickle dos dados. O envio para a GPU continua na thread com o
+contexto OpenGL (Model.apply_geometry).
+
+Os processos vêm de um forkserver, e não de um fork do processo principal: o fork copiaria um processo com
+contexto OpenGL e threads (ex.: as de decodificação de texturas) no meio do trabalho. O forkserver já importa o
+módulo dos modelos, então cada processo novo começa sem o custo dos imports.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.components.model import ModelGeometry, load_geometry
+
+# Alinhamento de cada array dentro do bloco (linha de cache)
+ALIGNMENT = 64
+
+# (deslocamento, dtype, forma) de um array no bloco; None para os índices fora do modo indexado
+ArrayLayout = Tuple[int, str, Tuple[int, ...]] | None
+
+
+@dataclass
+class SharedGeometry:
+    """
+    Geometria de um modelo lida em outro processo: o que volta do pool, em vez dos arrays.
+
+    Atributos:
+        name (str | None): Nome do bloco de memória compartilhada, ou None se o modelo não tem nenhum material
+        com textura (nada a compartilhar).
+
+        layout (List[Dict[str, List[ArrayLayout]]]): Para o modelo completo e cada nível de detalhe, por
+        material, a posição das posições, coordenadas de textura, normais e índices no bloco.
+
+        lod_errors (List[float]): Erro de cada nível de detalhe (veja ModelGeometry).
+
+        load_time (float): Tempo de leitura no processo do pool, em segundos.
+    """
+    wavefront_file: str
+    available_textures: Dict[str, str]
+    name: str | None
+    size: int
+    layout: List[Dict[str, List[ArrayLayout]]]
+    load_time: float
+    lod_errors: List[float]
+
+
+class SharedSegment(SharedMemory):
+    """
+    Bloco de memória compartilhada cujos arrays podem viver mais que o objeto: `close` com arrays ainda usando o
+    bloco não faz nada, e o mapeamento é desfeito quando o último deles for coletado.
+    """
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+
+def load_shared(root_dir: str, use_cache: bool = True, indexed: bool = False, lods=()) -> SharedGeometry:
+    """
+    Roda no processo do pool: lê o modelo (com os níveis de detalhe pedidos em `lods`) e copia os arrays para um
+    bloco novo de memória compartilhada.
+    O bloco sobrevive ao processo; quem recebe o resultado precisa chamar attach_geometry (ou release).
+    """
+    start = time.perf_counter()
+    geometry = load_geometry(root_dir, use_cache, indexed, lods)
+    levels = [geometry.materials] + geometry.lods
+
+    layout, size = [], 0
+    for materials in levels:
+        layout.append({})
+        for material, arrays in materials.items():
+            layout[-1][material] = []
+            for array in arrays:
+                if array is None:
+                    layout[-1][material].append(None)
+                    continue
+                size = -(-size // ALIGNMENT) * ALIGNMENT
+                layout[-1][material].append((size, array.dtype.str, array.shape))
+                size += array.nbytes
+
+    name = None
+    if size:
+        shm = SharedMemory(create=True, size=size)
+        for materials, positions in zip(levels, layout):
+            for material, arrays in materials.items():
+                for array, position in zip(arrays, positions[material]):
+                    if position is not None:
+                        offset, dtype, shape = position
+                        np.ndarray(shape, dtype, shm.buf, offset)[...] = array
+        name = shm.name
+        shm.close()
+        # O processo principal passa a ser o dono do bloco (attach_geometry o remove com unlink); sem isto, o
+        # resource tracker deste processo o apagaria, ou avisaria de um vazamento, ao encerrar
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    return SharedGeometry(geometry.wavefront_file, geometry.available_textures, name, size, layout,
+                          time.perf_counter() - start, geometry.lod_errors)
+
+
+def attach_geometry(shared: SharedGeometry) -> ModelGeometry:
+    """
+    Monta a geometria com arrays que são visões do bloco compartilhado. O nome do bloco é removido na hora
+    (unlink); a memória continua válida enquanto os arrays existirem.
+    """
+    segment = None
+    levels = [{} for _ in shared.layout]
+    if shared.name is not None:
+        segment = SharedSegment(name=shared.name)
+        segment.unlink()
+        for materials, layout in zip(levels, shared.layout):
+            for material, positions in layout.items():
+                arrays = []
+                for position in positions:
+                    if position is None:
+                        arrays.append(None)
+                        continue
+                    offset, dtype, shape = position
+                    dtype = np.dtype(dtype)
+                    count = int(np.prod(shape))
+                    # frombuffer prende o buffer, então o bloco não pode ser fechado enquanto o array existir
+                    arrays.append(np.frombuffer(segment.buf, dtype, count, offset).reshape(shape))
+                materials[material] = tuple(arrays)
+
+    return ModelGeometry(shared.wavefront_file, shared.available_textures, levels[0], segment, levels[1:],
+                         shared.lod_errors)
+
+
+def release(shared: SharedGeometry):
+    """Remove o bloco de um resultado que não vai ser usado (ex.: outro modelo do lote falhou)."""
+    if shared.name is not None:
+        segment = SharedSegment(name=shared.name)
+        segment.close()
+        segment.unlink()
+
+
+class ModelLoader:
+    """
+    Pool de processos para ler modelos. Os processos são criados no primeiro `submit` e ficam para os próximos
+    lotes até `shutdown`.
+
+    Atributos:
+        workers (int): Número de processos.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor: ProcessPoolExecutor | None = None
+
+    def submit(self, root_dir: str, use_cache: bool = True, indexed: bool = False, lods=()):
+        """Começa a ler o modelo em `root_dir` em um processo do pool. Devolve um Future de SharedGeometry."""
+        if self.executor is None:
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["src.components.model"])
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self.executor.submit(load_shared, root_dir, use_cache, indexed, tuple(lods))
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
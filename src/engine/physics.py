@@ -0,0 +1,249 @@
+"""
+Física do jogo: mantém os objetos interativos dentro das regiões registradas (BoundObject) e separa os que colidem.
+
+A simulação avança em passos de duração fixa (Physics.step), independente da taxa de quadros: `tick` acumula o
+tempo do quadro e executa quantos passos couberem nele. As colisões são encontradas em duas fases, ambas
+vetorizadas: a ampla ordena as caixas dos objetos no eixo x e só compara as que se sobrepõem nele (sweep and
+prune), e a estreita calcula a normal e a profundidade de cada contato conforme as formas (esfera ou caixa).
+"""
+from typing import List, Tuple
+
+import glm
+import numpy as np
+
+from src.components import BoundObject, InteractiveObject
+from src.profiler import profiler
+
+from .bvh import ranges_to_indices
+
+
+def sweep_and_prune(lows: np.ndarray, highs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares de caixas alinhadas aos eixos que se sobrepõem.
+
+    :param lows: Array (n, 3) com o canto mínimo de cada caixa.
+    :param highs: Array (n, 3) com o canto máximo de cada caixa.
+    :return: Uma tupla (first, second) com os índices dos pares, sempre com first < second.
+    """
+    n = len(lows)
+    if n < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(lows[:, 0], kind="stable")
+    # Candidatas de cada caixa: as seguintes na ordenação que começam antes de ela terminar em x
+    starts = np.arange(1, n + 1)
+    ends = np.maximum(np.searchsorted(lows[order, 0], highs[order, 0], side="right"), starts)
+    first = order[np.repeat(np.arange(n), ends - starts)]
+    second = order[ranges_to_indices(starts, ends)]
+
+    overlap = ((lows[first] <= highs[second]) & (lows[second] <= highs[first])).all(axis=1)
+    first, second = first[overlap], second[overlap]
+    return np.minimum(first, second), np.maximum(first, second)
+
+
+def normalize(vectors: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Divide cada vetor pelo seu comprimento; vetores nulos viram (0, 1, 0)."""
+    normals = np.tile([0.0, 1.0, 0.0], (len(vectors), 1))
+    valid = lengths > 0
+    normals[valid] = vectors[valid] / lengths[valid, None]
+    return normals
+
+
+def axis_normals(offsets: np.ndarray, gaps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Eixo de menor sobreposição entre caixas, com o sinal do deslocamento entre elas.
+
+    :return: Uma tupla com as normais (k, 3) e as sobreposições (k,) nesse eixo.
+    """
+    axis = gaps.argmin(axis=1)
+    rows = np.arange(len(axis))
+    normals = np.zeros((len(axis), 3))
+    normals[rows, axis] = np.where(offsets[rows, axis] < 0, -1.0, 1.0)
+    return normals, gaps[rows, axis]
+
+
+def sphere_box_contacts(centers, radii, box_centers, box_extents) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Contatos entre esferas e caixas alinhadas aos eixos.
+
+    :return: Uma tupla com as normais (k, 3), da caixa para a esfera, e as profundidades (k,).
+    """
+    local = centers - box_centers
+    closest = np.clip(local, -box_extents, box_extents)
+    distances = np.sqrt(((local - closest) ** 2).sum(axis=1))
+    normals = normalize(local - closest, distances)
+    depths = radii - distances
+
+    # Centro dentro da caixa: a esfera sai pelo eixo de menor penetração
+    inside = distances == 0
+    if inside.any():
+        normals[inside], gaps = axis_normals(local[inside], box_extents[inside] - np.abs(local[inside]))
+        depths[inside] = radii[inside] + gaps
+    return normals, depths
+
+
+def contacts(positions: np.ndarray, extents: np.ndarray, radii: np.ndarray, first: np.ndarray,
+             second: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fase estreita: normal e profundidade do contato de cada par. Formas com raio são esferas; as demais, caixas.
+
+    :return: Uma tupla com as normais (k, 3), de first para second, e as profundidades (k,), positivas quando as
+    formas se sobrepõem.
+    """
+    normals = np.zeros((len(first), 3))
+    depths = np.zeros(len(first))
+    offsets = positions[second] - positions[first]
+    first_sphere, second_sphere = radii[first] > 0, radii[second] > 0
+
+    spheres = first_sphere & second_sphere
+    distances = np.sqrt((offsets[spheres] ** 2).sum(axis=1))
+    normals[spheres] = normalize(offsets[spheres], distances)
+    depths[spheres] = radii[first[spheres]] + radii[second[spheres]] - distances
+
+    boxes = ~first_sphere & ~second_sphere
+    normals[boxes], depths[boxes] = axis_normals(
+        offsets[boxes], extents[first[boxes]] + extents[second[boxes]] - np.abs(offsets[boxes]))
+
+    mixed = first_sphere != second_sphere
+    flip = first_sphere[mixed]
+    sphere = np.where(flip, first[mixed], second[mixed])
+    box = np.where(flip, second[mixed], first[mixed])
+    mixed_normals, depths[mixed] = sphere_box_contacts(positions[sphere], radii[sphere], positions[box],
+                                                       extents[box])
+    # A normal calculada vai da caixa para a esfera; quando a esfera é `first`, ela é invertida
+    normals[mixed] = np.where(flip[:, None], -mixed_normals, mixed_normals)
+    return normals, depths
+
+
+class Physics:
+    """
+    Classe responsável por gerenciar a física do jogo: as regiões que limitam onde os objetos interativos podem
+    estar e as colisões entre os objetos interativos que têm forma de colisão (InteractiveObject.collider).
+    Objetos sem forma de colisão são pontos: não colidem entre si, mas continuam limitados pelas regiões.
+
+    Atributos:
+        objects (List[BoundObject]): Regiões registradas.
+
+        step (float): Duração de cada passo da simulação, em segundos.
+
+        max_steps (int): Máximo de passos por tick. O tempo além disso é descartado, para que um quadro lento não
+        gere cada vez mais passos nos quadros seguintes.
+
+        iterations (int): Rodadas de separação dos contatos em cada passo.
+
+        restitution (float): Fração da velocidade de aproximação devolvida nas colisões (0 = sem quique).
+
+        stats (Dict[str, int]): Estatísticas do último tick: `steps` (passos executados), `pairs` (pares da fase
+        ampla) e `contacts` (pares que se tocavam), somados nos passos.
+    """
+    def __init__(self, step: float = 1 / 120, max_steps: int = 8, iterations: int = 4, restitution: float = 0.0):
+        self.objects: List[BoundObject] = []
+        self.step = step
+        self.max_steps = max_steps
+        self.iterations = iterations
+        self.restitution = restitution
+        self.accumulator = 0.0
+        self.stats = {"steps": 0, "pairs": 0, "contacts": 0}
+
+    def register_object(self, obj: BoundObject):
+        self.objects.append(obj)
+
+    def tick(self, interactive_objects: List[InteractiveObject], delta) -> int:
+        """
+        Acumula `delta` e executa os passos de duração fixa que couberem no tempo acumulado.
+
+        :return: Quantidade de passos executados.
+        """
+        with profiler.scope("Physics.tick"):
+            self.accumulator += delta
+            steps = min(int(self.accumulator / self.step), self.max_steps)
+            self.accumulator -= steps * self.step
+            if steps == self.max_steps:
+                self.accumulator %= self.step
+
+            self.stats = {"steps": steps, "pairs": 0, "contacts": 0}
+            # Mesmo sem passos neste quadro, as regiões valem para quem foi movido fora da física (ex.: o jogador)
+            if interactive_objects and (steps or self.objects):
+                self.simulate(interactive_objects, steps)
+        return steps
+
+    def simulate(self, interactive_objects: List[InteractiveObject], steps: int = 1):
+        """
+        Executa `steps` passos: lê as posições e velocidades uma vez, simula nos arrays e escreve as que mudaram.
+        Com zero passos, só leva os objetos de volta para dentro das regiões.
+        """
+        colliders = [obj.collider for obj in interactive_objects]
+        positions = np.array([obj.position for obj in interactive_objects], dtype=np.float64)
+        extents = np.array([c.extent if c is not None else (0, 0, 0) for c in colliders], dtype=np.float64)
+        radii = np.array([c.radius if c is not None else 0.0 for c in colliders])
+        velocities = np.array([c.velocity if c is not None else (0, 0, 0) for c in colliders], dtype=np.float64)
+        inverse_masses = np.array([1 / c.mass if c is not None and c.mass > 0 else 0.0 for c in colliders])
+        bodies = np.array([i for i, c in enumerate(colliders) if c is not None], dtype=np.int64)
+        initial_positions, initial_velocities = positions.copy(), velocities.copy()
+
+        bounds = [obj for obj in self.objects if isinstance(obj, BoundObject)]
+        for _ in range(steps):
+            positions += velocities * self.step
+            if len(bodies) > 1:
+                self.collide(positions, velocities, extents, radii, inverse_masses, bodies)
+            positions = self.confine(bounds, positions, velocities, extents, radii)
+        if not steps:
+            positions = self.confine(bounds, positions, velocities, extents, radii)
+
+        moved = np.flatnonzero((positions != initial_positions).any(axis=1))
+        for i in moved:
+            interactive_objects[i].position = glm.vec3(*positions[i])
+        for i in np.flatnonzero((velocities != initial_velocities).any(axis=1)):
+            colliders[i].velocity = glm.vec3(*velocities[i])
+
+    def collide(self, positions, velocities, extents, radii, inverse_masses, bodies):
+        """Encontra e resolve os contatos entre as formas de colisão `bodies`, alterando os arrays no lugar."""
+        first, second = sweep_and_prune(positions[bodies] - extents[bodies], positions[bodies] + extents[bodies])
+        first, second = bodies[first], bodies[second]
+        weights = inverse_masses[first] + inverse_masses[second]
+        movable = weights > 0
+        first, second, weights = first[movable], second[movable], weights[movable]
+        self.stats["pairs"] += len(first)
+
+        for iteration in range(self.iterations):
+            normals, depths = contacts(positions, extents, radii, first, second)
+            touching = depths > 0
+            if not touching.any():
+                break
+            a, b, n, w = first[touching], second[touching], normals[touching], weights[touching]
+            if iteration == 0:
+                self.stats["contacts"] += len(a)
+                self.bounce(velocities, inverse_masses, a, b, n, w)
+
+            # Cada objeto recebe a média das correções dos seus contatos, para não ser empurrado demais
+            correction = n * (depths[touching] / w)[:, None]
+            shifts = np.zeros_like(positions)
+            np.add.at(shifts, a, -correction * inverse_masses[a, None])
+            np.add.at(shifts, b, correction * inverse_masses[b, None])
+            counts = np.bincount(np.concatenate([a, b]), minlength=len(positions))
+            positions += shifts / np.maximum(counts, 1)[:, None]
+
+    def bounce(self, velocities, inverse_masses, first, second, normals, weights):
+        """Impulso nos pares que se aproximam, removendo (ou invertendo, com restitution) a velocidade na normal."""
+        approach = ((velocities[second] - velocities[first]) * normals).sum(axis=1)
+        closing = approach < 0
+        impulses = normals[closing] * (-(1 + self.restitution) * approach[closing] / weights[closing])[:, None]
+        np.add.at(velocities, first[closing], -impulses * inverse_masses[first[closing], None])
+        np.add.at(velocities, second[closing], impulses * inverse_masses[second[closing], None])
+
+    def confine(self, bounds: List[BoundObject], positions, velocities, extents, radii) -> np.ndarray:
+        """Leva as formas de volta para dentro de cada região, sem a velocidade que as levava para fora."""
+        for bound in bounds:
+            resolved = bound.resolve(positions, extents, radii)
+            self.stop_outward(velocities, resolved - positions)
+            positions = resolved
+        return positions
+
+    @staticmethod
+    def stop_outward(velocities: np.ndarray, corrections: np.ndarray):
+        """Remove a componente da velocidade que leva para fora de uma região, nos objetos que ela corrigiu."""
+        lengths = np.sqrt((corrections ** 2).sum(axis=1))
+        corrected = lengths > 0
+        normals = corrections[corrected] / lengths[corrected, None]
+        outward = np.minimum((velocities[corrected] * normals).sum(axis=1), 0.0)
+        velocities[corrected] -= outward[:, None] * normals
@@ -0,0 +1,390 @@
+"""
+Fila de renderização: coleta as partes a desenhar no quadro, ordena pelo estado do OpenGL que cada uma precisa
+e só então envia os draws, trocando de luzes, programa, textura, VAO e material o mínimo de vezes.
+As partes com textura transparente (veja textures.translucent_textures) dependem do que já está na tela, então são
+desenhadas depois de todas as opacas, da mais distante da câmera para a mais próxima.
+Partes iguais de objetos que compartilham um modelo (ex.: as árvores de uma floresta) viram um único draw
+instanciado, com as matrizes dos objetos no buffer de instâncias do modelo.
+
+A geração das chaves, a ordenação, o agrupamento em lotes e a contagem de trocas de estado não chamam o OpenGL, então podem ser usadas
+(e verificadas) sem contexto; apenas `RenderQueue.submit` desenha.
+"""
+from dataclasses import dataclass, field
+from itertools import groupby
+from operator import ne
+from typing import Dict, List, Tuple
+
+import glm
+import numpy as np
+from OpenGL.GL import glBindTexture, glBindVertexArray, glUseProgram, GL_TEXTURE_2D
+
+from src.components.bounds import transform_bounds
+from src.components.lod import screen_sizes, select_levels
+from src.components.model import instance_matrices
+from src.components.textures import translucent_textures
+from src.profiler import profiler
+from src.view.shader import light_buffer
+
+# Campos da chave de estado, do mais caro de trocar para o mais barato. `blend` vem antes de todos: as partes
+# transparentes precisam ser desenhadas depois das opacas
+STATE_FIELDS = ("blend", "lights", "program", "texture", "vao", "material", "transform")
+
+
+@dataclass
+class DrawItem:
+    """
+    Uma parte desenhável do quadro: um material de um modelo com a matriz de um objeto.
+
+    Atributos:
+        lights (int): Conjunto de luzes da fila (0 = sem iluminação).
+
+        program, texture, vao (int): Ids do OpenGL necessários para o draw.
+
+        material (Tuple[float, ...]): Coeficientes ambiente, difuso, especular e brilho.
+
+        transform (int): Transformação de cena da fila (0 = identidade), enviada no uniform `scene`.
+
+        first, count (int): Intervalo desenhado do buffer do modelo.
+
+        model (Model): Modelo que faz o draw.
+
+        part (str): Material do modelo, para trocar o intervalo pelo do nível de detalhe escolhido.
+
+        matrix (glm.mat4): Matriz do objeto, ou None se o objeto está em um TransformStore.
+
+        store (TransformStore), index (int): Store e índice do objeto, se houver.
+
+        owner (Object): Objeto do item, se houver; guarda o nível de detalhe do quadro anterior (Object.lod).
+
+        blend (bool): Se a textura tem transparência. O item é desenhado depois dos opacos, de trás para a frente.
+    """
+    lights: int
+    program: int
+    texture: int
+    vao: int
+    material: Tuple[float, float, float, float]
+    transform: int = 0
+    first: int = 0
+    count: int = 0
+    model: object = field(default=None, compare=False, repr=False)
+    matrix: glm.mat4 = field(default=None, compare=False, repr=False)
+    store: object = field(default=None, compare=False, repr=False)
+    index: int = field(default=-1, compare=False, repr=False)
+    part: str = field(default=None, compare=False, repr=False)
+    owner: object = field(default=None, compare=False, repr=False)
+    row: int = field(default=-1, compare=False, repr=False)  # Linha do item nas matrizes do quadro
+    blend: bool = False
+
+
+def state_key(item: DrawItem) -> tuple:
+    return item.blend, item.lights, item.program, item.texture, item.vao, item.material, item.transform
+
+
+def batch_key(item: DrawItem) -> tuple:
+    """Itens com a mesma chave de lote desenham o mesmo intervalo com o mesmo estado e viram um draw instanciado."""
+    return state_key(item) + (item.first, item.count)
+
+
+def sort_items(items: List[DrawItem], distances: np.ndarray = None) -> List[DrawItem]:
+    """
+    Ordena os itens opacos pela chave de estado (e pelo intervalo, deixando juntos os itens de um mesmo lote) e põe
+    os transparentes depois deles, do mais distante da câmera para o mais próximo.
+    A ordenação é estável: itens com o mesmo estado (ou à mesma distância) mantêm a ordem de coleta.
+
+    :param distances: Array (n,) com a distância de cada item à câmera. Se None, os transparentes ficam na ordem
+    de coleta.
+    """
+    opaque = sorted((item for item in items if not item.blend), key=batch_key)
+    translucent = [i for i, item in enumerate(items) if item.blend]
+    if distances is not None and translucent:
+        translucent = [translucent[i] for i in np.argsort(-distances[translucent], kind="stable")]
+    return opaque + [items[i] for i in translucent]
+
+
+def gather_matrices(items: List[DrawItem]) -> np.ndarray:
+    """
+    Matrizes de todos os itens, no formato do buffer de instâncias (n, 4, 4).
+    Objetos de um mesmo TransformStore são copiados do store de uma vez, sem passar pelo glm.
+    """
+    matrices = np.empty((len(items), 4, 4), dtype=np.float32)
+    loose = [i for i, item in enumerate(items) if item.store is None]
+    if loose:
+        matrices[loose] = instance_matrices([items[i].matrix for i in loose])
+
+    stored: Dict[int, Tuple[object, List[int], List[int]]] = {}
+    for i, item in enumerate(items):
+        if item.store is not None:
+            _, rows, indices = stored.setdefault(id(item.store), (item.store, [], []))
+            rows.append(i)
+            indices.append(item.index)
+    for store, rows, indices in stored.values():
+        store.update()
+        matrices[rows] = store.matrices[indices]
+    return matrices
+
+
+def item_bounds(items: List[DrawItem], matrices: np.ndarray, transforms: np.ndarray):
+    """
+    Volumes envolventes dos itens no mundo.
+
+    :param items: Itens coletados.
+    :param matrices: Matrizes dos itens, uma por item, como devolvido por gather_matrices.
+    :param transforms: Array (k, 4, 4) com as matrizes das cenas (convenção matemática: linha, coluna).
+    :return: Centros (n, 3), metades dos tamanhos das caixas (n, 3) e raios (n,), como em transform_bounds.
+    Itens sem volumes (modelo ainda sem geometria) ficam com caixa e esfera infinitas.
+    """
+    bounds = [item.model.bounds for item in items]
+    centers = np.array([b.center if b is not None else (0.0, 0.0, 0.0) for b in bounds])
+    extents = np.array([b.extent if b is not None else (np.inf,) * 3 for b in bounds])
+    radii = np.array([b.radius if b is not None else np.inf for b in bounds])
+
+    # As matrizes das instâncias são guardadas coluna a coluna: transpostas, ficam na convenção matemática
+    world = transforms[[item.transform for item in items]] @ matrices.transpose(0, 2, 1).astype(np.float64)
+    return transform_bounds(centers, extents, radii, world)
+
+
+def visible_items(items: List[DrawItem], matrices: np.ndarray, transforms: np.ndarray, frustum) -> np.ndarray:
+    """
+    Descarta, de uma vez, os itens cujos volumes envolventes estão fora do tronco de visão.
+
+    :param items: Itens coletados.
+    :param matrices: Matrizes dos itens, como devolvido por gather_matrices.
+    :param transforms: Array (k, 4, 4) com as matrizes das cenas (convenção matemática: linha, coluna).
+    :param frustum: Frustum da câmera.
+    :return: Array (n,) bool, True para os itens que podem aparecer na tela.
+    """
+    if not items:
+        return np.zeros(0, dtype=bool)
+
+    centers, extents, radii = item_bounds(items, matrices, transforms)
+    with np.errstate(invalid="ignore"):
+        return frustum.spheres_visible(centers, radii) & frustum.boxes_visible(centers, extents)
+
+
+def lod_levels(items: List[DrawItem], matrices: np.ndarray, transforms: np.ndarray, view) -> np.ndarray:
+    """
+    Escolhe, de uma vez, o nível de detalhe de cada item pelo tamanho do seu modelo na tela (veja lod.py), com a
+    histerese do nível do quadro anterior do objeto.
+
+    :param matrices: Matrizes de todos os itens coletados (indexadas por DrawItem.row).
+    :param view: LodView da câmera.
+    :return: Array (n,) int, 0 para os itens de modelos sem níveis.
+    """
+    levels = np.zeros(len(items), dtype=np.int64)
+    detailed = [i for i, item in enumerate(items) if len(item.model.lod_errors) > 1]
+    if not detailed:
+        return levels
+
+    subset = [items[i] for i in detailed]
+    centers, _, radii = item_bounds(subset, matrices[[item.row for item in subset]], transforms)
+    errors = np.full((len(subset), max(len(item.model.lod_errors) for item in subset) - 1), np.inf)
+    for row, item in enumerate(subset):
+        errors[row, :len(item.model.lod_errors) - 1] = item.model.lod_errors[1:]
+    previous = np.array([item.owner.lod if item.owner is not None else -1 for item in subset])
+    sizes = screen_sizes(centers, radii, view.eye, view.scale)
+    levels[detailed] = select_levels(sizes, view.limits(errors), previous, view.hysteresis)
+    return levels
+
+
+def batch_items(items: List[DrawItem]) -> List[List[DrawItem]]:
+    """Agrupa itens já ordenados em lotes de itens consecutivos com a mesma chave de lote."""
+    return [list(batch) for _, batch in groupby(items, key=batch_key)]
+
+
+def count_state_changes(items: List[DrawItem]) -> Dict[str, int]:
+    """
+    Conta quantas vezes cada campo da chave de estado muda ao desenhar `items` nessa ordem,
+    incluindo a ligação inicial de cada um.
+    """
+    if not items:
+        return dict.fromkeys(STATE_FIELDS, 0)
+    keys = list(map(state_key, items))
+    changes = {}
+    for i, name in enumerate(STATE_FIELDS):
+        column = [key[i] for key in keys]
+        changes[name] = 1 + int(sum(map(ne, column, column[1:])))
+    return changes
+
+
+class RenderQueue:
+    """
+    Fila de renderização de um quadro. Uso: `clear`, `add_lights`/`add` (normalmente via Scene.collect e
+    Object.collect) e `submit`.
+
+    Atributos:
+        items (List[DrawItem]): Itens coletados, na ordem de coleta.
+
+        light_sets (List[tuple]): Luzes e luz ambiente de cada conjunto. O conjunto 0 é sem iluminação.
+
+        transforms (List[glm.mat4]): Matrizes globais das cenas coletadas. A transformação 0 é a identidade.
+
+        frustum (Frustum): Tronco de visão da câmera no quadro atual. Se None, nada é descartado.
+
+        lod_view (LodView): Câmera do quadro atual, para escolher o nível de detalhe dos modelos que têm níveis.
+        Se None, todos são desenhados completos.
+
+        eye (np.ndarray): Posição da câmera no quadro atual, para desenhar os itens transparentes de trás para a
+        frente. Se None, eles são desenhados na ordem de coleta (ainda depois dos opacos).
+
+        alpha (float): Fração do passo de simulação decorrida no quadro atual, usada para interpolar as matrizes
+        dos objetos que se movem (veja Object.render_matrix). Com 1, os objetos são desenhados no estado atual.
+
+        frame (int): Número do quadro atual, incrementado em `clear`. Os modelos desenhados guardam o número em
+        Model.last_drawn (usado pelo AssetManager para liberar primeiro os menos usados).
+
+        stats (Dict[str, int]): Estatísticas do último `submit`: `items` (itens desenhados), `culled` (itens
+        descartados por estarem fora do tronco de visão), `draws` (draws instanciados feitos),
+        `changes` (trocas de estado feitas), `avoided` (trocas que a ordem de coleta faria a mais),
+        `triangles` (triângulos desenhados) e `simplified` (itens desenhados com um nível simplificado).
+    """
+    def __init__(self):
+        self.items: List[DrawItem] = []
+        self.light_sets: List[tuple] = [(None, None)]
+        self.light_set_ids: Dict[tuple, int] = {}
+        self.transforms: List[glm.mat4] = [glm.mat4(1.0)]
+        self.transform_ids: Dict[bytes, int] = {bytes(self.transforms[0]): 0}
+        self.frustum = None
+        self.lod_view = None
+        self.eye = None
+        self.alpha = 1.0
+        self.frame = 0
+        self.stats = {"items": 0, "culled": 0, "draws": 0, "changes": 0, "avoided": 0, "triangles": 0,
+                      "simplified": 0}
+
+    def clear(self):
+        self.frame += 1
+        self.items.clear()
+        self.light_sets = [(None, None)]
+        self.light_set_ids.clear()
+        del self.transforms[1:]
+        self.transform_ids = {bytes(self.transforms[0]): 0}
+
+    def add_lights(self, lights: List = None, ambient_light=None) -> int:
+        """
+        Registra um conjunto de luzes para os próximos itens e devolve o seu número.
+        Cenas com as mesmas fontes de luz (ex.: sub-cenas sem luzes próprias) compartilham o conjunto.
+        """
+        if not lights and not ambient_light:
+            return 0
+        identity = (tuple(map(id, lights or [])), id(ambient_light))
+        if identity not in self.light_set_ids:
+            self.light_sets.append((list(lights) if lights else [], ambient_light))
+            self.light_set_ids[identity] = len(self.light_sets) - 1
+        return self.light_set_ids[identity]
+
+    def add_transform(self, matrix: glm.mat4) -> int:
+        """
+        Registra a matriz global de uma cena para os próximos itens e devolve o seu número.
+        Cenas com a mesma matriz (ex.: todas as que não foram transformadas) compartilham o número e os lotes.
+        """
+        key = bytes(matrix)
+        if key not in self.transform_ids:
+            self.transforms.append(matrix)
+            self.transform_ids[key] = len(self.transforms) - 1
+        return self.transform_ids[key]
+
+    def add(self, model, matrix: glm.mat4, lights: int = 0, store=None, index: int = -1, transform: int = 0,
+            owner=None):
+        """
+        Adiciona uma parte por material de `model`, desenhado com a matriz `matrix`
+        (ou com a matriz de `index` em `store`, para objetos em um TransformStore) dentro da transformação de cena
+        `transform`. Um modelo liberado pelo AssetManager volta para a GPU aqui; um que ainda não foi carregado é
+        trocado pelo seu placeholder, ou não é desenhado. As partes entram no nível 0 (o modelo completo); o nível
+        é escolhido em `submit`, para o objeto `owner`.
+        """
+        if model.evicted:
+            model.restore()
+            # Conta como uso neste quadro, mesmo que o objeto seja descartado depois, para não ser liberado de novo
+            model.last_drawn = self.frame
+        if not model.resident:
+            if model.placeholder is not None:
+                self.add(model.placeholder, matrix, lights, store, index, transform, owner)
+            return
+        program = int(model.shader_program)
+        material = model.material()
+        for part, texture, first, count in model.draw_parts():
+            self.items.append(DrawItem(lights, program, texture, model.vao, material, transform, first, count, model,
+                                       matrix, store, index, part, owner, blend=texture in translucent_textures))
+
+    def submit(self):
+        """
+        Descarta os itens fora do tronco de visão, troca o intervalo dos demais pelo do seu nível de detalhe e os
+        desenha ordenados pelo estado, pulando as ligações que não mudam entre um lote e o próximo. Cada lote é um
+        único draw instanciado. Os itens transparentes vêm por último, de trás para a frente.
+        """
+        matrices = gather_matrices(self.items)
+        for row, item in enumerate(self.items):
+            item.row = row
+
+        items = self.items
+        transforms = None
+        if self.frustum is not None or self.lod_view is not None:
+            transforms = np.array([np.array(matrix) for matrix in self.transforms], dtype=np.float64)
+        if self.frustum is not None:
+            visible = visible_items(items, matrices, transforms, self.frustum)
+            items = [item for item, keep in zip(items, visible) if keep]
+        culled = len(self.items) - len(items)
+
+        simplified = 0
+        if self.lod_view is not None:
+            detailed = []
+            for item, level in zip(items, lod_levels(items, matrices, transforms, self.lod_view).tolist()):
+                if item.owner is not None:
+                    item.owner.lod = level
+                if level:
+                    item.first, item.count = item.model.lod_ranges[level].get(item.part, (0, 0))
+                    if not item.count:
+                        # O material sumiu neste nível
+                        continue
+                    simplified += 1
+                detailed.append(item)
+            items = detailed
+
+        distances = None
+        translucent = [i for i, item in enumerate(items) if item.blend]
+        if self.eye is not None and translucent:
+            if transforms is None:
+                transforms = np.array([np.array(matrix) for matrix in self.transforms], dtype=np.float64)
+            subset = [items[i] for i in translucent]
+            centers, _, _ = item_bounds(subset, matrices[[item.row for item in subset]], transforms)
+            distances = np.zeros(len(items))
+            distances[translucent] = np.sqrt(((centers - np.asarray(self.eye, dtype=np.float64)) ** 2).sum(axis=1))
+        collected, items = items, sort_items(items, distances)
+        batches = batch_items(items)
+
+        lights = program = texture = vao = None
+        triangles = 0
+        for batch in batches:
+            item = batch[0]
+            if item.lights != lights:
+                lights = item.lights
+                light_buffer.update(*self.light_sets[lights])
+            if item.program != program:
+                program = item.program
+                glUseProgram(program)
+            if item.texture != texture:
+                texture = item.texture
+                glBindTexture(GL_TEXTURE_2D, texture)
+            if item.vao != vao:
+                vao = item.vao
+                item.model.bind()
+
+            with profiler.scope("Model.draw", item.model.root_dir):
+                # Material e transformação da cena já são deduplicados pelo Program
+                item.model.shader_program.set_material(*item.material)
+                item.model.shader_program.set_mat4("scene", self.transforms[item.transform])
+                item.model.upload_instances(matrices[[batch_item.row for batch_item in batch]])
+                item.model.draw_range(item.first, item.count, len(batch))
+            item.model.last_drawn = self.frame
+            triangles += item.count // 3 * len(batch)
+
+        if items:
+            glBindVertexArray(0)
+            glBindTexture(GL_TEXTURE_2D, 0)
+
+        # Dentro de um lote o estado não muda, então basta contar as trocas entre os lotes
+        sorted_changes = sum(count_state_changes([batch[0] for batch in batches]).values())
+        collected_changes = sum(count_state_changes(collected).values())
+        self.stats = {"items": len(items), "culled": culled, "draws": len(batches), "changes": sorted_changes,
+                      "avoided": collected_changes - sorted_changes, "triangles": triangles,
+                      "simplified": simplified}
@@ -0,0 +1,300 @@
+"""
+Carregamento de modelos em segundo plano (streaming), para a janela não congelar enquanto os modelos carregam.
+
+Um modelo registrado com `Engine.register_model(..., asynchronous=True)` volta na hora, ainda não residente, e o
+AssetStreamer faz o resto em duas etapas:
+
+- Em uma thread: lê e triangula o OBJ, monta os dados dos buffers (Model.buffer_data) e decodifica as texturas.
+- Na thread do OpenGL, a cada quadro (Engine.render chama `update`): copia no máximo `budget` bytes para a GPU.
+  Os vértices e índices vão direto para os seus buffers com glBufferSubData, em pedaços; as imagens vão para um
+  PBO (pixel buffer object), e a textura é criada a partir dele quando ele está completo.
+
+Até ficar residente, o modelo não é desenhado, ou é trocado pelo seu placeholder (veja Model.placeholder). Os
+modelos ficam residentes na ordem em que foram registrados. Um modelo que não pode ser lido (ex.: diretório sem OBJ)
+guarda o erro em Model.load_error e nunca fica residente; os outros continuam carregando.
+"""
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+from src.components import Model
+from src.components.model import load_geometry
+from src.components.textures import DecodedTexture, decode_texture, upload_texture
+
+
+@dataclass
+class PreparedModel:
+    """
+    O que a thread de carga entrega para o envio de um modelo.
+
+    Atributos:
+        blocks, elements, attributes: Como devolvidos por Model.buffer_data.
+
+        textures (Dict[str, DecodedTexture]): Imagens decodificadas, por material. Só as que ainda não estavam
+        no cache de texturas do modelo.
+
+        load_time (float): Tempo de leitura e decodificação na thread, em segundos.
+    """
+    blocks: List[np.ndarray]
+    elements: np.ndarray | None
+    attributes: list
+    textures: Dict[str, DecodedTexture]
+    load_time: float
+
+
+def byte_view(data) -> np.ndarray:
+    """Os bytes de um array ou de um objeto bytes, como um array uint8 achatado (sem cópia, se já contíguo)."""
+    if isinstance(data, np.ndarray):
+        return np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+class BufferUpload:
+    """
+    Blocos de bytes copiados aos poucos, em sequência, para um buffer novo do OpenGL.
+
+    Atributos:
+        buffer (int): ID do buffer, já com o tamanho final.
+
+        size (int): Total de bytes.
+    """
+    def __init__(self, blocks, target=GL_COPY_WRITE_BUFFER, usage=GL_STATIC_DRAW):
+        self.blocks = [view for view in map(byte_view, blocks) if len(view)]
+        self.size = sum(len(block) for block in self.blocks)
+        self.target = target
+        self.block = 0
+        self.position = 0  # Dentro do bloco atual
+        self.offset = 0  # No buffer
+
+        self.buffer = glGenBuffers(1)
+        glBindBuffer(self.target, self.buffer)
+        glBufferData(self.target, self.size, None, usage)
+        glBindBuffer(self.target, 0)
+
+    @property
+    def done(self) -> bool:
+        return self.block == len(self.blocks)
+
+    def step(self, budget: float) -> int:
+        """Copia até `budget` bytes. Devolve quantos foram copiados."""
+        copied = 0
+        glBindBuffer(self.target, self.buffer)
+        while not self.done and copied < budget:
+            data = self.blocks[self.block]
+            count = int(min(len(data) - self.position, budget - copied))
+            glBufferSubData(self.target, self.offset, count, data[self.position:self.position + count])
+            copied += count
+            self.offset += count
+            self.position += count
+            if self.position == len(data):
+                self.block += 1
+                self.position = 0
+        glBindBuffer(self.target, 0)
+        return copied
+
+
+class TextureUpload:
+    """
+    Imagem copiada aos poucos para um PBO; no passo em que ele fica completo, a textura é criada a partir dele e o
+    PBO é apagado.
+
+    Atributos:
+        texture_id (int | None): ID da textura, depois de criada.
+
+        upload_time (float): Tempo gasto nos passos, em segundos.
+    """
+    def __init__(self, texture: DecodedTexture):
+        self.texture = texture
+        self.offsets = np.cumsum([0] + [len(byte_view(data)) for _, _, data in texture.levels[:-1]]).tolist()
+        self.pixels = BufferUpload([data for _, _, data in texture.levels], GL_PIXEL_UNPACK_BUFFER, GL_STREAM_DRAW)
+        self.texture_id = None
+        self.upload_time = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.texture_id is not None
+
+    def step(self, budget: float) -> int:
+        start = time.perf_counter()
+        copied = self.pixels.step(budget)
+        if self.pixels.done:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pixels.buffer)
+            self.texture_id = upload_texture(self.texture, self.offsets)
+            # Com um PBO ligado, os próximos glTexImage2D leriam dele em vez da memória
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            glDeleteBuffers(1, [self.pixels.buffer])
+        self.upload_time += time.perf_counter() - start
+        return copied
+
+
+class ModelUpload:
+    """
+    Envio de um modelo já preparado: as texturas que ainda não estão na GPU, depois os vértices e os índices.
+    As partes são criadas no primeiro passo, para que texturas enviadas por modelos anteriores sejam reaproveitadas.
+    """
+    def __init__(self, model: Model, prepared: PreparedModel):
+        self.model = model
+        self.prepared = prepared
+        self.texture_ids: Dict[str, int] = {}
+        self.textures: List[Tuple[str, str, TextureUpload]] = []
+        self.parts = None
+        self.vertices = self.elements = None
+
+    def start(self):
+        model, manager = self.model, self.model.texture_manager
+        for material in model.triangle_vertices:
+            path = model.available_textures[material]
+            texture = self.prepared.textures.get(material)
+            if manager and (texture is None or texture.digest in manager.by_digest):
+                self.texture_ids[material] = manager.get(path) if texture is None else manager.add(path, texture)
+            else:
+                self.textures.append((material, path, TextureUpload(texture)))
+        model.discard_textures()
+
+        self.vertices = BufferUpload(self.prepared.blocks)
+        self.parts = [upload for _, _, upload in self.textures] + [self.vertices]
+        if self.prepared.elements is not None:
+            self.elements = BufferUpload([self.prepared.elements])
+            self.parts.append(self.elements)
+
+    @property
+    def done(self) -> bool:
+        return self.parts is not None and all(part.done for part in self.parts)
+
+    def step(self, budget: float) -> int:
+        if self.parts is None:
+            self.start()
+        copied = 0
+        for part in self.parts:
+            if part.done:
+                continue
+            if copied >= budget:
+                break
+            copied += part.step(budget - copied)
+        return copied
+
+    def finish(self):
+        """Registra as texturas enviadas no cache e cria o VAO: o modelo passa a ser desenhado."""
+        model, manager = self.model, self.model.texture_manager
+        for material, path, upload in self.textures:
+            texture_id = upload.texture_id
+            if manager:
+                texture_id = manager.add(path, upload.texture, texture_id, upload.upload_time)
+            self.texture_ids[material] = texture_id
+        model.texture_ids = {material: self.texture_ids[material] for material in model.triangle_vertices}
+        model.setup_vertex_array(self.vertices.buffer, self.elements.buffer if self.elements else None,
+                                 self.prepared.attributes,
+                                 buffer_bytes=self.vertices.size + (self.elements.size if self.elements else 0))
+
+
+def prepare(model: Model) -> PreparedModel:
+    """
+    Roda na thread de carga: lê a geometria para o modelo (que ainda não é residente, então nada mais o lê) e
+    decodifica as texturas que faltam.
+    """
+    start = time.perf_counter()
+    geometry = load_geometry(model.root_dir, model.use_cache, model.indexed, model.lod_ratios)
+    model.set_geometry(geometry)
+    blocks, elements, attributes = model.buffer_data()
+
+    manager = model.texture_manager
+    textures = {}
+    for material in geometry.materials:
+        path = geometry.available_textures[material]
+        if manager is None:
+            textures[material] = decode_texture(path)
+        elif manager.key(path) not in manager.by_path:
+            # Espera pelo prefetch do TextureManager, se houver, ou decodifica aqui
+            textures[material] = manager.decode(path)
+    return PreparedModel(blocks, elements, attributes, textures, time.perf_counter() - start)
+
+
+class AssetStreamer:
+    """
+    Fila de modelos carregados em segundo plano. `load` na thread do OpenGL, e `update` uma vez por quadro.
+
+    Atributos:
+        budget (float): Bytes copiados para a GPU por `update`, no máximo. Criar a textura a partir do PBO cheio,
+        gerar os mipmaps e criar o VAO não entram na conta (são cópias e trabalho na GPU, não da memória).
+
+        workers (int): Threads de carga. Com uma, os modelos são lidos na ordem em que foram pedidos.
+
+        stats (Dict[str, int]): Estado depois do último `update`: `loading` (modelos sendo lidos), `uploading`
+        (lidos, esperando ou sendo enviados), `bytes` (copiados no quadro), `resident` (total já residente) e
+        `failed` (total que não pôde ser lido, veja Model.load_error).
+    """
+    def __init__(self, budget: float = 4 * 2 ** 20, workers: int = 1):
+        self.budget = budget
+        self.workers = workers
+        self.executor: ThreadPoolExecutor | None = None
+        self.loading: deque[Tuple[Model, Future]] = deque()
+        self.uploads: deque[ModelUpload] = deque()
+        self.stats = {"loading": 0, "uploading": 0, "bytes": 0, "resident": 0, "failed": 0}
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.loading or self.uploads)
+
+    def load(self, model: Model):
+        """Começa a carregar um modelo criado com `streamed=True`."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="stream")
+        if model.texture_manager:
+            model.texture_manager.prefetch(model.available_textures.values())
+        self.loading.append((model, self.executor.submit(prepare, model)))
+
+    def update(self, budget: float = None) -> List[Model]:
+        """
+        Passa os modelos já lidos para a fila de envio e envia até `budget` bytes (por padrão, self.budget).
+        Um erro na leitura de um modelo (ex.: diretório sem OBJ) fica em Model.load_error, sem parar os outros.
+
+        :return: Modelos que ficaram residentes nesta chamada.
+        """
+        budget = self.budget if budget is None else budget
+        failed = 0
+        while self.loading and self.loading[0][1].done():
+            model, future = self.loading.popleft()
+            try:
+                prepared = future.result()
+            except Exception as error:
+                model.load_error = error
+                failed += 1
+                continue
+            self.uploads.append(ModelUpload(model, prepared))
+
+        resident = []
+        copied = 0
+        while self.uploads and copied < budget:
+            upload = self.uploads[0]
+            copied += upload.step(budget - copied)
+            if not upload.done:
+                break
+            upload.finish()
+            resident.append(self.uploads.popleft().model)
+
+        self.stats = {"loading": len(self.loading), "uploading": len(self.uploads), "bytes": copied,
+                      "resident": self.stats["resident"] + len(resident), "failed": self.stats["failed"] + failed}
+        return resident
+
+    def texture_ids(self) -> set:
+        """Texturas já pegas ou criadas pelos envios em andamento, de modelos que ainda não são residentes."""
+        ids = set()
+        for upload in self.uploads:
+            ids.update(upload.texture_ids.values())
+            ids.update(texture.texture_id for _, _, texture in upload.textures if texture.texture_id is not None)
+        return ids
+
+    def wait(self):
+        """Espera a leitura de todos os modelos pedidos (o envio continua a cada `update`)."""
+        wait([future for _, future in self.loading])
+
+    def shutdown(self):
+        """Encerra a thread de carga, descartando os modelos que ainda não começaram a ser lidos."""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
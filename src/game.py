@@ -1,19 +1,17 @@
-import time
+from dataclasses import asdict
 from typing import Dict
 
 import glfw
 import glm
 import numpy as np
-from OpenGL.GL.shaders import ShaderProgram, compileProgram
 from OpenGL.GL import *
 
-from src.components import Player
-from src.view import Camera, Window
+from src.components import Player, LodView
+from src.view import Camera, Window, Shader, Program, Frustum
+from src.view.shader import light_buffer
 from src.engine import Engine
-
-
-vertex_shader_source = open("shaders/vertex.glsl").read()
-fragment_shader_source = open("shaders/fragment.glsl").read()
+from src.loop import GameLoop, FrameStats
+from src.profiler import profiler
 
 
 class Game:
@@ -24,11 +22,13 @@ class Game:
     interações do jogador e o loop principal (game loop ou main loop) do jogo.
 
     Atributos:
-        window (Window): A janela gráfica onde o jogo é exibido. Interface com o GLFW.
+        window (Window | HeadlessWindow): A janela gráfica onde o jogo é exibido. Interface com o GLFW.
+        Sem display (ex.: em benchmarks), uma HeadlessWindow desenha em um framebuffer fora da tela.
 
         camera (Camera): Dataclass da câmera usada para obter a posição e direção no mundo.
 
-        shader_program (ShaderProgram): O programa responsável por renderizar gráficos.
+        shader_program (Program): O programa responsável por renderizar gráficos.
+        Guarda as localizações dos uniforms e evita enviar valores repetidos.
 
         engine (Engine): A engine principal que gerencia a lógica dos objetos e da cena, assim como as barreiras.
 
@@ -39,21 +39,33 @@ class Game:
         players (Dict[int, Player]): Um dicionário que mapeia IDs de jogadores para objetos Player.
         Como não há multiplayer, há apenas um jogador.
 
+        loop (GameLoop): O loop principal, criado em `start`. Os tempos de cada quadro vão para `loop.hooks`.
+
+        counters (Dict[str, int]): Contadores do último quadro (uniforms, luzes, fila de renderização, física,
+        streaming e memória dos modelos), para os hooks do loop.
+
+        profile_path (str): Prefixo dos arquivos exportados pelo profiler (`.json` e `.csv`), ao pressionar F4.
+
     Observação:
         Esta classe pressupõe a disponibilidade de bibliotecas e módulos de suporte para a
         renderização OpenGL, como GLFW, glm e outras dependências relacionadas.
         Não fizemos error catching para essas dependências.
     """
-    def __init__(self, width: int = 800, height: int = 600, title: str = "Game"):
-        self.window = Window(width, height, title)
-        self.camera: Camera = Camera(width, height)
+    def __init__(self, width: int = 800, height: int = 600, title: str = "Game", window=None):
+        self.window = window or Window(width, height, title)
+        self.camera: Camera = Camera(self.window.width, self.window.height)
 
-        self.shader_program: ShaderProgram | None = None
+        self.shader: Shader | None = None
+        self.shader_program: Program | None = None
         self.engine: Engine | None = None
         self.selected_keys = set()
         self.polygon_mode = False
 
         self.players: Dict[int, Player] = {}
+        self.loop: GameLoop | None = None
+        self.counters: Dict[str, int] = {}
+        self.previous_camera = glm.vec3(self.camera.position)
+        self.profile_path = "profile"
 
     def create(self):
         self.window.create_window()
@@ -63,16 +75,9 @@ class Game:
         self.create_shader()
 
     def create_shader(self):
-        vertex_shader = glCreateShader(GL_VERTEX_SHADER)
-        glShaderSource(vertex_shader, vertex_shader_source)
-        glCompileShader(vertex_shader)
-
-        fragment_shader = glCreateShader(GL_FRAGMENT_SHADER)
-        glShaderSource(fragment_shader, fragment_shader_source)
-        glCompileShader(fragment_shader)
-
-        self.shader_program = compileProgram(vertex_shader, fragment_shader)
-        glUseProgram(self.shader_program)
+        self.shader = Shader("shaders/vertex.glsl", "shaders/fragment.glsl")
+        self.shader_program = self.shader.shader_program
+        self.shader.use()
         glEnable(GL_DEPTH_TEST)
 
         glHint(GL_LINE_SMOOTH_HINT, GL_DONT_CARE)
@@ -82,37 +87,62 @@ class Game:
 
         self.engine = Engine(self.shader_program)
 
-    def start(self):
+    def start(self, tick_rate: float = 60, max_fps: float | None = 60, vsync: bool = False, spin: float = 0.002,
+              hooks=(), profile: bool = False):
         """
-        Inicia o loop principal do jogo. Enquanto a janela não for fechada, serão chamados os métodos tick e render.
-
-        Esses métodos são responsáveis por atualizar a lógica do jogo e renderizar os objetos na tela, respectivamente.
+        Inicia o loop principal do jogo. Enquanto a janela não for fechada, a lógica (`tick`) roda em passos fixos de
+        1 / tick_rate segundos e cada quadro é renderizado entre os dois últimos passos (veja GameLoop).
+
+        :param tick_rate: Passos de simulação por segundo.
+        :param max_fps: Limite de quadros por segundo; None para não limitar.
+        :param vsync: Sincroniza a troca de buffers com o monitor, que passa a ditar o ritmo (ignora max_fps).
+        :param spin: Margem final da espera entre quadros feita girando, em vez de dormindo, em segundos.
+        :param hooks: Funções chamadas ao fim de cada quadro com os seus tempos (FrameStats).
+        :param profile: Começa com o profiler ligado (também alternado com F3).
         """
-        start_time = time.time()
-
-        framerate = 60
-        delay = 1 / framerate
-
-        while not self.window.should_close():
-            delta = time.time() - start_time
-            delta = max(min(delta, delay), 1e-6)  # limita o delta a um valor máximo
-
-            if not delta < delay:
-                time.sleep(delay - delta)
-
-            start_time = time.time()
-
-            print(f"FPS: {1 / delta:.2f}")
-
-            self.tick(delta)
-            self.render()
+        if profile:
+            profiler.enable()
+        self.window.set_swap_interval(1 if vsync else 0)
+        self.loop = GameLoop(self.tick, self.present, tick_rate, None if vsync else max_fps, spin=spin)
+        self.loop.hooks.append(self.profile)
+        self.loop.hooks.extend(hooks)
+        self.loop.run(self.window.should_close)
+
+    def present(self, alpha: float = 1.0):
+        """Renderiza o quadro, troca os buffers e processa os eventos da janela."""
+        self.render(alpha)
+        self.window.swap_buffers()
+        self.window.poll_events()
+
+        uniforms = self.shader_program.reset_stats()
+        lights = light_buffer.reset_stats()
+        self.counters = {
+            "uniforms": uniforms["uploads"], "uniforms_skipped": uniforms["skipped"], "lookups": uniforms["lookups"],
+            "light_uploads": lights["uploads"], **self.engine.render_queue.stats,
+            **{f"physics_{name}": value for name, value in self.engine.physics.stats.items()},
+            **{f"stream_{name}": value for name, value in self.engine.streamer.stats.items()},
+            **{f"assets_{name}": value for name, value in self.engine.assets.counters.items()},
+        }
+
+    def profile(self, stats: FrameStats):
+        """
+        Hook do loop: fecha o quadro do profiler com os tempos e contadores do quadro e, a cada segundo, mostra no
+        título da janela os trechos mais caros.
+        """
+        if not profiler.enabled:
+            return
+        profiler.end_frame({**asdict(stats), **self.counters})
+        if stats.frame % 60 == 0:
+            fps = 1 / stats.frame_time if stats.frame_time else 0
+            self.window.set_title(f"{self.window.title} | {fps:.0f} FPS | {profiler.report(4)}")
 
-            self.window.swap_buffers()
-            self.window.poll_events()
+    def export_profile(self):
+        profiler.export_chrome_trace(f"{self.profile_path}.json")
+        profiler.export_csv(f"{self.profile_path}.csv")
 
     def stop(self):
-        glfw.destroy_window(self.window.window)
-        glfw.terminate()
+        self.engine.streamer.shutdown()
+        self.window.close_window()
 
     @property
     def current_player(self):
@@ -125,12 +155,11 @@ class Game:
 
     def tick(self, delta: float = 1 / 60):
         """Aplica movimento ao jogador e à camera. Também chama a função "tick" de todos objetos na Engine."""
+        self.previous_camera = glm.vec3(self.camera.position)
 
         if self.current_player:
             self.current_player.apply_movement(self.selected_keys, self.camera.front, self.camera.up, delta)
             self.camera.position = self.current_player.position
-            # update cameraPos
-            self.camera.update(self.shader_program)
 
         self.engine.tick(self.selected_keys, delta, self.current_player)
 
@@ -141,7 +170,8 @@ class Game:
 
         - Fechar a janela ao pressionar a tecla ESC;
         - Alternar entre o modo de polígono (wireframe) ao pressionar a tecla P;
-        - Alternar entre o modo de tela cheia ao pressionar a tecla F11.
+        - Alternar entre o modo de tela cheia ao pressionar a tecla F11;
+        - Ligar e desligar o profiler ao pressionar F3, e exportar os quadros medidos ao pressionar F4.
         """
         if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
             glfw.set_window_should_close(window, True)
@@ -150,6 +180,13 @@ class Game:
             self.window.toggle_fullscreen()
             return
 
+        if key == glfw.KEY_F3 and action == glfw.PRESS:
+            if not profiler.toggle():
+                self.window.set_title(self.window.title)
+
+        if key == glfw.KEY_F4 and action == glfw.PRESS and profiler.frames:
+            self.export_profile()
+
         if key == glfw.KEY_P and action == glfw.PRESS:
             self.polygon_mode = not self.polygon_mode
             if self.polygon_mode:
@@ -208,26 +245,31 @@ class Game:
         front.z = np.sin(glm.radians(self.camera.yaw)) * np.cos(glm.radians(self.camera.pitch))
         self.camera.front = glm.normalize(front)
 
-    def render(self):
+    def render(self, alpha: float = 1.0):
+        """
+        Desenha o quadro.
+
+        :param alpha: Fração do passo de simulação decorrida desde o último tick. A câmera e os objetos que se
+        movem são desenhados entre o estado anterior e o atual.
+        """
         glClearColor(0.2, 0.3, 0.3, 1.0)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
-        model = glm.mat4(1.0)
+        eye = glm.mix(self.previous_camera, self.camera.position, alpha)
+        self.camera.update(self.shader_program, eye)
+
         projection = glm.perspective(glm.radians(self.camera.fov), self.window.width / self.window.height, 0.1, 100.0)
-        view = glm.lookAt(self.camera.position, self.camera.position + self.camera.front, self.camera.up)
+        view = glm.lookAt(eye, eye + self.camera.front, self.camera.up)
 
-        # Passa as matrizes model, view e projection para o shader
+        # Passa as matrizes view e projection para o shader
+        # (a matriz model, com as transformações de cada objeto, é enviada por instância pela fila de renderização)
         #
-        # Matriz model: transformações do objeto
         # Matriz view: aplica a posição e orientação da câmera
         # Matriz projection: aplica a perspectiva da câmera aos objetos
-        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "model"), 1, GL_FALSE,
-                           glm.value_ptr(model))
-
-        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "view"), 1, GL_FALSE,
-                           glm.value_ptr(view))
-
-        glUniformMatrix4fv(glGetUniformLocation(self.shader_program, "projection"), 1, GL_FALSE,
-                           glm.value_ptr(projection))
+        self.shader_program.set_mat4("view", view)
+        self.shader_program.set_mat4("projection", projection)
 
-        self.engine.render()
+        # Objetos fora do campo de visão da câmera não são desenhados, e os modelos com níveis de detalhe são
+        # desenhados no nível do seu tamanho na tela
+        lod_view = LodView.perspective(eye, self.camera.fov, self.window.height)
+        self.engine.render(Frustum(projection * view), alpha, lod_view)
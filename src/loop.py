@@ -0,0 +1,147 @@
+"""
+Loop principal com passo fixo: a lógica do jogo (Engine.tick) roda sempre com o mesmo delta, em quantos passos
+couberem no tempo real decorrido, e a renderização recebe a fração do próximo passo já decorrida (alpha) para
+interpolar as transformações entre o estado anterior e o atual.
+
+O relógio é injetável (qualquer objeto com `now()` e `sleep(seconds)`), então o agendamento pode ser verificado
+com um relógio falso, sem esperar (veja benchmarks/game_loop.py).
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+# Folga na comparação do acumulador com o passo, em segundos: somar durações como 1/60 acumula erro de
+# arredondamento, e sem ela um quadro de exatamente um passo às vezes faria 0 ticks e o seguinte, 2
+EPSILON = 1e-9
+
+
+class SystemClock:
+    """Relógio real: time.perf_counter para medir e time.sleep para esperar."""
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    @staticmethod
+    def sleep(seconds: float):
+        time.sleep(seconds)
+
+
+class Pacer:
+    """
+    Espera até um instante com precisão: dorme até `spin` segundos antes dele e gira no relógio pelo resto,
+    já que o sleep do sistema pode acordar alguns milissegundos depois do pedido.
+
+    Atributos:
+        spin (float): Margem final, em segundos, esperada girando. Com 0, apenas dorme.
+    """
+    def __init__(self, clock=None, spin: float = 0.002):
+        self.clock = clock or SystemClock()
+        self.spin = spin
+
+    def wait_until(self, deadline: float) -> float:
+        """
+        :param deadline: Instante, no relógio do pacer.
+        :return: Tempo gasto esperando, em segundos.
+        """
+        start = self.clock.now()
+        remaining = deadline - start - self.spin
+        if remaining > 0:
+            self.clock.sleep(remaining)
+        while self.clock.now() < deadline:
+            pass
+        return self.clock.now() - start
+
+
+@dataclass
+class FrameStats:
+    """
+    Tempos de um quadro, entregues aos hooks do GameLoop.
+
+    Atributos:
+        frame (int): Número do quadro.
+
+        frame_time (float): Tempo real desde o início do quadro anterior, em segundos (antes do limite max_frame).
+
+        ticks (int): Passos de simulação executados no quadro.
+
+        tick_time, render_time, wait_time (float): Tempo gasto nos ticks, na renderização e esperando, em segundos.
+
+        alpha (float): Fração do próximo passo já decorrida, usada na interpolação.
+    """
+    frame: int
+    frame_time: float
+    ticks: int
+    tick_time: float
+    render_time: float
+    wait_time: float
+    alpha: float
+
+
+class GameLoop:
+    """
+    Loop de passo fixo com acumulador.
+
+    Atributos:
+        tick (Callable[[float], None]): Avança a simulação em `step` segundos.
+
+        render (Callable[[float], None]): Desenha o quadro, recebendo alpha em [0, 1).
+
+        step (float): Duração do passo de simulação, em segundos (1 / tick_rate).
+
+        frame_limit (float | None): Duração mínima de um quadro, em segundos (1 / max_fps). Com None, o loop não
+        espera: roda o mais rápido possível ou no ritmo do vsync, se a troca de buffers esperar por ele.
+
+        max_frame (float): Maior tempo real considerado em um quadro. Depois de uma pausa longa (ex.: a janela
+        sendo arrastada) a simulação não tenta recuperar todo o tempo perdido de uma vez.
+
+        hooks (List[Callable[[FrameStats], None]]): Chamados ao fim de cada quadro com os seus tempos.
+    """
+    def __init__(self, tick: Callable[[float], None], render: Callable[[float], None], tick_rate: float = 60,
+                 max_fps: float | None = 60, clock=None, spin: float = 0.002, max_frame: float = 0.25):
+        self.tick = tick
+        self.render = render
+        self.clock = clock or SystemClock()
+        self.pacer = Pacer(self.clock, spin)
+        self.step = 1 / tick_rate
+        self.frame_limit = 1 / max_fps if max_fps else None
+        self.max_frame = max_frame
+        self.hooks: List[Callable[[FrameStats], None]] = []
+
+        self.accumulator = 0.0
+        self.frames = 0
+        self.ticks = 0
+        self.frame_start: float | None = None
+
+    def frame(self) -> FrameStats:
+        """Executa um quadro: os passos de simulação devidos, a renderização e a espera até o próximo quadro."""
+        now = self.clock.now()
+        frame_time = 0.0 if self.frame_start is None else now - self.frame_start
+        self.frame_start = now
+        self.accumulator += min(frame_time, self.max_frame)
+
+        ticks = 0
+        while self.accumulator >= self.step - EPSILON:
+            self.tick(self.step)
+            self.accumulator -= self.step
+            ticks += 1
+        self.ticks += ticks
+        rendering = self.clock.now()
+
+        alpha = max(self.accumulator, 0.0) / self.step
+        self.render(alpha)
+        waiting = self.clock.now()
+
+        wait_time = 0.0
+        if self.frame_limit is not None:
+            wait_time = self.pacer.wait_until(self.frame_start + self.frame_limit)
+
+        stats = FrameStats(self.frames, frame_time, ticks, rendering - now, waiting - rendering, wait_time, alpha)
+        self.frames += 1
+        for hook in self.hooks:
+            hook(stats)
+        return stats
+
+    def run(self, should_stop: Callable[[], bool]):
+        """Executa quadros até `should_stop()` ser verdadeiro."""
+        while not should_stop():
+            self.frame()
@@ -0,0 +1,275 @@
+"""
+Profiler de quadros: mede, por quadro, o tempo de CPU de trechos marcados do código (Engine.tick, Physics.tick,
+Scene.collect, Model.draw...) e, quando o OpenGL tem timer queries, o tempo de GPU dos trechos de renderização.
+
+Uso nos trechos medidos:
+
+    with profiler.scope("Scene.collect", self.name):
+        ...
+
+Desligado (o padrão), `scope` devolve sempre o mesmo gerenciador de contexto vazio, sem medir nem alocar nada.
+Os quadros ficam em uma janela deslizante (os últimos `window` quadros), que pode ser resumida (`summary`) ou
+exportada como trace do Chrome (chrome://tracing ou https://ui.perfetto.dev) ou CSV.
+"""
+import csv
+import ctypes
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Tuple
+
+from OpenGL.GL import glGenQueries, glGetQueryObjectiv, glGetQueryObjectui64v, glQueryCounter, GL_QUERY_RESULT, \
+    GL_QUERY_RESULT_AVAILABLE, GL_TIMESTAMP
+
+
+class NullScope:
+    """Gerenciador de contexto que não faz nada, usado quando o profiler está desligado."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+class Scope:
+    """Mede o tempo de CPU de um trecho e o registra no profiler ao sair."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler.depth -= 1
+        self.profiler.events.append((self.name, self.start, end - self.start, self.profiler.depth))
+        return False
+
+
+class GPUScope(Scope):
+    """Além do tempo de CPU, mede o tempo de GPU do trecho com timer queries (veja GPUTimer)."""
+    __slots__ = ("query",)
+
+    def __enter__(self):
+        self.query = self.profiler.timer.begin()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        self.profiler.timer.end(self.query, self.name, self.start)
+        return False
+
+
+class GPUTimer:
+    """
+    Timer queries do OpenGL: um GL_TIMESTAMP (glQueryCounter) no início e outro no fim de cada trecho. Ao contrário
+    de GL_TIME_ELAPSED, os trechos podem ser aninhados. Os resultados chegam alguns quadros depois, então as
+    queries ficam pendentes e são lidas em `collect` sem bloquear.
+
+    Atributos:
+        available (bool | None): Se o contexto tem timer queries; None até a primeira tentativa.
+    """
+    def __init__(self):
+        self.available: bool | None = None
+        self.free: List[int] = []
+        self.pending: List[Tuple[int, int, str, float]] = []
+
+    def timestamp(self) -> int:
+        """Registra um GL_TIMESTAMP na fila de comandos e devolve a query, ou 0 se não houver timer queries."""
+        if self.available is False:
+            return 0
+        try:
+            query = self.free.pop() if self.free else int(glGenQueries(1)[0])
+            glQueryCounter(query, GL_TIMESTAMP)
+        except Exception:
+            # Sem timer queries (ou sem contexto): o profiler continua medindo só a CPU
+            self.available = False
+            return 0
+        self.available = True
+        return query
+
+    def begin(self) -> int:
+        return self.timestamp()
+
+    def end(self, query: int, name: str, start: float):
+        if query:
+            self.pending.append((query, self.timestamp(), name, start))
+
+    def collect(self) -> List[Tuple[str, float, float]]:
+        """
+        Lê as queries que já têm resultado.
+
+        :return: Lista de (nome, início na CPU, duração na GPU em segundos).
+        """
+        done, waiting = [], []
+        for first, last, name, start in self.pending:
+            # As queries terminam em ordem: se a do fim tem resultado, a do início também
+            if glGetQueryObjectiv(last, GL_QUERY_RESULT_AVAILABLE):
+                done.append((name, start, (self.result(last) - self.result(first)) / 1e9))
+                self.free.extend((first, last))
+            else:
+                waiting.append((first, last, name, start))
+        self.pending = waiting
+        return done
+
+    @staticmethod
+    def result(query: int) -> int:
+        value = ctypes.c_uint64()
+        glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(value))
+        return value.value
+
+
+@dataclass
+class FrameRecord:
+    """
+    Um quadro registrado.
+
+    Atributos:
+        events (List[Tuple[str, float, float, int]]): Trechos medidos na CPU: nome, início e duração (segundos,
+        no relógio time.perf_counter) e profundidade de aninhamento.
+
+        gpu (List[Tuple[str, float, float]]): Trechos medidos na GPU: nome, início do trecho na CPU e duração.
+        Como os resultados chegam atrasados, ficam no quadro em que foram lidos.
+
+        counters (Dict[str, float]): Contadores e tempos do quadro (ex.: Game.counters e os campos de FrameStats).
+    """
+    index: int
+    events: List[Tuple[str, float, float, int]] = field(default_factory=list)
+    gpu: List[Tuple[str, float, float]] = field(default_factory=list)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+
+class Profiler:
+    """
+    Atributos:
+        enabled (bool): Se os trechos são medidos. Mudar com `enable`/`disable`, que também limpam o quadro atual.
+
+        window (int): Quantidade de quadros guardados.
+
+        frames (Deque[FrameRecord]): Os últimos quadros completos.
+    """
+    def __init__(self, window: int = 300):
+        self.enabled = False
+        self.window = window
+        self.frames: Deque[FrameRecord] = deque(maxlen=window)
+        self.events: List[Tuple[str, float, float, int]] = []
+        self.depth = 0
+        self.frame_index = 0
+        self.timer = GPUTimer()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.depth = 0
+
+    def disable(self):
+        self.enabled = False
+        self.events = []
+
+    def toggle(self) -> bool:
+        self.disable() if self.enabled else self.enable()
+        return self.enabled
+
+    def scope(self, name: str, detail: str = None):
+        """
+        Trecho medido na CPU. `detail` (ex.: o nome da cena) é anexado ao nome só quando o profiler está ligado.
+        """
+        if not self.enabled:
+            return NULL_SCOPE
+        return Scope(self, f"{name}:{detail}" if detail else name)
+
+    def gpu_scope(self, name: str):
+        """Trecho medido na CPU e, se o contexto tiver timer queries, na GPU."""
+        if not self.enabled:
+            return NULL_SCOPE
+        return GPUScope(self, name)
+
+    def end_frame(self, counters: Dict[str, float] = None):
+        """Fecha o quadro atual com os seus contadores e começa o próximo (veja Game.profile)."""
+        if not self.enabled:
+            return
+        record = FrameRecord(self.frame_index, self.events, self.timer.collect(), dict(counters or {}))
+        self.frames.append(record)
+        self.frame_index += 1
+        self.events = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Tempos por trecho na janela: `calls` (chamadas por quadro), `mean` e `max` (ms por quadro, somando as
+        chamadas do quadro). Trechos de GPU aparecem com o prefixo `gpu:`.
+        """
+        totals: Dict[str, List[float]] = {}
+        calls: Dict[str, int] = {}
+        for frame in self.frames:
+            per_frame: Dict[str, float] = {}
+            for name, _, duration, _ in frame.events:
+                per_frame[name] = per_frame.get(name, 0.0) + duration
+                calls[name] = calls.get(name, 0) + 1
+            for name, _, duration in frame.gpu:
+                per_frame[f"gpu:{name}"] = per_frame.get(f"gpu:{name}", 0.0) + duration
+                calls[f"gpu:{name}"] = calls.get(f"gpu:{name}", 0) + 1
+            for name, duration in per_frame.items():
+                totals.setdefault(name, []).append(duration)
+
+        frames = max(len(self.frames), 1)
+        return {name: {"calls": calls[name] / frames, "mean": sum(values) / frames * 1000,
+                       "max": max(values) * 1000} for name, values in totals.items()}
+
+    def counters(self) -> Dict[str, float]:
+        """Média de cada contador na janela."""
+        sums: Dict[str, float] = {}
+        for frame in self.frames:
+            for name, value in frame.counters.items():
+                sums[name] = sums.get(name, 0.0) + value
+        return {name: value / max(len(self.frames), 1) for name, value in sums.items()}
+
+    def report(self, limit: int = 8) -> str:
+        """Resumo curto dos trechos mais caros, em ms por quadro."""
+        summary = sorted(self.summary().items(), key=lambda item: -item[1]["mean"])[:limit]
+        return " | ".join(f"{name} {stats['mean']:.2f}ms" for name, stats in summary)
+
+    def export_chrome_trace(self, path: str):
+        """
+        Escreve os quadros da janela no formato Trace Event do Chrome (eventos completos, "ph": "X").
+        A CPU fica na thread 1 e a GPU na thread 2; os contadores viram eventos "C".
+        """
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "CPU"}},
+                  {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "GPU"}}]
+        for frame in self.frames:
+            for name, start, duration, _ in frame.events:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1, "ts": start * 1e6, "dur": duration * 1e6,
+                               "args": {"frame": frame.index}})
+            for name, start, duration in frame.gpu:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 2, "ts": start * 1e6, "dur": duration * 1e6})
+            if frame.counters and frame.events:
+                start = min(event[1] for event in frame.events)
+                events.append({"name": "counters", "ph": "C", "pid": 1, "ts": start * 1e6, "args": frame.counters})
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export_csv(self, path: str):
+        """Escreve uma linha por trecho medido: quadro, tipo (cpu/gpu), nome, início e duração em ms, profundidade."""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "kind", "name", "start_ms", "duration_ms", "depth"])
+            for frame in self.frames:
+                for name, start, duration, depth in frame.events:
+                    writer.writerow([frame.index, "cpu", name, f"{start * 1000:.4f}", f"{duration * 1000:.4f}", depth])
+                for name, start, duration in frame.gpu:
+                    writer.writerow([frame.index, "gpu", name, f"{start * 1000:.4f}", f"{duration * 1000:.4f}", 0])
+
+
+profiler = Profiler()
@@ -1,2 +1,5 @@
 from .camera import Camera
 from .window import Window
+from .headless import HeadlessWindow
+from .shader import Shader, Program
+from .frustum import Frustum
@@ -3,7 +3,6 @@ from typing import Set
 
 import glfw
 import glm
-from OpenGL.GL import glUniform3fv, glGetUniformLocation
 
 
 @dataclass
@@ -54,6 +53,6 @@ class Camera:
         if glfw.KEY_LEFT_SHIFT in key_actions:
             self.position -= self.up * self.speed * delta
 
-    def update(self, shader_program):
-        # update in vec3 cameraPos
-        glUniform3fv(glGetUniformLocation(shader_program, "cameraPos"), 1, glm.value_ptr(self.position))
+    def update(self, shader_program, position: glm.vec3 = None):
+        # update in vec3 cameraPos (com `position`, a posição interpolada do quadro)
+        shader_program.set_vec3("cameraPos", self.position if position is None else position)
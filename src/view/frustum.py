@@ -0,0 +1,69 @@
+"""
+Tronco de visão (frustum) da câmera, para descartar objetos que não aparecem na tela antes de desenhá-los.
+"""
+import glm
+import numpy as np
+
+
+class Frustum:
+    """
+    Os seis planos do tronco de visão de uma matriz `projection * view`, extraídos pelo método de Gribb e Hartmann.
+
+    Atributos:
+        planes (np.ndarray): Array (6, 4) com os planos esquerdo, direito, inferior, superior, próximo e distante.
+        Cada plano (a, b, c, d) tem a normal (a, b, c) unitária e apontando para dentro, então um ponto p está do
+        lado de dentro quando `a*x + b*y + c*z + d >= 0`, e esse valor é a sua distância até o plano.
+    """
+    def __init__(self, matrix: glm.mat4):
+        self.planes = extract_planes(matrix)
+
+    def spheres_visible(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """
+        Testa várias esferas de uma vez.
+
+        :param centers: Array (n, 3).
+        :param radii: Array (n,).
+        :return: Array (n,) bool, False para as esferas completamente fora de algum plano.
+        """
+        distances = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        return (distances >= -radii[:, None]).all(axis=1)
+
+    def boxes_visible(self, centers: np.ndarray, extents: np.ndarray) -> np.ndarray:
+        """
+        Testa várias caixas alinhadas aos eixos de uma vez. Conservador: caixas perto dos cantos do tronco podem
+        ser consideradas visíveis mesmo estando fora, mas uma caixa visível nunca é descartada.
+
+        :param centers: Array (n, 3) com os centros.
+        :param extents: Array (n, 3) com a metade do tamanho de cada caixa.
+        :return: Array (n,) bool, False para as caixas completamente fora de algum plano.
+        """
+        distances = centers @ self.planes[:, :3].T + self.planes[:, 3]
+        # Raio da caixa projetado na normal de cada plano
+        reach = extents @ np.abs(self.planes[:, :3]).T
+        return (distances >= -reach).all(axis=1)
+
+    def sphere_visible(self, center, radius: float) -> bool:
+        return bool(self.spheres_visible(np.asarray(center, dtype=np.float64).reshape(1, 3), np.array([radius]))[0])
+
+    def box_visible(self, low, high) -> bool:
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+        return bool(self.boxes_visible(((low + high) / 2).reshape(1, 3), ((high - low) / 2).reshape(1, 3))[0])
+
+
+def extract_planes(matrix: glm.mat4) -> np.ndarray:
+    """
+    Extrai e normaliza os planos do tronco de visão da matriz `projection * view` (veja Frustum).
+
+    :param matrix: Matriz do glm ou array 4x4 na convenção matemática (linha, coluna).
+    :return: Array (6, 4) float64.
+    """
+    rows = np.array(matrix, dtype=np.float64).reshape(4, 4)
+    planes = np.array([
+        rows[3] + rows[0],  # esquerdo
+        rows[3] - rows[0],  # direito
+        rows[3] + rows[1],  # inferior
+        rows[3] - rows[1],  # superior
+        rows[3] + rows[2],  # próximo
+        rows[3] - rows[2],  # distante
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
@@ -0,0 +1,191 @@
+import ctypes
+import os
+
+import glfw
+import numpy as np
+from OpenGL.GL import *
+from PIL import Image
+
+
+class HeadlessWindow:
+    """
+    Substitui a Window quando não há display nem GPU (ex.: máquinas de CI): cria um contexto OpenGL 3.3 core sem
+    janela visível e desenha em um framebuffer próprio (FBO com cor e profundidade) do tamanho pedido, que pode ser
+    lido com `read_pixels` ou salvo com `save`.
+
+    Backends:
+        - "egl": contexto EGL sem superfície de janela (no Linux sem GPU, o Mesa usa o llvmpipe). O PyOpenGL
+          precisa ter sido configurado para EGL antes do primeiro import do OpenGL, com a variável de ambiente
+          PYOPENGL_PLATFORM=egl (veja benchmarks/render.py).
+        - "glfw": janela GLFW invisível. Ainda precisa de um display (ex.: Xvfb), mas nada aparece na tela.
+
+    A interface é a mesma da Window; os callbacks de entrada são guardados, mas nunca chamados.
+
+    Atributos:
+        backend (str): "egl" ou "glfw".
+
+        framebuffer (int): O FBO em que o jogo desenha.
+
+        frames (int): Quantidade de trocas de buffer (quadros apresentados).
+    """
+
+    def __init__(self, width: int = 800, height: int = 600, title: str = "Game", backend: str = "egl"):
+        if backend not in ("egl", "glfw"):
+            raise ValueError(f"backend desconhecido: {backend}")
+
+        self.width = width
+        self.height = height
+        self.title = title
+        self.backend = backend
+        self.window = None
+
+        self.display = None
+        self.surface = None
+        self.context = None
+
+        self.framebuffer = 0
+        self.renderbuffers = []
+        self.callbacks = {}
+        self.closed = False
+        self.frames = 0
+        self.fullscreen = False
+
+    def create_window(self):
+        if self.backend == "egl":
+            self.create_egl_context()
+        else:
+            self.create_glfw_context()
+        self.create_framebuffer()
+        return self
+
+    def create_egl_context(self):
+        from OpenGL import platform
+        if type(platform.PLATFORM).__name__ != "EGLPlatform":
+            raise RuntimeError("O backend EGL precisa de PYOPENGL_PLATFORM=egl definido antes de importar o OpenGL")
+
+        from OpenGL import EGL
+        # Sem display, o Mesa escolhe a plataforma "surfaceless" (renderização só em memória)
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise RuntimeError("Não foi possível inicializar o EGL")
+
+        attributes = (EGL.EGLint * 7)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                      EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_NONE)
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        EGL.eglChooseConfig(self.display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if not count.value:
+            raise RuntimeError("Nenhuma configuração EGL com OpenGL e pbuffer")
+
+        # A superfície só serve para tornar o contexto atual: o jogo desenha no FBO
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config,
+                                                   (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attributes = (EGL.EGLint * 7)(EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                                              EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+                                              EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT, EGL.EGL_NONE)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+        if not self.context or not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("Não foi possível criar o contexto OpenGL 3.3 core pelo EGL")
+
+    def create_glfw_context(self):
+        if not glfw.init():
+            raise RuntimeError("Não foi possível inicializar o GLFW")
+
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+        glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+
+        self.window = glfw.create_window(self.width, self.height, self.title, None, None)
+        if not self.window:
+            glfw.terminate()
+            raise RuntimeError("Não foi possível criar a janela GLFW invisível")
+        glfw.make_context_current(self.window)
+
+    def create_framebuffer(self):
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+
+        color, depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color)
+        glBindRenderbuffer(GL_RENDERBUFFER, depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, depth)
+        self.renderbuffers = [color, depth]
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Framebuffer offscreen incompleto")
+        glViewport(0, 0, self.width, self.height)
+
+    def read_pixels(self) -> np.ndarray:
+        """
+        Lê o framebuffer.
+
+        :return: Array (altura, largura, 3) de uint8, com a primeira linha no topo da imagem.
+        """
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3)
+        return pixels[::-1].copy()
+
+    def save(self, path: str):
+        """Salva o framebuffer como imagem (o formato vem da extensão, ex.: .png)."""
+        Image.fromarray(self.read_pixels()).save(path)
+
+    def close_window(self):
+        if self.framebuffer:
+            glDeleteRenderbuffers(len(self.renderbuffers), self.renderbuffers)
+            glDeleteFramebuffers(1, [self.framebuffer])
+            self.framebuffer = 0
+
+        if self.backend == "egl" and self.display is not None:
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglDestroySurface(self.display, self.surface)
+            EGL.eglTerminate(self.display)
+            self.display = None
+        elif self.window:
+            glfw.destroy_window(self.window)
+            glfw.terminate()
+            self.window = None
+
+    def set_framebuffer_size_callback(self, callback):
+        self.callbacks["framebuffer_size"] = callback
+
+    def set_cursor_callback(self, callback):
+        self.callbacks["cursor"] = callback
+
+    def set_scroll_callback(self, callback):
+        self.callbacks["scroll"] = callback
+
+    def set_key_callback(self, callback):
+        self.callbacks["key"] = callback
+
+    def set_input_mode(self, mode):
+        pass
+
+    def set_swap_interval(self, interval: int):
+        # Sem monitor, não há vsync
+        pass
+
+    def should_close(self):
+        return self.closed
+
+    def set_title(self, title: str):
+        pass
+
+    def swap_buffers(self):
+        # Não há buffer para apresentar; o quadro fica no FBO até o próximo glClear
+        self.frames += 1
+
+    def poll_events(self):
+        pass
+
+    def toggle_fullscreen(self):
+        pass
@@ -1,8 +1,193 @@
+from typing import Dict, List
+
 import glm
 import numpy as np
 from OpenGL.GL import *
+from OpenGL.GL.shaders import ShaderProgram
 from PIL import Image
 
+# Deve ser igual ao MAX_LIGHTS de shaders/fragment.glsl
+MAX_LIGHTS = 10
+# Ponto de ligação do uniform buffer `Lights`, compartilhado por todos os programas
+LIGHTS_BINDING = 0
+
+
+class Program(ShaderProgram):
+    """
+    Programa de shaders com cache das localizações dos uniforms.
+
+    Continua sendo um ShaderProgram (um int com o id do programa), então pode ser passado para qualquer função
+    do OpenGL. As localizações de todos os uniforms ativos são consultadas uma única vez, logo após o link, e os
+    setters tipados só enviam um valor para a GPU quando ele é diferente do último enviado.
+
+    Atributos:
+        locations (Dict[str, int]): Localização de cada uniform, incluindo cada posição de arrays (`lightPos[3]`).
+
+        stats (Dict[str, int]): Contadores de chamadas ao OpenGL desde o último `reset_stats`:
+        `uploads` (glUniform* executados), `skipped` (envios evitados por valor repetido)
+        e `lookups` (glGetUniformLocation executados).
+    """
+    def __init__(self, program: int):
+        super().__init__()
+        self.locations: Dict[str, int] = {}
+        self.values: Dict[int, object] = {}
+        self.stats = {"uploads": 0, "skipped": 0, "lookups": 0}
+        self.material = None
+        self.cache_uniforms()
+        self.bind_light_block()
+
+    def cache_uniforms(self):
+        """Consulta e guarda a localização de todos os uniforms ativos do programa."""
+        for i in range(glGetProgramiv(self, GL_ACTIVE_UNIFORMS)):
+            name, size, _ = glGetActiveUniform(self, i)
+            name = name.decode() if isinstance(name, bytes) else name
+
+            if name.endswith("[0]"):
+                # Arrays aparecem uma única vez, como `nome[0]`; cada posição tem sua própria localização
+                base = name[:-3]
+                for j in range(size):
+                    self.locations[f"{base}[{j}]"] = glGetUniformLocation(self, f"{base}[{j}]")
+                self.locations[base] = self.locations[name]
+            else:
+                self.locations[name] = glGetUniformLocation(self, name)
+
+    def bind_light_block(self):
+        """Liga o bloco `Lights` do shader ao ponto de ligação do LightBuffer, se o bloco estiver ativo."""
+        index = glGetUniformBlockIndex(self, "Lights")
+        if index != GL_INVALID_INDEX:
+            glUniformBlockBinding(self, index, LIGHTS_BINDING)
+
+    def location(self, name: str) -> int:
+        location = self.locations.get(name)
+        if location is None:
+            # Uniform inativo (removido pelo compilador) ou nome inválido: consulta uma vez e guarda o -1
+            location = glGetUniformLocation(self, name)
+            self.locations[name] = location
+            self.stats["lookups"] += 1
+        return location
+
+    def changed(self, location: int, value) -> bool:
+        """Registra `value` como o valor atual do uniform e diz se ele precisa ser enviado."""
+        if location == -1:
+            return False
+        if self.values.get(location) == value:
+            self.stats["skipped"] += 1
+            return False
+        self.values[location] = value
+        self.stats["uploads"] += 1
+        return True
+
+    def set_int(self, name: str, value: int):
+        location = self.location(name)
+        if self.changed(location, int(value)):
+            glUniform1i(location, value)
+
+    def set_float(self, name: str, value: float):
+        location = self.location(name)
+        if self.changed(location, float(value)):
+            glUniform1f(location, value)
+
+    def set_vec3(self, name: str, value):
+        location = self.location(name)
+        value = glm.vec3(value)  # cópia, pois vetores do glm são alterados no lugar
+        if self.changed(location, value):
+            glUniform3fv(location, 1, glm.value_ptr(value))
+
+    def set_mat4(self, name: str, value):
+        location = self.location(name)
+        value = glm.mat4(value)
+        if self.changed(location, value):
+            glUniformMatrix4fv(location, 1, GL_FALSE, glm.value_ptr(value))
+
+    def set_material(self, ambient: float, diffuse: float, specular: float, shininess: float):
+        """
+        Envia os coeficientes do material apenas quando eles diferem do material ligado por último,
+        evitando até as comparações por uniform quando vários objetos seguidos usam o mesmo material.
+        """
+        material = (ambient, diffuse, specular, shininess)
+        if material == self.material:
+            self.stats["skipped"] += 4
+            return
+        self.material = material
+        self.set_float("ambientCoefficient", ambient)
+        self.set_float("diffuseCoefficient", diffuse)
+        self.set_float("specularCoefficient", specular)
+        self.set_float("shininess", shininess)
+
+    def reset_stats(self):
+        stats = dict(self.stats)
+        for key in self.stats:
+            self.stats[key] = 0
+        return stats
+
+
+class LightBuffer:
+    """
+    Uniform buffer com as luzes da cena (bloco `Lights` de shaders/fragment.glsl, layout std140).
+
+    As luzes são as mesmas para todos os objetos de uma cena, então são enviadas uma vez por cena, e não por objeto.
+    O buffer é compartilhado por todos os programas e só é reenviado quando o conteúdo muda.
+    """
+    # Layout std140: lightPos[10] e lightColor[10] como vec4, ambientLight como vec4 e numLights como int
+    SIZE = (2 * MAX_LIGHTS + 1) * 16 + 16
+
+    def __init__(self):
+        self.ubo = None
+        self.data = None
+        self.stats = {"uploads": 0, "skipped": 0}
+
+    @staticmethod
+    def pack(lights: List = None, ambient_light=None) -> np.ndarray:
+        """
+        Monta o conteúdo do bloco `Lights`.
+
+        :param lights: Fontes de luz (com `position` e `luminance`). Apenas as MAX_LIGHTS primeiras são usadas.
+        :param ambient_light: Fonte de luz ambiente (com `luminance`), ou None para nenhuma.
+        :return: Array float32 com LightBuffer.SIZE bytes.
+        """
+        data = np.zeros(LightBuffer.SIZE // 4, dtype=np.float32)
+        lights = lights[:MAX_LIGHTS] if lights else []
+
+        positions = data[:4 * MAX_LIGHTS].reshape(MAX_LIGHTS, 4)
+        colors = data[4 * MAX_LIGHTS:8 * MAX_LIGHTS].reshape(MAX_LIGHTS, 4)
+        for i, light in enumerate(lights):
+            positions[i, :3] = light.position
+            colors[i, :3] = light.luminance
+
+        if ambient_light:
+            data[8 * MAX_LIGHTS:8 * MAX_LIGHTS + 3] = ambient_light.luminance
+        data.view(np.int32)[8 * MAX_LIGHTS + 4] = len(lights)
+        return data
+
+    def update(self, lights: List = None, ambient_light=None):
+        """Envia as luzes para a GPU, se forem diferentes das últimas enviadas."""
+        data = self.pack(lights, ambient_light)
+        if self.data is not None and np.array_equal(data, self.data):
+            self.stats["skipped"] += 1
+            return
+
+        if self.ubo is None:
+            self.ubo = glGenBuffers(1)
+            glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+            glBufferData(GL_UNIFORM_BUFFER, self.SIZE, None, GL_DYNAMIC_DRAW)
+            glBindBufferBase(GL_UNIFORM_BUFFER, LIGHTS_BINDING, self.ubo)
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        self.data = data
+        self.stats["uploads"] += 1
+
+    def reset_stats(self):
+        stats = dict(self.stats)
+        for key in self.stats:
+            self.stats[key] = 0
+        return stats
+
+
+# As luzes fazem parte do estado global do contexto OpenGL, então há um único buffer
+light_buffer = LightBuffer()
+
 
 class Shader:
     def __init__(self, vertex_shader, fragment_shader):
@@ -26,7 +211,7 @@ class Shader:
 
         return shader
 
-    def create_shader_program(self):
+    def create_shader_program(self) -> Program:
         shader_program = glCreateProgram()
         glAttachShader(shader_program, self.vertex_shader)
         glAttachShader(shader_program, self.fragment_shader)
@@ -35,7 +220,7 @@ class Shader:
         if not glGetProgramiv(shader_program, GL_LINK_STATUS):
             raise Exception(glGetProgramInfoLog(shader_program))
 
-        return shader_program
+        return Program(shader_program)
 
     def use(self):
         glUseProgram(self.shader_program)
@@ -10,6 +10,7 @@ class Window:
     Funções:
         - create_window: Cria a janela gráfica.
         - close_window: Fecha a janela gráfica.
+        - set_swap_interval: Define quantos retraços do monitor a troca de buffers espera (1 = vsync).
         - set_framebuffer_size_callback: Define o callback para redimensionamento da janela.
         - set_cursor_callback: Define o callback para movimento do cursor.
         - set_key_callback: Define o callback para pressionamento de teclas.
@@ -49,6 +50,9 @@ class Window:
         return self.window
 
     def close_window(self):
+        if self.window:
+            glfw.destroy_window(self.window)
+            self.window = None
         glfw.terminate()
 
     def set_framebuffer_size_callback(self, callback):
@@ -66,9 +70,15 @@ class Window:
     def set_input_mode(self, mode):
         glfw.set_input_mode(self.window, glfw.CURSOR, mode)
 
+    def set_swap_interval(self, interval: int):
+        glfw.swap_interval(interval)
+
     def should_close(self):
         return glfw.window_should_close(self.window)
 
+    def set_title(self, title: str):
+        glfw.set_window_title(self.window, title)
+
     def swap_buffers(self):
         glfw.swap_buffers(self.window)
 